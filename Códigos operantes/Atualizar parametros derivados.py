@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+__title__ = "Atualizar Parâmetros Derivados"
+__doc__ = """Versão: 1.0
+_____________________________________________________________________
+Descrição:
+Liga ou desliga, no documento ativo, o atualizador que mantém a
+potência ativa, a potência reativa e a corrente das tomadas sempre de
+acordo com a potência aparente, o fator de potência, a tensão e o
+número de fases. Com ele ligado, editar S ou cos φ de uma ou de
+milhares de tomadas recalcula os derivados na mesma transação.
+O atualizador vale até o Revit ser fechado.
+_____________________________________________________________________
+Como usar:
+- Clique no botão para ligar ou desligar no documento ativo. Ao ligar,
+  é possível recalcular de uma vez os derivados de todas as tomadas.
+- Clique de novo depois de criar parâmetros elétricos novos no projeto
+  para observar também esses parâmetros.
+- Ctrl+clique grava um rastreio com o tempo de cada etapa e diálogo
+  (resumo na janela do pyRevit; arquivo para chrome://tracing).
+_____________________________________________________________________
+Autor: Seu Nome"""
+
+# O atualizador precisa continuar vivo depois que o script termina
+__persistentengine__ = True
+
+# Instante do clique, para medir o tempo até o primeiro diálogo
+import time
+_INICIO = time.time()
+
+import traceback
+
+# Importações do pyRevit
+from pyrevit import forms
+
+# Biblioteca compartilhada da extensão (pasta lib/)
+import os
+import sys
+_LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib')
+if _LIB not in sys.path:
+    sys.path.append(_LIB)
+from eletrica import atualizador, exportacao, formularios, parametrizacao, partida, transacoes
+
+# Variáveis do documento
+doc = __revit__.ActiveUIDocument.Document  # Documento ativo do Revit
+app = __revit__.Application
+
+
+def recalcular_projeto():
+    """Recalcula os derivados de todas as tomadas do projeto em uma transação."""
+    tomadas = list(exportacao.coletar_instancias(doc, atualizador.CATEGORIA_TOMADAS))
+    agendador = transacoes.Agendador(doc, "Recalcular Parâmetros Derivados")
+    with agendador, agendador.etapa("Recalcular Parâmetros Derivados"):
+        resultado = parametrizacao.recalcular_derivados(tomadas)
+    return resultado
+
+
+def main():
+    try:
+        id_addin = app.ActiveAddInId
+        if atualizador.ativo(doc, id_addin):
+            atualizador.desativar(doc, id_addin)
+            partida.primeiro_dialogo(__title__)
+            formularios.informar(
+                "Atualizador desligado neste documento.\n"
+                "P, Q e a corrente não serão mais recalculados automaticamente.",
+                __title__,
+            )
+            return
+
+        ids, completos = atualizador.ativar(doc, id_addin)
+        partida.primeiro_dialogo(__title__)
+        mensagem = "Atualizador ligado neste documento ({} parâmetro(s) observado(s)).".format(len(ids))
+        if not completos:
+            mensagem += ("\nAlgumas entradas são parâmetros de família: qualquer alteração "
+                         "de tomada dispara o recálculo.")
+        mensagem += "\n\nRecalcular agora os derivados de todas as tomadas do projeto?"
+        if not formularios.confirmar(mensagem, __title__):
+            return
+
+        resultado = recalcular_projeto()
+        texto = "{} tomada(s) atualizada(s), {} já estavam corretas.".format(
+            len(resultado.alteradas), resultado.mantidas)
+        if resultado.sem_parametros:
+            texto += "\n{} tomada(s) sem parâmetros derivados graváveis.".format(len(resultado.sem_parametros))
+        if resultado.erros:
+            texto += "\n\nErros:\n" + "\n".join(resultado.erros[:10])
+        formularios.informar(texto, __title__)
+    except Exception:
+        tb = traceback.format_exc()
+        forms.alert("Ocorreu um erro:\n{}".format(tb))
+
+
+# Executar o script
+if __name__ == "__main__":
+    with partida.ferramenta(__title__, _INICIO):
+        main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+__title__ = "Calcular Demanda dos Circuitos"
+__doc__ = """Versão: 1.0
+_____________________________________________________________________
+Descrição:
+Calcula, para todos os circuitos de força do projeto, a carga
+instalada, a demanda, a corrente de projeto, a seção mínima do
+condutor e a queda de tensão estimada, e totaliza a demanda de cada
+painel pela tabela de fatores de demanda.
+Os resultados por circuito ficam em cache durante a sessão: ao rodar
+de novo, só os circuitos alterados são recalculados.
+_____________________________________________________________________
+Como usar:
+- Clique no botão. Shift+clique descarta o cache e recalcula tudo.
+- Ctrl+clique grava um rastreio com o tempo de cada etapa e diálogo
+  (resumo na janela do pyRevit; arquivo para chrome://tracing).
+_____________________________________________________________________
+Autor: Seu Nome"""
+
+# Instante do clique, para medir o tempo até o primeiro diálogo
+import time
+_INICIO = time.time()
+
+import traceback
+
+# Importações do pyRevit
+from pyrevit import forms, script
+
+# Biblioteca compartilhada da extensão (pasta lib/)
+import os
+import sys
+_LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib')
+if _LIB not in sys.path:
+    sys.path.append(_LIB)
+from eletrica import demanda, partida, relatorio
+
+# Variáveis do documento
+doc = __revit__.ActiveUIDocument.Document  # Documento ativo do Revit
+
+
+def main():
+    try:
+        cache = demanda.CacheDemanda() if __shiftclick__ else None
+        analise = demanda.analisar(doc, cache=cache)
+        partida.primeiro_dialogo(__title__)
+        if not analise.circuitos:
+            forms.alert("Nenhum circuito de força encontrado no projeto.", exitscript=True)
+
+        rel = relatorio.Relatorio([relatorio.DestinoPyRevit(script.get_output())])
+        rel.texto("{} circuito(s) recalculado(s), {} reaproveitado(s) do cache.".format(
+            analise.cache.recalculados, analise.cache.reaproveitados))
+        demanda.relatar(analise, rel)
+        rel.emitir()
+
+        reprovados = analise.reprovados()
+        if reprovados:
+            forms.alert("{} circuito(s) não atendem à queda de tensão máxima ({} %) "
+                        "nem com a maior seção da tabela.".format(len(reprovados), demanda.QUEDA_MAXIMA))
+    except Exception:
+        tb = traceback.format_exc()
+        forms.alert("Ocorreu um erro:\n{}".format(tb))
+
+
+# Executar o script
+if __name__ == "__main__":
+    with partida.ferramenta(__title__, _INICIO):
+        main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+__title__ = "Calcular Rotas dos Circuitos"
+__doc__ = """Versão: 1.0
+_____________________________________________________________________
+Descrição:
+Estima o comprimento real dos eletrodutos de cada circuito seguindo as
+paredes do nível, do painel até a tomada mais distante, e grava o valor
+no parâmetro "Comprimento da Rota (m)" dos circuitos. O cálculo de
+demanda e queda de tensão passa a usar esse comprimento.
+O grafo das paredes de cada nível fica guardado durante a sessão e só é
+refeito quando as paredes mudam.
+_____________________________________________________________________
+Como usar:
+- Crie um parâmetro de projeto "Comprimento da Rota (m)" (Número) na
+  categoria Circuitos elétricos.
+- Clique no botão. Shift+clique refaz o grafo das paredes.
+- Ctrl+clique grava um rastreio com o tempo de cada etapa e diálogo
+  (resumo na janela do pyRevit; arquivo para chrome://tracing).
+_____________________________________________________________________
+Autor: Seu Nome"""
+
+# Instante do clique, para medir o tempo até o primeiro diálogo
+import time
+_INICIO = time.time()
+
+import traceback
+
+# Importações do pyRevit
+from pyrevit import forms, script
+
+# Biblioteca compartilhada da extensão (pasta lib/)
+import os
+import sys
+_LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib')
+if _LIB not in sys.path:
+    sys.path.append(_LIB)
+from eletrica import demanda, partida, relatorio, rotas, transacoes
+from eletrica.catalogo import id_inteiro
+
+# Variáveis do documento
+doc = __revit__.ActiveUIDocument.Document  # Documento ativo do Revit
+
+
+def main():
+    try:
+        lista = demanda.coletar_circuitos(doc)
+        resultado = rotas.calcular_rotas(doc, lista, usar_sessao=not __shiftclick__)
+        partida.primeiro_dialogo(__title__)
+        if not resultado.comprimentos:
+            forms.alert("Nenhum circuito ligado a um painel foi encontrado.", exitscript=True)
+
+        agendador = transacoes.Agendador(doc, "Calcular Rotas dos Circuitos")
+        with agendador:
+            gravados, sem_parametro = rotas.gravar_comprimentos(
+                doc, lista, resultado.comprimentos, agendador)
+
+        rel = relatorio.Relatorio([relatorio.DestinoPyRevit(script.get_output())])
+        rel.titulo(u"Comprimento de rota por circuito")
+        paineis = dict((id_inteiro(c.Id), c.BaseEquipment) for c in lista)
+        rel.tabela(
+            sorted((id_circuito, paineis[id_circuito].Name, u"{:.1f}".format(metros))
+                   for id_circuito, metros in resultado.comprimentos.items()),
+            [u"Circuito", u"Painel", u"Rota (m)"],
+        )
+        rel.texto(u"{} circuito(s) atualizado(s); {} painel(is)/nível(is) calculados.".format(
+            gravados, resultado.consultas))
+        if resultado.sem_rota:
+            rel.texto(u"{} tomada(s) sem caminho pelas paredes até o painel (usada a distância "
+                      u"ortogonal): {}".format(len(resultado.sem_rota),
+                                                u", ".join(str(i) for i in resultado.sem_rota[:50])))
+        agendador.relatar(rel)
+        rel.emitir()
+
+        if sem_parametro:
+            forms.alert("{} circuito(s) não têm o parâmetro '{}'. Crie-o como parâmetro de projeto "
+                        "na categoria Circuitos elétricos.".format(sem_parametro, rotas.PARAM_COMPRIMENTO_ROTA))
+    except transacoes.ErroEtapa as e:
+        forms.alert("A gravação foi desfeita:\n{}".format(e))
+    except Exception:
+        tb = traceback.format_exc()
+        forms.alert("Ocorreu um erro:\n{}".format(tb))
+
+
+# Executar o script
+if __name__ == "__main__":
+    with partida.ferramenta(__title__, _INICIO):
+        main()
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 __title__ = "Log de Informações da Tomada"
-__doc__ = """Script para selecionar uma família de tomada e logar todas as suas informações e parâmetros."""
+__doc__ = """Script para selecionar famílias de tomada e logar todas as suas informações e parâmetros (janela do pyRevit, texto ou JSON lines)."""
 
 # Importações necessárias
 import clr
@@ -14,117 +14,88 @@ from pyrevit import revit, forms, script
 
 import traceback  # Para capturar o traceback completo
 
+# Biblioteca compartilhada da extensão (pasta lib/)
+import os
+import sys
+_LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib')
+if _LIB not in sys.path:
+    sys.path.append(_LIB)
+from eletrica import busca, catalogo, partida, relatorio, transacoes
+
 # Variáveis do documento
 doc = revit.doc  # Documento ativo do Revit
 uidoc = revit.uidoc  # Documento UI ativo
 
 
-def selecionar_familia_tomada():
-    """Permite que o usuário selecione uma família de tomada elétrica."""
-    output = script.get_output()
-    output.print_md("### Iniciando seleção da família de tomada.")
-
-    # Coletar todos os símbolos de família da categoria "Dispositivos elétricos"
-    collector = FilteredElementCollector(doc) \
-        .OfClass(FamilySymbol) \
-        .OfCategory(BuiltInCategory.OST_ElectricalFixtures)
+DESTINO_JANELA = "Janela de Output do pyRevit"
+DESTINO_TEXTO = "Arquivo de texto (.txt)"
+DESTINO_JSONL = "JSON lines (.jsonl)"
 
-    tomadas = []
-    for symbol in collector:
-        try:
-            # Obter o nome da família usando BuiltInParameter
-            family_name_param = symbol.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME)
-            family_name = family_name_param.AsString() if family_name_param and family_name_param.HasValue else "Sem Família"
 
-            # Obter o nome do símbolo usando BuiltInParameter
-            symbol_name_param = symbol.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME)
-            symbol_name = symbol_name_param.AsString() if symbol_name_param and symbol_name_param.HasValue else "Sem Nome"
+def selecionar_familia_tomada(rel):
+    """Permite que o usuário selecione uma ou mais famílias de tomada elétrica."""
+    rel.titulo("Iniciando seleção da família de tomada.")
 
-            # Filtrar por famílias que contenham "Tomada" no nome
-            if "Tomada" in family_name or "Tomada" in symbol_name:
-                tomadas.append(symbol)
-        except Exception as e:
-            output.print_md("**Erro ao processar símbolo de família:** {}".format(e))
-            pass
+    # Índice persistente dos símbolos da categoria "Dispositivos elétricos"
+    catalogo_simbolos = catalogo.carregar_catalogo(doc, completo=__shiftclick__)
+    indice = busca.indice_do_catalogo(doc, catalogo_simbolos)
 
-    if not tomadas:
+    if not len(indice):
         forms.alert("Nenhuma família de tomadas encontrada no projeto.", exitscript=True)
 
-    # Criar um dicionário de opções
-    tomadas_dict = {}
-    for tomada in tomadas:
-        try:
-            # Obter o nome da família
-            family_name_param = tomada.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME)
-            family_name = family_name_param.AsString() if family_name_param and family_name_param.HasValue else "Sem Família"
-
-            # Obter o nome do símbolo
-            symbol_name_param = tomada.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME)
-            symbol_name = symbol_name_param.AsString() if symbol_name_param and symbol_name_param.HasValue else "Sem Nome"
-
-            display_name = "{} : {}".format(family_name, symbol_name)
-            tomadas_dict[display_name] = tomada
-        except Exception as e:
-            output.print_md("**Erro ao processar tomada:** {}".format(e))
-            pass
-
-    if not tomadas_dict:
-        forms.alert("Nenhuma família de tomadas válida encontrada.", exitscript=True)
-
-    # Ordenar os nomes para exibição
-    tomadas_nomes_ordenados = sorted(tomadas_dict.keys())
-
-    # Permitir que o usuário selecione uma tomada
-    output.print_md("### Exibindo lista de tomadas para seleção.")
-    tomada_selecionada_nome = forms.SelectFromList.show(
-        tomadas_nomes_ordenados,
-        title='Selecione uma Tomada',
-        button_name='Selecionar',
-        multiselect=False
+    # Permitir que o usuário busque e selecione as tomadas
+    rel.titulo("Exibindo lista de tomadas para seleção.")
+    escolhidos = busca.escolher_simbolos(
+        indice, 'Selecione as Tomadas',
+        categorias=catalogo.ids_categorias(['OST_ElectricalFixtures']),
+        multiselecao=True,
     )
 
-    if not tomada_selecionada_nome:
+    if not escolhidos:
         forms.alert("Nenhuma tomada selecionada.", exitscript=True)
 
-    tomada_selecionada = tomadas_dict[tomada_selecionada_nome]
-
-    # Adicionar logs para depuração
-    output.print_md("### Tipo de tomada_selecionada: {}".format(type(tomada_selecionada)))
-    output.print_md("### Atributos disponíveis: {}".format(dir(tomada_selecionada)))
-
-    # Ativar o símbolo da família, se necessário
-    if not tomada_selecionada.IsActive:
-        output.print_md("### Ativando o símbolo da família da tomada.")
-        with revit.Transaction("Ativar Família"):
-            tomada_selecionada.Activate()
-            doc.Regenerate()
-
-    # Verificar se o atributo 'Name' existe
-    if hasattr(tomada_selecionada, 'Name'):
-        output.print_md("### Família de tomada selecionada: {}".format(tomada_selecionada.Name))
-    else:
-        output.print_md("### O objeto tomada_selecionada não possui o atributo 'Name'.")
+    tomadas_selecionadas = [doc.GetElement(ElementId(id_simbolo)) for id_simbolo in escolhidos]
+
+    # Ativar os símbolos das famílias, se necessário (uma única transação)
+    inativas = [tomada for tomada in tomadas_selecionadas if not tomada.IsActive]
+    if inativas:
+        rel.titulo("Ativando {} símbolo(s) de família de tomada.".format(len(inativas)))
+        # Uma regeneração no fim da etapa, qualquer que seja o número de símbolos
+        agendador = transacoes.Agendador(doc, "Ativar Família")
+        with agendador.etapa("Ativar Família"):
+            for tomada in inativas:
+                tomada.Activate()
+                agendador.regenerar()
+        agendador.relatar(rel)
+
+    for tomada in tomadas_selecionadas:
+        # Adicionar logs para depuração
+        rel.titulo("Tipo de tomada_selecionada: {}".format(type(tomada)))
+        rel.item("Atributos disponíveis", ", ".join(dir(tomada)))
+        if hasattr(tomada, 'Name'):
+            rel.item("Família de tomada selecionada", tomada.Name)
+        else:
+            rel.item("O objeto tomada_selecionada não possui o atributo 'Name'.")
 
-    return tomada_selecionada
+    return tomadas_selecionadas
 
 
-def logar_informacoes_tomada(tomada):
-    """Loga todas as informações e parâmetros da tomada selecionada."""
-    output = script.get_output()
-    output.print_md("### Iniciando log de informações da tomada.")
+def logar_informacoes_tomada(tomada, rel):
+    """Acrescenta ao relatório todas as informações e parâmetros da tomada."""
+    rel.titulo("Iniciando log de informações da tomada.")
 
     # Logar informações básicas da família
-    output.print_md("**Informações da Família:**")
+    rel.texto("**Informações da Família:**")
     try:
         family = tomada.Family
-        output.print_md("- **Nome da Família:** {}".format(family.Name))
-        output.print_md("- **Nome do Tipo:** {}".format(tomada.Name))
-        output.print_md("- **IsActive:** {}".format(tomada.IsActive))
+        rel.item("Nome da Família", family.Name)
+        rel.item("Nome do Tipo", tomada.Name)
+        rel.item("IsActive", tomada.IsActive)
     except Exception as e:
-        output.print_md("**Erro ao obter informações básicas da família:** {}".format(e))
+        rel.texto("**Erro ao obter informações básicas da família:** {}".format(e))
 
-    # Logar todos os parâmetros da família
-    output.print_md("**Parâmetros da Tomada:**")
+    # Logar todos os parâmetros da família (uma tabela em vez de uma linha por parâmetro)
+    linhas = []
     try:
         parameters = tomada.Parameters
         for param in parameters:
@@ -139,49 +110,80 @@ def logar_informacoes_tomada(tomada):
             elif param.StorageType == StorageType.String:
                 param_value = param.AsString()
             elif param.StorageType == StorageType.ElementId:
-                param_value = param.AsElementId().IntegerValue
+                param_value = catalogo.id_inteiro(param.AsElementId())
             else:
                 param_value = "Tipo de armazenamento desconhecido"
 
-            output.print_md("- **{}:** {}".format(param_name, param_value))
+            linhas.append([param_name, param_value])
+        rel.tabela(linhas, ["Parâmetro", "Valor"], titulo="Parâmetros da Tomada:")
     except Exception as e:
-        output.print_md("**Erro ao obter parâmetros da tomada:** {}".format(e))
+        rel.texto("**Erro ao obter parâmetros da tomada:** {}".format(e))
 
     # Logar conectores elétricos, se houver
-    output.print_md("**Conectores Elétricos da Tomada:**")
+    rel.texto("**Conectores Elétricos da Tomada:**")
     try:
         connectors = tomada.MEPModel.ConnectorManager.Connectors
         if connectors.Size == 0:
-            output.print_md("- Nenhum conector encontrado.")
+            rel.item("Nenhum conector encontrado.")
         else:
             for connector in connectors:
-                output.print_md("- **Nome do Conector:** {}".format(connector.Name))
-                output.print_md("  - **Domain:** {}".format(connector.Domain))
-                output.print_md("  - **ConnectorType:** {}".format(connector.ConnectorType))
-                output.print_md(
-                    "  - **Origin:** ({:.2f}, {:.2f}, {:.2f})".format(connector.Origin.X, connector.Origin.Y,
-                                                                      connector.Origin.Z))
-                output.print_md("  - **Facing Orientation:** {}".format(connector.FacingOrientation))
-                output.print_md("  - **Is Connected:** {}".format(connector.IsConnected))
+                rel.item("Nome do Conector", connector.Name)
+                rel.item("Domain", connector.Domain, nivel=1)
+                rel.item("ConnectorType", connector.ConnectorType, nivel=1)
+                rel.item(
+                    "Origin",
+                    "({:.2f}, {:.2f}, {:.2f})".format(connector.Origin.X, connector.Origin.Y,
+                                                      connector.Origin.Z),
+                    nivel=1,
+                )
+                rel.item("Facing Orientation", connector.FacingOrientation, nivel=1)
+                rel.item("Is Connected", connector.IsConnected, nivel=1)
     except Exception as e:
-        output.print_md("**Erro ao obter conectores elétricos:** {}".format(e))
+        rel.texto("**Erro ao obter conectores elétricos:** {}".format(e))
+
+
+def escolher_destino():
+    """Pergunta para onde enviar o relatório; retorna a lista de destinos."""
+    escolha = forms.CommandSwitchWindow.show(
+        [DESTINO_JANELA, DESTINO_TEXTO, DESTINO_JSONL],
+        message="Destino do log:",
+    )
+    if escolha == DESTINO_TEXTO:
+        caminho = forms.save_file(file_ext='txt', default_name="log_tomadas")
+        if caminho:
+            return [relatorio.DestinoTexto(caminho)], caminho
+    elif escolha == DESTINO_JSONL:
+        caminho = forms.save_file(file_ext='jsonl', default_name="log_tomadas")
+        if caminho:
+            return [relatorio.DestinoJsonLines(caminho)], caminho
+    return [relatorio.DestinoPyRevit(script.get_output())], None
 
 
 def main():
+    destinos, caminho = escolher_destino()
+    rel = relatorio.Relatorio(destinos)
     try:
-        # Selecionar a família de tomada
-        tomada_selecionada = selecionar_familia_tomada()
+        # Selecionar as famílias de tomada
+        tomadas_selecionadas = selecionar_familia_tomada(rel)
 
-        # Logar informações da tomada
-        logar_informacoes_tomada(tomada_selecionada)
+        # Logar informações das tomadas
+        for tomada in tomadas_selecionadas:
+            logar_informacoes_tomada(tomada, rel)
 
-        forms.alert("Log de informações da tomada concluído. Verifique o painel de Output do pyRevit.")
+        # Uma única emissão para todo o log
+        rel.emitir()
+        if caminho:
+            forms.alert("Log de informações da tomada salvo em:\n{}".format(caminho))
+        else:
+            forms.alert("Log de informações da tomada concluído. Verifique o painel de Output do pyRevit.")
     except Exception as e:
         tb = traceback.format_exc()
+        rel.emitir()
         forms.alert("Ocorreu um erro:\n{}".format(tb))
         script.get_output().print_md("### Erro Geral no Script:\n{}".format(tb))
 
 
 # Executar o script
 if __name__ == "__main__":
-    main()
+    with partida.ferramenta(__title__):
+        main()
@@ -1,31 +1,51 @@
 # -*- coding: utf-8 -*-
 __title__ = "Inserir Tomada com Parâmetros Elétricos"
-__doc__ = """Versão: 2.0
+__doc__ = """Versão: 2.1
 _____________________________________________________________________
 Descrição:
 Este script insere uma tomada elétrica na parede selecionada,
 permitindo escolher a altura, posição horizontal e face (frontal/traseira).
 Adicionalmente, coleta parâmetros elétricos como potência aparente,
 fator de potência, tensão e número de fases para calcular a potência ativa.
+No modo de atualização, regrava S, cos φ, tensão e fases (e recalcula
+P, Q e a corrente) de todas as tomadas existentes da seleção, da vista
+ativa ou do projeto, em uma única transação.
 _____________________________________________________________________
 Como usar:
 - Clique no botão e siga as instruções.
+- Ctrl+clique grava um rastreio com o tempo de cada etapa e diálogo
+  (resumo na janela do pyRevit; arquivo para chrome://tracing).
 _____________________________________________________________________
 Autor: Seu Nome"""
 
-# Importações necessárias
-import clr
-clr.AddReference('System.Windows.Forms')
-from System.Windows.Forms import DialogResult, MessageBox, MessageBoxButtons, MessageBoxIcon
+# Instante do clique, para medir o tempo até o primeiro diálogo
+import time
+_INICIO = time.time()
 
-from Autodesk.Revit.DB import *
-from Autodesk.Revit.UI import *
+# Importações necessárias
+from Autodesk.Revit.DB import (
+    ElementId,
+    ElementTransformUtils,
+    Line,
+    LocationCurve,
+    StorageType,
+    Wall,
+    XYZ,
+)
 from Autodesk.Revit.UI.Selection import ObjectType
 from Autodesk.Revit.Exceptions import InvalidOperationException
 from Autodesk.Revit.DB.Structure import StructuralType
 
 # Importações do pyRevit
-from pyrevit import revit, forms, script
+from pyrevit import forms
+
+# Biblioteca compartilhada da extensão (pasta lib/)
+import os
+import sys
+_LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib')
+if _LIB not in sys.path:
+    sys.path.append(_LIB)
+from eletrica import busca, catalogo, formularios, parametrizacao, partida, transacoes
 
 # Variáveis do documento
 doc = __revit__.ActiveUIDocument.Document  # type: Document
@@ -35,84 +55,26 @@ app = __revit__.Application
 # Funções auxiliares
 def selecionar_familia_tomada():
     """Permite que o usuário selecione uma família de tomada elétrica."""
-    # Coletar todos os símbolos de família da categoria "Dispositivos elétricos"
-    collector = FilteredElementCollector(doc) \
-        .OfClass(FamilySymbol) \
-        .OfCategory(BuiltInCategory.OST_ElectricalFixtures)
-
-    tomadas = []
-    for symbol in collector:
-        # Obter o nome da família usando BuiltInParameter
-        family_name_param = symbol.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME)
-        if family_name_param and family_name_param.HasValue:
-            family_name = family_name_param.AsString()
-        else:
-            family_name = "Sem Família"
-
-        # Obter o nome do símbolo usando BuiltInParameter
-        symbol_name_param = symbol.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME)
-        if symbol_name_param and symbol_name_param.HasValue:
-            symbol_name = symbol_name_param.AsString()
-        else:
-            symbol_name = "Sem Nome"
-
-        # Filtrar por famílias que contenham "Tomada" no nome
-        if "Tomada" in family_name or "Tomada" in symbol_name:
-            tomadas.append(symbol)
+    # Índice persistente dos símbolos da categoria "Dispositivos elétricos"
+    catalogo_simbolos = catalogo.carregar_catalogo(doc, completo=__shiftclick__)
+    indice = busca.indice_do_catalogo(doc, catalogo_simbolos)
+    # Primeiro diálogo da ferramenta: registrar o tempo de partida
+    partida.primeiro_dialogo(__title__)
 
-    if not tomadas:
+    if not len(indice):
         forms.alert("Nenhuma família de tomadas encontrada no projeto.", exitscript=True)
 
-    # Criar um dicionário de opções
-    tomadas_dict = {}
-    for tomada in tomadas:
-        try:
-            # Obter o nome da família
-            family_name_param = tomada.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME)
-            if family_name_param and family_name_param.HasValue:
-                family_name = family_name_param.AsString()
-            else:
-                family_name = "Sem Família"
-
-            # Obter o nome do símbolo
-            symbol_name_param = tomada.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME)
-            if symbol_name_param and symbol_name_param.HasValue:
-                symbol_name = symbol_name_param.AsString()
-            else:
-                symbol_name = "Sem Nome"
-
-            display_name = "{} : {}".format(family_name, symbol_name)
-            tomadas_dict[display_name] = tomada
-        except Exception as e:
-            # Se ocorrer um erro, ignorar este elemento
-            pass
-
-    if not tomadas_dict:
-        forms.alert("Nenhuma família de tomadas válida encontrada.", exitscript=True)
-
-    # Ordenar os nomes para exibição
-    tomadas_nomes_ordenados = sorted(tomadas_dict.keys())
-
-    # Permitir que o usuário selecione uma tomada
-    tomada_selecionada_nome = forms.SelectFromList.show(
-        tomadas_nomes_ordenados,
-        title='Selecione uma Tomada',
-        button_name='Selecionar',
-        multiselect=False
+    # Busca com relevância, começando pelas tomadas (e sinônimos) da categoria
+    escolhidos = busca.escolher_simbolos(
+        indice, 'Selecione uma Tomada',
+        categorias=catalogo.ids_categorias(['OST_ElectricalFixtures']),
     )
 
-    if not tomada_selecionada_nome:
+    if not escolhidos:
         forms.alert("Nenhuma tomada selecionada.", exitscript=True)
 
-    tomada_selecionada = tomadas_dict[tomada_selecionada_nome]
-
-    # Ativar o símbolo da família, se necessário
-    if not tomada_selecionada.IsActive:
-        with revit.Transaction("Ativar Família"):
-            tomada_selecionada.Activate()
-            doc.Regenerate()
-
-    return tomada_selecionada
+    # A ativação do símbolo, se necessária, é feita na transação de inserção
+    return doc.GetElement(ElementId(escolhidos[0]))
 
 def selecionar_parede():
     """Permite que o usuário selecione uma parede."""
@@ -189,11 +151,9 @@ def obter_parametros_elec():
     # potencia_reativa = potencia_aparente * (1 - fator_potencia**2)**0.5  # Q = S * sin φ
 
     # Mostrar os cálculos ao usuário (substituir f-string por .format())
-    MessageBox.Show(
+    formularios.informar(
         "Potência Ativa (P): {} W".format(potencia_ativa),
         "Cálculo da Potência Ativa",
-        MessageBoxButtons.OK,
-        MessageBoxIcon.Information
     )
 
     return potencia_aparente, fator_potencia, tensao, numero_fases, potencia_ativa
@@ -287,7 +247,10 @@ def inserir_tomada(parede, tomada_selecionada, ponto_insercao, parametros_elec):
     potencia_aparente, fator_potencia, tensao, numero_fases, potencia_ativa = parametros_elec
 
     # Inserir a tomada usando a parede como host
-    with revit.Transaction("Inserir Tomada"):
+    # Ativação e inserção na mesma transação; avisos do Revit vão para o relatório
+    agendador = transacoes.Agendador(doc, "Inserir Tomada")
+    with agendador.etapa("Inserir Tomada"):
+        transacoes.ativar_simbolo(agendador, tomada_selecionada)
         tomada_instancia = doc.Create.NewFamilyInstance(
             ponto_insercao,
             tomada_selecionada,
@@ -349,6 +312,7 @@ def inserir_tomada(parede, tomada_selecionada, ponto_insercao, parametros_elec):
             # Se ocorrer um erro ao definir os parâmetros, exibir uma mensagem e continuar
             forms.alert("Erro ao definir parâmetros elétricos: {}".format(e))
 
+    agendador.relatar()
     forms.alert("Tomada inserida com sucesso!")
 
 def inserir_tomada_na_parede():
@@ -372,6 +336,81 @@ def inserir_tomada_na_parede():
     except Exception as e:
         forms.alert("Ocorreu um erro: {}".format(e))
 
+def _numero_opcional(texto, titulo, valido):
+    """Valor digitado ou None (em branco = manter o valor de cada tomada)."""
+    if not texto.strip():
+        return None
+    try:
+        valor = float(texto.replace(',', '.'))
+        if not valido(valor):
+            raise ValueError
+        return valor
+    except ValueError:
+        forms.alert("Entrada inválida para {}. O valor atual de cada tomada será mantido.".format(titulo))
+        return None
+
+
+def parametrizar_tomadas_existentes():
+    """Atualiza os parâmetros elétricos de várias tomadas existentes de uma só vez."""
+    resultados = formularios.pedir_parametros_eletricos(parametrizacao.ORIGENS)
+    if resultados is None:
+        forms.alert("Entrada cancelada pelo usuário.", exitscript=True)
+
+    novos = {
+        'potencia_aparente': _numero_opcional(
+            resultados['potencia_aparente'], "Potência Aparente", lambda v: v >= 0),
+        'fator_potencia': _numero_opcional(
+            resultados['fator_potencia'], "Fator de Potência", lambda v: 0 < v <= 1),
+    }
+    if resultados['fases'] != formularios.MANTER:
+        novos['numero_fases'] = int(resultados['fases'])
+    if resultados['sistema_tensao'] != formularios.MANTER:
+        novos['sistema_tensao'] = dict(formularios.SISTEMAS_TENSAO)[resultados['sistema_tensao']]
+
+    tomadas = parametrizacao.coletar_tomadas(
+        doc, resultados['origem'], uidoc.Selection.GetElementIds())
+    if not tomadas:
+        forms.alert("Nenhuma tomada encontrada em: {}.".format(resultados['origem']), exitscript=True)
+
+    agendador = transacoes.Agendador(doc, "Parametrizar Tomadas")
+    resultado = parametrizacao.parametrizar(doc, tomadas, novos, agendador)
+    agendador.relatar()
+
+    mensagem = "{} tomada(s) atualizada(s) ({} valores gravados) e {} sem alteração.".format(
+        len(resultado.alteradas), resultado.escritas, resultado.mantidas)
+    if resultado.sem_parametros:
+        mensagem += "\n{} tomada(s) sem parâmetros elétricos na família.".format(
+            len(resultado.sem_parametros))
+    if resultado.erros:
+        mensagem += "\n\n{} erros (primeiros 10):\n{}".format(
+            len(resultado.erros), "\n".join(resultado.erros[:10]))
+    if agendador.falhas:
+        mensagem += "\n\n" + agendador.resumo()
+    forms.alert(mensagem)
+
+
+MODO_INSERIR = "Inserir nova tomada"
+MODO_ATUALIZAR = "Atualizar tomadas existentes"
+
+
+def main():
+    """Escolhe entre inserir uma tomada e atualizar tomadas existentes em massa."""
+    # Primeiro diálogo da ferramenta: registrar o tempo de partida
+    partida.primeiro_dialogo(__title__)
+    modo = forms.CommandSwitchWindow.show(
+        [MODO_INSERIR, MODO_ATUALIZAR],
+        message="O que deseja fazer?",
+    )
+    if modo == MODO_INSERIR:
+        inserir_tomada_na_parede()
+    elif modo == MODO_ATUALIZAR:
+        try:
+            parametrizar_tomadas_existentes()
+        except transacoes.ErroEtapa as e:
+            forms.alert("Nenhuma alteração foi gravada.\n\n{}".format(e))
+
+
 # Executar o script
 if __name__ == "__main__":
-    inserir_tomada_na_parede()
+    with partida.ferramenta(__title__, _INICIO):
+        main()
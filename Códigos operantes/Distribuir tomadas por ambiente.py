@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+__title__ = "Distribuir Tomadas por Ambiente"
+__doc__ = """Versão: 1.0
+_____________________________________________________________________
+Descrição:
+Distribui as tomadas de uso geral (TUG) de todos os ambientes de um
+nível conforme a NBR 5410: a quantidade mínima sai da classe do
+ambiente (nome ou parâmetro "Classe NBR 5410") e do perímetro, por
+exemplo uma a cada 5 m em salas e dormitórios e uma a cada 3,5 m em
+cozinhas e áreas de serviço. As tomadas são igualmente espaçadas nas
+paredes do contorno, fora das portas e janelas, na face voltada para o
+ambiente, com potência de 600 VA ou 100 VA conforme a norma.
+Pontos já ocupados por um dispositivo contam como atendidos, então
+rodar de novo no mesmo nível só insere o que falta.
+_____________________________________________________________________
+Como usar:
+- Clique no botão, escolha a tomada, o nível, a tensão e as fases.
+- Confira o resumo por ambiente e confirme a inserção.
+- Shift+clique relê o catálogo de famílias e o contorno dos ambientes.
+- Ctrl+clique grava um rastreio com o tempo de cada etapa e diálogo
+  (resumo na janela do pyRevit; arquivo para chrome://tracing).
+_____________________________________________________________________
+Autor: Seu Nome"""
+
+# Instante do clique, para medir o tempo até o primeiro diálogo
+import time
+_INICIO = time.time()
+
+# Importações necessárias
+import traceback
+
+from Autodesk.Revit.DB import ElementId, FilteredElementCollector, Level
+
+# Importações do pyRevit
+from pyrevit import forms, script
+
+# Biblioteca compartilhada da extensão (pasta lib/)
+import os
+import sys
+_LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib')
+if _LIB not in sys.path:
+    sys.path.append(_LIB)
+from eletrica import (
+    ambientes, busca, catalogo, conflitos, formularios, insercao, lote, partida, relatorio, transacoes,
+)
+
+# Variáveis do documento
+doc = __revit__.ActiveUIDocument.Document  # Documento ativo do Revit
+
+FATOR_POTENCIA = float(formularios.PADROES_INSERCAO['fator_potencia'])
+FOLGA_METROS = float(formularios.PADROES_INSERCAO['folga'])
+
+
+def selecionar_familia_tomada():
+    """Permite que o usuário selecione uma família de tomada elétrica."""
+    catalogo_simbolos = catalogo.carregar_catalogo(doc, completo=__shiftclick__)
+    indice = busca.indice_do_catalogo(doc, catalogo_simbolos)
+    # Primeiro diálogo da ferramenta: registrar o tempo de partida
+    partida.primeiro_dialogo(__title__)
+
+    if not len(indice):
+        forms.alert("Nenhuma família de tomadas encontrada no projeto.", exitscript=True)
+
+    escolhidos = busca.escolher_simbolos(indice, 'Selecione uma Tomada')
+    if not escolhidos:
+        forms.alert("Nenhuma tomada selecionada.", exitscript=True)
+
+    # A ativação do símbolo, se necessária, é feita dentro do grupo de transações
+    return doc.GetElement(ElementId(escolhidos[0]))
+
+
+def selecionar_nivel():
+    niveis = dict(
+        (nivel.Name, nivel)
+        for nivel in FilteredElementCollector(doc).OfClass(Level)
+    )
+    nome_nivel = forms.SelectFromList.show(
+        sorted(niveis.keys()),
+        title='Escolha o nível dos ambientes',
+        button_name='Selecionar',
+        multiselect=False,
+    )
+    if not nome_nivel:
+        forms.alert("Nenhum nível selecionado.", exitscript=True)
+    return niveis[nome_nivel]
+
+
+def distribuir_tomadas():
+    """Função principal da distribuição por ambiente."""
+    try:
+        tomada_selecionada = selecionar_familia_tomada()
+        nivel = selecionar_nivel()
+        tensao_fases = formularios.pedir_tensao_e_fases()
+        if tensao_fases is None:
+            forms.alert("Entrada cancelada pelo usuário.", exitscript=True)
+        tensao, numero_fases = tensao_fases
+
+        # Dispositivos existentes: pontos já ocupados contam como atendidos
+        indice_conflitos = conflitos.indice_do_documento(doc, FOLGA_METROS * insercao.PES_POR_METRO)
+        plano = ambientes.planejar_ambientes(
+            doc, nivel.Id, (FATOR_POTENCIA, tensao, numero_fases),
+            conflitos=indice_conflitos, usar_sessao=not __shiftclick__,
+        )
+
+        rel = relatorio.Relatorio([relatorio.DestinoPyRevit(script.get_output())])
+        ambientes.relatar(plano, rel)
+        rel.emitir()
+        if not plano.ambientes:
+            forms.alert("Nenhum ambiente com área no nível selecionado.", exitscript=True)
+        if not plano.total:
+            forms.alert("Todos os ambientes já atendem à quantidade mínima de tomadas.", exitscript=True)
+
+        pergunta = "Inserir {} tomadas em {} ambientes?".format(
+            plano.total, sum(1 for a in plano.ambientes if a.planejadas))
+        faltantes = sum(a.faltantes for a in plano.ambientes)
+        if faltantes:
+            pergunta += "\n\n{} tomada(s) exigida(s) sem trecho de parede livre (ver relatório).".format(
+                faltantes)
+        if not forms.alert(pergunta, yes=True, no=True):
+            forms.alert("Inserção cancelada pelo usuário.", exitscript=True)
+
+        agendador = transacoes.Agendador(doc, "Distribuir Tomadas por Ambiente")
+        try:
+            with agendador:
+                if not tomada_selecionada.IsActive:
+                    with agendador.etapa("Ativar Família"):
+                        transacoes.ativar_simbolo(agendador, tomada_selecionada)
+                resultado = lote.executar_lote(
+                    doc, tomada_selecionada, plano.itens, nome="Distribuir Tomadas por Ambiente",
+                    agendador=agendador,
+                )
+        finally:
+            agendador.relatar()
+
+        mensagem = "{} tomadas inseridas em {} ambientes.".format(
+            resultado.total, sum(1 for a in plano.ambientes if a.planejadas))
+        if resultado.erros:
+            mensagem += "\n\n{} erros (primeiros 10):\n{}".format(
+                len(resultado.erros), "\n".join(resultado.erros[:10]))
+        if agendador.falhas:
+            mensagem += "\n\n" + agendador.resumo()
+        forms.alert(mensagem)
+    except transacoes.ErroEtapa as e:
+        forms.alert("Nenhuma tomada foi gravada.\n\n{}".format(e))
+    except Exception:
+        tb = traceback.format_exc()
+        forms.alert("Ocorreu um erro:\n{}".format(tb))
+
+
+# Executar o script
+if __name__ == "__main__":
+    with partida.ferramenta(__title__, _INICIO):
+        distribuir_tomadas()
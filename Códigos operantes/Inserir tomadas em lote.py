@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+__title__ = "Inserir Tomadas em Lote"
+__doc__ = """Versão: 1.0
+_____________________________________________________________________
+Descrição:
+Insere tomadas em várias paredes de uma só vez: nas paredes
+selecionadas, em todas as paredes de um nível ou nas paredes de
+modelos vinculados (arquitetura), escolhidas por nível ou selecionadas
+nos vínculos. Nos vínculos a tomada é hospedada na face da parede
+vinculada e a família precisa ser baseada em face. Os mesmos parâmetros
+são aplicados a todas as paredes, com sobrescritas opcionais por parede
+lidas de um CSV (id_parede;altura;numero_tomadas;intervalo;face).
+Todos os pontos são calculados antes da inserção e todas as tomadas
+são criadas em um único grupo de transações (um único "Desfazer");
+os avisos do Revit são reunidos em um relatório no fim.
+_____________________________________________________________________
+Como usar:
+- Selecione as paredes (ou escolha um nível ou os vínculos) e clique
+  no botão.
+- Shift+clique relê o catálogo de famílias e as paredes dos vínculos.
+- Ctrl+clique grava um rastreio com o tempo de cada etapa e diálogo
+  (resumo na janela do pyRevit; arquivo para chrome://tracing).
+_____________________________________________________________________
+Autor: Seu Nome"""
+
+# Instante do clique, para medir o tempo até o primeiro diálogo
+import time
+_INICIO = time.time()
+
+# Importações necessárias
+import traceback
+
+from Autodesk.Revit.DB import ElementId, FilteredElementCollector, Level
+from Autodesk.Revit.Exceptions import InvalidOperationException
+from Autodesk.Revit.UI.Selection import ObjectType
+
+# Importações do pyRevit
+from pyrevit import forms
+
+# Biblioteca compartilhada da extensão (pasta lib/)
+import os
+import sys
+_LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib')
+if _LIB not in sys.path:
+    sys.path.append(_LIB)
+from eletrica import (
+    antecipacao, busca, catalogo, conflitos, formularios, insercao, lote, partida, transacoes, vinculos,
+)
+
+# Variáveis do documento
+doc = __revit__.ActiveUIDocument.Document  # Documento ativo do Revit
+uidoc = __revit__.ActiveUIDocument  # Documento UI ativo
+
+ORIGEM_NIVEL = "Paredes do projeto em um nível"
+ORIGEM_VINCULOS_NIVEL = "Paredes dos vínculos em um nível"
+ORIGEM_VINCULOS_SELECAO = "Selecionar paredes nos vínculos"
+
+
+def selecionar_familia_tomada():
+    """Permite que o usuário selecione uma família de tomada elétrica."""
+    catalogo_simbolos = catalogo.carregar_catalogo(doc, completo=__shiftclick__)
+    indice = busca.indice_do_catalogo(doc, catalogo_simbolos)
+    # Primeiro diálogo da ferramenta: registrar o tempo de partida
+    partida.primeiro_dialogo(__title__)
+
+    if not len(indice):
+        forms.alert("Nenhuma família de tomadas encontrada no projeto.", exitscript=True)
+
+    escolhidos = busca.escolher_simbolos(indice, 'Selecione uma Tomada')
+    if not escolhidos:
+        forms.alert("Nenhuma tomada selecionada.", exitscript=True)
+
+    # A ativação do símbolo, se necessária, é feita dentro do grupo do lote
+    return doc.GetElement(ElementId(escolhidos[0]))
+
+
+def selecionar_nivel():
+    niveis = dict(
+        (nivel.Name, nivel)
+        for nivel in FilteredElementCollector(doc).OfClass(Level)
+    )
+    nome_nivel = forms.SelectFromList.show(
+        sorted(niveis.keys()),
+        title='Escolha um nível',
+        button_name='Selecionar',
+        multiselect=False,
+    )
+    if not nome_nivel:
+        forms.alert("Nenhum nível selecionado.", exitscript=True)
+    return niveis[nome_nivel]
+
+
+def selecionar_paredes_vinculos():
+    """Paredes escolhidas com o cursor nos modelos vinculados."""
+    try:
+        referencias = uidoc.Selection.PickObjects(
+            ObjectType.LinkedElement,
+            'Selecione as paredes nos vínculos e clique em Concluir.'
+        )
+    except InvalidOperationException:
+        forms.alert("Nenhuma parede selecionada.", exitscript=True)
+    lista, ids = vinculos.paredes_escolhidas(doc, referencias)
+    if not lista:
+        forms.alert("Nenhum dos elementos selecionados é uma parede.", exitscript=True)
+    return vinculos.descrever_vinculos(lista, ids=ids, usar_sessao=not __shiftclick__)
+
+
+def selecionar_paredes():
+    """Usa a seleção atual ou, se vazia, paredes de um nível ou dos vínculos.
+
+    Retorna ``(paredes, descricao_vinculos)``: as paredes do projeto ou a
+    ``lote.DescricaoParedes`` das paredes vinculadas (a outra fica None).
+    """
+    paredes = lote.coletar_paredes_selecao(doc, uidoc)
+    if paredes:
+        return paredes, None
+
+    origem = forms.CommandSwitchWindow.show(
+        [ORIGEM_NIVEL, ORIGEM_VINCULOS_NIVEL, ORIGEM_VINCULOS_SELECAO],
+        message="Nenhuma parede selecionada: de onde vêm as paredes?",
+    )
+    if not origem:
+        forms.alert("Nenhuma parede selecionada.", exitscript=True)
+    if origem == ORIGEM_VINCULOS_SELECAO:
+        return None, selecionar_paredes_vinculos()
+
+    nivel = selecionar_nivel()
+    if origem == ORIGEM_VINCULOS_NIVEL:
+        lista = vinculos.vinculos_do_documento(doc)
+        if not lista:
+            forms.alert("Nenhum vínculo carregado no projeto.", exitscript=True)
+        # Geometria dos vínculos lida uma vez e reaproveitada da sessão nos outros níveis
+        descricao = vinculos.descrever_vinculos(lista, nivel.Elevation, usar_sessao=not __shiftclick__)
+        if not descricao.ids:
+            forms.alert("Nenhuma parede dos vínculos na elevação do nível selecionado.", exitscript=True)
+        return None, descricao
+
+    paredes = lote.coletar_paredes_nivel(doc, nivel.Id)
+    if not paredes:
+        forms.alert("Nenhuma parede encontrada no nível selecionado.", exitscript=True)
+    return paredes, None
+
+
+def _converter(texto, titulo, padrao, tipo, valido=lambda v: True):
+    if texto.strip() == '':
+        return tipo(padrao) if padrao else None
+    try:
+        valor = tipo(texto.replace(',', '.'))
+        if not valido(valor):
+            raise ValueError
+        return valor
+    except ValueError:
+        forms.alert("Entrada inválida para {}. Usando {}.".format(titulo, padrao))
+        return tipo(padrao) if padrao else None
+
+
+def obter_parametros_lote():
+    """Obtém os parâmetros aplicados a todas as paredes do lote.
+
+    Usa o mesmo formulário da inserção em uma parede; o intervalo em
+    branco usa o comprimento total de cada parede. Retorna
+    ``(parametros, folga_metros)``.
+    """
+    resultados = formularios.pedir_parametros_insercao()
+    if resultados is None:
+        forms.alert("Entrada cancelada pelo usuário.", exitscript=True)
+
+    padroes = formularios.PADROES_INSERCAO
+    altura_metros = _converter(
+        resultados['altura'], "Altura", padroes['altura'], float)
+    numero_tomadas = _converter(
+        resultados['numero_tomadas'], "Número de Tomadas", padroes['numero_tomadas'], int,
+        lambda v: v >= 1)
+    intervalo_metros = _converter(
+        resultados['intervalo'], "Intervalo", padroes['intervalo'], float, lambda v: v > 0)
+    potencia_aparente = _converter(
+        resultados['potencia_aparente'], "Potência Aparente", padroes['potencia_aparente'], float)
+    fator_potencia = _converter(
+        resultados['fator_potencia'], "Fator de Potência", padroes['fator_potencia'], float,
+        lambda v: 0 < v <= 1)
+    folga_metros = _converter(
+        resultados['folga'], "Folga", padroes['folga'], float, lambda v: v >= 0) or 0.0
+
+    parametros = lote.ParametrosParede(
+        altura_metros,
+        numero_tomadas,
+        intervalo_metros,
+        resultados['face'],
+        (potencia_aparente, fator_potencia, resultados['tensao'], resultados['fases']),
+    )
+    return parametros, folga_metros
+
+
+def obter_sobrescritas():
+    """Pergunta se há um CSV de sobrescritas por parede e o carrega."""
+    if not forms.alert("Deseja carregar sobrescritas por parede de um arquivo CSV?",
+                       yes=True, no=True):
+        return {}
+    caminho = forms.pick_file(file_ext='csv')
+    if not caminho:
+        return {}
+    try:
+        return lote.ler_sobrescritas_csv(caminho)
+    except Exception as e:
+        forms.alert("Erro ao ler o CSV de sobrescritas:\n{}".format(e))
+        return {}
+
+
+def planejar_vinculos(descricao, parametros_padrao, sobrescritas, folga_metros):
+    """Pontos nas paredes vinculadas; retorna ``(itens, erros, indice_conflitos)``.
+
+    Sem sincronização: as tomadas ficam hospedadas em faces de outro
+    documento, então os conflitos com os dispositivos existentes bastam.
+    """
+    indice_conflitos = None
+    if folga_metros > 0:
+        indice_conflitos = conflitos.indice_do_documento(doc, folga_metros * insercao.PES_POR_METRO)
+    itens, erros = lote.planejar_descritas(
+        descricao, parametros_padrao, sobrescritas, conflitos=indice_conflitos)
+    return itens, erros, indice_conflitos
+
+
+def inserir_tomadas_em_lote():
+    """Função principal da inserção em lote."""
+    try:
+        tomada_selecionada = selecionar_familia_tomada()
+        paredes, descricao_vinculos = selecionar_paredes()
+        antecipada = None
+        if descricao_vinculos is None:
+            # Paredes, dispositivos e tomadas gerenciadas lidos antes do formulário;
+            # o índice de conflitos e os pontos padrão são montados enquanto ele está aberto
+            antecipada = antecipacao.Antecipacao(
+                antecipacao.capturar(doc, paredes),
+                antecipacao.parametros_padrao(),
+                antecipacao.folga_padrao(),
+            )
+        elif not vinculos.aceita_vinculo(tomada_selecionada):
+            forms.alert("Paredes de vínculos só aceitam famílias baseadas em face.\n\n"
+                        "Escolha uma tomada baseada em face.", exitscript=True)
+        parametros_padrao, folga_metros = obter_parametros_lote()
+        sobrescritas = obter_sobrescritas()
+
+        # Tomadas já inseridas pelas ferramentas nestas paredes: sincronizar em vez de duplicar
+        gerenciadas = antecipada.gerenciadas() if antecipada is not None else None
+        ignorar = None
+        if gerenciadas and forms.alert(
+                "{} parede(s) já possuem {} tomada(s) inseridas pelas ferramentas.\n\n"
+                "Sincronizar? Apenas a diferença será movida, criada ou removida, "
+                "mantendo os ids e os circuitos. Escolha Não para inserir um novo "
+                "conjunto.".format(len(gerenciadas), sum(len(t) for t in gerenciadas.values())),
+                yes=True, no=True):
+            ignorar = set(catalogo.id_inteiro(t.Id) for lista in gerenciadas.values() for t, _ in lista)
+        else:
+            gerenciadas = None
+
+        # Calcular todos os pontos antes de escrever no modelo; dispositivos
+        # existentes indexados uma vez para todo o lote
+        if antecipada is None:
+            itens, erros, indice_conflitos = planejar_vinculos(
+                descricao_vinculos, parametros_padrao, sobrescritas, folga_metros)
+        else:
+            indice_conflitos = antecipada.indice_conflitos(
+                folga_metros, ignorar, parametros_padrao, sobrescritas)
+            itens, erros = antecipada.planejar(parametros_padrao, sobrescritas, indice_conflitos, gerenciadas)
+        total_planejado = sum(len(item.pontos) for item in itens)
+        # Na sincronização, paredes sem pontos vêm como itens vazios (tomadas a remover)
+        if not itens:
+            forms.alert("Nenhum ponto de inserção calculado.", exitscript=True)
+
+        pergunta = "Inserir {} tomadas em {} paredes?".format(
+            total_planejado, sum(1 for item in itens if item.pontos))
+        esvaziadas = sum(1 for item in itens if not item.pontos)
+        if esvaziadas:
+            pergunta += "\n\n{} parede(s) ficaram sem pontos: as tomadas gerenciadas delas serão removidas.".format(
+                esvaziadas)
+        if indice_conflitos is not None and (indice_conflitos.deslocados or indice_conflitos.descartados):
+            pergunta += "\n\n{} tomada(s) deslocada(s) e {} descartada(s) por conflito.".format(
+                indice_conflitos.deslocados, indice_conflitos.descartados)
+        if not forms.alert(pergunta, yes=True, no=True):
+            forms.alert("Inserção cancelada pelo usuário.", exitscript=True)
+
+        # Ativação e todas as fatias do lote em um único grupo de transações
+        agendador = transacoes.Agendador(doc, "Inserir Tomadas em Lote")
+        try:
+            with agendador:
+                if not tomada_selecionada.IsActive:
+                    with agendador.etapa("Ativar Família"):
+                        transacoes.ativar_simbolo(agendador, tomada_selecionada)
+                resultado = lote.executar_lote(
+                    doc, tomada_selecionada, itens, gerenciadas=gerenciadas, agendador=agendador)
+        finally:
+            agendador.relatar()
+        erros.extend(resultado.erros)
+
+        mensagem = "{} tomadas inseridas em {} paredes.".format(
+            resultado.total, len(resultado.tomadas_por_parede))
+        if resultado.sincronizacao is not None:
+            sincronizadas = resultado.sincronizacao
+            mensagem += "\n{} ajustadas, {} removidas e {} sem alteração.".format(
+                len(sincronizadas.modificadas), len(sincronizadas.removidas), sincronizadas.mantidas)
+        if erros:
+            mensagem += "\n\n{} erros (primeiros 10):\n{}".format(
+                len(erros), "\n".join(erros[:10]))
+        if agendador.falhas:
+            mensagem += "\n\n" + agendador.resumo()
+        forms.alert(mensagem)
+    except transacoes.ErroEtapa as e:
+        forms.alert("Nenhuma tomada foi gravada.\n\n{}".format(e))
+    except Exception:
+        tb = traceback.format_exc()
+        forms.alert("Ocorreu um erro:\n{}".format(tb))
+
+
+# Executar o script
+if __name__ == "__main__":
+    with partida.ferramenta(__title__, _INICIO):
+        inserir_tomadas_em_lote()
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 __title__ = "Listar Parâmetros da Família"
-__doc__ = """Script para listar todos os parâmetros de uma instância de família selecionada, incluindo parâmetros de instância e de tipo."""
+__doc__ = """Script para listar todos os parâmetros de uma instância de família selecionada, incluindo parâmetros de instância e de tipo.
+Também exporta, em fluxo, os parâmetros de todas as instâncias de uma categoria (CSV e/ou formato colunar binário)
+e o retrato do projeto (.elrp: paredes, tomadas, painéis e circuitos) para relatórios fora do Revit
+(benchmarks/resumo_retrato.py)."""
 
 import clr
 import traceback
@@ -17,6 +20,30 @@ from pyrevit import revit, forms, script
 clr.AddReference('System.Windows.Forms')
 from System.Windows.Forms import DialogResult, MessageBox, MessageBoxButtons, MessageBoxIcon
 
+# Biblioteca compartilhada da extensão (pasta lib/)
+import os
+import sys
+_LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib')
+if _LIB not in sys.path:
+    sys.path.append(_LIB)
+from eletrica import exportacao, relatorio, retrato
+
+MODO_ELEMENTO = "Elemento selecionado"
+MODO_PROJETO = "Exportar projeto inteiro"
+MODO_RETRATO = "Retrato do projeto (.elrp)"
+
+FORMATO_CSV = "CSV"
+FORMATO_COLUNAR = "Colunar binário (.elpc)"
+FORMATO_AMBOS = "CSV + colunar"
+
+# Categorias oferecidas na exportação do projeto
+CATEGORIAS_EXPORTACAO = [
+    'OST_ElectricalFixtures',
+    'OST_ElectricalEquipment',
+    'OST_LightingFixtures',
+    'OST_LightingDevices',
+]
+
 
 def listar_parametros():
     output = script.get_output()
@@ -203,8 +230,89 @@ def listar_parametros():
         output.print_md("### Erro no Script:\n{}".format(tb))
 
 
+def exportar_projeto():
+    """Exporta os parâmetros de todas as instâncias de uma categoria, em blocos."""
+    output = script.get_output()
+    categoria = forms.SelectFromList.show(
+        CATEGORIAS_EXPORTACAO,
+        title='Categoria a exportar',
+        button_name='Selecionar',
+        multiselect=False,
+    )
+    if not categoria:
+        return
+    formato = forms.CommandSwitchWindow.show(
+        [FORMATO_CSV, FORMATO_COLUNAR, FORMATO_AMBOS],
+        message="Formato de saída:",
+    )
+    if not formato:
+        return
+
+    extensao = 'elpc' if formato == FORMATO_COLUNAR else 'csv'
+    caminho = forms.save_file(file_ext=extensao, default_name="parametros_projeto")
+    if not caminho:
+        return
+    base = os.path.splitext(caminho)[0]
+
+    escritores = []
+    try:
+        if formato in (FORMATO_CSV, FORMATO_AMBOS):
+            escritores.append(exportacao.EscritorCSV(base + '.csv'))
+        if formato in (FORMATO_COLUNAR, FORMATO_AMBOS):
+            escritores.append(exportacao.EscritorColunar(base + '.elpc'))
+        resumo = exportacao.exportar_parametros(
+            exportacao.coletar_instancias(revit.doc, categoria), escritores
+        )
+    except Exception:
+        tb = traceback.format_exc()
+        forms.alert("Erro ao exportar os parâmetros:\n{}".format(tb))
+        return
+    finally:
+        for escritor in escritores:
+            escritor.fechar()
+
+    output.print_md("## Exportação de Parâmetros")
+    output.print_md("### Categoria: {}".format(categoria))
+    output.print_md("### Elementos: {} | Tipos: {} | Linhas: {}".format(
+        resumo.elementos, resumo.tipos, resumo.linhas))
+    forms.alert("Parâmetros de {} elemento(s) exportados em:\n{}".format(resumo.elementos, base))
+
+
+def exportar_retrato():
+    """Grava o retrato compacto do projeto para análises sem reabrir o modelo."""
+    caminho = forms.save_file(file_ext=retrato.EXTENSAO, default_name="retrato_projeto")
+    if not caminho:
+        return
+    extras = forms.ask_for_string(
+        default="",
+        prompt="Parâmetros extras das tomadas (separados por ponto e vírgula, opcional):",
+        title="Retrato do projeto",
+    )
+    nomes = [n.strip() for n in (extras or "").split(";") if n.strip()]
+    try:
+        retrato.exportar(revit.doc, caminho, nomes)
+    except Exception:
+        tb = traceback.format_exc()
+        forms.alert("Erro ao gravar o retrato do projeto:\n{}".format(tb))
+        return
+
+    with retrato.abrir(caminho) as lido:
+        with relatorio.Relatorio([relatorio.DestinoPyRevit()]) as rel:
+            retrato.relatar(lido, rel)
+            rel.texto(u"Arquivo: {}".format(caminho))
+
+
 def main():
-    listar_parametros()
+    modo = forms.CommandSwitchWindow.show(
+        [MODO_ELEMENTO, MODO_PROJETO, MODO_RETRATO],
+        message="O que deseja fazer?",
+    )
+    if modo == MODO_ELEMENTO:
+        listar_parametros()
+    elif modo == MODO_PROJETO:
+        exportar_projeto()
+    elif modo == MODO_RETRATO:
+        exportar_retrato()
 
 
 if __name__ == "__main__":
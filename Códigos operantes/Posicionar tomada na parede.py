@@ -9,20 +9,41 @@ permitindo escolher a altura, posição horizontal e face (frontal/traseira).
 _____________________________________________________________________
 Como usar:
 - Clique no botão e siga as instruções.
+- Ctrl+clique grava um rastreio com o tempo de cada etapa e diálogo
+  (resumo na janela do pyRevit; arquivo para chrome://tracing).
 _____________________________________________________________________
 Autor: Seu Nome"""
 
+# Instante do clique, para medir o tempo até o primeiro diálogo
+import time
+_INICIO = time.time()
+
 # Importações necessárias
 import math  # Importação do módulo math no escopo global
 
-from Autodesk.Revit.DB import *
-from Autodesk.Revit.UI import *
+from Autodesk.Revit.DB import (
+    ElementId,
+    ElementTransformUtils,
+    Line,
+    LocationCurve,
+    LocationPoint,
+    Wall,
+    XYZ,
+)
 from Autodesk.Revit.UI.Selection import ObjectType
 from Autodesk.Revit.Exceptions import InvalidOperationException
 from Autodesk.Revit.DB.Structure import StructuralType
 
 # Importações do pyRevit
-from pyrevit import revit, forms, script
+from pyrevit import forms
+
+# Biblioteca compartilhada da extensão (pasta lib/)
+import os
+import sys
+_LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib')
+if _LIB not in sys.path:
+    sys.path.append(_LIB)
+from eletrica import busca, catalogo, partida, transacoes
 
 # Variáveis do documento
 doc = __revit__.ActiveUIDocument.Document  # type: Document
@@ -31,84 +52,26 @@ app = __revit__.Application
 
 # Funções auxiliares
 def selecionar_familia_tomada():
-    # Coletar todos os símbolos de família da categoria "Dispositivos elétricos"
-    collector = FilteredElementCollector(doc) \
-        .OfClass(FamilySymbol) \
-        .OfCategory(BuiltInCategory.OST_ElectricalFixtures)
-
-    tomadas = []
-    for symbol in collector:
-        # Obter o nome da família usando BuiltInParameter
-        family_name_param = symbol.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME)
-        if family_name_param and family_name_param.HasValue:
-            family_name = family_name_param.AsString()
-        else:
-            family_name = "Sem Família"
-
-        # Obter o nome do símbolo usando BuiltInParameter
-        symbol_name_param = symbol.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME)
-        if symbol_name_param and symbol_name_param.HasValue:
-            symbol_name = symbol_name_param.AsString()
-        else:
-            symbol_name = "Sem Nome"
-
-        # Filtrar por famílias que contenham "Tomada" no nome
-        if "Tomada" in family_name or "Tomada" in symbol_name:
-            tomadas.append(symbol)
-
-    if not tomadas:
+    # Índice persistente dos símbolos da categoria "Dispositivos elétricos"
+    catalogo_simbolos = catalogo.carregar_catalogo(doc, completo=__shiftclick__)
+    indice = busca.indice_do_catalogo(doc, catalogo_simbolos)
+    # Primeiro diálogo da ferramenta: registrar o tempo de partida
+    partida.primeiro_dialogo(__title__)
+
+    if not len(indice):
         forms.alert("Nenhuma família de tomadas encontrada no projeto.", exitscript=True)
 
-    # Criar um dicionário de opções
-    tomadas_dict = {}
-    for tomada in tomadas:
-        try:
-            # Obter o nome da família
-            family_name_param = tomada.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME)
-            if family_name_param and family_name_param.HasValue:
-                family_name = family_name_param.AsString()
-            else:
-                family_name = "Sem Família"
-
-            # Obter o nome do símbolo
-            symbol_name_param = tomada.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME)
-            if symbol_name_param and symbol_name_param.HasValue:
-                symbol_name = symbol_name_param.AsString()
-            else:
-                symbol_name = "Sem Nome"
-
-            display_name = "{} : {}".format(family_name, symbol_name)
-            tomadas_dict[display_name] = tomada
-        except Exception as e:
-            # Se ocorrer um erro, ignorar este elemento
-            pass
-
-    if not tomadas_dict:
-        forms.alert("Nenhuma família de tomadas válida encontrada.", exitscript=True)
-
-    # Ordenar os nomes para exibição
-    tomadas_nomes_ordenados = sorted(tomadas_dict.keys())
-
-    # Permitir que o usuário selecione uma tomada
-    tomada_selecionada_nome = forms.SelectFromList.show(
-        tomadas_nomes_ordenados,
-        title='Selecione uma Tomada',
-        button_name='Selecionar',
-        multiselect=False
+    # Busca com relevância, começando pelas tomadas (e sinônimos) da categoria
+    escolhidos = busca.escolher_simbolos(
+        indice, 'Selecione uma Tomada',
+        categorias=catalogo.ids_categorias(['OST_ElectricalFixtures']),
     )
 
-    if not tomada_selecionada_nome:
+    if not escolhidos:
         forms.alert("Nenhuma tomada selecionada.", exitscript=True)
 
-    tomada_selecionada = tomadas_dict[tomada_selecionada_nome]
-
-    # Ativar o símbolo da família, se necessário
-    if not tomada_selecionada.IsActive:
-        with revit.Transaction("Ativar Família"):
-            tomada_selecionada.Activate()
-            doc.Regenerate()
-
-    return tomada_selecionada
+    # A ativação do símbolo, se necessária, é feita na transação de inserção
+    return doc.GetElement(ElementId(escolhidos[0]))
 
 def selecionar_parede():
     # Permitir que o usuário selecione uma parede
@@ -212,7 +175,10 @@ def obter_ponto_insercao(parede):
 
 def inserir_tomada(parede, tomada_selecionada, ponto_insercao, altura_pes, rotacionar_180):
     # Inserir a tomada usando a parede como host
-    with revit.Transaction("Inserir Tomada"):
+    # Ativação e inserção na mesma transação; avisos do Revit vão para o relatório
+    agendador = transacoes.Agendador(doc, "Inserir Tomada")
+    with agendador.etapa("Inserir Tomada"):
+        transacoes.ativar_simbolo(agendador, tomada_selecionada)
         tomada_instancia = doc.Create.NewFamilyInstance(
             ponto_insercao,
             tomada_selecionada,
@@ -281,6 +247,7 @@ def inserir_tomada(parede, tomada_selecionada, ponto_insercao, altura_pes, rotac
                 new_point = XYZ(point.X, point.Y, altura_pes)
                 location.Point = new_point
 
+    agendador.relatar()
     forms.alert("Tomada inserida com sucesso!")
 
 def inserir_tomada_na_parede():
@@ -298,4 +265,5 @@ def inserir_tomada_na_parede():
 
 # Executar o script
 if __name__ == "__main__":
-    inserir_tomada_na_parede()
+    with partida.ferramenta(__title__, _INICIO):
+        inserir_tomada_na_parede()
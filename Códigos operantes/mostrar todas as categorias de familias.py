@@ -1,24 +1,92 @@
 # -*- coding: utf-8 -*-
 __title__ = "Listar Categorias de Famílias"
+__doc__ = """Versão: 2.0
+_____________________________________________________________________
+Descrição:
+Inventário do projeto por categoria, família e tipo, com a quantidade
+de instâncias colocadas de cada um. Símbolos e instâncias são lidos em
+uma passada e o inventário fica em cache por documento: nas execuções
+seguintes só os elementos novos, removidos ou modificados são relidos.
+_____________________________________________________________________
+Como usar:
+- Clique no botão, escolha o nível de detalhe, a ordenação e,
+  opcionalmente, um filtro (termos da categoria, família ou tipo).
+- Shift+clique descarta o cache e relê o projeto inteiro (necessário
+  para refletir trocas de tipo em versões anteriores ao Revit 2023).
+- Ctrl+clique grava um rastreio com o tempo de cada etapa e diálogo
+  (resumo na janela do pyRevit; arquivo para chrome://tracing).
+_____________________________________________________________________
+Autor: Seu Nome"""
 
-from Autodesk.Revit.DB import *
-from pyrevit import revit
+# Instante do clique, para medir o tempo até o primeiro diálogo
+import time
+_INICIO = time.time()
 
-doc = revit.doc
+import traceback
 
-# Coletar todos os símbolos de família
-collector = FilteredElementCollector(doc)\
-    .OfClass(FamilySymbol)
+# Importações do pyRevit
+from pyrevit import forms, script
 
-# Criar um conjunto para armazenar categorias únicas
-categorias = set()
+# Biblioteca compartilhada da extensão (pasta lib/)
+import os
+import sys
+_LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib')
+if _LIB not in sys.path:
+    sys.path.append(_LIB)
+from eletrica import inventario, partida, relatorio
 
-for symbol in collector:
-    categoria = symbol.Category
-    if categoria:
-        categorias.add((categoria.Id.IntegerValue, categoria.Name))
+# Variáveis do documento
+doc = __revit__.ActiveUIDocument.Document  # Documento ativo do Revit
 
-# Listar as categorias encontradas
-print("Categorias encontradas:")
-for cat_id, cat_name in sorted(categorias, key=lambda x: x[1]):
-    print("ID: {}, Nome: {}".format(cat_id, cat_name))
+NIVEIS = {
+    "Categorias": inventario.NIVEL_CATEGORIA,
+    "Famílias": inventario.NIVEL_FAMILIA,
+    "Tipos": inventario.NIVEL_TIPO,
+}
+ORDENS = {
+    "Mais instâncias primeiro": inventario.ORDEM_INSTANCIAS,
+    "Ordem alfabética": inventario.ORDEM_NOME,
+}
+SOMENTE_COLOCADOS = "Somente tipos com instâncias"
+
+
+def main():
+    try:
+        nivel = forms.CommandSwitchWindow.show(
+            sorted(NIVEIS), message="Nível de detalhe do inventário:",
+        )
+        partida.primeiro_dialogo(__title__)
+        if not nivel:
+            return
+        ordem = forms.CommandSwitchWindow.show(
+            sorted(ORDENS), message="Ordenar por:",
+            switches=[SOMENTE_COLOCADOS],
+        )
+        if not ordem:
+            return
+        ordem, opcoes = ordem
+        filtro = forms.ask_for_string(
+            default="",
+            prompt="Filtro (termos da categoria, família ou tipo; vazio lista tudo):",
+            title="Inventário de famílias",
+        ) or ""
+
+        inv = inventario.carregar_inventario(doc, completo=__shiftclick__)
+
+        rel = relatorio.Relatorio([relatorio.DestinoPyRevit(script.get_output())])
+        rel.texto("{} elemento(s) relido(s) nesta execução.".format(inv.relidos))
+        linhas = inventario.relatar(
+            inv, rel, NIVEIS[nivel], filtro, ORDENS[ordem], opcoes.get(SOMENTE_COLOCADOS, False),
+        )
+        rel.emitir()
+        if not linhas:
+            forms.alert("Nenhum item do inventário atende ao filtro.")
+    except Exception:
+        tb = traceback.format_exc()
+        forms.alert("Ocorreu um erro:\n{}".format(tb))
+
+
+# Executar o script
+if __name__ == "__main__":
+    with partida.ferramenta(__title__, _INICIO):
+        main()
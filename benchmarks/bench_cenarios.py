@@ -0,0 +1,434 @@
+# -*- coding: utf-8 -*-
+"""Cenários de 1k/10k/100k tomadas sobre o documento falso (``eletrica.revit_falso``).
+
+Cada cenário monta um projeto em memória (um nível, paredes retas e em
+arco com portas, um símbolo de tomada e painéis) e mede as etapas da
+biblioteca como são chamadas pelos scripts:
+
+- ``planejar``: ``lote.planejar_lote`` (pontos de todas as paredes);
+- ``inserir``: ``lote.executar_lote`` (instâncias, rotação e parâmetros);
+- ``conflitos``: índice dos dispositivos e novo planejamento com todas as
+  tomadas já existentes como obstáculos (pior caso: todo ponto conflita);
+- ``antecipar``: o mesmo planejamento pelo fluxo das ferramentas
+  (``antecipacao``: instantâneo, tarefas em threads e planejamento depois
+  do "OK"), conferido contra o resultado de ``conflitos``;
+- ``sincronizar``: nova execução sobre as mesmas paredes no modo de
+  sincronização, sem mudanças (deve ler tudo e não escrever nada);
+- ``circuitos``: divisão em circuitos, ``criar_circuitos`` e ``atribuir_painel``
+  em uma etapa do ``transacoes.Agendador``;
+- ``parametrizar``: troca do sistema de tensão de todas as tomadas
+  (``parametrizacao``), com P, Q e corrente recalculados;
+- ``rotas``: grafo das paredes, comprimento de rota de todas as tomadas até
+  o painel e gravação no parâmetro dos circuitos;
+- ``demanda``: demanda, seção e queda de tensão de todos os circuitos e
+  totais por painel (``demanda.analisar``, sem o cache da sessão);
+- ``paineis``: índice de painéis e sugestão do mais próximo por circuito;
+- ``exportar``: exportação colunar de todos os parâmetros das tomadas;
+- ``retrato``: retrato do projeto (``retrato.exportar``) relido e conferido;
+- ``inventario``: inventário de famílias completo e a atualização seguinte
+  a partir do cache (sem nada para reler);
+- ``atualizador``: edição em massa da potência aparente de todas as
+  tomadas com o ``atualizador`` ativo (P, Q e I recalculados no ``Commit``);
+- ``ambientes``: distribuição das TUGs pela NBR 5410 em um pavimento à
+  parte com um ambiente a cada 20 tomadas (500 com 10k), inserção e novo
+  planejamento com os contornos da sessão (nada a inserir);
+- ``vinculos``: tomadas em todos os pavimentos de uma arquitetura
+  vinculada de 30 andares (paredes lidas uma vez, hospedagem na face
+  vinculada) e nova leitura das paredes a partir da sessão.
+
+Para cada etapa são impressos o tempo (melhor de N) e as chamadas à API
+por tomada. ``--json`` grava os resultados e ``--base`` compara com uma
+execução anterior: o processo termina com código 1 se alguma etapa ficar
+mais lenta que a tolerância, para pegar regressões antes de chegarem ao Revit.
+``--rastreio`` ativa o ``eletrica.rastreio`` (com as chamadas à API do
+documento falso) e grava o Chrome Trace de todas as etapas; os tempos
+medidos incluem então o custo da instrumentação.
+
+Uso:
+    python benchmarks/bench_cenarios.py [--tamanhos 1000,10000,100000]
+        [--repeticoes 3] [--json resultados.json] [--base anterior.json] [--tolerancia 0.25]
+        [--rastreio rastreio.json]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+
+from eletrica import revit_falso  # noqa: E402
+
+revit_falso.instalar()
+
+from eletrica import (  # noqa: E402
+    ambientes, antecipacao, atualizador, circuitos, conflitos, demanda, exportacao, insercao, inventario, lote,
+    marcacao, paineis, parametrizacao, rastreio, retrato, rotas, sessao, transacoes, vinculos,
+)
+
+TOMADAS_POR_PAREDE = 10
+FOLGA_CONFLITOS = 0.5  # pés
+PARAMETROS_EXTRAS = 20
+TOMADAS_POR_AMBIENTE = 20
+LADO_AMBIENTE = (13.0, 11.0)  # pés (cerca de 4,0 x 3,4 m)
+NOMES_AMBIENTES = (u"Sala", u"Quarto", u"Cozinha", u"Banheiro", u"Varanda", u"Depósito")
+PAVIMENTOS_VINCULO = 30
+PE_DIREITO = 10.0  # pés
+
+
+def montar_projeto(tomadas, semente=42):
+    """Documento com paredes suficientes para ``tomadas`` pontos."""
+    aleatorio = random.Random(semente)
+    doc = revit_falso.Documento(u"Cenário {}".format(tomadas))
+    nivel = doc.criar_nivel(u"Térreo", 0.0)
+    tipo = doc.criar_tipo_parede()
+    definicoes = [
+        (u"Elevação do Ponto", revit_falso.StorageType.Double, 0.0),
+        (u"Potência Aparente (VA)", revit_falso.StorageType.Double, 0.0),
+        (u"Fator de Potência", revit_falso.StorageType.Double, 0.0),
+        (u"Tensão (V)", revit_falso.StorageType.Double, 0.0),
+        (u"Número de Fases", revit_falso.StorageType.Integer, 1),
+        (u"Potência Ativa (W)", revit_falso.StorageType.Double, 0.0),
+        (u"Corrente (A)", revit_falso.StorageType.Double, 0.0),
+    ] + [(u"Parâmetro {}".format(i), revit_falso.StorageType.Double, 0.0)
+         for i in range(PARAMETROS_EXTRAS)]
+    simbolo = doc.criar_simbolo(u"Tomada", u"TUG 10A", parametros_instancia=definicoes)
+
+    lado = int(math.ceil(math.sqrt(tomadas / TOMADAS_POR_PAREDE)))
+    paredes = []
+    for i in range(int(math.ceil(float(tomadas) / TOMADAS_POR_PAREDE))):
+        x0, y0 = (i % lado) * 40.0, (i // lado) * 40.0
+        comprimento = aleatorio.uniform(15.0, 35.0)
+        if i % 5 == 0:
+            parede = doc.criar_parede(
+                (x0, y0), (x0 + comprimento, y0), nivel, tipo,
+                meio=(x0 + comprimento / 2.0, y0 + comprimento / 4.0),
+            )
+        else:
+            parede = doc.criar_parede((x0, y0), (x0, y0 + comprimento), nivel, tipo)
+        if i % 4 == 0:
+            doc.criar_abertura(parede, comprimento / 2.0, 3.0)
+        paredes.append(parede)
+
+    sistema = doc.criar_sistema_distribuicao()
+    sistema_380 = doc.criar_sistema_distribuicao(u"220/380 V", 220.0, 380.0)
+    for i in range(max(4, lado // 2)):
+        doc.criar_painel(
+            u"QD-{}".format(i), (aleatorio.uniform(0, lado * 40.0), aleatorio.uniform(0, lado * 40.0), 0.0),
+            nivel, sistema if i % 3 else sistema_380,
+        )
+
+    # Corredores ligando o início de todas as paredes (fora do lote: não recebem tomadas)
+    linhas = int(math.ceil(float(len(paredes)) / lado))
+    for j in range(linhas):
+        doc.criar_parede((0.0, j * 40.0), (lado * 40.0, j * 40.0), nivel, tipo)
+    doc.criar_parede((lado * 40.0, -20.0), (lado * 40.0, linhas * 40.0), nivel, tipo)
+    return doc, simbolo, paredes
+
+
+def montar_ambientes(quantidade):
+    """Pavimento em grade com ``quantidade`` ambientes, paredes compartilhadas e uma porta em cada."""
+    doc = revit_falso.Documento(u"Ambientes {}".format(quantidade))
+    nivel = doc.criar_nivel(u"Pavimento", 0.0)
+    tipo = doc.criar_tipo_parede()
+    simbolo = doc.criar_simbolo(u"Tomada", u"TUG 10A", parametros_instancia=[
+        (u"Elevação do Ponto", revit_falso.StorageType.Double, 0.0),
+        (u"Potência Aparente (VA)", revit_falso.StorageType.Double, 0.0),
+        (u"Fator de Potência", revit_falso.StorageType.Double, 0.0),
+    ])
+    largura, profundidade = LADO_AMBIENTE
+    colunas = int(math.ceil(math.sqrt(quantidade)))
+    linhas = int(math.ceil(float(quantidade) / colunas))
+    horizontais = dict(
+        ((i, j), doc.criar_parede((i * largura, j * profundidade), ((i + 1) * largura, j * profundidade),
+                                  nivel, tipo))
+        for i in range(colunas) for j in range(linhas + 1)
+    )
+    verticais = dict(
+        ((i, j), doc.criar_parede((i * largura, j * profundidade), (i * largura, (j + 1) * profundidade),
+                                  nivel, tipo))
+        for i in range(colunas + 1) for j in range(linhas)
+    )
+    # Contorno na face acabada das paredes
+    meia = tipo.Width / 2.0
+    for k in range(quantidade):
+        i, j = k % colunas, k // colunas
+        x0, y0 = i * largura + meia, j * profundidade + meia
+        x1, y1 = (i + 1) * largura - meia, (j + 1) * profundidade - meia
+        abaixo = horizontais[(i, j)]
+        doc.criar_abertura(abaixo, largura / 2.0, 3.0)
+        doc.criar_ambiente(
+            NOMES_AMBIENTES[k % len(NOMES_AMBIENTES)], [(x0, y0), (x1, y0), (x1, y1), (x0, y1)], nivel,
+            [abaixo, verticais[(i + 1, j)], horizontais[(i, j + 1)], verticais[(i, j)]],
+            numero=u"{}".format(k + 1),
+        )
+    return doc, nivel, simbolo
+
+
+def montar_vinculo(tomadas):
+    """Projeto elétrico com uma arquitetura de ``PAVIMENTOS_VINCULO`` andares vinculada (girada)."""
+    arquitetura = revit_falso.Documento(u"Arquitetura", u"C:/Projetos/Arquitetura.rvt")
+    tipo = arquitetura.criar_tipo_parede()
+    por_pavimento = int(math.ceil(float(tomadas) / TOMADAS_POR_PAREDE / PAVIMENTOS_VINCULO))
+    lado = int(math.ceil(math.sqrt(por_pavimento)))
+    for andar in range(PAVIMENTOS_VINCULO):
+        nivel = arquitetura.criar_nivel(u"Pavimento {}".format(andar), andar * PE_DIREITO)
+        for k in range(por_pavimento):
+            x0, y0 = (k % lado) * 40.0, (k // lado) * 40.0
+            if k % 5 == 0:
+                parede = arquitetura.criar_parede(
+                    (x0, y0), (x0 + 30.0, y0), nivel, tipo, meio=(x0 + 15.0, y0 + 7.5))
+            else:
+                parede = arquitetura.criar_parede((x0, y0), (x0, y0 + 30.0), nivel, tipo)
+            if k % 4 == 0:
+                arquitetura.criar_abertura(parede, 15.0, 3.0)
+
+    doc = revit_falso.Documento(u"Elétrico vinculado")
+    niveis = [doc.criar_nivel(u"Pavimento {}".format(andar), 2.0 + andar * PE_DIREITO)
+              for andar in range(PAVIMENTOS_VINCULO)]
+    simbolo = doc.criar_simbolo(u"Tomada de face", u"TUG 10A", parametros_instancia=[
+        (u"Elevação do Ponto", revit_falso.StorageType.Double, 0.0),
+        (u"Potência Aparente (VA)", revit_falso.StorageType.Double, 0.0),
+        (u"Fator de Potência", revit_falso.StorageType.Double, 0.0),
+    ], baseada_em_face=True)
+    doc.criar_vinculo(arquitetura, origem=(250.0, -80.0, 2.0), rotacao=math.radians(30.0))
+    return doc, niveis, simbolo, arquitetura
+
+
+class Cenario(object):
+    def __init__(self, tomadas, pasta):
+        self.tomadas = tomadas
+        self.pasta = pasta
+        self.parametros = lote.ParametrosParede(0.3, TOMADAS_POR_PAREDE, None, 'Frontal',
+                                                (200.0, 0.8, 127.0, 1))
+
+    def preparar(self):
+        self.doc, self.simbolo, self.paredes = montar_projeto(self.tomadas)
+        self.itens = None
+        self.inseridas = None
+        self.grupos = None
+        self.pavimento = montar_ambientes(max(1, self.tomadas // TOMADAS_POR_AMBIENTE))
+        # Contornos de uma repetição anterior (mesmo título e ids) não valem
+        sessao.guardar('contornos_ambientes_{}'.format(self.pavimento[1].Id.Value), None, self.pavimento[0])
+        self.vinculado = montar_vinculo(self.tomadas)
+        sessao.guardar('paredes_vinculo', None, self.vinculado[3])
+
+    def planejar(self):
+        self.itens, _ = lote.planejar_lote(self.paredes, self.parametros)
+
+    def inserir(self):
+        resultado = lote.executar_lote(self.doc, self.simbolo, self.itens)
+        self.inseridas = [t for grupo in resultado.tomadas_por_parede.values() for t in grupo]
+
+    def conflitos(self):
+        indice = conflitos.indice_do_documento(self.doc, FOLGA_CONFLITOS)
+        self.planejados, _ = lote.planejar_lote(self.paredes, self.parametros, conflitos=indice)
+
+    def antecipar(self):
+        folga_metros = FOLGA_CONFLITOS / insercao.PES_POR_METRO
+        antecipada = antecipacao.Antecipacao(
+            antecipacao.capturar(self.doc, self.paredes), self.parametros, folga_metros)
+        indice = antecipada.indice_conflitos(folga_metros, parametros=self.parametros)
+        itens, _ = antecipada.planejar(self.parametros, indice_conflitos=indice)
+        assert antecipada.aproveitadas == 2
+        assert [len(i.pontos) for i in itens] == [len(i.pontos) for i in self.planejados]
+
+    def sincronizar(self):
+        gerenciadas = marcacao.gerenciadas_por_parede(self.doc)
+        resultado = lote.executar_lote(self.doc, self.simbolo, self.itens, gerenciadas=gerenciadas)
+        assert resultado.sincronizacao.alteracoes == 0
+
+    def circuitos(self):
+        self.grupos = circuitos.particionar(circuitos.cargas_das_tomadas(self.inseridas, 200.0))
+        agendador = transacoes.Agendador(self.doc, "Criar Circuitos")
+        with agendador, agendador.etapa("Criar Circuitos"):
+            criados = circuitos.criar_circuitos(self.doc, self.grupos)
+            painel = next(iter(revit_falso.FilteredElementCollector(self.doc)
+                               .OfCategory(revit_falso.BuiltInCategory.OST_ElectricalEquipment)
+                               .OfClass(revit_falso.FamilyInstance)))
+            circuitos.atribuir_painel(criados, painel, 127.0, 1, 200.0, 0.8)
+            agendador.regenerar()
+        assert agendador.regeneracoes == 1
+
+    def parametrizar(self):
+        tomadas = parametrizacao.coletar_tomadas(self.doc, parametrizacao.ORIGEM_PROJETO)
+        resultado = parametrizacao.parametrizar(self.doc, tomadas, {'sistema_tensao': (220.0, 380.0)})
+        assert len(resultado.alteradas) == len(tomadas) and not resultado.erros
+
+    def rotas(self):
+        lista = demanda.coletar_circuitos(self.doc)
+        resultado = rotas.calcular_rotas(self.doc, lista, usar_sessao=False)
+        assert not resultado.sem_rota and len(resultado.comprimentos) == len(lista)
+        rotas.gravar_comprimentos(self.doc, lista, resultado.comprimentos)
+
+    def demanda(self):
+        analise = demanda.analisar(self.doc, usar_sessao=False)
+        assert len(analise.circuitos) == len(self.grupos)
+
+    def paineis(self):
+        indice = paineis.IndicePaineis(paineis.construir_registros(self.doc))
+        posicoes = dict((revit_falso._valor_id(t.Id), t.Location.Point) for t in self.inseridas)
+        for grupo in self.grupos:
+            indice.sugerir([(posicoes[i].X, posicoes[i].Y) for i in grupo], 127.0, n=3)
+
+    def exportar(self):
+        caminho = os.path.join(self.pasta, 'parametros.elpc')
+        with exportacao.EscritorColunar(caminho) as escritor:
+            exportacao.exportar_parametros(self.inseridas, [escritor])
+
+    def retrato(self):
+        caminho = os.path.join(self.pasta, 'projeto.elrp')
+        resumo = retrato.exportar(self.doc, caminho)
+        with retrato.abrir(caminho) as lido:
+            assert lido.resumo() == resumo
+            assert len(lido.tomadas) == len(self.inseridas)
+            assert sum(c.pontos for c in lido.circuitos) == len(self.inseridas)
+
+    def inventario(self):
+        caminho = os.path.join(self.pasta, 'inventario.json')
+        completo = inventario.carregar_inventario(self.doc, completo=True, caminho=caminho)
+        atualizado = inventario.carregar_inventario(self.doc, caminho=caminho)
+        assert atualizado.relidos == 0 and atualizado.instancias == completo.instancias
+
+    def atualizador(self):
+        id_addin = revit_falso.AddInId(revit_falso.Guid('a1b2c3d4-0000-4000-8000-000000000001'))
+        atualizador.ativar(self.doc, id_addin)
+        instancia = atualizador.instancia(id_addin)
+        chamadas = instancia.chamadas
+        tomadas = self.inseridas
+        agendador = transacoes.Agendador(self.doc, "Editar Potência")
+        with agendador, agendador.etapa("Editar Potência"):
+            for tomada in tomadas:
+                tomada.LookupParameter(u"Potência Aparente (VA)").Set(300.0)
+        atualizador.desativar(self.doc, id_addin)
+        assert instancia.chamadas == chamadas + 1 and not instancia.erros
+        ativa = tomadas[-1].LookupParameter(u"Potência Ativa (W)").AsDouble()
+        assert abs(ativa - 300.0 * 0.8) < 1e-9
+
+    def ambientes(self):
+        doc, nivel, simbolo = self.pavimento
+        plano = ambientes.planejar_ambientes(doc, nivel.Id, (0.8, 127.0, 1))
+        assert plano.contornos_lidos == len(plano.ambientes) and not plano.erros
+        assert plano.total == plano.exigidas
+        resultado = lote.executar_lote(doc, simbolo, plano.itens, nome="Tomadas por Ambiente")
+        assert resultado.total == plano.total and not resultado.erros
+        indice = conflitos.indice_do_documento(doc, FOLGA_CONFLITOS)
+        repetido = ambientes.planejar_ambientes(doc, nivel.Id, (0.8, 127.0, 1), conflitos=indice)
+        assert repetido.contornos_lidos == 0 and repetido.total == 0
+        assert sum(a.existentes for a in repetido.ambientes) == plano.exigidas
+
+    def vinculos(self):
+        doc, niveis, simbolo, _ = self.vinculado
+        lista = vinculos.vinculos_do_documento(doc)
+        itens = []
+        for k, nivel in enumerate(niveis):
+            antes = revit_falso.chamadas_api()
+            descricao = vinculos.descrever_vinculos(lista, nivel.Elevation)
+            # Só o primeiro pavimento lê o modelo vinculado
+            assert k == 0 or revit_falso.chamadas_api() == antes
+            parcial, erros = lote.planejar_descritas(descricao, self.parametros)
+            assert not erros
+            itens.extend(parcial)
+        resultado = lote.executar_lote(doc, simbolo, itens, nome="Tomadas no Vínculo")
+        assert resultado.total == sum(len(i.pontos) for i in itens) and not resultado.erros
+        # Nova execução: a geometria vem da sessão, sem reler as paredes do vínculo
+        antes = revit_falso.chamadas_api()
+        descricao = vinculos.descrever_vinculos(vinculos.vinculos_do_documento(doc))
+        assert revit_falso.chamadas_api() - antes < len(descricao.ids)
+
+
+# Etapas em ordem; cada uma depende do estado deixado pela anterior
+ETAPAS = ('planejar', 'inserir', 'conflitos', 'antecipar', 'sincronizar', 'circuitos', 'parametrizar',
+          'rotas', 'demanda', 'paineis', 'exportar', 'retrato',
+          'inventario', 'atualizador', 'ambientes', 'vinculos')
+
+
+def medir(tomadas, repeticoes, pasta):
+    """Melhor tempo e chamadas à API de cada etapa, refazendo o projeto a cada repetição."""
+    melhores = dict((etapa, float('inf')) for etapa in ETAPAS)
+    chamadas = {}
+    cenario = Cenario(tomadas, pasta)
+    for _ in range(repeticoes):
+        cenario.preparar()
+        for etapa in ETAPAS:
+            funcao = getattr(cenario, etapa)
+            revit_falso.zerar_chamadas()
+            with rastreio.trecho(u"{} ({} tomadas)".format(etapa, tomadas), 'cenario'):
+                tempo = timeit.timeit(funcao, number=1)
+            melhores[etapa] = min(melhores[etapa], tempo)
+            chamadas[etapa] = revit_falso.chamadas_api()
+    return dict(
+        (etapa, {'segundos': melhores[etapa], 'chamadas_por_tomada': float(chamadas[etapa]) / tomadas})
+        for etapa in ETAPAS
+    )
+
+
+def comparar(resultados, base, tolerancia):
+    """Lista de regressões ``(tamanho, etapa, atual, anterior)`` acima da tolerância."""
+    regressoes = []
+    for tamanho, etapas in resultados.items():
+        for etapa, valores in etapas.items():
+            anterior = base.get(tamanho, {}).get(etapa)
+            if anterior and valores['segundos'] > anterior['segundos'] * (1.0 + tolerancia):
+                regressoes.append((tamanho, etapa, valores['segundos'], anterior['segundos']))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cenários de desempenho com o documento falso.")
+    parser.add_argument('--tamanhos', default='1000,10000,100000')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--json', dest='saida')
+    parser.add_argument('--base')
+    parser.add_argument('--tolerancia', type=float, default=0.25)
+    parser.add_argument('--rastreio')
+    args = parser.parse_args()
+
+    if args.rastreio:
+        rastreio.iniciar('bench_cenarios', True)
+        rastreio.registrar_contador_api(revit_falso.chamadas_api)
+
+    tamanhos = [int(t) for t in args.tamanhos.split(',') if t.strip()]
+    pasta = tempfile.mkdtemp()
+    resultados = {}
+    try:
+        for tamanho in tamanhos:
+            repeticoes = args.repeticoes if tamanho < 100000 else 1
+            print("{} tomadas (melhor de {}):".format(tamanho, repeticoes))
+            resultados[str(tamanho)] = medicao = medir(tamanho, repeticoes, pasta)
+            for etapa in ETAPAS:
+                print("  {:<12} {:9.2f} ms  {:7.3f} us/tomada  {:6.2f} chamadas API/tomada".format(
+                    etapa, medicao[etapa]['segundos'] * 1e3,
+                    medicao[etapa]['segundos'] * 1e6 / tamanho,
+                    medicao[etapa]['chamadas_por_tomada']))
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    if args.rastreio:
+        rastreio.gravar(args.rastreio)
+        print("Rastreio gravado em {}; trechos mais lentos:".format(args.rastreio))
+        for nome, n, total, _, api in rastreio.resumo()[:15]:
+            print(u"  {:<40} {:6d}x {:9.2f} ms  {:>8} chamadas API".format(nome, n, total * 1e3, api))
+
+    if args.saida:
+        with open(args.saida, 'w') as arquivo:
+            json.dump(resultados, arquivo, indent=2, sort_keys=True)
+
+    if args.base:
+        with open(args.base, 'r') as arquivo:
+            base = json.load(arquivo)
+        regressoes = comparar(resultados, base, args.tolerancia)
+        for tamanho, etapa, atual, anterior in regressoes:
+            print("REGRESSÃO {} tomadas / {}: {:.2f} ms (antes {:.2f} ms)".format(
+                tamanho, etapa, atual * 1e3, anterior * 1e3))
+        if regressoes:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
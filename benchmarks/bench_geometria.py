@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Benchmark do núcleo geométrico (``eletrica.geometria``) em CPython puro.
+
+Gera um lote de paredes retas e curvas, com aberturas, e mede a geração
+de todos os pontos de inserção com NumPy (se instalado) e com o caminho
+em Python puro usado no IronPython.
+
+Uso:
+    python benchmarks/bench_geometria.py [paredes] [tomadas_por_parede] [repeticoes]
+"""
+
+import math
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+
+from eletrica import geometria  # noqa: E402
+
+
+def montar_lote(paredes, tomadas_por_parede, semente=42):
+    aleatorio = random.Random(semente)
+    lote = geometria.LoteParedes()
+    for i in range(paredes):
+        face = 'Frontal' if i % 2 else 'Traseira'
+        aberturas = [(1.0, 4.0)] if i % 4 == 0 else None
+        if i % 5 == 0:
+            lote.adicionar_arco(
+                aleatorio.uniform(-100, 100), aleatorio.uniform(-100, 100),
+                aleatorio.uniform(5, 30), aleatorio.uniform(0, 2 * math.pi),
+                aleatorio.uniform(-math.pi, math.pi), 0.0, 0.5, 3.6,
+                tomadas_por_parede, None, face, aberturas,
+            )
+        else:
+            x0, y0 = aleatorio.uniform(-100, 100), aleatorio.uniform(-100, 100)
+            angulo = aleatorio.uniform(0, 2 * math.pi)
+            comprimento = aleatorio.uniform(5, 40)
+            lote.adicionar_reta(
+                x0, y0, x0 + comprimento * math.cos(angulo), y0 + comprimento * math.sin(angulo),
+                0.0, 0.5, 3.6, tomadas_por_parede, None, face, aberturas,
+            )
+    return lote
+
+
+def main():
+    paredes = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    tomadas_por_parede = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    repeticoes = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    lote = montar_lote(paredes, tomadas_por_parede)
+    variantes = [('python puro', False)]
+    if geometria.np is not None:
+        variantes.append(('numpy', True))
+
+    print("{} paredes x {} tomadas, melhor de {} execuções".format(
+        paredes, tomadas_por_parede, repeticoes))
+    for nome, usar_numpy in variantes:
+        pontos = geometria.calcular_pontos(lote, usar_numpy=usar_numpy)
+        melhor = min(timeit.repeat(
+            lambda: geometria.calcular_pontos(lote, usar_numpy=usar_numpy),
+            number=1, repeat=repeticoes))
+        print("  {:<12} {:8.2f} ms  {:6.3f} us/ponto  ({} pontos)".format(
+            nome, melhor * 1e3, melhor * 1e6 / max(len(pontos), 1), len(pontos)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Benchmark do plano de inserção compilado (1k tomadas por parede).
+
+Compara o laço original de ``inserir_tomadas`` (que recalcula direção,
+ângulo e procura os parâmetros por nome a cada tomada) com
+``insercao.criar_tomadas``, que usa o ``PlanoInsercao`` da parede.
+
+Roda em CPython sem Revit sobre o documento falso de
+``eletrica.revit_falso`` (``LookupParameter`` percorre os parâmetros da
+instância, como no Revit). Além do tempo, o benchmark conta as chamadas à
+API por tomada, que no IronPython atravessam a camada de
+interoperabilidade .NET e dominam o custo.
+
+O ganho em tempo no CPython é pequeno (cerca de 1.5x) porque aqui cada
+chamada ao substituto custa pouco mais que uma chamada de função Python. O
+plano elimina, por tomada, as leituras da curva e o cálculo do ângulo
+(``GetEndPoint`` duas vezes, ``Normalize``, ``AngleTo`` e
+``CrossProduct``) e troca as três buscas por nome (``LookupParameter``)
+por acesso direto às definições (``get_Parameter``): de 14 para 9
+chamadas por tomada. As 9 restantes são as escritas de cada instância
+(``NewFamilyInstance``, eixo e ``RotateElement``, três ``Set``) e as três
+leituras dos parâmetros a gravar, que o plano não tem como evitar.
+
+Uso:
+    python benchmarks/bench_plano_insercao.py [tomadas_por_parede] [repeticoes]
+"""
+
+import math
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+
+from eletrica import revit_falso  # noqa: E402
+
+revit_falso.instalar()
+
+from eletrica import insercao  # noqa: E402
+from eletrica.revit_falso import (  # noqa: E402
+    ElementTransformUtils,
+    Line,
+    StorageType,
+    Transaction,
+    XYZ,
+)
+
+PARAMETROS_POR_FAMILIA = 60
+
+
+def montar_documento():
+    """Documento com uma parede e um símbolo de ``PARAMETROS_POR_FAMILIA`` parâmetros."""
+    doc = revit_falso.Documento()
+    nivel = doc.criar_nivel(u"Térreo", 0.0)
+    parede = doc.criar_parede((0.0, 0.0), (30.0, 40.0), nivel)
+    definicoes = [(u"Parametro {}".format(i), StorageType.Double, 0.0)
+                  for i in range(PARAMETROS_POR_FAMILIA - 3)] + [
+        (u"Elevação do Ponto", StorageType.Double, 0.0),
+        (u"Potência Aparente (VA)", StorageType.Double, 0.0),
+        (u"Fator de Potência", StorageType.Double, 0.0),
+    ]
+    simbolo = doc.criar_simbolo(u"Tomada", u"TUG", parametros_instancia=definicoes)
+    return doc, parede, simbolo
+
+
+# --- Laço original (referência) ----------------------------------------------
+
+def inserir_tomadas_original(doc, parede, tomada_selecionada, pontos_insercao, face_selecionada,
+                             parametros_elet):
+    potencia_aparente, fator_potencia, tensao, numero_fases = parametros_elet
+    tomadas_inseridas = []
+    for ponto_insercao in pontos_insercao:
+        tomada_instancia = doc.Create.NewFamilyInstance(ponto_insercao, tomada_selecionada, parede, 0)
+        curva = parede.Location.Curve
+        direcao_parede = (curva.GetEndPoint(1) - curva.GetEndPoint(0)).Normalize()
+        angulo = XYZ.BasisX.AngleTo(direcao_parede)
+        cross = XYZ.BasisX.CrossProduct(direcao_parede)
+        if cross.Z < 0:
+            angulo = -angulo
+        if face_selecionada == 'Traseira':
+            angulo += math.pi
+        eixo_rotacao = Line.CreateBound(ponto_insercao, ponto_insercao + XYZ.BasisZ)
+        ElementTransformUtils.RotateElement(doc, tomada_instancia.Id, eixo_rotacao, angulo)
+        param_elevacao = tomada_instancia.LookupParameter('Elevação do Ponto')
+        if param_elevacao and not param_elevacao.IsReadOnly:
+            param_elevacao.Set(ponto_insercao.Z)
+        parametro_S = tomada_instancia.LookupParameter('Potência Aparente (VA)')
+        if parametro_S and parametro_S.StorageType == StorageType.Double:
+            parametro_S.Set(potencia_aparente)
+        parametro_cos_phi = tomada_instancia.LookupParameter('Fator de Potência')
+        if parametro_cos_phi and parametro_cos_phi.StorageType == StorageType.Double:
+            parametro_cos_phi.Set(fator_potencia)
+        tomadas_inseridas.append(tomada_instancia)
+    return tomadas_inseridas
+
+
+def main():
+    tomadas_por_parede = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    direcao = XYZ(0.6, 0.8, 0.0)
+    pontos = [direcao * (0.05 * i) + XYZ(0.0, 0.0, 3.6) for i in range(tomadas_por_parede)]
+    parametros_elet = (1000.0, 0.8, 127.0, 1)
+
+    def executar(funcao):
+        def rodar():
+            doc, parede, simbolo = montar_documento()
+            transacao = Transaction(doc, "Benchmark")
+            transacao.Start()
+            funcao(doc, parede, simbolo, pontos, 'Traseira', parametros_elet)
+            transacao.Commit()
+        return rodar
+
+    print("{} tomadas por parede, {} parâmetros por família, melhor de {} execuções".format(
+        tomadas_por_parede, PARAMETROS_POR_FAMILIA, repeticoes))
+    resultados = {}
+    for nome, funcao in (('original', inserir_tomadas_original),
+                         ('plano compilado', insercao.criar_tomadas)):
+        rodar = executar(funcao)
+        revit_falso.zerar_chamadas()
+        rodar()
+        chamadas = revit_falso.chamadas_api()
+        melhor = min(timeit.repeat(rodar, number=1, repeat=repeticoes))
+        resultados[nome] = (melhor, chamadas)
+        print("  {:<16} {:8.2f} ms total  {:6.2f} us/tomada  {:5.2f} chamadas API/tomada".format(
+            nome, melhor * 1e3, melhor * 1e6 / tomadas_por_parede, float(chamadas) / tomadas_por_parede))
+    (tempo_original, chamadas_original), (tempo_plano, chamadas_plano) = (
+        resultados['original'], resultados['plano compilado'])
+    print("  ganho: {:.2f}x no tempo, {:.2f}x menos chamadas à API".format(
+        tempo_original / tempo_plano, float(chamadas_original) / chamadas_plano))
+
+
+if __name__ == '__main__':
+    main()
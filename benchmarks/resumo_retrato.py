@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Resumo de um retrato de projeto (``.elrp``, ``eletrica.retrato``) sem o Revit.
+
+Imprime as contagens de cada seção e as cargas por painel. Com
+``--comparar`` confronta dois retratos (ex.: o da versão anterior do
+modelo) e termina com código 1 se as contagens ou as cargas por painel
+mudarem, para uso em verificações automáticas.
+
+Uso:
+    python benchmarks/resumo_retrato.py projeto.elrp [--json resumo.jsonl]
+        [--comparar anterior.elrp] [--tolerancia 0.5]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+
+from eletrica import relatorio, retrato  # noqa: E402
+
+
+def diferencas(atual, anterior, tolerancia):
+    """Linhas ``(item, anterior, atual)`` que mudaram entre os dois retratos."""
+    linhas = []
+    for campo, valor in zip(retrato.ResumoRetrato._fields, atual.resumo()):
+        antigo = getattr(anterior.resumo(), campo)
+        if campo != 'textos' and valor != antigo:
+            linhas.append((campo, antigo, valor))
+    novos = retrato.cargas_por_painel(atual)
+    antigos = retrato.cargas_por_painel(anterior)
+    for nome in sorted(set(novos) | set(antigos), key=lambda n: n or u""):
+        rotulo = nome if nome is not None else u"(sem painel)"
+        n, pontos, s, _ = novos.get(nome, (0, 0, 0.0, 0.0))
+        n0, pontos0, s0, _ = antigos.get(nome, (0, 0, 0.0, 0.0))
+        if (n, pontos) != (n0, pontos0) or abs(s - s0) > tolerancia:
+            linhas.append((rotulo, u"{} / {} / {:.0f} VA".format(n0, pontos0, s0),
+                           u"{} / {} / {:.0f} VA".format(n, pontos, s)))
+    return linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('caminho', help='arquivo .elrp')
+    parser.add_argument('--json', help='grava também o resumo em JSON Lines')
+    parser.add_argument('--comparar', help='retrato anterior para comparação')
+    parser.add_argument('--tolerancia', type=float, default=0.5, help='diferença de carga aceita (VA)')
+    args = parser.parse_args()
+
+    destinos = [relatorio.DestinoJsonLines(args.json)] if args.json else []
+    rel = relatorio.Relatorio(destinos)
+    codigo = 0
+    with retrato.abrir(args.caminho) as atual:
+        retrato.relatar(atual, rel)
+        if args.comparar:
+            with retrato.abrir(args.comparar) as anterior:
+                linhas = diferencas(atual, anterior, args.tolerancia)
+            rel.titulo(u"Comparação com {}".format(os.path.basename(args.comparar)))
+            if linhas:
+                rel.tabela(linhas, [u"Item", u"Anterior", u"Atual"])
+                codigo = 1
+            else:
+                rel.texto(u"Sem diferenças.")
+    print(relatorio.renderizar_texto(rel.entradas))
+    rel.emitir()
+    sys.exit(codigo)
+
+
+if __name__ == '__main__':
+    main()
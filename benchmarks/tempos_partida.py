@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""Resumo dos tempos de partida registrados pelas ferramentas (``eletrica.partida``).
+
+O arquivo fica nos dados do pyRevit (``tempos_partida.csv``, em
+``%APPDATA%\\pyRevit``); copie-o para cá ou informe o caminho.
+
+Uso:
+    python benchmarks/tempos_partida.py [tempos_partida.csv]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+
+from eletrica import partida  # noqa: E402
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else None
+    registros = partida.ler_registros(caminho)
+    if not registros:
+        print("Nenhum tempo de partida registrado.")
+        return
+    resumo = partida.resumo(registros)
+    print("{:<55} {:>6} {:>10} {:>10}".format("Ferramenta", "N", "Mediana", "Máximo"))
+    for ferramenta in sorted(resumo):
+        n, mediana, maximo = resumo[ferramenta]
+        print(u"{:<55} {:>6} {:>8.0f} ms {:>7.0f} ms".format(ferramenta, n, mediana * 1e3, maximo * 1e3))
+
+
+if __name__ == '__main__':
+    main()
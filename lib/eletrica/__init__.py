@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""Biblioteca compartilhada pelas ferramentas de tomadas da extensão.
+
+Os scripts em "Códigos operantes" adicionam a pasta ``lib`` ao ``sys.path``
+e importam os módulos deste pacote (ex.: ``from eletrica import catalogo``).
+"""
@@ -0,0 +1,461 @@
+# -*- coding: utf-8 -*-
+"""Distribuição de tomadas de uso geral (TUG) por ambiente, pela NBR 5410.
+
+Na inserção por parede o projetista escolhe a parede e digita a
+quantidade e o intervalo; quantas TUGs cada cômodo exige fica por conta
+dele. Aqui os ambientes (``Room``) de um nível são classificados pelo
+nome ou pelo parâmetro ``PARAMETRO_CLASSE`` e a quantidade mínima sai
+da NBR 5410 (9.5.2.2.1):
+
+- banheiros: ao menos uma tomada, junto ao lavatório;
+- cozinhas, copas, áreas de serviço e lavanderias: uma a cada 3,5 m, ou
+  fração, de perímetro;
+- varandas: ao menos uma;
+- salas e dormitórios: uma a cada 5 m, ou fração, de perímetro;
+- demais cômodos: uma até 6 m² e, acima disso, uma a cada 5 m ou fração.
+
+As potências seguem 9.5.2.2.2: 600 VA nas três primeiras tomadas de
+banheiros e cozinhas (nas duas primeiras, se o cômodo tiver mais de
+seis) e 100 VA nas demais.
+
+Cada trecho do contorno delimitado por uma parede é projetado na linha
+de localização dela; as portas e janelas da parede são retiradas e as
+tomadas do ambiente são repartidas entre os trechos livres na proporção
+do comprimento, igualmente espaçadas dentro de cada trecho. Os trechos
+livres de todos os ambientes entram em um único ``LoteParedes``, com a
+face voltada para o ambiente, e os pontos saem do mesmo núcleo de
+``calcular_pontos_insercao`` (deslocamento da face, paredes em arco). O
+resultado são ``ItemLote`` para ``lote.executar_lote``.
+
+Os contornos (``GetBoundarySegments``) ficam na sessão enquanto as
+paredes do nível e a área e o perímetro dos ambientes não mudarem: nas
+execuções seguintes em um pavimento de centenas de ambientes só a área
+e o perímetro de cada um são lidos.
+"""
+
+import math
+
+from eletrica import busca, geometria, insercao, lote, rastreio, rotas, sessao
+from eletrica.catalogo import _valor_texto, id_inteiro
+
+CLASSE_BANHEIRO = 'banheiro'
+CLASSE_COZINHA = 'cozinha'
+CLASSE_VARANDA = 'varanda'
+CLASSE_SALA = 'sala'
+CLASSE_OUTROS = 'outros'
+
+# Termos normalizados de cada classe, na ordem de prioridade ("Banheiro da suíte" é banheiro)
+TERMOS_CLASSES = (
+    (CLASSE_BANHEIRO, ('banheiro', 'banho', 'wc', 'bwc', 'lavabo', 'sanitario', 'toalete')),
+    (CLASSE_COZINHA, ('cozinha', 'copa', 'servico', 'lavanderia', 'gourmet')),
+    (CLASSE_VARANDA, ('varanda', 'sacada', 'terraco', 'alpendre')),
+    (CLASSE_SALA, ('sala', 'estar', 'jantar', 'quarto', 'dormitorio', 'suite')),
+)
+
+# Parâmetro de texto do ambiente que, se preenchido, prevalece sobre o nome
+PARAMETRO_CLASSE = u"Classe NBR 5410"
+
+POTENCIA_UMIDOS_VA = 600.0
+POTENCIA_GERAL_VA = 100.0
+
+# Trechos livres mais curtos que isto (pés) não recebem tomadas
+COMPRIMENTO_MINIMO = 1.0
+
+M2_POR_PE2 = 1.0 / insercao.PES_POR_METRO ** 2
+
+_TOLERANCIA = 1e-6
+
+
+class RegraTUG(object):
+    """Quantidade mínima, altura e potências das TUGs de uma classe de ambiente.
+
+    ``metros_por_tomada`` None: uma tomada, qualquer que seja o perímetro;
+    até ``area_limite_m2`` também vale uma só.
+    """
+
+    __slots__ = ('metros_por_tomada', 'area_limite_m2', 'altura_metros', 'umido')
+
+    def __init__(self, metros_por_tomada, area_limite_m2=0.0, altura_metros=0.30, umido=False):
+        self.metros_por_tomada = metros_por_tomada
+        self.area_limite_m2 = area_limite_m2
+        self.altura_metros = altura_metros
+        self.umido = umido
+
+    def quantidade(self, perimetro_m, area_m2):
+        if self.metros_por_tomada is None or area_m2 <= self.area_limite_m2:
+            return 1
+        return max(1, int(math.ceil(perimetro_m / self.metros_por_tomada - _TOLERANCIA)))
+
+    def potencias(self, quantidade):
+        """Potência (VA) de cada tomada do ambiente, na ordem do contorno."""
+        if not self.umido:
+            return [POTENCIA_GERAL_VA] * quantidade
+        fortes = min(3 if quantidade <= 6 else 2, quantidade)
+        return [POTENCIA_UMIDOS_VA] * fortes + [POTENCIA_GERAL_VA] * (quantidade - fortes)
+
+
+REGRAS = {
+    CLASSE_BANHEIRO: RegraTUG(None, altura_metros=1.10, umido=True),
+    CLASSE_COZINHA: RegraTUG(3.5, altura_metros=1.10, umido=True),
+    CLASSE_VARANDA: RegraTUG(None),
+    CLASSE_SALA: RegraTUG(5.0),
+    CLASSE_OUTROS: RegraTUG(5.0, area_limite_m2=6.0),
+}
+
+
+def _classe_dos_termos(texto):
+    termos = set(busca.termos(texto or u""))
+    for classe, termos_classe in TERMOS_CLASSES:
+        if termos.intersection(termos_classe):
+            return classe
+    return None
+
+
+def classificar(nome, valor_parametro=None):
+    """Classe do ambiente pelo parâmetro (se reconhecido) ou pelo nome."""
+    if valor_parametro:
+        normalizado = busca.normalizar(valor_parametro).strip()
+        if normalizado in REGRAS:
+            return normalizado
+        classe = _classe_dos_termos(valor_parametro)
+        if classe is not None:
+            return classe
+    return _classe_dos_termos(nome) or CLASSE_OUTROS
+
+
+def repartir(quantidade, comprimentos):
+    """Tomadas de cada trecho, proporcionais ao comprimento (maiores restos)."""
+    total = sum(comprimentos)
+    if quantidade <= 0 or total <= 0:
+        return [0] * len(comprimentos)
+    cotas = [quantidade * c / total for c in comprimentos]
+    partes = [int(math.floor(c)) for c in cotas]
+    ordem = sorted(range(len(cotas)), key=lambda k: (partes[k] - cotas[k], -comprimentos[k]))
+    for k in ordem[:quantidade - sum(partes)]:
+        partes[k] += 1
+    return partes
+
+
+class Ambiente(object):
+    """Ambiente do nível e o resultado da distribuição das suas tomadas."""
+
+    __slots__ = ('id', 'nome', 'numero', 'classe', 'area_m2', 'perimetro_m', 'quantidade',
+                 'planejadas', 'existentes')
+
+    def __init__(self, id_ambiente, nome, numero, classe, area_m2, perimetro_m, quantidade):
+        self.id = id_ambiente
+        self.nome = nome
+        self.numero = numero
+        self.classe = classe
+        self.area_m2 = area_m2
+        self.perimetro_m = perimetro_m
+        self.quantidade = quantidade
+        self.planejadas = 0
+        # Pontos já ocupados por um dispositivo existente (índice de conflitos)
+        self.existentes = 0
+
+    @property
+    def faltantes(self):
+        """Tomadas exigidas sem trecho de parede livre para recebê-las."""
+        return max(0, self.quantidade - self.planejadas - self.existentes)
+
+
+class PlanoAmbientes(object):
+    def __init__(self):
+        self.ambientes = []
+        self.itens = []
+        self.erros = []
+        # Ambientes do nível sem área (não colocados ou não fechados)
+        self.sem_area = 0
+        # Ambientes cujo contorno foi lido do documento nesta execução
+        self.contornos_lidos = 0
+
+    @property
+    def total(self):
+        return sum(len(item.pontos) for item in self.itens)
+
+    @property
+    def exigidas(self):
+        return sum(a.quantidade for a in self.ambientes)
+
+
+def coletar_ambientes(doc, nivel_id):
+    """Todos os ambientes do nível informado."""
+    from Autodesk.Revit.DB import BuiltInCategory, ElementLevelFilter, FilteredElementCollector
+
+    return list(
+        FilteredElementCollector(doc)
+        .OfCategory(BuiltInCategory.OST_Rooms)
+        .WherePasses(ElementLevelFilter(nivel_id))
+        .WhereElementIsNotElementType()
+    )
+
+
+def _ler_contorno(ambiente, opcoes):
+    """Laço externo como ``((id_elemento, x0, y0, x1, y1, xm, ym, comprimento), ...)``."""
+    from Autodesk.Revit.DB import Arc
+
+    trechos = []
+    for laco in ambiente.GetBoundarySegments(opcoes):
+        for segmento in laco:
+            curva = segmento.GetCurve()
+            inicio, fim = curva.GetEndPoint(0), curva.GetEndPoint(1)
+            if isinstance(curva, Arc):
+                meio = curva.Evaluate(0.5, True)
+                xm, ym = meio.X, meio.Y
+            else:
+                xm, ym = (inicio.X + fim.X) / 2.0, (inicio.Y + fim.Y) / 2.0
+            trechos.append((id_inteiro(segmento.ElementId), inicio.X, inicio.Y, fim.X, fim.Y,
+                            xm, ym, curva.Length))
+        break  # o primeiro laço é o contorno externo
+    return tuple(trechos)
+
+
+@rastreio.medido()
+def contornos_do_nivel(doc, nivel_id, lidos, descricao, usar_sessao=True):
+    """Contorno de cada ambiente ``{id: trechos}`` e quantos foram lidos agora.
+
+    ``lidos`` são ``(ambiente, área, perímetro)``; ``descricao`` são as
+    paredes do nível (``lote.descrever_paredes``). Os contornos são
+    reaproveitados da sessão enquanto ambas não mudarem.
+    """
+    from Autodesk.Revit.DB import SpatialElementBoundaryOptions
+
+    contador = [0]
+
+    def construir():
+        opcoes = SpatialElementBoundaryOptions()
+        contador[0] = len(lidos)
+        return tuple((id_inteiro(a.Id), _ler_contorno(a, opcoes)) for a, _, _ in lidos)
+
+    if not usar_sessao:
+        return dict(construir()), contador[0]
+    assinatura = (
+        tuple((id_inteiro(a.Id), round(area, 4), round(perimetro, 4)) for a, area, perimetro in lidos),
+        rotas._assinatura(descricao.lote, descricao.ids),
+    )
+    dados = sessao.memorizar(
+        'contornos_ambientes_{}'.format(id_inteiro(nivel_id)), doc, assinatura, construir)
+    return dict(dados), contador[0]
+
+
+def _sentido(trechos):
+    """+1 se o laço é anti-horário (ambiente à esquerda dos trechos), -1 caso contrário."""
+    soma = 0.0
+    for _, x0, y0, x1, y1, xm, ym, _ in trechos:
+        soma += (x0 * ym - xm * y0) + (xm * y1 - x1 * ym)
+    return 1.0 if soma >= 0 else -1.0
+
+
+def _limitar(paredes, i, s):
+    """Comprimento de arco ``s`` trazido para dentro da parede ``i``."""
+    comprimento = paredes.comprimento(i)
+    if paredes.tipo[i] == geometria.ARCO and s > comprimento:
+        # Antes do início do arco o ângulo dá a volta
+        volta = 2 * math.pi * paredes.c2[i]
+        return 0.0 if volta - s < s - comprimento else comprimento
+    return min(max(s, 0.0), comprimento)
+
+
+def intervalos_livres(inicio, fim, aberturas, folga=0.0, minimo=COMPRIMENTO_MINIMO):
+    """Partes de ``[inicio, fim]`` fora das aberturas, com ao menos ``minimo`` de comprimento."""
+    livres = []
+    for a, b in aberturas:
+        a, b = a - folga, b + folga
+        if b <= inicio:
+            continue
+        if a >= fim:
+            break
+        if a - inicio >= minimo:
+            livres.append((inicio, a))
+        inicio = max(inicio, b)
+    if fim - inicio >= minimo:
+        livres.append((inicio, fim))
+    return livres
+
+
+def _face_e_intervalo(paredes, i, trecho, sentido):
+    """Face da parede voltada para o ambiente e o intervalo do trecho na parede."""
+    _, x0, y0, x1, y1, xm, ym, _ = trecho
+    sa = _limitar(paredes, i, geometria.parametro_do_ponto(paredes, i, x0, y0))
+    sb = _limitar(paredes, i, geometria.parametro_do_ponto(paredes, i, x1, y1))
+    tx, ty = geometria.tangente_em(paredes, i, geometria.parametro_do_ponto(paredes, i, xm, ym))
+    # A corda do trecho é paralela à tangente no meio (também nos arcos)
+    nx, ny = -(y1 - y0) * sentido, (x1 - x0) * sentido
+    face = 'Frontal' if -ty * nx + tx * ny >= 0 else 'Traseira'
+    return face, min(sa, sb), max(sa, sb)
+
+
+def _adicionar_peca(pecas, paredes, i, inicio, fim, altura_pes, numero, face):
+    """Parte ``[inicio, fim]`` da parede ``i`` como uma parede do lote de peças."""
+    comprimento = fim - inicio
+    # Espaçamento uniforme com meio espaçamento nas pontas; uma tomada fica no meio
+    intervalo = comprimento * (numero - 1) / float(numero)
+    z, espessura = paredes.z[i], paredes.espessura[i]
+    if paredes.tipo[i] == geometria.ARCO:
+        cx, cy, raio, a0, varredura = (paredes.c0[i], paredes.c1[i], paredes.c2[i], paredes.c3[i],
+                                       paredes.c4[i])
+        sentido = 1.0 if varredura >= 0 else -1.0
+        pecas.adicionar_arco(cx, cy, raio, a0 + sentido * inicio / raio, sentido * comprimento / raio,
+                             z, espessura, altura_pes, numero, intervalo, face)
+    else:
+        tx, ty = geometria.tangente_em(paredes, i, 0.0)
+        x, y = paredes.c0[i], paredes.c1[i]
+        pecas.adicionar_reta(x + tx * inicio, y + ty * inicio, x + tx * fim, y + ty * fim,
+                             z, espessura, altura_pes, numero, intervalo, face)
+
+
+class _Paredes(object):
+    """Paredes descritas por id; as de outros níveis são descritas sob demanda."""
+
+    def __init__(self, doc, descricao):
+        self.doc = doc
+        self.descricoes = [descricao]
+        self.posicoes = dict((id_parede, (descricao, k)) for k, id_parede in enumerate(descricao.ids))
+        self.recusados = set()
+
+    def obter(self, id_parede):
+        """``(descrição, índice)`` da parede ou None (linha de separação, pilar...)."""
+        posicao = self.posicoes.get(id_parede)
+        if posicao is not None or id_parede in self.recusados or id_parede < 0:
+            return posicao
+        from Autodesk.Revit.DB import ElementId, Wall
+
+        parede = self.doc.GetElement(ElementId(id_parede))
+        if isinstance(parede, Wall):
+            descricao = lote.descrever_paredes([parede])
+            if descricao.ids:
+                posicao = self.posicoes[id_parede] = (descricao, 0)
+                return posicao
+        self.recusados.add(id_parede)
+        return None
+
+
+def _ler_ambiente(ambiente, parametro_classe):
+    from Autodesk.Revit.DB import BuiltInParameter
+
+    nome = _valor_texto(ambiente, BuiltInParameter.ROOM_NAME, None) or u""
+    numero = _valor_texto(ambiente, BuiltInParameter.ROOM_NUMBER, None) or u""
+    valor = None
+    if parametro_classe:
+        parametro = ambiente.LookupParameter(parametro_classe)
+        if parametro is not None and parametro.HasValue:
+            valor = parametro.AsString()
+    return nome, numero, classificar(nome, valor)
+
+
+@rastreio.medido()
+def planejar_ambientes(doc, nivel_id, eletrica, conflitos=None, folga_aberturas=0.0, regras=None,
+                       parametro_classe=PARAMETRO_CLASSE, usar_sessao=True):
+    """Calcula as tomadas de todos os ambientes do nível antes de qualquer escrita.
+
+    ``eletrica`` é ``(fator de potência, tensão, fases)``; a potência
+    aparente vem da regra do ambiente. Com ``conflitos``
+    (``IndiceConflitos``) um ponto a menos de ``folga`` de um dispositivo
+    existente conta como já atendido e não é inserido de novo, de modo
+    que rodar outra vez no mesmo nível não duplica as tomadas.
+    ``folga_aberturas`` (pés) amplia as portas e janelas dos dois lados.
+    """
+    regras = regras or REGRAS
+    fator_potencia, tensao, numero_fases = eletrica
+    plano = PlanoAmbientes()
+
+    descricao = lote.descrever_paredes(lote.coletar_paredes_nivel(doc, nivel_id))
+    plano.erros.extend(descricao.erros)
+    lidos = []
+    for ambiente in coletar_ambientes(doc, nivel_id):
+        area = ambiente.Area
+        if area > 0:
+            lidos.append((ambiente, area, ambiente.Perimeter))
+        else:
+            plano.sem_area += 1
+    contornos, plano.contornos_lidos = contornos_do_nivel(doc, nivel_id, lidos, descricao, usar_sessao)
+    paredes = _Paredes(doc, descricao)
+
+    # Trechos livres de todos os ambientes em um único lote de peças
+    pecas = geometria.LoteParedes()
+    origens = []  # por peça: (ambiente, parede, face)
+    for ambiente, area, _ in lidos:
+        trechos = contornos.get(id_inteiro(ambiente.Id), ())
+        nome, numero, classe = _ler_ambiente(ambiente, parametro_classe)
+        regra = regras[classe]
+        perimetro_m = sum(t[7] for t in trechos) / insercao.PES_POR_METRO
+        area_m2 = area * M2_POR_PE2
+        registro = Ambiente(id_inteiro(ambiente.Id), nome, numero, classe, area_m2, perimetro_m,
+                            regra.quantidade(perimetro_m, area_m2))
+        plano.ambientes.append(registro)
+
+        sentido = _sentido(trechos)
+        livres = []
+        for trecho in trechos:
+            posicao = paredes.obter(trecho[0])
+            if posicao is None:
+                continue
+            descricao_parede, i = posicao
+            face, inicio, fim = _face_e_intervalo(descricao_parede.lote, i, trecho, sentido)
+            for a, b in intervalos_livres(inicio, fim, descricao_parede.lote.aberturas[i], folga_aberturas):
+                livres.append((descricao_parede, i, face, a, b))
+        if not livres:
+            plano.erros.append(u"Ambiente {}: nenhum trecho de parede livre no contorno.".format(
+                u" ".join(t for t in (numero, nome) if t)))
+            continue
+        altura_pes = regra.altura_metros * insercao.PES_POR_METRO
+        for (descricao_parede, i, face, a, b), n in zip(
+                livres, repartir(registro.quantidade, [b - a for _, _, _, a, b in livres])):
+            if n:
+                _adicionar_peca(pecas, descricao_parede.lote, i, a, b, altura_pes, n, face)
+                origens.append((registro, regra, descricao_parede.paredes[i], face))
+
+    # As peças não têm aberturas: cada uma gera exatamente ``numero`` pontos
+    pontos = geometria.calcular_pontos(pecas)
+    if conflitos is not None:
+        pontos = conflitos.resolver(pecas, pontos, deslocamento_maximo=0.0)
+        aceitos = [0] * len(pecas)
+        for indice, inicio, fim in pontos.fatias():
+            aceitos[indice] = fim - inicio
+        for indice, (registro, _, _, _) in enumerate(origens):
+            registro.existentes += pecas.numero[indice] - aceitos[indice]
+
+    # Potência pela posição da tomada no ambiente; um item por sequência de mesma potência
+    potencias = {}
+    for indice, inicio, fim in pontos.fatias():
+        registro, regra, parede, face = origens[indice]
+        lista = potencias.get(registro.id)
+        if lista is None:
+            lista = potencias[registro.id] = regra.potencias(registro.quantidade)
+        k = inicio
+        while k < fim:
+            potencia = lista[registro.planejadas]
+            j = k
+            while j < fim and lista[registro.planejadas] == potencia:
+                registro.planejadas += 1
+                j += 1
+            parametros = lote.ParametrosParede(
+                regra.altura_metros, j - k, None, face,
+                (potencia, fator_potencia, tensao, numero_fases),
+            )
+            plano.itens.append(lote.ItemLote(
+                parede, parametros, insercao.pontos_xyz(pontos, k, j), insercao.tangentes(pontos, k, j)))
+            k = j
+    return plano
+
+
+def relatar(plano, rel):
+    """Resumo e a tabela por ambiente em ``rel``."""
+    rel.titulo(u"Tomadas de uso geral por ambiente (NBR 5410)")
+    rel.texto(u"{} ambiente(s): {} tomada(s) exigida(s), {} a inserir, {} já existente(s).".format(
+        len(plano.ambientes), plano.exigidas, plano.total, sum(a.existentes for a in plano.ambientes)))
+    if plano.sem_area:
+        rel.texto(u"{} ambiente(s) sem área (não colocados ou não fechados) ignorado(s).".format(
+            plano.sem_area))
+    rel.tabela(
+        [(a.numero, a.nome, a.classe, round(a.area_m2, 2), round(a.perimetro_m, 2), a.quantidade,
+          a.planejadas, a.existentes, a.faltantes)
+         for a in plano.ambientes],
+        [u"Número", u"Ambiente", u"Classe", u"Área (m²)", u"Perímetro (m)", u"Exigidas",
+         u"A inserir", u"Existentes", u"Sem parede"],
+    )
+    if plano.erros:
+        rel.titulo(u"Avisos")
+        for erro in plano.erros:
+            rel.texto(erro)
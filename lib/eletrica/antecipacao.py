@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""Pré-cálculo em threads auxiliares enquanto o formulário está aberto.
+
+Enquanto o usuário preenche o ``InputForm``/``VoltageForm`` o processador
+fica parado e, depois do OK, a ferramenta ainda descreve as paredes,
+coleta os dispositivos, monta o índice de conflitos e o de painéis. Aqui
+o trabalho é dividido em duas fases:
+
+1. ``capturar`` (thread da API, antes do diálogo) lê do documento tudo o
+   que será necessário: geometria das paredes (``lote.DescricaoParedes``),
+   posição dos dispositivos, tomadas gerenciadas e registros dos painéis.
+   O resultado (``Instantaneo``) só contém números, tuplas e ids;
+2. ``Antecipacao`` dispara ``Tarefa``\\ s em threads auxiliares que, a
+   partir do instantâneo, montam o índice de conflitos com a folga padrão,
+   calculam (e, se possível, já resolvem) os pontos com os parâmetros
+   padrão e montam o índice de painéis enquanto o diálogo está aberto.
+
+Depois do OK, os métodos de ``Antecipacao`` devolvem o resultado pronto
+quando os valores digitados coincidem com os padrões e recalculam a
+partir do instantâneo (sem a API) quando não coincidem. Nenhuma chamada à
+Revit API é feita fora da thread principal.
+"""
+
+import sys
+import threading
+
+from eletrica import conflitos, formularios, geometria, lote, marcacao, paineis, rastreio
+from eletrica.insercao import PES_POR_METRO
+
+if sys.version_info[0] >= 3:
+    def _relancar(tipo, valor, tb):
+        raise valor.with_traceback(tb)
+else:
+    # ``raise tipo, valor, tb`` não compila no Python 3
+    exec("def _relancar(tipo, valor, tb):\n    raise tipo, valor, tb\n")
+
+
+class Tarefa(object):
+    """Executa ``funcao(*args)`` em uma thread auxiliar.
+
+    ``resultado()`` espera o fim da execução e devolve o valor ou relança a
+    exceção da thread com o traceback original. Com ``em_thread=False`` a
+    função roda na hora (útil para depuração e para os cenários de
+    desempenho).
+    """
+
+    def __init__(self, nome, funcao, *args, **opcoes):
+        self.nome = nome
+        self._funcao = funcao
+        self._args = args
+        self._valor = None
+        self._erro = None  # sys.exc_info() da execução
+        self._thread = None
+        if opcoes.get('em_thread', True):
+            self._thread = threading.Thread(target=self._executar, name=nome)
+            self._thread.daemon = True
+            self._thread.start()
+        else:
+            self._executar()
+
+    def _executar(self):
+        try:
+            with rastreio.trecho(self.nome, 'antecipacao'):
+                self._valor = self._funcao(*self._args)
+        except Exception:
+            self._erro = sys.exc_info()
+
+    def pronta(self):
+        return self._thread is None or not self._thread.is_alive()
+
+    def resultado(self):
+        if self._thread is not None:
+            with rastreio.trecho(u"Aguardar: {}".format(self.nome), 'antecipacao'):
+                self._thread.join()
+        if self._erro is not None:
+            _relancar(*self._erro)
+        return self._valor
+
+
+class Instantaneo(object):
+    """Dados somente leitura do documento para as threads auxiliares."""
+
+    def __init__(self):
+        self.descricao = None  # lote.DescricaoParedes
+        self.dispositivos = []  # [(x, y, z, id)]
+        self.gerenciadas = {}  # id da parede -> [(tomada, dados)]; usado só na thread principal
+        self.registros_paineis = None  # [paineis.RegistroPainel] ou None
+
+
+@rastreio.medido()
+def capturar(doc, paredes, dispositivos=True, gerenciadas=True, com_paineis=False):
+    """Lê do documento, na thread da API, tudo o que as tarefas vão usar."""
+    instantaneo = Instantaneo()
+    instantaneo.descricao = lote.descrever_paredes(paredes)
+    if dispositivos:
+        instantaneo.dispositivos = conflitos.pontos_do_documento(doc)
+    if gerenciadas:
+        instantaneo.gerenciadas = marcacao.gerenciadas_por_parede(doc, set(instantaneo.descricao.ids))
+    if com_paineis:
+        instantaneo.registros_paineis = paineis.registros_da_sessao(doc)
+    return instantaneo
+
+
+def _planejar_padrao(descricao, parametros, dispositivos, folga):
+    """Pontos dos parâmetros padrão; com ``folga``, já resolvidos contra os dispositivos.
+
+    Retorna ``(indice_conflitos ou None, pontos)``.
+    """
+    lote_paredes, _ = descricao.com_parametros(parametros)
+    pontos = geometria.calcular_pontos(lote_paredes)
+    indice = None
+    if folga > 0:
+        indice = conflitos.indice_dos_pontos(dispositivos, folga)
+        pontos = indice.resolver(lote_paredes, pontos)
+    return indice, pontos
+
+
+def _chave(parametros):
+    return (parametros.altura_metros, parametros.numero_tomadas, parametros.intervalo_metros,
+            parametros.face)
+
+
+class Antecipacao(object):
+    """Tarefas de pré-cálculo sobre um ``Instantaneo``.
+
+    ``parametros`` (``lote.ParametrosParede``) e ``folga_metros`` são os
+    valores padrão do formulário; os resultados antecipados só são
+    aproveitados quando o usuário confirma esses mesmos valores.
+
+    Sem tomadas gerenciadas nas paredes não haverá sincronização (nada a
+    ignorar), então a tarefa já resolve os conflitos dos pontos padrão.
+    Com tomadas gerenciadas o conjunto ignorado só é conhecido depois do
+    formulário: o índice e os pontos são antecipados separadamente. Um
+    índice limpo (sem pontos resolvidos) é sempre antecipado, para quando
+    o usuário muda os valores padrão.
+    """
+
+    def __init__(self, instantaneo, parametros, folga_metros, em_thread=True):
+        self.instantaneo = instantaneo
+        self.parametros = parametros
+        self.folga = folga_metros * PES_POR_METRO
+        self.aproveitadas = 0
+        self._padrao = None
+        self._conflitos = None
+        self._pontos = None
+        descricao = instantaneo.descricao
+        if self.folga > 0:
+            self._conflitos = Tarefa(
+                u"Índice de conflitos", conflitos.indice_dos_pontos, instantaneo.dispositivos,
+                self.folga, em_thread=em_thread)
+        if not instantaneo.gerenciadas:
+            self._padrao = Tarefa(
+                u"Planejamento padrão", _planejar_padrao, descricao, parametros,
+                instantaneo.dispositivos, self.folga, em_thread=em_thread)
+        else:
+            self._pontos = Tarefa(
+                u"Pontos candidatos", _planejar_padrao, descricao, parametros, (), 0.0,
+                em_thread=em_thread)
+        self._paineis = None
+        if instantaneo.registros_paineis is not None:
+            self._paineis = Tarefa(
+                u"Índice de painéis", paineis.IndicePaineis, instantaneo.registros_paineis,
+                em_thread=em_thread)
+
+    def gerenciadas(self):
+        return self.instantaneo.gerenciadas
+
+    def _aproveitar(self, tarefa):
+        self.aproveitadas += 1
+        return tarefa.resultado()
+
+    def _padrao_vale(self, parametros, sobrescritas):
+        return (self._padrao is not None and parametros is not None and not sobrescritas
+                and _chave(parametros) == _chave(self.parametros))
+
+    def indice_conflitos(self, folga_metros, ignorar=None, parametros=None, sobrescritas=None):
+        """``IndiceConflitos`` para a folga escolhida (None com folga nula).
+
+        O índice da tarefa padrão já contém os pontos padrão resolvidos e só
+        é entregue quando ``parametros`` e ``sobrescritas`` (os mesmos de
+        ``planejar``) coincidem com os padrões; senão o índice é limpo. O
+        índice antecipado é entregue uma única vez, porque ``resolver``
+        acrescenta os pontos aceitos à grade.
+        """
+        folga = folga_metros * PES_POR_METRO
+        if folga <= 0:
+            return None
+        if abs(folga - self.folga) < 1e-9:
+            if not ignorar and self._padrao_vale(parametros, sobrescritas):
+                return self._aproveitar(self._padrao)[0]
+            if self._conflitos is not None:
+                indice = self._aproveitar(self._conflitos)
+                self._conflitos = None
+                indice.ignorar = ignorar
+                return indice
+        return conflitos.indice_dos_pontos(self.instantaneo.dispositivos, folga, ignorar)
+
+    def planejar(self, parametros, sobrescritas=None, indice_conflitos=None, gerenciadas=None):
+        """``lote.planejar_descritas`` com os pontos antecipados, se ainda valerem.
+
+        ``gerenciadas`` só no modo de sincronização (ver ``lote.planejar_descritas``).
+        """
+        descricao = self.instantaneo.descricao
+        if not sobrescritas and _chave(parametros) == _chave(self.parametros):
+            if self._padrao is not None:
+                indice, pontos = self._padrao.resultado()
+                if indice is indice_conflitos:
+                    # Conflitos já resolvidos na tarefa
+                    self.aproveitadas += 1
+                    return lote.planejar_descritas(
+                        descricao, parametros, pontos=pontos, gerenciadas=gerenciadas)
+            elif self._pontos is not None:
+                _, pontos = self._aproveitar(self._pontos)
+                return lote.planejar_descritas(
+                    descricao, parametros, conflitos=indice_conflitos, pontos=pontos,
+                    gerenciadas=gerenciadas)
+        return lote.planejar_descritas(
+            descricao, parametros, sobrescritas, conflitos=indice_conflitos, gerenciadas=gerenciadas)
+
+    def indice_paineis(self, doc):
+        """Índice de painéis montado na thread auxiliar (ou lido agora, sem instantâneo)."""
+        if self._paineis is None:
+            return paineis.indice_paineis(doc)
+        return self._aproveitar(self._paineis)
+
+
+def parametros_padrao(padroes=None):
+    """``lote.ParametrosParede`` equivalente aos valores iniciais do ``InputForm``."""
+    padroes = padroes or formularios.PADROES_INSERCAO
+    intervalo = padroes['intervalo'].strip()
+    return lote.ParametrosParede(
+        float(padroes['altura'].replace(',', '.')),
+        int(padroes['numero_tomadas']),
+        float(intervalo.replace(',', '.')) if intervalo else None,
+        formularios.FACES[0],
+        None,
+    )
+
+
+def folga_padrao(padroes=None):
+    padroes = padroes or formularios.PADROES_INSERCAO
+    return float(padroes['folga'].replace(',', '.') or conflitos.FOLGA_PADRAO_METROS)
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""Atualizador dinâmico (``IUpdater``) dos parâmetros elétricos derivados.
+
+"Definir alguns parametros de tomada" calcula P = S·cos φ só na inserção:
+quando alguém edita S ou cos φ de uma tomada depois, P, Q e a corrente
+ficam desatualizados até a próxima parametrização em massa. Com o
+atualizador ativo no documento:
+
+- os gatilhos observam os parâmetros de entrada (``parametrizacao.ENTRADAS``)
+  das tomadas e a inserção de tomadas novas;
+- o Revit chama ``Execute`` uma vez por transação com todos os ids
+  alterados; as tomadas são agrupadas por símbolo e os derivados são
+  recalculados em colunas (``parametrizacao.recalcular_derivados``) e
+  gravados, só onde mudaram, na mesma transação da edição.
+
+Parâmetros de projeto/compartilhados têm um ``ParameterElement`` (id
+positivo) e viram gatilhos de parâmetro; se alguma entrada for um
+parâmetro de família, o gatilho passa a ser qualquer alteração das
+tomadas (o resultado é o mesmo, só há mais chamadas). O registro é por
+documento e vale até o Revit ser fechado; ``alternar`` liga e desliga.
+"""
+
+import traceback
+
+from eletrica import parametrizacao, rastreio
+from eletrica.catalogo import id_inteiro
+
+GUID_ATUALIZADOR = '5b0f3c2e-7d4a-4e61-9a8b-2c6d1e0f4a93'
+NOME_ATUALIZADOR = u"Parâmetros elétricos derivados"
+CATEGORIA_TOMADAS = 'OST_ElectricalFixtures'
+
+# Erros guardados do ``Execute`` (os mais recentes)
+MAXIMO_ERROS = 20
+
+_CLASSES = {}
+_INSTANCIAS = {}
+
+
+def _id_atualizador(id_addin):
+    from System import Guid
+    from Autodesk.Revit.DB import UpdaterId
+    return UpdaterId(id_addin, Guid(GUID_ATUALIZADOR))
+
+
+def _definir_classes():
+    """Declara a classe do atualizador (uma vez por motor)."""
+    if _CLASSES:
+        return _CLASSES
+    from Autodesk.Revit.DB import ChangePriority, IUpdater
+
+    class AtualizadorDerivados(IUpdater):
+        def __init__(self, id_addin):
+            self.id = _id_atualizador(id_addin)
+            self.chamadas = 0
+            self.alteradas = 0
+            self.erros = []
+
+        def GetUpdaterId(self):
+            return self.id
+
+        def GetUpdaterName(self):
+            return NOME_ATUALIZADOR
+
+        def GetAdditionalInformation(self):
+            return u"Recalcula potência ativa, reativa e corrente das tomadas editadas."
+
+        def GetChangePriority(self):
+            return ChangePriority.MEPFixtures
+
+        def Execute(self, dados):
+            try:
+                ids = list(dados.GetModifiedElementIds()) + list(dados.GetAddedElementIds())
+                resultado = atualizar(dados.GetDocument(), ids)
+                self.chamadas += 1
+                if resultado is not None:
+                    self.alteradas += len(resultado.alteradas)
+                    self._guardar_erros(resultado.erros)
+            except Exception:
+                # Uma exceção não tratada faria o Revit desativar o atualizador
+                self._guardar_erros([traceback.format_exc()])
+
+        def _guardar_erros(self, erros):
+            if erros:
+                self.erros.extend(erros)
+                del self.erros[:-MAXIMO_ERROS]
+
+    _CLASSES['AtualizadorDerivados'] = AtualizadorDerivados
+    return _CLASSES
+
+
+def instancia(id_addin):
+    """Atualizador único do motor para o add-in (compartilhado entre documentos)."""
+    chave = str(id_addin.GetGUID())
+    atualizador = _INSTANCIAS.get(chave)
+    if atualizador is None:
+        atualizador = _INSTANCIAS[chave] = _definir_classes()['AtualizadorDerivados'](id_addin)
+    return atualizador
+
+
+def tomadas_dos_ids(doc, ids):
+    """Instâncias da categoria de tomadas entre ``ids`` (demais elementos ignorados)."""
+    from Autodesk.Revit.DB import BuiltInCategory
+
+    categoria = int(getattr(BuiltInCategory, CATEGORIA_TOMADAS))
+    tomadas = []
+    for elem_id in ids:
+        elemento = doc.GetElement(elem_id)
+        if elemento is None or getattr(elemento, 'Symbol', None) is None:
+            continue
+        if elemento.Category is None or id_inteiro(elemento.Category.Id) != categoria:
+            continue
+        tomadas.append(elemento)
+    return tomadas
+
+
+@rastreio.medido()
+def atualizar(doc, ids):
+    """Recalcula os derivados das tomadas entre ``ids``; None se não houver tomadas."""
+    tomadas = tomadas_dos_ids(doc, ids)
+    if not tomadas:
+        return None
+    return parametrizacao.recalcular_derivados(tomadas)
+
+
+def ids_parametros_entrada(doc):
+    """Ids dos parâmetros de entrada das famílias de tomada e se todos servem de gatilho.
+
+    Lê uma instância por símbolo. Retorna ``(ids, completos)``; ``completos``
+    é False quando alguma entrada não tem ``ParameterElement``.
+    """
+    from eletrica import exportacao
+
+    ids = set()
+    completos = True
+    simbolos = set()
+    for tomada in exportacao.coletar_instancias(doc, CATEGORIA_TOMADAS):
+        id_simbolo = id_inteiro(tomada.Symbol.Id)
+        if id_simbolo in simbolos:
+            continue
+        simbolos.add(id_simbolo)
+        mapa = parametrizacao.ParametrosFamilia.resolver(tomada)
+        for campo in parametrizacao.ENTRADAS:
+            definicao = mapa.definicoes.get(campo)
+            if definicao is None:
+                continue
+            id_parametro = id_inteiro(tomada.get_Parameter(definicao).Id)
+            if id_parametro > 0:
+                ids.add(id_parametro)
+            else:
+                completos = False
+    return sorted(ids), completos
+
+
+def ativo(doc, id_addin):
+    from Autodesk.Revit.DB import UpdaterRegistry
+    return UpdaterRegistry.IsUpdaterRegistered(_id_atualizador(id_addin), doc)
+
+
+def ativar(doc, id_addin):
+    """Registra o atualizador no documento com os gatilhos atuais.
+
+    Retorna ``(ids dos parâmetros observados, completos)``.
+    """
+    from Autodesk.Revit.DB import (
+        BuiltInCategory, Element, ElementCategoryFilter, ElementId, UpdaterRegistry,
+    )
+
+    atualizador = instancia(id_addin)
+    id_atualizador = atualizador.GetUpdaterId()
+    ids, completos = ids_parametros_entrada(doc)
+    # Opcional: abrir o modelo sem a extensão não gera aviso
+    UpdaterRegistry.RegisterUpdater(atualizador, doc, True)
+    filtro = ElementCategoryFilter(getattr(BuiltInCategory, CATEGORIA_TOMADAS))
+    for id_parametro in ids:
+        UpdaterRegistry.AddTrigger(
+            id_atualizador, doc, filtro, Element.GetChangeTypeParameter(ElementId(id_parametro)))
+    if not completos:
+        UpdaterRegistry.AddTrigger(id_atualizador, doc, filtro, Element.GetChangeTypeAny())
+    UpdaterRegistry.AddTrigger(id_atualizador, doc, filtro, Element.GetChangeTypeElementAddition())
+    return ids, completos
+
+
+def desativar(doc, id_addin):
+    from Autodesk.Revit.DB import UpdaterRegistry
+    UpdaterRegistry.UnregisterUpdater(_id_atualizador(id_addin), doc)
+
+
+def alternar(doc, id_addin):
+    """Liga o atualizador no documento se estiver desligado e vice-versa; retorna o novo estado."""
+    if ativo(doc, id_addin):
+        desativar(doc, id_addin)
+        return False
+    ativar(doc, id_addin)
+    return True
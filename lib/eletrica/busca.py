@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""Índice de busca com relevância para o seletor de símbolos.
+
+O seletor listava só os símbolos cujo nome continha "tomada" ou "outlet",
+em ordem alfabética: famílias chamadas "TUG", "Ponto de força" ou
+"Receptacle" ficavam de fora e bibliotecas grandes eram inutilizáveis.
+``IndiceBusca``:
+
+- separa família, tipo, categoria e nomes de parâmetros em termos
+  normalizados (minúsculas, sem acentos, sem palavras vazias), cada campo
+  com um peso (``PESOS``);
+- responde a cada termo digitado por correspondência exata, por prefixo
+  (busca binária no vocabulário ordenado) e aproximada por trigramas
+  (erros de digitação), nessa ordem de relevância;
+- expande os termos com grupos de sinônimos configuráveis (``SINONIMOS``),
+  inclusive expressões de mais de uma palavra ("ponto de força");
+- exige todos os termos da consulta e ordena pela soma das relevâncias.
+
+O índice é montado uma vez a partir do ``CatalogoSimbolos`` e guardado na
+sessão enquanto o catálogo não mudar; os termos já consultados ficam em
+memória, então cada tecla no seletor só calcula o termo novo.
+"""
+
+import bisect
+import re
+import unicodedata
+
+from eletrica import rastreio, sessao
+
+# Peso de cada campo do símbolo na relevância
+PESOS = (
+    ('familia', 3.0),
+    ('tipo', 2.0),
+    ('nome_categoria', 1.0),
+    ('parametros', 0.5),
+)
+
+# Fator aplicado a correspondências por prefixo, por sinônimo e aproximadas
+FATOR_PREFIXO = 0.7
+FATOR_SINONIMO = 0.9
+FATOR_APROXIMADO = 0.5
+
+# Semelhança mínima de trigramas (Jaccard) e tamanho mínimo do termo para a busca aproximada
+SEMELHANCA_MINIMA = 0.4
+TAMANHO_MINIMO_APROXIMADO = 4
+
+# Grupos de termos equivalentes (cada item pode ter mais de uma palavra)
+SINONIMOS = (
+    (u'tomada', u'tug', u'tue', u'outlet', u'receptacle', u'socket', u'plug', u'ponto de força'),
+    (u'interruptor', u'switch'),
+    (u'luminária', u'luminaria', u'light', u'lighting'),
+    (u'quadro', u'painel', u'panel', u'qd', u'qdc'),
+)
+
+# Consulta inicial do seletor de tomadas
+CONSULTA_TOMADA = u"tomada"
+
+PALAVRAS_VAZIAS = frozenset(('a', 'o', 'e', 'de', 'da', 'do', 'das', 'dos', 'com', 'para', 'the', 'of'))
+
+LIMITE_RESULTADOS = 500
+
+_MEMO_MAXIMO = 256
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos."""
+    texto = unicodedata.normalize('NFKD', u"{}".format(texto).lower())
+    return u"".join(c for c in texto if not unicodedata.combining(c))
+
+
+def termos(texto):
+    """Termos alfanuméricos normalizados de ``texto``, sem palavras vazias."""
+    return [t for t in re.findall(r'[a-z0-9]+', normalizar(texto)) if t not in PALAVRAS_VAZIAS]
+
+
+def trigramas(termo):
+    termo = u" {} ".format(termo)
+    return set(termo[k:k + 3] for k in range(len(termo) - 2))
+
+
+def rotulo(registro):
+    return u"{} : {}".format(registro.familia, registro.tipo)
+
+
+class IndiceBusca(object):
+    """Índice invertido ``termo -> {documento: peso}`` dos símbolos do catálogo."""
+
+    def __init__(self, sinonimos=SINONIMOS):
+        self.ids = []
+        self.rotulos = []
+        self.categorias = []
+        self.postings = {}
+        self.vocabulario = []
+        self.por_trigrama = {}
+        self.sinonimos = {}
+        for grupo in sinonimos:
+            chaves = [tuple(termos(item)) for item in grupo]
+            for chave in chaves:
+                if chave:
+                    self.sinonimos[chave] = [c for c in chaves if c and c != chave]
+        self._memo = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def construir(cls, registros, sinonimos=SINONIMOS):
+        indice = cls(sinonimos)
+        postings = indice.postings
+        for registro in sorted(registros, key=rotulo):
+            documento = len(indice.ids)
+            indice.ids.append(registro.id)
+            indice.rotulos.append(rotulo(registro))
+            indice.categorias.append(registro.categoria)
+            for campo, peso in PESOS:
+                valor = getattr(registro, campo)
+                if isinstance(valor, (tuple, list)):
+                    valor = u" ".join(valor)
+                for termo in termos(valor or u""):
+                    documentos = postings.setdefault(termo, {})
+                    if documentos.get(documento, 0.0) < peso:
+                        documentos[documento] = peso
+        indice.vocabulario = sorted(postings)
+        for termo in indice.vocabulario:
+            if len(termo) >= TAMANHO_MINIMO_APROXIMADO - 1:
+                for trigrama in trigramas(termo):
+                    indice.por_trigrama.setdefault(trigrama, []).append(termo)
+        return indice
+
+    # Consulta
+
+    def _prefixados(self, termo):
+        vocabulario = self.vocabulario
+        k = bisect.bisect_left(vocabulario, termo)
+        while k < len(vocabulario) and vocabulario[k].startswith(termo):
+            yield vocabulario[k]
+            k += 1
+
+    def _aproximados(self, termo):
+        """Termos do vocabulário parecidos com ``termo`` e a semelhança de cada um."""
+        proprios = trigramas(termo)
+        comuns = {}
+        for trigrama in proprios:
+            for outro in self.por_trigrama.get(trigrama, ()):
+                comuns[outro] = comuns.get(outro, 0) + 1
+        for outro, quantidade in comuns.items():
+            # Um termo de n letras tem n trigramas (com as bordas)
+            semelhanca = float(quantidade) / (len(proprios) + len(outro) - quantidade)
+            if semelhanca >= SEMELHANCA_MINIMA:
+                yield outro, semelhanca
+
+    def pontuar_termo(self, termo):
+        """``{documento: relevância}`` de um único termo (exato, prefixo ou aproximado)."""
+        pontos = self._memo.get(termo)
+        if pontos is not None:
+            return pontos
+        pontos = dict(self.postings.get(termo, {}))
+        for outro in self._prefixados(termo):
+            if outro == termo:
+                continue
+            for documento, peso in self.postings[outro].items():
+                if pontos.get(documento, 0.0) < peso * FATOR_PREFIXO:
+                    pontos[documento] = peso * FATOR_PREFIXO
+        if len(termo) >= TAMANHO_MINIMO_APROXIMADO:
+            for outro, semelhanca in self._aproximados(termo):
+                fator = FATOR_APROXIMADO * semelhanca
+                for documento, peso in self.postings[outro].items():
+                    if pontos.get(documento, 0.0) < peso * fator:
+                        pontos[documento] = peso * fator
+        if len(self._memo) >= _MEMO_MAXIMO:
+            self._memo.clear()
+        self._memo[termo] = pontos
+        return pontos
+
+    def _pontuar_expressao(self, expressao):
+        """Relevância de uma expressão: todos os termos presentes, vale o menor."""
+        pontos = None
+        for termo in expressao:
+            atual = self.pontuar_termo(termo)
+            if pontos is None:
+                pontos = dict(atual)
+            else:
+                pontos = dict((d, min(p, atual[d])) for d, p in pontos.items() if d in atual)
+            if not pontos:
+                break
+        return pontos or {}
+
+    def _grupos(self, lista):
+        """Divide a consulta em expressões, juntando as que formam um sinônimo."""
+        grupos = []
+        k = 0
+        while k < len(lista):
+            for tamanho in (3, 2, 1):
+                expressao = tuple(lista[k:k + tamanho])
+                if len(expressao) == tamanho and (tamanho == 1 or expressao in self.sinonimos):
+                    grupos.append(expressao)
+                    k += tamanho
+                    break
+        return grupos
+
+    def pontuar(self, consulta):
+        """``{documento: relevância}`` dos documentos que atendem a todos os termos."""
+        total = None
+        for expressao in self._grupos(termos(consulta)):
+            pontos = self._pontuar_expressao(expressao)
+            for sinonimo in self.sinonimos.get(expressao, ()):
+                for documento, valor in self._pontuar_expressao(sinonimo).items():
+                    if pontos.get(documento, 0.0) < valor * FATOR_SINONIMO:
+                        pontos[documento] = valor * FATOR_SINONIMO
+            if total is None:
+                total = pontos
+            else:
+                total = dict((d, p + pontos[d]) for d, p in total.items() if d in pontos)
+            if not total:
+                return {}
+        return total
+
+    def buscar(self, consulta, categorias=None, limite=LIMITE_RESULTADOS):
+        """``[(rótulo, id)]`` em ordem de relevância (alfabética com a consulta vazia)."""
+        if not termos(consulta):
+            documentos = range(len(self.ids))
+        else:
+            pontos = self.pontuar(consulta)
+            # Os documentos já estão em ordem alfabética: o índice desempata
+            documentos = sorted(pontos, key=lambda d: (-pontos[d], d))
+        resultado = []
+        for documento in documentos:
+            if categorias is not None and self.categorias[documento] not in categorias:
+                continue
+            resultado.append((self.rotulos[documento], self.ids[documento]))
+            if limite and len(resultado) >= limite:
+                break
+        return resultado
+
+    # Sessão
+
+    def para_tupla(self):
+        return (self.ids, self.rotulos, self.categorias, self.postings, self.vocabulario,
+                self.por_trigrama, self.sinonimos)
+
+    @classmethod
+    def de_tupla(cls, dados):
+        indice = cls(())
+        (indice.ids, indice.rotulos, indice.categorias, indice.postings, indice.vocabulario,
+         indice.por_trigrama, indice.sinonimos) = dados
+        return indice
+
+
+@rastreio.medido()
+def indice_do_catalogo(doc, catalogo, usar_sessao=True):
+    """Índice dos registros do catálogo, reaproveitado na sessão enquanto eles não mudarem."""
+    registros = list(catalogo.registros.values())
+    if not usar_sessao:
+        return IndiceBusca.construir(registros)
+    assinatura = tuple(sorted((r.id, r.familia, r.tipo, r.parametros) for r in registros))
+    dados = sessao.memorizar(
+        'indice_busca', doc, assinatura, lambda: IndiceBusca.construir(registros).para_tupla(),
+    )
+    return IndiceBusca.de_tupla(dados)
+
+
+def escolher_simbolos(indice, titulo, categorias=None, consulta=CONSULTA_TOMADA, multiselecao=False):
+    """Mostra o seletor com busca; retorna a lista de ids escolhidos (vazia se cancelado)."""
+    from eletrica import formularios
+
+    escolhidos = formularios.pedir_busca(
+        titulo, lambda texto: indice.buscar(texto, categorias), consulta, multiselecao,
+    )
+    return escolhidos or []
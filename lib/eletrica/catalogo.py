@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""Catálogo persistente de símbolos de família de tomadas.
+
+Em vez de percorrer todos os ``FamilySymbol`` a cada execução e ler
+``ALL_MODEL_FAMILY_NAME``/``ALL_MODEL_TYPE_NAME`` duas vezes por símbolo,
+o catálogo faz uma única passada, monta um índice
+``id do símbolo -> (família, tipo, categoria, ativo, ...)`` e o grava em
+disco por documento. Nas execuções seguintes apenas os símbolos criados,
+removidos ou modificados desde a última gravação são relidos. Como a versão
+do documento só muda ao salvar, o nome de família, o nome de tipo e
+``IsActive`` de cada símbolo são conferidos a cada execução; os demais
+campos (categoria e parâmetros) seguem a versão.
+"""
+
+import json
+import os
+from collections import namedtuple
+
+from eletrica import rastreio
+
+# Categorias onde as famílias de tomadas costumam estar
+CATEGORIAS_TOMADA = (
+    'OST_ElectricalFixtures',
+    'OST_ElectricalEquipment',
+    'OST_GenericModel',
+)
+
+# Termos usados para reconhecer uma tomada pelo nome (case-insensitive)
+TERMOS_TOMADA = ('tomada', 'outlet')
+
+VERSAO_FORMATO = 2
+
+# ``nome_categoria`` e ``parametros`` (nomes dos parâmetros de tipo não
+# embutidos) alimentam o índice de busca (``eletrica.busca``)
+RegistroSimbolo = namedtuple(
+    'RegistroSimbolo', ['id', 'familia', 'tipo', 'categoria', 'ativo', 'nome_categoria', 'parametros']
+)
+
+
+def id_inteiro(element_id):
+    """Retorna o valor inteiro de um ElementId (Revit 2024+ usa ``Value``)."""
+    try:
+        return int(element_id.Value)
+    except AttributeError:
+        return int(element_id.IntegerValue)
+
+
+def _valor_texto(elemento, parametro, padrao):
+    param = elemento.get_Parameter(parametro)
+    if param and param.HasValue:
+        return param.AsString()
+    return padrao
+
+
+def _nomes_parametros(simbolo):
+    """Nomes dos parâmetros de tipo de família ou compartilhados (não embutidos)."""
+    from Autodesk.Revit.DB import BuiltInParameter
+
+    nomes = set()
+    for param in simbolo.Parameters:
+        definicao = param.Definition
+        if getattr(definicao, 'BuiltInParameter', BuiltInParameter.INVALID) == BuiltInParameter.INVALID:
+            nomes.add(definicao.Name)
+    return tuple(sorted(nomes))
+
+
+def ler_registro(simbolo):
+    """Lê uma única vez os dados de um FamilySymbol para o catálogo."""
+    from Autodesk.Revit.DB import BuiltInParameter
+
+    familia = _valor_texto(simbolo, BuiltInParameter.ALL_MODEL_FAMILY_NAME, "Sem Família")
+    tipo = _valor_texto(simbolo, BuiltInParameter.ALL_MODEL_TYPE_NAME, "Sem Nome")
+    categoria = nome_categoria = None
+    if simbolo.Category:
+        categoria = id_inteiro(simbolo.Category.Id)
+        nome_categoria = simbolo.Category.Name
+    return RegistroSimbolo(
+        id_inteiro(simbolo.Id), familia, tipo, categoria, bool(simbolo.IsActive),
+        nome_categoria, _nomes_parametros(simbolo),
+    )
+
+
+def campos_baratos(simbolo):
+    """Família, tipo e ativação lidos sem percorrer os parâmetros do símbolo."""
+    from Autodesk.Revit.DB import BuiltInParameter
+
+    tipo = _valor_texto(simbolo, BuiltInParameter.ALL_MODEL_TYPE_NAME, "Sem Nome")
+    return simbolo.FamilyName or u"Sem Família", tipo, bool(simbolo.IsActive)
+
+
+class CatalogoSimbolos(object):
+    """Índice em memória dos símbolos de família de um documento."""
+
+    def __init__(self, registros=None, versao=None):
+        self.registros = registros or {}
+        self.versao = versao
+
+    def __len__(self):
+        return len(self.registros)
+
+    def filtrar(self, termos=TERMOS_TOMADA, categorias=None):
+        """Retorna os registros cujo nome de família ou tipo contém algum termo."""
+        termos = [t.lower() for t in termos]
+        resultado = []
+        for registro in self.registros.values():
+            if categorias is not None and registro.categoria not in categorias:
+                continue
+            nome = (registro.familia + u" " + registro.tipo).lower()
+            if any(termo in nome for termo in termos):
+                resultado.append(registro)
+        return resultado
+
+    def opcoes(self, termos=TERMOS_TOMADA, categorias=None):
+        """Dicionário ``"Família : Tipo" -> id`` pronto para o SelectFromList."""
+        return dict(
+            (u"{} : {}".format(r.familia, r.tipo), r.id)
+            for r in self.filtrar(termos, categorias)
+        )
+
+    def para_dict(self):
+        return {
+            'versao_formato': VERSAO_FORMATO,
+            'versao_documento': self.versao,
+            'simbolos': dict(
+                (str(r.id), [r.familia, r.tipo, r.categoria, r.ativo, r.nome_categoria, list(r.parametros)])
+                for r in self.registros.values()
+            ),
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        if dados.get('versao_formato') != VERSAO_FORMATO:
+            return cls()
+        registros = {}
+        simbolos = dados.get('simbolos', {})
+        for chave, (familia, tipo, categoria, ativo, nome_categoria, parametros) in simbolos.items():
+            registros[int(chave)] = RegistroSimbolo(
+                int(chave), familia, tipo, categoria, ativo, nome_categoria, tuple(parametros))
+        return cls(registros, dados.get('versao_documento'))
+
+
+def ids_categorias(nomes=CATEGORIAS_TOMADA):
+    """Converte nomes de BuiltInCategory nos ids inteiros usados no catálogo."""
+    from Autodesk.Revit.DB import BuiltInCategory
+    return set(int(getattr(BuiltInCategory, nome)) for nome in nomes)
+
+
+def _coletor_simbolos(doc, nomes_categorias=CATEGORIAS_TOMADA):
+    """Um único coletor de FamilySymbol para todas as categorias de tomada."""
+    import clr
+    clr.AddReference('System')
+    from System.Collections.Generic import List
+    from Autodesk.Revit.DB import (
+        BuiltInCategory,
+        ElementMulticategoryFilter,
+        FamilySymbol,
+        FilteredElementCollector,
+    )
+
+    categorias = List[BuiltInCategory](
+        [getattr(BuiltInCategory, nome) for nome in nomes_categorias]
+    )
+    return FilteredElementCollector(doc) \
+        .OfClass(FamilySymbol) \
+        .WherePasses(ElementMulticategoryFilter(categorias))
+
+
+def versao_documento(doc):
+    """GUID da versão do documento (Revit 2023+), ou None se indisponível."""
+    try:
+        from Autodesk.Revit.DB import Document
+        return str(Document.GetDocumentVersion(doc).VersionGUID)
+    except Exception:
+        return None
+
+
+def ids_modificados(doc, versao_anterior):
+    """Ids modificados desde ``versao_anterior`` ou None se não for possível saber."""
+    if not versao_anterior:
+        return None
+    try:
+        from System import Guid
+        alteracoes = doc.GetChangedElements(Guid(versao_anterior))
+        return set(id_inteiro(i) for i in alteracoes.GetModifiedElementIds())
+    except Exception:
+        return None
+
+
+def caminho_cache(doc):
+    """Arquivo de cache do catálogo, um por documento (pasta de dados do pyRevit)."""
+    from pyrevit import script
+    return script.get_document_data_file('catalogo_simbolos', 'json', add_cmd_name=False)
+
+
+def ler_cache(caminho):
+    if not caminho or not os.path.exists(caminho):
+        return CatalogoSimbolos()
+    try:
+        with open(caminho, 'r') as arquivo:
+            return CatalogoSimbolos.de_dict(json.load(arquivo))
+    except Exception:
+        # Cache corrompido ou de outra versão: reconstruir do zero
+        return CatalogoSimbolos()
+
+
+def gravar_cache(catalogo, caminho):
+    if not caminho:
+        return
+    try:
+        with open(caminho, 'w') as arquivo:
+            json.dump(catalogo.para_dict(), arquivo)
+    except Exception:
+        # Falha ao gravar o cache não deve impedir o uso da ferramenta
+        pass
+
+
+def atualizar_catalogo(doc, catalogo, completo=False):
+    """Sincroniza ``catalogo`` com o documento relendo só o que mudou.
+
+    Retorna True se algum registro foi alterado. Com ``completo=True`` todos
+    os símbolos são relidos (útil quando a versão do Revit não informa as
+    modificações, ex.: para refletir parâmetros de tipo editados). Se a
+    versão mudou e as modificações não podem ser consultadas, todos são
+    relidos também. Símbolos renomeados ou ativados na sessão, ainda sem
+    versão nova, são relidos pela conferência de ``campos_baratos``.
+    """
+    simbolos = dict((id_inteiro(s.Id), s) for s in _coletor_simbolos(doc))
+    ids_atuais = set(simbolos)
+    ids_cache = set(catalogo.registros)
+
+    versao = versao_documento(doc)
+    if completo:
+        reler = ids_atuais
+    else:
+        reler = ids_atuais - ids_cache
+        if versao != catalogo.versao:
+            modificados = ids_modificados(doc, catalogo.versao)
+            if modificados is None:
+                # Versão anterior fora do histórico: não há como saber o que mudou
+                reler = ids_atuais
+            else:
+                reler |= modificados & ids_atuais
+        for id_simbolo in (ids_atuais & ids_cache) - reler:
+            registro = catalogo.registros[id_simbolo]
+            if campos_baratos(simbolos[id_simbolo]) != (registro.familia, registro.tipo, registro.ativo):
+                reler.add(id_simbolo)
+
+    removidos = ids_cache - ids_atuais
+    for id_removido in removidos:
+        del catalogo.registros[id_removido]
+
+    for id_simbolo in reler:
+        catalogo.registros[id_simbolo] = ler_registro(simbolos[id_simbolo])
+
+    alterado = bool(removidos or reler or versao != catalogo.versao)
+    catalogo.versao = versao
+    return alterado
+
+
+@rastreio.medido()
+def carregar_catalogo(doc, completo=False):
+    """Carrega o catálogo do disco, atualiza o delta e grava de volta se mudou."""
+    caminho = caminho_cache(doc)
+    catalogo = CatalogoSimbolos() if completo else ler_cache(caminho)
+    if atualizar_catalogo(doc, catalogo, completo=completo):
+        gravar_cache(catalogo, caminho)
+    return catalogo
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""Divisão automática de tomadas em circuitos por limite de carga e proximidade.
+
+``criar_circuito_eletrico`` colocava todas as tomadas inseridas em um único
+``ElectricalSystem.Create``, independente da potência total. Aqui as tomadas
+são ordenadas por uma curva de Hilbert (tomadas próximas no plano ficam
+próximas na ordem) e um corte guloso fecha o circuito sempre que o próximo
+ponto ultrapassaria o limite de VA ou de pontos. O custo é dominado pela
+ordenação, O(n log n), e escala para milhares de dispositivos.
+
+Os limites padrão são valores usuais de projeto para circuitos de TUG e
+devem ser ajustados conforme o dimensionamento (NBR 5410).
+"""
+
+from collections import namedtuple
+
+from eletrica import rastreio
+
+# Limites padrão por circuito
+MAX_VA_PADRAO = 2200.0
+MAX_PONTOS_PADRAO = 10
+
+# Resolução da grade da curva de Hilbert (2^16 células por eixo)
+_ORDEM_HILBERT = 16
+
+Carga = namedtuple('Carga', ['id', 'x', 'y', 'va', 'grupo'])
+
+
+def indice_hilbert(x, y, ordem=_ORDEM_HILBERT):
+    """Posição da célula inteira ``(x, y)`` ao longo da curva de Hilbert."""
+    n = 1 << ordem
+    d = 0
+    s = n >> 1
+    while s > 0:
+        rx = 1 if (x & s) else 0
+        ry = 1 if (y & s) else 0
+        d += s * s * ((3 * rx) ^ ry)
+        # Rotacionar o quadrante
+        if ry == 0:
+            if rx == 1:
+                x = n - 1 - x
+                y = n - 1 - y
+            x, y = y, x
+        s >>= 1
+    return d
+
+
+def ordenar_por_proximidade(cargas):
+    """Ordena as cargas pela curva de Hilbert sobre a caixa envolvente."""
+    if len(cargas) < 2:
+        return list(cargas)
+    xmin = min(c.x for c in cargas)
+    ymin = min(c.y for c in cargas)
+    extensao = max(max(c.x for c in cargas) - xmin, max(c.y for c in cargas) - ymin) or 1.0
+    escala = ((1 << _ORDEM_HILBERT) - 1) / extensao
+    return sorted(
+        cargas,
+        key=lambda c: indice_hilbert(int((c.x - xmin) * escala), int((c.y - ymin) * escala)),
+    )
+
+
+def particionar(cargas, max_va=MAX_VA_PADRAO, max_pontos=MAX_PONTOS_PADRAO):
+    """Agrupa as cargas em circuitos respeitando ``max_va`` e ``max_pontos``.
+
+    Cargas de grupos diferentes (ex.: níveis) nunca dividem um circuito.
+    Uma carga maior que ``max_va`` sozinha forma um circuito próprio.
+    Retorna uma lista de listas de ids, na ordem espacial.
+    """
+    por_grupo = {}
+    for carga in cargas:
+        por_grupo.setdefault(carga.grupo, []).append(carga)
+
+    circuitos = []
+    for grupo in sorted(por_grupo, key=lambda g: (g is None, g)):
+        atual = []
+        total_va = 0.0
+        for carga in ordenar_por_proximidade(por_grupo[grupo]):
+            if atual and (total_va + carga.va > max_va or len(atual) >= max_pontos):
+                circuitos.append(atual)
+                atual = []
+                total_va = 0.0
+            atual.append(carga.id)
+            total_va += carga.va
+        if atual:
+            circuitos.append(atual)
+    return circuitos
+
+
+def cargas_das_tomadas(tomadas, potencia_padrao):
+    """Monta as ``Carga`` das instâncias (posição, VA e nível).
+
+    A potência vem do parâmetro 'Potência Aparente (VA)' da instância,
+    ou de ``potencia_padrao`` quando a família não o possui.
+    """
+    from eletrica.catalogo import id_inteiro
+    from eletrica.plano import PARAM_POTENCIA_APARENTE
+
+    cargas = []
+    for tomada in tomadas:
+        ponto = tomada.Location.Point
+        param = tomada.LookupParameter(PARAM_POTENCIA_APARENTE)
+        va = param.AsDouble() if param and param.HasValue else potencia_padrao
+        cargas.append(Carga(id_inteiro(tomada.Id), ponto.X, ponto.Y, va, id_inteiro(tomada.LevelId)))
+    return cargas
+
+
+@rastreio.medido()
+def criar_circuitos(doc, grupos_ids):
+    """Cria um ``ElectricalSystem`` por grupo (exige transação aberta)."""
+    import clr
+    clr.AddReference('System')
+    from System.Collections.Generic import List
+    from Autodesk.Revit.DB import ElementId
+    from Autodesk.Revit.DB.Electrical import ElectricalSystem, ElectricalSystemType
+
+    criados = []
+    for ids in grupos_ids:
+        elementos_ids = List[ElementId]([ElementId(i) for i in ids])
+        circuito = ElectricalSystem.Create(doc, elementos_ids, ElectricalSystemType.PowerCircuit)
+        if circuito:
+            criados.append(circuito)
+    return criados
+
+
+def definir_parametros_circuito(circuito, tensao, numero_fases, potencia_aparente, fator_potencia):
+    """Define tensão, número de polos, potência aparente e fator de potência do circuito."""
+    from Autodesk.Revit.DB import BuiltInParameter, StorageType
+
+    valores = (
+        (BuiltInParameter.RBS_ELEC_VOLTAGE, StorageType.Double, tensao),
+        (BuiltInParameter.RBS_ELEC_NUMBER_OF_POLES, StorageType.Integer, numero_fases),
+        (BuiltInParameter.RBS_ELEC_APPARENT_LOAD, StorageType.Double, potencia_aparente),
+        (BuiltInParameter.RBS_ELEC_POWER_FACTOR, StorageType.Double, fator_potencia),
+    )
+    for parametro, tipo, valor in valores:
+        param = circuito.get_Parameter(parametro)
+        if param and param.StorageType == tipo and not param.IsReadOnly:
+            param.Set(valor)
+
+
+@rastreio.medido()
+def atribuir_painel(circuitos_criados, painel, tensao, numero_fases, potencia_aparente, fator_potencia):
+    """Conecta os circuitos ao painel e grava seus parâmetros (exige transação aberta)."""
+    for circuito in circuitos_criados:
+        circuito.SelectPanel(painel)
+        definir_parametros_circuito(circuito, tensao, numero_fases, potencia_aparente, fator_potencia)
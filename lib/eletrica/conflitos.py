@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Posicionamento de tomadas sem conflito com dispositivos existentes.
+
+``calcular_pontos_insercao`` só conhece a parede: sem este passo as
+tomadas caem sobre tomadas e interruptores já existentes. Comparar cada
+ponto novo com todos os dispositivos do modelo custa O(N·M); aqui os
+dispositivos são indexados uma vez por execução em uma ``GradeEspacial``
+e cada ponto consulta apenas as células vizinhas.
+
+Para cada ponto em conflito (a menos de ``folga`` de um dispositivo, em
+3D) tenta-se deslocá-lo ao longo da própria parede, em passos
+alternados para os dois lados, até ``deslocamento_maximo``; posições fora
+da parede ou dentro de aberturas (portas/janelas da parede) são
+recusadas. Se nenhuma posição servir, o ponto é descartado. Os pontos
+aceitos entram no índice, de modo que tomadas planejadas em paredes
+vizinhas (cantos) também não se sobrepõem.
+
+Todas as medidas estão em pés, como na Revit API.
+"""
+
+import math
+from array import array
+
+from eletrica import geometria, rastreio
+from eletrica.espacial import GradeEspacial
+
+# Categorias de dispositivos considerados obstáculos
+CATEGORIAS_DISPOSITIVOS = (
+    'OST_ElectricalFixtures',
+    'OST_LightingDevices',
+    'OST_CommunicationDevices',
+    'OST_DataDevices',
+    'OST_FireAlarmDevices',
+    'OST_NurseCallDevices',
+    'OST_SecurityDevices',
+    'OST_TelephoneDevices',
+)
+
+# Distância mínima padrão entre dispositivos (m)
+FOLGA_PADRAO_METROS = 0.15
+
+
+class IndiceConflitos(object):
+    """Pontos ocupados ``(x, y, z)`` em uma grade espacial 2D.
+
+    ``deslocados`` e ``descartados`` acumulam o resultado de ``resolver``.
+    Os dispositivos cujo id está em ``ignorar`` continuam na grade, mas não
+    contam como conflito (o conjunto pode ser trocado depois de montado).
+    """
+
+    def __init__(self, folga, tamanho_celula=None, ignorar=None):
+        self.folga = float(folga)
+        self.grade = GradeEspacial(tamanho_celula or max(2.0 * self.folga, 1.0))
+        self.ignorar = ignorar
+        self.deslocados = 0
+        self.descartados = 0
+
+    def __len__(self):
+        return len(self.grade)
+
+    def adicionar(self, x, y, z, item=None):
+        self.grade.inserir(x, y, (z, item))
+
+    def conflita(self, x, y, z):
+        """True se algum ponto ocupado está a até ``folga`` de ``(x, y, z)``."""
+        if self.folga <= 0:
+            return False
+        folga2 = self.folga * self.folga
+        ignorar = self.ignorar
+        for distancia, (pz, item) in self.grade.no_raio(x, y, self.folga):
+            if ignorar and item in ignorar:
+                continue
+            if distancia * distancia + (pz - z) ** 2 <= folga2:
+                return True
+        return False
+
+    def resolver(self, lote, pontos, deslocamento_maximo=None, passo=None, folga_aberturas=0.0):
+        """Desloca ou descarta os pontos de ``pontos`` em conflito.
+
+        ``deslocamento_maximo`` (padrão: 2 × folga; 0 apenas descarta) e
+        ``passo`` (padrão: folga / 2) são medidos ao longo da parede.
+        Retorna um novo ``PontosLote`` com os pontos aceitos, na mesma ordem.
+        """
+        if deslocamento_maximo is None:
+            deslocamento_maximo = 2.0 * self.folga
+        if passo is None or passo <= 0:
+            passo = self.folga / 2.0 or 1.0
+        passos = int(math.floor(deslocamento_maximo / passo + 1e-9))
+        deslocamentos = [0.0]
+        for k in range(1, passos + 1):
+            deslocamentos.extend((k * passo, -k * passo))
+
+        x, y, z, tx, ty, sp = array('d'), array('d'), array('d'), array('d'), array('d'), array('d')
+        indices = array('l')
+        for k in range(len(pontos)):
+            i = int(pontos.parede[k])
+            s0 = float(pontos.s[k])
+            comprimento = lote.comprimento(i)
+            aberturas = lote.aberturas[i]
+            aceito = None
+            for delta in deslocamentos:
+                s = s0 + delta
+                if delta:
+                    if s < 0.0 or s > comprimento:
+                        continue
+                    if aberturas and geometria.dentro_de_abertura(s, aberturas, folga_aberturas):
+                        continue
+                    candidato = geometria.ponto_em(lote, i, s)
+                else:
+                    candidato = (float(pontos.x[k]), float(pontos.y[k]), float(pontos.z[k]),
+                                 float(pontos.tx[k]), float(pontos.ty[k]))
+                if not self.conflita(candidato[0], candidato[1], candidato[2]):
+                    aceito = (s, delta, candidato)
+                    break
+            if aceito is None:
+                self.descartados += 1
+                continue
+            s, delta, (px, py, pz, dx, dy) = aceito
+            if delta:
+                self.deslocados += 1
+            self.adicionar(px, py, pz)
+            x.append(px)
+            y.append(py)
+            z.append(pz)
+            tx.append(dx)
+            ty.append(dy)
+            indices.append(i)
+            sp.append(s)
+        return geometria.PontosLote(x, y, z, tx, ty, indices, sp)
+
+
+def _coletor_dispositivos(doc, nomes_categorias=CATEGORIAS_DISPOSITIVOS):
+    """Um único coletor de instâncias para todas as categorias de dispositivos."""
+    import clr
+    clr.AddReference('System')
+    from System.Collections.Generic import List
+    from Autodesk.Revit.DB import (
+        BuiltInCategory,
+        ElementMulticategoryFilter,
+        FamilyInstance,
+        FilteredElementCollector,
+    )
+
+    categorias = List[BuiltInCategory](
+        [getattr(BuiltInCategory, nome) for nome in nomes_categorias]
+    )
+    return FilteredElementCollector(doc) \
+        .OfClass(FamilyInstance) \
+        .WherePasses(ElementMulticategoryFilter(categorias))
+
+
+@rastreio.medido()
+def pontos_do_documento(doc, nomes_categorias=CATEGORIAS_DISPOSITIVOS):
+    """Posição de todos os dispositivos do documento como ``[(x, y, z, id)]``."""
+    from Autodesk.Revit.DB import LocationPoint
+    from eletrica.catalogo import id_inteiro
+
+    pontos = []
+    for dispositivo in _coletor_dispositivos(doc, nomes_categorias):
+        local = dispositivo.Location
+        if not isinstance(local, LocationPoint):
+            continue
+        ponto = local.Point
+        pontos.append((ponto.X, ponto.Y, ponto.Z, id_inteiro(dispositivo.Id)))
+    return pontos
+
+
+@rastreio.medido()
+def indice_dos_pontos(pontos, folga, ignorar=None):
+    """``IndiceConflitos`` montado a partir de ``pontos_do_documento`` (sem a API)."""
+    indice = IndiceConflitos(folga, ignorar=ignorar)
+    for x, y, z, id_dispositivo in pontos:
+        indice.adicionar(x, y, z, id_dispositivo)
+    return indice
+
+
+def indice_do_documento(doc, folga, nomes_categorias=CATEGORIAS_DISPOSITIVOS, ignorar=None):
+    """``IndiceConflitos`` com a posição de todos os dispositivos do documento.
+
+    ``ignorar`` é um conjunto opcional de ids (inteiros) que não contam como
+    conflito, como as tomadas que serão reposicionadas por uma sincronização.
+    """
+    return indice_dos_pontos(pontos_do_documento(doc, nomes_categorias), folga, ignorar)
@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+"""Demanda, corrente de projeto e queda de tensão por circuito e por painel.
+
+As ferramentas só calculavam ``P = S·cos φ`` por tomada e a R02 copia S e
+cos φ para o circuito. ``analisar`` percorre todos os circuitos de força do
+projeto em uma passada e calcula, por circuito:
+
+- carga instalada (VA e W) a partir das tomadas do circuito;
+- demanda com o fator de circuito de ``FatoresDemanda``;
+- corrente de projeto ``Ib = D / V`` (ou ``D / (√3·V)`` com 3 polos);
+- seção mínima que atende à capacidade de condução e à queda de tensão
+  máxima, e a queda de tensão estimada ``ΔV% = k·Ib·R·L·cos φ / V``.
+
+Por painel, a carga instalada soma a dos circuitos e a demanda aplica a
+tabela de faixas (em W, consultada por busca binária) à potência ativa;
+a demanda aparente usa o fator de potência médio do painel. As tabelas de
+condutores e de demanda são montadas uma vez e os resultados por circuito
+ficam em cache na sessão: a cada execução cada circuito é comparado por
+uma assinatura barata (ids das tomadas, S e cos φ de cada uma, tensão,
+polos e comprimentos) e só os que mudaram são recalculados. A versão do
+documento só muda ao salvar, então serve apenas de filtro extra: circuitos
+com elementos modificados desde a versão guardada são sempre recalculados.
+"""
+
+import bisect
+import math
+from collections import namedtuple
+
+from eletrica import catalogo, paineis, parametrizacao, rastreio, rotas, sessao
+from eletrica.catalogo import id_inteiro
+from eletrica.insercao import PES_POR_METRO
+
+# Fator de demanda por faixa de carga instalada do painel (W): (limite superior, fator).
+# Valores usuais de concessionárias para iluminação e TUG residenciais; ajustar ao projeto.
+FAIXAS_DEMANDA_PADRAO = (
+    (1000.0, 0.86),
+    (2000.0, 0.75),
+    (3000.0, 0.66),
+    (4000.0, 0.59),
+    (5000.0, 0.52),
+    (6000.0, 0.45),
+    (7000.0, 0.40),
+    (8000.0, 0.35),
+    (9000.0, 0.31),
+    (10000.0, 0.27),
+    (float('inf'), 0.24),
+)
+
+# Condutores de cobre, PVC 70 °C, método de referência B1 (NBR 5410, tabela 36):
+# (seção mm², resistência Ω/km, capacidade com 2 e com 3 condutores carregados, A)
+CONDUTORES = (
+    (1.5, 12.10, 17.5, 15.5),
+    (2.5, 7.41, 24.0, 21.0),
+    (4.0, 4.61, 32.0, 28.0),
+    (6.0, 3.08, 41.0, 36.0),
+    (10.0, 1.83, 57.0, 50.0),
+    (16.0, 1.15, 76.0, 68.0),
+    (25.0, 0.727, 101.0, 89.0),
+    (35.0, 0.524, 125.0, 110.0),
+    (50.0, 0.387, 151.0, 134.0),
+)
+
+# Seção mínima para circuitos de tomadas (NBR 5410, 6.2.6.1.1)
+SECAO_MINIMA = 2.5
+
+# Queda de tensão máxima admitida nos circuitos terminais (%)
+QUEDA_MAXIMA = 4.0
+
+ResultadoCircuito = namedtuple('ResultadoCircuito', [
+    'id', 'painel', 'pontos', 'potencia_aparente', 'potencia_ativa', 'demanda',
+    'tensao', 'polos', 'corrente', 'comprimento', 'secao', 'queda', 'atende',
+])
+
+ResultadoPainel = namedtuple('ResultadoPainel', [
+    'id', 'nome', 'circuitos', 'potencia_aparente', 'potencia_ativa', 'fator_demanda',
+    'demanda', 'corrente', 'demanda_ativa', 'polos',
+])
+
+
+class FatoresDemanda(object):
+    """Fator fixo por circuito e tabela de faixas por painel.
+
+    ``faixas``: ``(limite superior em W, fator)`` em ordem crescente; a
+    carga do painel usa o fator da faixa em que cai.
+    """
+
+    def __init__(self, faixas=FAIXAS_DEMANDA_PADRAO, fator_circuito=1.0):
+        self.faixas = tuple(faixas)
+        self.fator_circuito = fator_circuito
+        self._limites = [limite for limite, _ in self.faixas]
+
+    def fator_painel(self, potencia_ativa):
+        indice = bisect.bisect_left(self._limites, potencia_ativa)
+        return self.faixas[min(indice, len(self.faixas) - 1)][1]
+
+    def chave(self):
+        return (self.faixas, self.fator_circuito)
+
+
+class TabelaCondutores(object):
+    """Condutores ordenados por seção, a partir de ``secao_minima``."""
+
+    def __init__(self, condutores=CONDUTORES, secao_minima=SECAO_MINIMA, queda_maxima=QUEDA_MAXIMA):
+        self.condutores = [c for c in sorted(condutores) if c[0] >= secao_minima]
+        self.queda_maxima = queda_maxima
+
+    def chave(self):
+        return (tuple(self.condutores), self.queda_maxima)
+
+    def dimensionar(self, corrente, comprimento_m, tensao, polos, fator_potencia):
+        """``(seção, queda %, atende)`` da menor seção que atende aos dois critérios.
+
+        Se nenhuma atende, retorna a maior seção da tabela com ``atende`` False.
+        """
+        k = math.sqrt(3.0) if polos == 3 else 2.0
+        coluna = 3 if polos == 3 else 2
+        queda = 0.0
+        for condutor in self.condutores:
+            secao, resistencia = condutor[0], condutor[1]
+            queda = queda_percentual(k, corrente, resistencia, comprimento_m, fator_potencia, tensao)
+            if condutor[coluna] >= corrente and queda <= self.queda_maxima:
+                return secao, queda, True
+        return self.condutores[-1][0], queda, False
+
+
+def queda_percentual(k, corrente, resistencia_km, comprimento_m, fator_potencia, tensao):
+    if tensao <= 0:
+        return 0.0
+    return 100.0 * k * corrente * resistencia_km * comprimento_m / 1000.0 * fator_potencia / tensao
+
+
+def corrente_projeto(demanda, tensao, polos):
+    """Corrente de projeto (A) para a demanda em VA."""
+    divisor = tensao * (math.sqrt(3.0) if polos == 3 else 1.0)
+    return demanda / divisor if divisor > 0 else 0.0
+
+
+def _para_metros(valor_interno):
+    return valor_interno / PES_POR_METRO
+
+
+def _ler_circuito(circuito):
+    """Tensão, polos e comprimento (pés) do circuito pelos parâmetros embutidos.
+
+    O quarto valor é o comprimento de rota (m) gravado por ``rotas``, ou None.
+    """
+    from Autodesk.Revit.DB import BuiltInParameter
+
+    valores = []
+    for parametro, inteiro in ((BuiltInParameter.RBS_ELEC_VOLTAGE, False),
+                               (BuiltInParameter.RBS_ELEC_NUMBER_OF_POLES, True),
+                               (BuiltInParameter.RBS_ELEC_CIRCUIT_LENGTH_PARAM, False)):
+        param = circuito.get_Parameter(parametro)
+        if param is None or not param.HasValue:
+            valores.append(0)
+        else:
+            valores.append(param.AsInteger() if inteiro else param.AsDouble())
+    tensao, polos, comprimento = valores
+    rota = circuito.LookupParameter(rotas.PARAM_COMPRIMENTO_ROTA)
+    rota = rota.AsDouble() if rota and rota.HasValue and rota.AsDouble() > 0 else None
+    return paineis.para_volts(tensao), polos or 1, comprimento, rota
+
+
+class CacheDemanda(object):
+    """Resultados por circuito com a assinatura de entrada usada em cada um."""
+
+    def __init__(self, versao=None, chave=None, circuitos=None):
+        self.versao = versao
+        self.chave = chave
+        self.circuitos = circuitos or {}
+        self.recalculados = 0
+        self.reaproveitados = 0
+
+    def para_tupla(self):
+        return (self.versao, self.chave, dict(
+            (id_circuito, (assinatura, tuple(resultado)))
+            for id_circuito, (assinatura, resultado) in self.circuitos.items()))
+
+    @classmethod
+    def de_tupla(cls, dados):
+        versao, chave, circuitos = dados
+        return cls(versao, chave, dict(
+            (id_circuito, (assinatura, ResultadoCircuito(*resultado)))
+            for id_circuito, (assinatura, resultado) in circuitos.items()))
+
+
+def coletar_circuitos(doc):
+    """Todos os circuitos de força do documento."""
+    from Autodesk.Revit.DB import FilteredElementCollector
+    from Autodesk.Revit.DB.Electrical import ElectricalSystem, ElectricalSystemType
+
+    return [
+        c for c in FilteredElementCollector(doc).OfClass(ElectricalSystem)
+        if getattr(c, 'SystemType', ElectricalSystemType.PowerCircuit) == ElectricalSystemType.PowerCircuit
+    ]
+
+
+class AnaliseDemanda(object):
+    """Resultado de ``analisar``: circuitos e painéis por id."""
+
+    def __init__(self, circuitos, paineis, cache):
+        self.circuitos = circuitos
+        self.paineis = paineis
+        self.cache = cache
+
+    def reprovados(self):
+        return [r for r in self.circuitos.values() if not r.atende]
+
+
+def _cargas_membros(membros, mapas):
+    """Soma de S (VA) e P (W) das tomadas do circuito."""
+    total_s = total_p = 0.0
+    valores = []
+    for membro in membros:
+        simbolo = getattr(membro, 'Symbol', None)
+        if simbolo is None:
+            valores.append((id_inteiro(membro.Id), 0.0, 0.0))
+            continue
+        chave = id_inteiro(simbolo.Id)
+        mapa = mapas.get(chave)
+        if mapa is None:
+            mapa = mapas[chave] = parametrizacao.ParametrosFamilia.resolver(membro)
+        s = fp = 0.0
+        definicao = mapa.definicoes.get('potencia_aparente')
+        if definicao is not None:
+            s = membro.get_Parameter(definicao).AsDouble()
+        definicao = mapa.definicoes.get('fator_potencia')
+        if definicao is not None:
+            fp = membro.get_Parameter(definicao).AsDouble()
+        valores.append((id_inteiro(membro.Id), s, fp))
+        total_s += s
+        total_p += s * fp
+    return total_s, total_p, tuple(valores)
+
+
+def _comprimento_estimado(painel, membros):
+    """Maior distância ortogonal (pés) do painel a uma tomada do circuito."""
+    if painel is None:
+        return 0.0
+    origem = painel.Location.Point
+    maior = 0.0
+    for membro in membros:
+        ponto = membro.Location.Point
+        maior = max(maior, abs(ponto.X - origem.X) + abs(ponto.Y - origem.Y) + abs(ponto.Z - origem.Z))
+    return maior
+
+
+def calcular_circuito(id_circuito, id_painel, total_s, total_p, pontos, tensao, polos,
+                      comprimento_m, fatores, condutores):
+    demanda = total_s * fatores.fator_circuito
+    corrente = corrente_projeto(demanda, tensao, polos)
+    fator_potencia = total_p / total_s if total_s > 0 else 1.0
+    secao, queda, atende = condutores.dimensionar(corrente, comprimento_m, tensao, polos, fator_potencia)
+    return ResultadoCircuito(
+        id_circuito, id_painel, pontos, total_s, total_p, demanda, tensao, polos, corrente,
+        comprimento_m, secao, queda, atende,
+    )
+
+
+@rastreio.medido()
+def analisar(doc, fatores=None, condutores=None, comprimentos=None, cache=None, usar_sessao=True):
+    """Calcula todos os circuitos e painéis do documento.
+
+    ``comprimentos`` (id do circuito -> metros) substitui o comprimento do
+    Revit; sem ele usa-se o comprimento de rota gravado por ``rotas``, o
+    comprimento do circuito e, se for zero, a maior distância ortogonal do
+    painel às tomadas. Com ``usar_sessao`` o
+    cache de circuitos é lido e gravado na sessão do Revit.
+    """
+    fatores = fatores or FatoresDemanda()
+    condutores = condutores or TabelaCondutores()
+    comprimentos = comprimentos or {}
+    chave = (fatores.chave(), condutores.chave())
+
+    if cache is None and usar_sessao:
+        guardado = sessao.obter('demanda', doc)
+        cache = CacheDemanda.de_tupla(guardado) if guardado is not None else None
+    if cache is None or cache.chave != chave:
+        cache = CacheDemanda(chave=chave)
+
+    # A versão só muda ao salvar: os elementos modificados desde a versão
+    # guardada são recalculados mesmo com a assinatura igual
+    versao = catalogo.versao_documento(doc)
+    modificados = None
+    if versao is not None and cache.versao is not None and versao != cache.versao:
+        modificados = catalogo.ids_modificados(doc, cache.versao)
+
+    mapas = {}
+    resultados = {}
+    vistos = set()
+    for circuito in coletar_circuitos(doc):
+        id_circuito = id_inteiro(circuito.Id)
+        vistos.add(id_circuito)
+        membros = list(circuito.Elements)
+        painel = circuito.BaseEquipment
+        id_painel = id_inteiro(painel.Id) if painel is not None else None
+        ids_membros = tuple(sorted(id_inteiro(m.Id) for m in membros))
+        guardado = cache.circuitos.get(id_circuito)
+
+        tensao, polos, comprimento, rota = _ler_circuito(circuito)
+        total_s, total_p, valores = _cargas_membros(membros, mapas)
+        estimado = None
+        if id_circuito not in comprimentos and rota is None and not comprimento:
+            # Posições entram na assinatura só quando definem o comprimento
+            estimado = _comprimento_estimado(painel, membros)
+        assinatura = (ids_membros, id_painel, comprimentos.get(id_circuito), tensao, polos, comprimento, rota,
+                      estimado, valores)
+        alterado = modificados is not None and (
+            id_circuito in modificados or id_painel in modificados or not modificados.isdisjoint(ids_membros))
+        if guardado is not None and guardado[0] == assinatura and not alterado:
+            resultados[id_circuito] = guardado[1]
+            cache.reaproveitados += 1
+            continue
+
+        if id_circuito in comprimentos:
+            comprimento_m = comprimentos[id_circuito]
+        elif rota is not None:
+            comprimento_m = rota
+        else:
+            comprimento_m = _para_metros(comprimento or estimado)
+        resultado = calcular_circuito(
+            id_circuito, id_painel, total_s, total_p, len(membros), tensao, polos,
+            comprimento_m, fatores, condutores,
+        )
+        cache.circuitos[id_circuito] = (assinatura, resultado)
+        resultados[id_circuito] = resultado
+        cache.recalculados += 1
+
+    for id_removido in set(cache.circuitos) - vistos:
+        del cache.circuitos[id_removido]
+    cache.versao = versao
+    if usar_sessao:
+        sessao.guardar('demanda', cache.para_tupla(), doc)
+
+    return AnaliseDemanda(resultados, totalizar_paineis(doc, resultados, fatores), cache)
+
+
+def totalizar_paineis(doc, resultados, fatores):
+    """Soma os circuitos por painel e aplica a tabela de demanda.
+
+    O fator da faixa (em W) multiplica a potência ativa instalada; a
+    demanda aparente divide o resultado pelo fator de potência médio. A
+    corrente usa o maior número de polos entre os circuitos do painel e a
+    tensão desses circuitos (a do sistema do painel, se não informada).
+    """
+    por_painel = {}
+    for resultado in resultados.values():
+        if resultado.painel is not None:
+            por_painel.setdefault(resultado.painel, []).append(resultado)
+    if not por_painel:
+        return {}
+
+    registros = dict((r.id, r) for r in paineis.construir_registros(doc))
+    totais = {}
+    for id_painel, lista in por_painel.items():
+        registro = registros.get(id_painel)
+        total_s = sum(r.potencia_aparente for r in lista)
+        total_p = sum(r.potencia_ativa for r in lista)
+        fator = fatores.fator_painel(total_p)
+        demanda_ativa = total_p * fator
+        demanda = demanda_ativa * total_s / total_p if total_p > 0 else total_s * fator
+        polos = max(r.polos for r in lista)
+        tensao = max(r.tensao for r in lista if r.polos == polos)
+        if not tensao and registro is not None:
+            tensao = (registro.tensao_ff if polos > 1 else registro.tensao_fn) or 0.0
+        corrente = corrente_projeto(demanda, tensao, polos)
+        totais[id_painel] = ResultadoPainel(
+            id_painel, registro.nome if registro is not None else u"", len(lista),
+            total_s, total_p, fator, demanda, corrente, demanda_ativa, polos,
+        )
+    return totais
+
+
+def relatar(analise, rel):
+    """Tabelas de painéis e de circuitos (reprovados primeiro) no ``Relatorio``."""
+    rel.titulo(u"Demanda por painel")
+    rel.tabela(
+        [(p.nome, p.id, p.circuitos, u"{:.0f}".format(p.potencia_aparente), u"{:.0f}".format(p.potencia_ativa),
+          u"{:.2f}".format(p.fator_demanda), u"{:.0f}".format(p.demanda_ativa), u"{:.0f}".format(p.demanda),
+          u"{:.1f}".format(p.corrente))
+         for p in sorted(analise.paineis.values(), key=lambda p: (p.nome, p.id))],
+        [u"Painel", u"Id", u"Circuitos", u"Instalada (VA)", u"Instalada (W)", u"Fator", u"Demanda (W)",
+         u"Demanda (VA)", u"Corrente (A)"],
+    )
+    rel.titulo(u"Circuitos")
+    rel.tabela(
+        [(c.id, c.painel if c.painel is not None else u"-", c.pontos, u"{:.0f}".format(c.potencia_aparente),
+          u"{:.0f}".format(c.tensao), c.polos, u"{:.1f}".format(c.corrente), u"{:.1f}".format(c.comprimento),
+          c.secao, u"{:.2f}".format(c.queda), u"Sim" if c.atende else u"NÃO")
+         for c in sorted(analise.circuitos.values(), key=lambda c: (c.atende, c.painel or 0, c.id))],
+        [u"Circuito", u"Painel", u"Pontos", u"Instalada (VA)", u"Tensão (V)", u"Polos", u"Ib (A)",
+         u"Comprimento (m)", u"Seção (mm²)", u"ΔV (%)", u"Atende"],
+    )
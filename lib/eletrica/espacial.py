@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Grade espacial uniforme para consultas de vizinhança em 2D.
+
+Cada item é guardado na célula ``(floor(x / tamanho), floor(y / tamanho))``.
+A busca dos N mais próximos percorre anéis de células em torno do ponto
+consultado e para assim que nenhuma célula ainda não visitada pode conter
+um item mais próximo que o N-ésimo já encontrado.
+"""
+
+import heapq
+import math
+
+# Abaixo desta quantidade de itens a varredura direta é mais barata que os anéis
+LIMITE_VARREDURA = 64
+
+
+class GradeEspacial(object):
+    """Índice de pontos ``(x, y) -> item`` em células quadradas."""
+
+    def __init__(self, tamanho_celula):
+        if tamanho_celula <= 0:
+            raise ValueError("O tamanho da célula deve ser positivo.")
+        self.tamanho = float(tamanho_celula)
+        self.celulas = {}
+        self._quantidade = 0
+
+    def __len__(self):
+        return self._quantidade
+
+    def celula(self, x, y):
+        return int(math.floor(x / self.tamanho)), int(math.floor(y / self.tamanho))
+
+    def inserir(self, x, y, item):
+        self.celulas.setdefault(self.celula(x, y), []).append((x, y, item))
+        self._quantidade += 1
+
+    def no_raio(self, x, y, raio):
+        """Itens a até ``raio`` de ``(x, y)``, como ``(distância, item)``."""
+        ci0, cj0 = self.celula(x - raio, y - raio)
+        ci1, cj1 = self.celula(x + raio, y + raio)
+        raio2 = raio * raio
+        resultado = []
+        for ci in range(ci0, ci1 + 1):
+            for cj in range(cj0, cj1 + 1):
+                for px, py, item in self.celulas.get((ci, cj), ()):
+                    d2 = (px - x) ** 2 + (py - y) ** 2
+                    if d2 <= raio2:
+                        resultado.append((math.sqrt(d2), item))
+        return resultado
+
+    def mais_proximos(self, x, y, n=1, filtro=None):
+        """Os ``n`` itens mais próximos de ``(x, y)`` como ``(distância, item)``.
+
+        ``filtro(item)`` opcional descarta itens que não interessam.
+        """
+        if not self.celulas or n <= 0:
+            return []
+        if self._quantidade <= LIMITE_VARREDURA:
+            return self._varrer(x, y, n, filtro)
+        ci, cj = self.celula(x, y)
+        # Maior anel necessário para cobrir todas as células ocupadas
+        anel_maximo = max(
+            max(abs(i - ci), abs(j - cj)) for i, j in self.celulas
+        )
+        melhores = []  # heap de (-d2, contador, item)
+        contador = 0
+        for anel in range(anel_maximo + 1):
+            if len(melhores) == n:
+                # Distância mínima possível até células do anel atual
+                limite = (anel - 1) * self.tamanho
+                if limite > 0 and limite * limite > -melhores[0][0]:
+                    break
+            for i, j in _celulas_do_anel(ci, cj, anel):
+                for px, py, item in self.celulas.get((i, j), ()):
+                    if filtro is not None and not filtro(item):
+                        continue
+                    d2 = (px - x) ** 2 + (py - y) ** 2
+                    contador += 1
+                    if len(melhores) < n:
+                        heapq.heappush(melhores, (-d2, contador, item))
+                    elif d2 < -melhores[0][0]:
+                        heapq.heapreplace(melhores, (-d2, contador, item))
+        return [(math.sqrt(-d2), item) for d2, _, item in sorted(melhores, reverse=True)]
+
+    def _varrer(self, x, y, n, filtro):
+        candidatos = [
+            ((px - x) ** 2 + (py - y) ** 2, contador, item)
+            for contador, (px, py, item) in enumerate(
+                entrada for celula in self.celulas.values() for entrada in celula)
+            if filtro is None or filtro(item)
+        ]
+        return [(math.sqrt(d2), item) for d2, _, item in heapq.nsmallest(n, candidatos)]
+
+
+def _celulas_do_anel(ci, cj, anel):
+    """Células na borda do quadrado de raio ``anel`` centrado em ``(ci, cj)``."""
+    if anel == 0:
+        yield ci, cj
+        return
+    for i in range(ci - anel, ci + anel + 1):
+        yield i, cj - anel
+        yield i, cj + anel
+    for j in range(cj - anel + 1, cj + anel):
+        yield ci - anel, j
+        yield ci + anel, j
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""Exportação em fluxo dos parâmetros de todas as instâncias de uma categoria.
+
+O modo de elemento único de "Listar parametros" monta listas de dicionários,
+exibe tudo com ``print_table`` e só então grava o CSV. Para dezenas de
+milhares de elementos isso mantém o modelo inteiro em memória. Aqui:
+
+- as linhas vão para o disco em blocos de ``TAMANHO_BLOCO`` linhas, então o
+  pico de memória não depende da quantidade de elementos;
+- os parâmetros de tipo de cada ``FamilySymbol`` são lidos uma única vez e
+  gravados com ``Origem = Tipo``; as linhas de instância apenas referenciam
+  o id do tipo;
+- além do CSV existe um formato colunar binário tipado (``.elpc``), com
+  colunas numéricas empacotadas e textos em dicionário.
+
+Formato colunar (little-endian)::
+
+    cabeçalho  b'ELPC' + versão (uint16)
+    textos     b'S' + quantidade (uint32) + [tamanho (uint32) + utf-8]...
+    bloco      b'B' + linhas (uint32) + colunas na ordem de ``COLUNAS``
+
+Cada bloco ``B`` é precedido pelos textos novos que ele usa; o índice de um
+texto é a sua posição na ordem de aparição no arquivo.
+"""
+
+import csv
+import io
+import struct
+from collections import namedtuple
+
+from eletrica.catalogo import id_inteiro
+
+TAMANHO_BLOCO = 5000
+
+VERSAO_COLUNAR = 1
+ASSINATURA_COLUNAR = b'ELPC'
+
+ORIGEM_INSTANCIA = 0
+ORIGEM_TIPO = 1
+NOMES_ORIGEM = (u"Instância", u"Tipo")
+
+# Códigos de armazenamento (StorageType)
+ARMAZENAMENTO_NENHUM = 0
+ARMAZENAMENTO_DOUBLE = 1
+ARMAZENAMENTO_INTEGER = 2
+ARMAZENAMENTO_STRING = 3
+ARMAZENAMENTO_ELEMENTID = 4
+NOMES_ARMAZENAMENTO = (u"None", u"Double", u"Integer", u"String", u"ElementId")
+
+# Colunas do formato colunar: (nome, formato struct)
+COLUNAS = (
+    ('origem', 'B'),
+    ('elemento', 'q'),
+    ('tipo', 'q'),
+    ('parametro', 'i'),     # índice do texto
+    ('armazenamento', 'B'),
+    ('numero', 'd'),        # Double, Integer e ElementId
+    ('texto', 'i'),         # índice do texto (-1 = vazio)
+)
+
+CABECALHO_CSV = [u"Origem", u"Elemento", u"Tipo", u"Nome", u"Armazenamento", u"Valor"]
+
+LinhaParametro = namedtuple(
+    'LinhaParametro', ['origem', 'elemento', 'tipo', 'nome', 'armazenamento', 'valor']
+)
+
+ResumoExportacao = namedtuple('ResumoExportacao', ['elementos', 'tipos', 'linhas'])
+
+_TIPOS_TEXTO = (type(u""), type(""))
+
+
+_CODIGOS_ARMAZENAMENTO = dict((nome, codigo) for codigo, nome in enumerate(NOMES_ARMAZENAMENTO))
+
+
+def codigo_armazenamento(storage_type):
+    return _CODIGOS_ARMAZENAMENTO.get(str(storage_type), ARMAZENAMENTO_NENHUM)
+
+
+def valor_parametro(parametro):
+    """Valor de um parâmetro como exibido pela ferramenta.
+
+    Double é convertido de pés para metros e arredondado a 3 casas, como
+    no modo de elemento único; ElementId vira o inteiro do id.
+    """
+    codigo = codigo_armazenamento(parametro.StorageType)
+    if codigo == ARMAZENAMENTO_DOUBLE:
+        # Revit utiliza pés como unidade padrão
+        return codigo, round(parametro.AsDouble() * 0.3048, 3)
+    if codigo == ARMAZENAMENTO_INTEGER:
+        return codigo, parametro.AsInteger()
+    if codigo == ARMAZENAMENTO_STRING:
+        return codigo, parametro.AsString()
+    if codigo == ARMAZENAMENTO_ELEMENTID:
+        return codigo, id_inteiro(parametro.AsElementId())
+    return codigo, u"Desconhecido"
+
+
+def linhas_parametros(parametros, origem, elemento, tipo):
+    """Gera ``LinhaParametro`` para cada parâmetro, ignorando os ilegíveis."""
+    for parametro in parametros:
+        try:
+            armazenamento, valor = valor_parametro(parametro)
+            nome = parametro.Definition.Name
+        except Exception:
+            continue
+        yield LinhaParametro(origem, elemento, tipo, nome, armazenamento, valor)
+
+
+class EscritorBlocos(object):
+    """Acumula linhas e grava em blocos de ``tamanho_bloco``."""
+
+    def __init__(self, tamanho_bloco=TAMANHO_BLOCO):
+        self.tamanho_bloco = tamanho_bloco
+        self._pendentes = []
+        self.linhas = 0
+
+    def escrever(self, linha):
+        self._pendentes.append(linha)
+        if len(self._pendentes) >= self.tamanho_bloco:
+            self.descarregar()
+
+    def descarregar(self):
+        if self._pendentes:
+            self._gravar_bloco(self._pendentes)
+            self.linhas += len(self._pendentes)
+            self._pendentes = []
+
+    def _gravar_bloco(self, linhas):
+        raise NotImplementedError
+
+    def fechar(self):
+        self.descarregar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+
+class EscritorCSV(EscritorBlocos):
+    """CSV separado por ';' (UTF-8 com BOM, para abrir direto no Excel)."""
+
+    def __init__(self, caminho, tamanho_bloco=TAMANHO_BLOCO):
+        super(EscritorCSV, self).__init__(tamanho_bloco)
+        self._arquivo = io.open(caminho, 'w', encoding='utf-8-sig', newline='')
+        self._csv = csv.writer(self._arquivo, delimiter=';')
+        self._csv.writerow(CABECALHO_CSV)
+
+    def _gravar_bloco(self, linhas):
+        self._csv.writerows([
+            (NOMES_ORIGEM[l.origem], l.elemento, l.tipo, l.nome,
+             NOMES_ARMAZENAMENTO[l.armazenamento], u"" if l.valor is None else l.valor)
+            for l in linhas
+        ])
+
+    def fechar(self):
+        super(EscritorCSV, self).fechar()
+        self._arquivo.close()
+
+
+class EscritorColunar(EscritorBlocos):
+    """Formato binário colunar tipado (ver o cabeçalho do módulo)."""
+
+    def __init__(self, caminho, tamanho_bloco=TAMANHO_BLOCO):
+        super(EscritorColunar, self).__init__(tamanho_bloco)
+        self._arquivo = io.open(caminho, 'wb')
+        self._arquivo.write(ASSINATURA_COLUNAR + struct.pack('<H', VERSAO_COLUNAR))
+        self._textos = {}
+
+    def _indice_texto(self, texto, novos):
+        if texto is None:
+            return -1
+        indice = self._textos.get(texto)
+        if indice is None:
+            indice = self._textos[texto] = len(self._textos)
+            novos.append(texto)
+        return indice
+
+    def _gravar_bloco(self, linhas):
+        novos = []
+        colunas = dict((nome, []) for nome, _ in COLUNAS)
+        for l in linhas:
+            colunas['origem'].append(l.origem)
+            colunas['elemento'].append(l.elemento)
+            colunas['tipo'].append(l.tipo)
+            colunas['parametro'].append(self._indice_texto(l.nome, novos))
+            colunas['armazenamento'].append(l.armazenamento)
+            if l.armazenamento == ARMAZENAMENTO_STRING or isinstance(l.valor, _TIPOS_TEXTO):
+                colunas['numero'].append(0.0)
+                colunas['texto'].append(self._indice_texto(l.valor, novos))
+            else:
+                colunas['numero'].append(float(l.valor))
+                colunas['texto'].append(-1)
+
+        partes = []
+        if novos:
+            partes.append(b'S' + struct.pack('<I', len(novos)))
+            for texto in novos:
+                dados = texto.encode('utf-8')
+                partes.append(struct.pack('<I', len(dados)) + dados)
+        n = len(linhas)
+        partes.append(b'B' + struct.pack('<I', n))
+        for nome, formato in COLUNAS:
+            partes.append(struct.pack('<{}{}'.format(n, formato), *colunas[nome]))
+        self._arquivo.write(b''.join(partes))
+
+    def fechar(self):
+        super(EscritorColunar, self).fechar()
+        self._arquivo.close()
+
+
+def _ler_exato(arquivo, tamanho):
+    dados = arquivo.read(tamanho)
+    if len(dados) != tamanho:
+        raise ValueError("Arquivo colunar truncado.")
+    return dados
+
+
+def ler_colunar(caminho):
+    """Lê um arquivo ``.elpc`` bloco a bloco, gerando ``LinhaParametro``."""
+    textos = []
+    with io.open(caminho, 'rb') as arquivo:
+        if _ler_exato(arquivo, 4) != ASSINATURA_COLUNAR:
+            raise ValueError("Arquivo não está no formato colunar de parâmetros.")
+        versao, = struct.unpack('<H', _ler_exato(arquivo, 2))
+        if versao != VERSAO_COLUNAR:
+            raise ValueError("Versão do formato colunar não suportada: {}".format(versao))
+        while True:
+            marcador = arquivo.read(1)
+            if not marcador:
+                break
+            quantidade, = struct.unpack('<I', _ler_exato(arquivo, 4))
+            if marcador == b'S':
+                for _ in range(quantidade):
+                    tamanho, = struct.unpack('<I', _ler_exato(arquivo, 4))
+                    textos.append(_ler_exato(arquivo, tamanho).decode('utf-8'))
+                continue
+            if marcador != b'B':
+                raise ValueError("Marcador de bloco inválido.")
+            colunas = {}
+            for nome, formato in COLUNAS:
+                tamanho = struct.calcsize('<' + formato) * quantidade
+                colunas[nome] = struct.unpack(
+                    '<{}{}'.format(quantidade, formato), _ler_exato(arquivo, tamanho)
+                )
+            for i in range(quantidade):
+                armazenamento = colunas['armazenamento'][i]
+                indice_texto = colunas['texto'][i]
+                if indice_texto >= 0:
+                    valor = textos[indice_texto]
+                elif armazenamento == ARMAZENAMENTO_STRING:
+                    valor = None
+                elif armazenamento == ARMAZENAMENTO_DOUBLE:
+                    valor = colunas['numero'][i]
+                else:
+                    valor = int(colunas['numero'][i])
+                yield LinhaParametro(
+                    colunas['origem'][i], colunas['elemento'][i], colunas['tipo'][i],
+                    textos[colunas['parametro'][i]], armazenamento, valor,
+                )
+
+
+def coletar_instancias(doc, categoria='OST_ElectricalFixtures'):
+    """Coletor (iterável, sem materializar) das instâncias da categoria."""
+    from Autodesk.Revit.DB import BuiltInCategory, FamilyInstance, FilteredElementCollector
+
+    return FilteredElementCollector(doc) \
+        .OfCategory(getattr(BuiltInCategory, categoria)) \
+        .OfClass(FamilyInstance) \
+        .WhereElementIsNotElementType()
+
+
+def exportar_parametros(elementos, escritores):
+    """Envia os parâmetros de ``elementos`` para todos os ``escritores``.
+
+    Os parâmetros de tipo são emitidos uma vez por ``FamilySymbol``, na
+    primeira instância que o usa. Os escritores não são fechados aqui.
+    """
+    tipos_vistos = set()
+    n_elementos = 0
+    n_linhas = 0
+    for elemento in elementos:
+        id_elemento = id_inteiro(elemento.Id)
+        simbolo = getattr(elemento, 'Symbol', None)
+        id_tipo = id_inteiro(simbolo.Id) if simbolo is not None else -1
+
+        if simbolo is not None and id_tipo not in tipos_vistos:
+            tipos_vistos.add(id_tipo)
+            for linha in linhas_parametros(simbolo.Parameters, ORIGEM_TIPO, id_tipo, id_tipo):
+                for escritor in escritores:
+                    escritor.escrever(linha)
+                n_linhas += 1
+
+        for linha in linhas_parametros(elemento.Parameters, ORIGEM_INSTANCIA, id_elemento, id_tipo):
+            for escritor in escritores:
+                escritor.escrever(linha)
+            n_linhas += 1
+        n_elementos += 1
+
+    for escritor in escritores:
+        escritor.descarregar()
+    return ResumoExportacao(n_elementos, len(tipos_vistos), n_linhas)
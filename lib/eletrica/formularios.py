@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""Formulários WinForms compartilhados pelas ferramentas de tomadas.
+
+A R02 carregava ``System.Windows.Forms``/``System.Drawing`` na importação e
+redeclarava as classes ``InputForm`` e ``VoltageForm`` dentro das funções a
+cada chamada. Aqui as referências só são adicionadas no primeiro
+formulário exibido e as classes são definidas uma única vez por motor
+IronPython (e reaproveitadas entre cliques quando o motor é persistente).
+"""
+
+from eletrica import rastreio
+
+# Sistemas de tensão oferecidos: nome -> (fase-neutro, fase-fase)
+SISTEMAS_TENSAO = (
+    ('220/380 V', (220.0, 380.0)),
+    ('127/220 V', (127.0, 220.0)),
+)
+
+FACES = ('Frontal', 'Traseira')
+
+# Opção dos formulários que preserva o valor atual de cada elemento
+MANTER = 'Manter'
+
+_WINFORMS = {}
+_CLASSES = {}
+
+
+def tensao_do_sistema(sistema, numero_fases):
+    """Tensão do circuito: fase-neutro para 1 fase, fase-fase para 2 ou 3."""
+    for nome, (fase_neutro, fase_fase) in SISTEMAS_TENSAO:
+        if nome == sistema:
+            return fase_neutro if numero_fases == 1 else fase_fase
+    return 0.0
+
+
+def winforms():
+    """Namespace de ``System.Windows.Forms``/``System.Drawing`` carregado sob demanda."""
+    if not _WINFORMS:
+        import clr
+        clr.AddReference('System.Windows.Forms')
+        clr.AddReference('System.Drawing')
+        import System.Windows.Forms as wf
+        from System.Drawing import Point, Size
+        _WINFORMS.update(wf=wf, Point=Point, Size=Size)
+    return _WINFORMS
+
+
+def _definir_classes():
+    """Declara os formulários (uma vez por motor)."""
+    if _CLASSES:
+        return _CLASSES
+    w = winforms()
+    wf, Point, Size = w['wf'], w['Point'], w['Size']
+
+    class FormularioBase(wf.Form):
+        def __init__(self, titulo, largura, altura):
+            self.Text = titulo
+            self.Width = largura
+            self.Height = altura
+            self.StartPosition = wf.FormStartPosition.CenterScreen
+            self.AutoSize = True
+            self.AutoSizeMode = wf.AutoSizeMode.GrowAndShrink
+            self.results = None
+
+        def _label(self, texto, y, altura=None):
+            label = wf.Label()
+            label.Text = texto
+            label.Location = Point(10, y)
+            if altura:
+                label.Size = Size(350, altura)
+            else:
+                label.Width = 350
+            self.Controls.Add(label)
+            return label
+
+        def _textbox(self, texto, y):
+            textbox = wf.TextBox()
+            textbox.Text = texto
+            textbox.Location = Point(10, y)
+            self.Controls.Add(textbox)
+            return textbox
+
+        def _combobox(self, itens, y):
+            combobox = wf.ComboBox()
+            for item in itens:
+                combobox.Items.Add(item)
+            combobox.SelectedIndex = 0
+            combobox.Location = Point(10, y)
+            self.Controls.Add(combobox)
+            return combobox
+
+        def _botoes(self, y):
+            # OK and Cancel buttons
+            self.button_ok = wf.Button()
+            self.button_ok.Text = 'OK'
+            self.button_ok.Location = Point(220, y)
+            self.button_ok.Click += self.ok_clicked
+            self.Controls.Add(self.button_ok)
+
+            self.button_cancel = wf.Button()
+            self.button_cancel.Text = 'Cancelar'
+            self.button_cancel.Location = Point(300, y)
+            self.button_cancel.Click += self.cancel_clicked
+            self.Controls.Add(self.button_cancel)
+
+        def ok_clicked(self, sender, event):
+            self.results = self.coletar()
+            self.DialogResult = wf.DialogResult.OK
+            self.Close()
+
+        def cancel_clicked(self, sender, event):
+            self.DialogResult = wf.DialogResult.Cancel
+            self.Close()
+
+    class VoltageForm(FormularioBase):
+        def __init__(self):
+            FormularioBase.__init__(self, 'Seleção de Tensão e Número de Fases', 400, 250)
+            y = 10
+            dy = 30
+            self._label('Selecione o sistema de tensão:', y)
+            y += dy
+            self.combobox_sistema_tensao = self._combobox([nome for nome, _ in SISTEMAS_TENSAO], y)
+            y += dy
+            self._label('Selecione o número de fases:', y)
+            y += dy
+            self.combobox_num_fases = self._combobox(['1', '2', '3'], y)
+            y += dy + 10
+            self._botoes(y)
+
+        def coletar(self):
+            return {
+                'sistema_tensao': self.combobox_sistema_tensao.SelectedItem,
+                'numero_fases': int(self.combobox_num_fases.SelectedItem),
+            }
+
+    class InputForm(FormularioBase):
+        def __init__(self, padroes):
+            FormularioBase.__init__(self, 'Parâmetros de Inserção', 400, 760)
+            y = 10
+            dy = 30
+            self._label('Insira a altura das tomadas em metros:', y)
+            y += dy
+            self.textbox_altura = self._textbox(padroes['altura'], y)
+            y += dy
+            self._label('Insira o número de tomadas a serem inseridas:', y)
+            y += dy
+            self.textbox_num_tomadas = self._textbox(padroes['numero_tomadas'], y)
+            y += dy
+            self._label(
+                'Insira o comprimento do intervalo em metros '
+                '(deixe em branco para usar o comprimento total da parede):', y, 30)
+            y += dy + 10
+            self.textbox_intervalo = self._textbox(padroes['intervalo'], y)
+            y += dy
+            self._label('Selecione a face da parede:', y)
+            y += dy
+            self.combobox_face = self._combobox(FACES, y)
+            y += dy + 10
+            self._label('Parâmetros Elétricos', y)
+            y += dy
+            self._label('Potência Aparente (VA):', y)
+            y += dy
+            self.textbox_potencia = self._textbox(padroes['potencia_aparente'], y)
+            y += dy
+            self._label('Fator de Potência (cos φ):', y)
+            y += dy
+            self.textbox_fp = self._textbox(padroes['fator_potencia'], y)
+            y += dy
+            self._label('Folga mínima até dispositivos existentes (m, 0 = ignorar):', y)
+            y += dy
+            self.textbox_folga = self._textbox(padroes['folga'], y)
+            y += dy + 10
+
+            # Seleção de Sistema de Tensão e Número de Fases
+            self.button_voltage = wf.Button()
+            self.button_voltage.Text = 'Configurar Tensão e Fases'
+            self.button_voltage.Location = Point(10, y)
+            self.button_voltage.Click += self.configure_voltage_phases
+            self.Controls.Add(self.button_voltage)
+            y += dy + 10
+            self._botoes(y)
+
+            # Variáveis para armazenar tensão e fases
+            self.voltage = 0.0
+            self.number_of_phases = 1
+
+        def configure_voltage_phases(self, sender, event):
+            selecao = pedir_tensao_e_fases()
+            if selecao is None:
+                return
+            self.voltage, self.number_of_phases = selecao
+            informar(
+                "Tensão configurada para {} V com {} fases.".format(self.voltage, self.number_of_phases),
+                "Configuração Concluída",
+            )
+
+        def coletar(self):
+            return {
+                'altura': self.textbox_altura.Text,
+                'numero_tomadas': self.textbox_num_tomadas.Text,
+                'intervalo': self.textbox_intervalo.Text,
+                'face': self.combobox_face.SelectedItem,
+                'potencia_aparente': self.textbox_potencia.Text,
+                'fator_potencia': self.textbox_fp.Text,
+                'folga': self.textbox_folga.Text,
+                'tensao': self.voltage,
+                'fases': self.number_of_phases,
+            }
+
+    class ParametrosEletricosForm(FormularioBase):
+        def __init__(self, origens):
+            FormularioBase.__init__(self, 'Parametrizar Tomadas Existentes', 400, 420)
+            y = 10
+            dy = 30
+            self._label('Tomadas a alterar:', y)
+            y += dy
+            self.combobox_origem = self._combobox(origens, y)
+            y += dy + 10
+            self._label('Campos em branco ou "Manter" preservam o valor de cada tomada.', y, 30)
+            y += dy + 10
+            self._label('Potência Aparente (VA):', y)
+            y += dy
+            self.textbox_potencia = self._textbox('', y)
+            y += dy
+            self._label('Fator de Potência (cos φ):', y)
+            y += dy
+            self.textbox_fp = self._textbox('', y)
+            y += dy
+            self._label('Sistema de tensão:', y)
+            y += dy
+            self.combobox_sistema = self._combobox([MANTER] + [nome for nome, _ in SISTEMAS_TENSAO], y)
+            y += dy
+            self._label('Número de fases:', y)
+            y += dy
+            self.combobox_fases = self._combobox([MANTER, '1', '2', '3'], y)
+            y += dy + 10
+            self._botoes(y)
+
+        def coletar(self):
+            return {
+                'origem': self.combobox_origem.SelectedItem,
+                'potencia_aparente': self.textbox_potencia.Text,
+                'fator_potencia': self.textbox_fp.Text,
+                'sistema_tensao': self.combobox_sistema.SelectedItem,
+                'fases': self.combobox_fases.SelectedItem,
+            }
+
+    class BuscaForm(FormularioBase):
+        """Lista filtrada a cada tecla por ``buscar(texto) -> [(rótulo, valor)]``."""
+
+        def __init__(self, titulo, buscar, consulta, multiselecao):
+            FormularioBase.__init__(self, titulo, 540, 560)
+            self.buscar = buscar
+            self.valores = []
+            y = 10
+            self._label('Digite para buscar (família, tipo, categoria ou parâmetro):', y)
+            y += 25
+            self.textbox_busca = self._textbox(consulta, y)
+            self.textbox_busca.Width = 500
+            self.textbox_busca.TextChanged += self.busca_alterada
+            y += 30
+            self.listbox = wf.ListBox()
+            self.listbox.Location = Point(10, y)
+            self.listbox.Size = Size(500, 400)
+            self.listbox.HorizontalScrollbar = True
+            if multiselecao:
+                self.listbox.SelectionMode = wf.SelectionMode.MultiExtended
+            self.listbox.DoubleClick += self.ok_clicked
+            self.Controls.Add(self.listbox)
+            y += 405
+            self.label_total = self._label('', y)
+            y += 25
+            self._botoes(y)
+            self.AcceptButton = self.button_ok
+            self.atualizar()
+
+        def busca_alterada(self, sender, event):
+            self.atualizar()
+
+        def atualizar(self):
+            resultado = self.buscar(self.textbox_busca.Text)
+            self.valores = [valor for _, valor in resultado]
+            self.listbox.BeginUpdate()
+            self.listbox.Items.Clear()
+            for texto, _ in resultado:
+                self.listbox.Items.Add(texto)
+            self.listbox.EndUpdate()
+            if resultado:
+                self.listbox.SelectedIndex = 0
+            self.label_total.Text = '{} resultado(s)'.format(len(resultado))
+
+        def coletar(self):
+            return [self.valores[k] for k in self.listbox.SelectedIndices]
+
+    _CLASSES.update(
+        VoltageForm=VoltageForm, InputForm=InputForm, ParametrosEletricosForm=ParametrosEletricosForm,
+        BuscaForm=BuscaForm)
+    return _CLASSES
+
+
+PADROES_INSERCAO = {
+    'altura': '1.10',
+    'numero_tomadas': '1',
+    'intervalo': '',
+    'potencia_aparente': '1000',
+    'fator_potencia': '0.8',
+    'folga': '0.15',
+}
+
+
+def _mostrar(formulario):
+    with rastreio.trecho(u"Diálogo: {}".format(formulario.Text), 'dialogo'):
+        resposta = formulario.ShowDialog()
+    if resposta != winforms()['wf'].DialogResult.OK:
+        return None
+    return formulario.results
+
+
+def pedir_tensao_e_fases():
+    """Mostra o ``VoltageForm``; retorna ``(tensao, numero_fases)`` ou None se cancelado."""
+    resultados = _mostrar(_definir_classes()['VoltageForm']())
+    if resultados is None:
+        return None
+    numero_fases = resultados['numero_fases']
+    return tensao_do_sistema(resultados['sistema_tensao'], numero_fases), numero_fases
+
+
+def pedir_parametros_insercao(padroes=None):
+    """Mostra o ``InputForm``; retorna o dicionário de textos digitados ou None."""
+    valores = dict(PADROES_INSERCAO)
+    valores.update(padroes or {})
+    return _mostrar(_definir_classes()['InputForm'](valores))
+
+
+def pedir_parametros_eletricos(origens):
+    """Mostra o ``ParametrosEletricosForm``; retorna o dicionário digitado ou None."""
+    return _mostrar(_definir_classes()['ParametrosEletricosForm'](origens))
+
+
+def pedir_busca(titulo, buscar, consulta=u"", multiselecao=False):
+    """Mostra o ``BuscaForm``; retorna os valores selecionados ou None se cancelado."""
+    return _mostrar(_definir_classes()['BuscaForm'](titulo, buscar, consulta, multiselecao))
+
+
+def confirmar(mensagem, titulo):
+    """Pergunta Sim/Não; True se o usuário respondeu Sim."""
+    wf = winforms()['wf']
+    with rastreio.trecho(u"Diálogo: {}".format(titulo), 'dialogo'):
+        resposta = wf.MessageBox.Show(
+            mensagem, titulo, wf.MessageBoxButtons.YesNo, wf.MessageBoxIcon.Question
+        )
+    return resposta == wf.DialogResult.Yes
+
+
+def informar(mensagem, titulo):
+    wf = winforms()['wf']
+    with rastreio.trecho(u"Diálogo: {}".format(titulo), 'dialogo'):
+        wf.MessageBox.Show(mensagem, titulo, wf.MessageBoxButtons.OK, wf.MessageBoxIcon.Information)
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""Núcleo geométrico de ``calcular_pontos_insercao`` independente do Revit.
+
+As paredes são descritas em colunas de floats (uma posição por parede) e
+os pontos de todas as paredes são gerados de uma só vez. Usa NumPy quando
+disponível (CPython) e o módulo ``array`` caso contrário (IronPython).
+
+Convenções mantidas da ferramenta R02:
+
+- o intervalo é centrado no meio da parede (meio do comprimento de arco);
+- com uma única tomada ela fica no início do intervalo;
+- a face 'Frontal' desloca meia espessura na normal ``(-ty, tx)`` e a
+  'Traseira' no sentido oposto.
+
+Paredes curvas (``Arc``) são parametrizadas pelo comprimento de arco, e
+pontos que caem dentro de aberturas (portas/janelas) são descartados.
+Todas as medidas estão em pés, como na Revit API.
+"""
+
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # IronPython
+    np = None
+
+RETA = 0
+ARCO = 1
+
+# Sinal do deslocamento de cada face
+LADO_FACE = {'Frontal': 1, 'Traseira': -1}
+
+
+class LoteParedes(object):
+    """Paredes em colunas (uma posição por parede).
+
+    Retas usam ``c0..c3 = x0, y0, x1, y1``; arcos usam
+    ``c0..c3 = cx, cy, raio, ângulo inicial`` e ``c4`` = varredura em
+    radianos (positiva no sentido anti-horário).
+    """
+
+    def __init__(self):
+        self.tipo = array('b')
+        self.c0 = array('d')
+        self.c1 = array('d')
+        self.c2 = array('d')
+        self.c3 = array('d')
+        self.c4 = array('d')
+        self.z = array('d')
+        self.espessura = array('d')
+        self.altura = array('d')
+        self.numero = array('l')
+        self.intervalo = array('d')  # < 0: comprimento total da parede
+        self.lado = array('b')
+        self.aberturas = []  # por parede: lista de (s_inicio, s_fim)
+
+    def __len__(self):
+        return len(self.tipo)
+
+    def _adicionar(self, tipo, c, z, espessura, altura, numero, intervalo, face, aberturas):
+        self.tipo.append(tipo)
+        self.c0.append(c[0])
+        self.c1.append(c[1])
+        self.c2.append(c[2])
+        self.c3.append(c[3])
+        self.c4.append(c[4])
+        self.z.append(z)
+        self.espessura.append(espessura)
+        self.altura.append(altura)
+        self.numero.append(int(numero))
+        self.intervalo.append(-1.0 if intervalo is None else intervalo)
+        self.lado.append(LADO_FACE.get(face, 0))
+        self.aberturas.append(sorted(aberturas or []))
+        return len(self.tipo) - 1
+
+    def adicionar_reta(self, x0, y0, x1, y1, z, espessura, altura, numero,
+                       intervalo=None, face=None, aberturas=None):
+        return self._adicionar(RETA, (x0, y0, x1, y1, 0.0), z, espessura, altura,
+                               numero, intervalo, face, aberturas)
+
+    def adicionar_arco(self, cx, cy, raio, angulo_inicial, varredura, z, espessura, altura,
+                       numero, intervalo=None, face=None, aberturas=None):
+        return self._adicionar(ARCO, (cx, cy, raio, angulo_inicial, varredura), z, espessura,
+                               altura, numero, intervalo, face, aberturas)
+
+    def definir_parametros(self, i, altura, numero, intervalo=None, face=None):
+        """Troca os parâmetros de inserção da parede ``i`` (a geometria é mantida)."""
+        self.altura[i] = altura
+        self.numero[i] = int(numero)
+        self.intervalo[i] = -1.0 if intervalo is None else intervalo
+        self.lado[i] = LADO_FACE.get(face, 0)
+
+    def copiar(self):
+        """Cópia independente das colunas e das aberturas."""
+        copia = LoteParedes()
+        for nome in ('tipo', 'c0', 'c1', 'c2', 'c3', 'c4', 'z', 'espessura', 'altura', 'numero',
+                     'intervalo', 'lado'):
+            getattr(copia, nome).extend(getattr(self, nome))
+        copia.aberturas = [list(a) for a in self.aberturas]
+        return copia
+
+    def comprimento(self, i):
+        if self.tipo[i] == ARCO:
+            return self.c2[i] * abs(self.c4[i])
+        return math.hypot(self.c2[i] - self.c0[i], self.c3[i] - self.c1[i])
+
+
+class PontosLote(object):
+    """Pontos gerados: coordenadas, tangente, índice da parede e comprimento de arco."""
+
+    def __init__(self, x, y, z, tx, ty, parede, s=None):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.tx = tx
+        self.ty = ty
+        self.parede = parede
+        self.s = s
+
+    def __len__(self):
+        return len(self.x)
+
+    def fatias(self):
+        """Gera ``(parede, inicio, fim)`` para cada bloco contíguo de pontos.
+
+        Os pontos saem agrupados por parede, na ordem do lote, então uma
+        única varredura separa os pontos de todas as paredes.
+        """
+        total = len(self.parede)
+        inicio = 0
+        while inicio < total:
+            atual = self.parede[inicio]
+            fim = inicio + 1
+            while fim < total and self.parede[fim] == atual:
+                fim += 1
+            yield int(atual), inicio, fim
+            inicio = fim
+
+
+def parametros_ao_longo(comprimento, numero, intervalo):
+    """Posições (comprimento de arco) das tomadas em uma parede."""
+    if intervalo < 0 or intervalo > comprimento:
+        intervalo = comprimento
+    inicio = (comprimento - intervalo) / 2.0
+    espacamento = intervalo / (numero - 1) if numero > 1 else 0.0
+    return [inicio + espacamento * k for k in range(numero)]
+
+
+def dentro_de_abertura(s, aberturas, folga=0.0):
+    for inicio, fim in aberturas:
+        if inicio - folga <= s <= fim + folga:
+            return True
+        if inicio - folga > s:
+            break
+    return False
+
+
+def _calcular_python(lote, folga):
+    x, y, z, tx, ty, sp = array('d'), array('d'), array('d'), array('d'), array('d'), array('d')
+    indices = array('l')
+    for i in range(len(lote)):
+        comprimento = lote.comprimento(i)
+        if comprimento <= 0:
+            continue
+        meia_espessura = lote.lado[i] * lote.espessura[i] / 2.0
+        zp = lote.z[i] + lote.altura[i]
+        aberturas = lote.aberturas[i]
+        eh_arco = lote.tipo[i] == ARCO
+        if eh_arco:
+            cx, cy, raio, a0, varredura = lote.c0[i], lote.c1[i], lote.c2[i], lote.c3[i], lote.c4[i]
+            sentido = 1.0 if varredura >= 0 else -1.0
+        else:
+            x0, y0 = lote.c0[i], lote.c1[i]
+            dx = (lote.c2[i] - x0) / comprimento
+            dy = (lote.c3[i] - y0) / comprimento
+        for s in parametros_ao_longo(comprimento, lote.numero[i], lote.intervalo[i]):
+            if aberturas and dentro_de_abertura(s, aberturas, folga):
+                continue
+            if eh_arco:
+                angulo = a0 + sentido * s / raio
+                cos_a, sen_a = math.cos(angulo), math.sin(angulo)
+                px, py = cx + raio * cos_a, cy + raio * sen_a
+                dx, dy = -sentido * sen_a, sentido * cos_a
+            else:
+                px, py = x0 + dx * s, y0 + dy * s
+            x.append(px - dy * meia_espessura)
+            y.append(py + dx * meia_espessura)
+            z.append(zp)
+            tx.append(dx)
+            ty.append(dy)
+            indices.append(i)
+            sp.append(s)
+    return PontosLote(x, y, z, tx, ty, indices, sp)
+
+
+def _calcular_numpy(lote, folga):
+    tipo = np.frombuffer(lote.tipo, dtype=np.int8)
+    c0, c1, c2, c3, c4 = [np.frombuffer(c, dtype=np.float64)
+                          for c in (lote.c0, lote.c1, lote.c2, lote.c3, lote.c4)]
+    numero = np.asarray(lote.numero, dtype=np.int64)
+    intervalo = np.frombuffer(lote.intervalo, dtype=np.float64)
+    arco = tipo == ARCO
+
+    comprimento = np.where(arco, c2 * np.abs(c4), np.hypot(c2 - c0, c3 - c1))
+    numero = np.where(comprimento > 0, numero, 0)
+    intervalo = np.where((intervalo < 0) | (intervalo > comprimento), comprimento, intervalo)
+    inicio = (comprimento - intervalo) / 2.0
+    espacamento = np.where(numero > 1, intervalo / np.maximum(numero - 1, 1), 0.0)
+
+    # Um elemento por ponto: índice da parede e posição k dentro da parede
+    parede = np.repeat(np.arange(len(lote)), numero)
+    primeiros = np.cumsum(numero) - numero
+    k = np.arange(parede.size) - np.repeat(primeiros, numero)
+    s = inicio[parede] + k * espacamento[parede]
+
+    # Descartar pontos dentro das aberturas (apenas paredes que as possuem)
+    manter = np.ones(s.size, dtype=bool)
+    for i, aberturas in enumerate(lote.aberturas):
+        if not aberturas or not numero[i]:
+            continue
+        fatia = slice(primeiros[i], primeiros[i] + numero[i])
+        for a, b in aberturas:
+            manter[fatia] &= ~((s[fatia] >= a - folga) & (s[fatia] <= b + folga))
+    parede, s = parede[manter], s[manter]
+
+    eh_arco = arco[parede]
+    comp = np.where(comprimento > 0, comprimento, 1.0)[parede]
+    # Retas
+    dx = (c2 - c0)[parede] / comp
+    dy = (c3 - c1)[parede] / comp
+    px = c0[parede] + dx * s
+    py = c1[parede] + dy * s
+    # Arcos
+    if eh_arco.any():
+        sentido = np.where(c4[parede] >= 0, 1.0, -1.0)
+        raio = np.where(eh_arco, c2[parede], 1.0)
+        angulo = c3[parede] + sentido * s / raio
+        cos_a, sen_a = np.cos(angulo), np.sin(angulo)
+        px = np.where(eh_arco, c0[parede] + raio * cos_a, px)
+        py = np.where(eh_arco, c1[parede] + raio * sen_a, py)
+        dx = np.where(eh_arco, -sentido * sen_a, dx)
+        dy = np.where(eh_arco, sentido * cos_a, dy)
+
+    lado = np.frombuffer(lote.lado, dtype=np.int8)[parede]
+    meia_espessura = lado * np.frombuffer(lote.espessura, dtype=np.float64)[parede] / 2.0
+    z = (np.frombuffer(lote.z, dtype=np.float64) + np.frombuffer(lote.altura, dtype=np.float64))[parede]
+    return PontosLote(px - dy * meia_espessura, py + dx * meia_espessura, z, dx, dy, parede, s)
+
+
+def calcular_pontos(lote, folga_aberturas=0.0, usar_numpy=None):
+    """Gera os pontos de inserção de todas as paredes do lote.
+
+    ``folga_aberturas`` amplia cada abertura nos dois lados (pés).
+    ``usar_numpy=None`` usa NumPy se estiver instalado.
+    """
+    if not len(lote):
+        return PontosLote(array('d'), array('d'), array('d'), array('d'), array('d'), array('l'),
+                          array('d'))
+    if usar_numpy is None:
+        usar_numpy = np is not None
+    if usar_numpy and np is None:
+        raise ImportError("NumPy não está disponível.")
+    if usar_numpy:
+        return _calcular_numpy(lote, folga_aberturas)
+    return _calcular_python(lote, folga_aberturas)
+
+
+def parametro_do_ponto(lote, i, x, y):
+    """Projeta ``(x, y)`` na parede ``i`` e retorna o comprimento de arco."""
+    if lote.tipo[i] == ARCO:
+        cx, cy, raio, a0, varredura = lote.c0[i], lote.c1[i], lote.c2[i], lote.c3[i], lote.c4[i]
+        delta = math.atan2(y - cy, x - cx) - a0
+        if varredura < 0:
+            delta = -delta
+        delta %= 2 * math.pi
+        return raio * delta
+    comprimento = lote.comprimento(i)
+    dx = (lote.c2[i] - lote.c0[i]) / comprimento
+    dy = (lote.c3[i] - lote.c1[i]) / comprimento
+    return (x - lote.c0[i]) * dx + (y - lote.c1[i]) * dy
+
+
+def tangente_em(lote, i, s):
+    """Direção unitária da parede ``i`` no comprimento de arco ``s``."""
+    if lote.tipo[i] == ARCO:
+        sentido = 1.0 if lote.c4[i] >= 0 else -1.0
+        angulo = lote.c3[i] + sentido * s / lote.c2[i]
+        return -sentido * math.sin(angulo), sentido * math.cos(angulo)
+    comprimento = lote.comprimento(i) or 1.0
+    return ((lote.c2[i] - lote.c0[i]) / comprimento,
+            (lote.c3[i] - lote.c1[i]) / comprimento)
+
+
+def ponto_em(lote, i, s):
+    """Ponto de inserção ``(x, y, z, tx, ty)`` da parede ``i`` no comprimento de arco ``s``.
+
+    Mesmo cálculo de ``calcular_pontos`` (inclui o deslocamento da face),
+    usado para reposicionar um ponto ao longo da parede.
+    """
+    tx, ty = tangente_em(lote, i, s)
+    if lote.tipo[i] == ARCO:
+        sentido = 1.0 if lote.c4[i] >= 0 else -1.0
+        angulo = lote.c3[i] + sentido * s / lote.c2[i]
+        px = lote.c0[i] + lote.c2[i] * math.cos(angulo)
+        py = lote.c1[i] + lote.c2[i] * math.sin(angulo)
+    else:
+        px, py = lote.c0[i] + tx * s, lote.c1[i] + ty * s
+    meia_espessura = lote.lado[i] * lote.espessura[i] / 2.0
+    return (px - ty * meia_espessura, py + tx * meia_espessura,
+            lote.z[i] + lote.altura[i], tx, ty)
+
+
+def varredura_do_arco(cx, cy, inicio, fim, meio):
+    """Ângulo inicial e varredura com sinal de um arco dado por três pontos."""
+    a0 = math.atan2(inicio[1] - cy, inicio[0] - cx)
+    a1 = math.atan2(fim[1] - cy, fim[0] - cx)
+    am = math.atan2(meio[1] - cy, meio[0] - cx)
+    ccw = (a1 - a0) % (2 * math.pi)
+    if (am - a0) % (2 * math.pi) <= ccw:
+        return a0, ccw
+    return a0, ccw - 2 * math.pi
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""Cálculo dos pontos de inserção e criação das tomadas hospedadas na parede.
+
+Funções extraídas da ferramenta "Inserir Múltiplas Tomadas" (R02) para que
+possam ser reutilizadas pela inserção em lote e pelos demais scripts.
+"""
+
+from eletrica import geometria, marcacao, plano, rastreio, transacoes
+
+# Fator de conversão usado em todos os scripts (Revit trabalha em pés)
+PES_POR_METRO = 3.28084
+
+
+def curva_da_parede(parede):
+    """Retorna a curva de localização da parede ou gera ValueError."""
+    from Autodesk.Revit.DB import LocationCurve
+
+    loc_curve = parede.Location
+    if not isinstance(loc_curve, LocationCurve):
+        raise ValueError("Não foi possível obter a localização da parede.")
+    return loc_curve.Curve
+
+
+def _largura_abertura(insert, tangente):
+    """Largura da porta/janela ao longo da parede (parâmetro ou bounding box)."""
+    from Autodesk.Revit.DB import BuiltInParameter
+
+    for elemento in (insert, getattr(insert, 'Symbol', None)):
+        if elemento is None:
+            continue
+        for parametro in (BuiltInParameter.FAMILY_WIDTH_PARAM,
+                          BuiltInParameter.DOOR_WIDTH,
+                          BuiltInParameter.WINDOW_WIDTH):
+            param = elemento.get_Parameter(parametro)
+            if param and param.HasValue and param.AsDouble() > 0:
+                return param.AsDouble()
+
+    caixa = insert.get_BoundingBox(None)
+    if caixa is None:
+        return 0.0
+    return (abs((caixa.Max.X - caixa.Min.X) * tangente[0]) +
+            abs((caixa.Max.Y - caixa.Min.Y) * tangente[1]))
+
+
+def aberturas_da_parede(parede, lote, indice):
+    """Intervalos ``(s_inicio, s_fim)`` ocupados por portas e janelas da parede."""
+    from Autodesk.Revit.DB import LocationPoint
+
+    doc = parede.Document
+    aberturas = []
+    for insert_id in parede.FindInserts(True, False, False, False):
+        insert = doc.GetElement(insert_id)
+        local = getattr(insert, 'Location', None)
+        if not isinstance(local, LocationPoint):
+            continue
+        ponto = local.Point
+        s = geometria.parametro_do_ponto(lote, indice, ponto.X, ponto.Y)
+        tangente = geometria.tangente_em(lote, indice, s)
+        meia_largura = _largura_abertura(insert, tangente) / 2.0
+        aberturas.append((s - meia_largura, s + meia_largura))
+    return sorted(aberturas)
+
+
+def descrever_parede(lote, parede, altura_metros, numero_tomadas, intervalo_metros,
+                     face_selecionada, considerar_aberturas=True):
+    """Adiciona a parede ao ``LoteParedes`` do núcleo geométrico.
+
+    Retorna o índice da parede no lote.
+    """
+    from Autodesk.Revit.DB import Arc
+
+    curva = curva_da_parede(parede)
+    inicio = curva.GetEndPoint(0)
+    fim = curva.GetEndPoint(1)
+    espessura = parede.WallType.Width  # Em pés
+    altura_pes = altura_metros * PES_POR_METRO
+    intervalo_pes = None if intervalo_metros is None else intervalo_metros * PES_POR_METRO
+
+    if isinstance(curva, Arc):
+        centro = curva.Center
+        meio = curva.Evaluate(0.5, True)
+        angulo_inicial, varredura = geometria.varredura_do_arco(
+            centro.X, centro.Y, (inicio.X, inicio.Y), (fim.X, fim.Y), (meio.X, meio.Y)
+        )
+        indice = lote.adicionar_arco(
+            centro.X, centro.Y, curva.Radius, angulo_inicial, varredura, inicio.Z,
+            espessura, altura_pes, numero_tomadas, intervalo_pes, face_selecionada,
+        )
+    else:
+        indice = lote.adicionar_reta(
+            inicio.X, inicio.Y, fim.X, fim.Y, inicio.Z,
+            espessura, altura_pes, numero_tomadas, intervalo_pes, face_selecionada,
+        )
+
+    if considerar_aberturas:
+        lote.aberturas[indice] = aberturas_da_parede(parede, lote, indice)
+    return indice
+
+
+def aplicar_parametros(lote, indice, altura_metros, numero_tomadas, intervalo_metros, face_selecionada):
+    """Grava na parede ``indice`` do lote os parâmetros de inserção (em metros)."""
+    lote.definir_parametros(
+        indice,
+        altura_metros * PES_POR_METRO,
+        numero_tomadas,
+        None if intervalo_metros is None else intervalo_metros * PES_POR_METRO,
+        face_selecionada,
+    )
+
+
+def pontos_xyz(pontos, inicio=0, fim=None):
+    """Converte um trecho de ``PontosLote`` em uma lista de XYZ."""
+    from Autodesk.Revit.DB import XYZ
+
+    if fim is None:
+        fim = len(pontos)
+    x, y, z = pontos.x, pontos.y, pontos.z
+    return [XYZ(float(x[k]), float(y[k]), float(z[k])) for k in range(inicio, fim)]
+
+
+def tangentes(pontos, inicio=0, fim=None):
+    """Direções ``(tx, ty)`` da parede em um trecho de ``PontosLote``."""
+    if fim is None:
+        fim = len(pontos)
+    tx, ty = pontos.tx, pontos.ty
+    return [(float(tx[k]), float(ty[k])) for k in range(inicio, fim)]
+
+
+@rastreio.medido()
+def calcular_pontos_insercao(
+        parede, altura_metros, numero_tomadas, intervalo_metros, face_selecionada,
+        considerar_aberturas=True, folga_aberturas=0.0, conflitos=None
+):
+    """Calcula os pontos de inserção das tomadas.
+
+    ``intervalo_metros`` igual a None usa o comprimento total da parede.
+    Paredes curvas seguem o arco e pontos sobre portas/janelas são
+    descartados. Com ``conflitos`` (``IndiceConflitos``), pontos sobre
+    dispositivos existentes são deslocados ao longo da parede ou
+    descartados. Retorna ``(pontos_insercao, tangentes)``, com a direção
+    ``(tx, ty)`` da parede em cada ponto.
+    """
+    lote = geometria.LoteParedes()
+    descrever_parede(
+        lote, parede, altura_metros, numero_tomadas, intervalo_metros, face_selecionada,
+        considerar_aberturas,
+    )
+    pontos = geometria.calcular_pontos(lote, folga_aberturas)
+    if conflitos is not None:
+        pontos = conflitos.resolver(lote, pontos, folga_aberturas=folga_aberturas)
+    return pontos_xyz(pontos), tangentes(pontos)
+
+
+def criar_tomadas(doc, parede, tomada_selecionada, pontos_insercao, face_selecionada, parametros_elet,
+                  erros=None, cache_planos=None, dados_marcacao=None):
+    """Cria as instâncias nas posições calculadas (exige transação aberta).
+
+    A orientação e os parâmetros são resolvidos uma vez no ``PlanoInsercao``
+    da parede; ``cache_planos`` permite reaproveitá-los entre chamadas.
+    Com ``dados_marcacao`` as tomadas são marcadas como gerenciadas
+    (``marcacao``), para poderem ser sincronizadas depois. Falhas de
+    inserção vão para ``erros``; cabe a quem chama exibi-las.
+    """
+    potencia_aparente, fator_potencia, tensao, numero_fases = parametros_elet
+    if erros is None:
+        erros = []
+
+    if cache_planos is None:
+        cache_planos = plano.CachePlanos()
+    plano_parede = cache_planos.obter(parede, tomada_selecionada, face_selecionada)
+
+    # Lista para armazenar as instâncias de tomadas inseridas
+    tomadas_inseridas = []
+    entidade = None if dados_marcacao is None else marcacao.entidade(dados_marcacao)
+
+    for ponto_insercao in pontos_insercao:
+        try:
+            tomada = plano_parede.instanciar(doc, ponto_insercao, potencia_aparente, fator_potencia)
+            if entidade is not None:
+                tomada.SetEntity(entidade)
+            tomadas_inseridas.append(tomada)
+        except Exception as e:
+            erros.append("Erro ao inserir tomada: {}".format(e))
+
+    return tomadas_inseridas
+
+
+def inserir_tomadas(doc, parede, tomada_selecionada, pontos_insercao, face_selecionada, parametros_elet,
+                    dados_marcacao=None, agendador=None, erros=None):
+    """Insere as tomadas nas posições calculadas em uma única transação.
+
+    Com ``agendador`` a inserção é uma etapa do grupo aberto pelo script
+    (e reaproveita a transação, se já houver uma aberta). As falhas vão
+    para ``erros`` (ver ``criar_tomadas``).
+    """
+    if agendador is None:
+        agendador = transacoes.Agendador(doc, "Inserir Tomadas")
+    with agendador.etapa("Inserir Tomadas"):
+        return criar_tomadas(
+            doc, parede, tomada_selecionada, pontos_insercao, face_selecionada, parametros_elet,
+            erros=erros, dados_marcacao=dados_marcacao,
+        )
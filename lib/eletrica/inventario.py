@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""Inventário de categorias, famílias e tipos com as instâncias colocadas.
+
+"Listar Categorias de Famílias" percorria todos os ``FamilySymbol`` só para
+montar o conjunto de nomes de categoria: sem contagens, sem instâncias e
+sem o detalhe por família. O inventário faz uma passada pelos símbolos e
+outra pelas instâncias (coletores filtrados por classe e, opcionalmente,
+por categoria) e agrega categoria -> família -> tipo -> instâncias.
+
+Como o catálogo (``eletrica.catalogo``), o resultado é gravado em disco
+por documento; nas execuções seguintes só os ids são coletados e apenas
+símbolos e instâncias novos ou modificados (``GetChangedElements``,
+Revit 2023+) são relidos. Sem essa informação, trocas de tipo de
+instâncias existentes só aparecem na releitura completa (Shift+clique).
+
+Os ids das instâncias e dos seus símbolos vão para o cache como colunas
+``array('d')`` em base64 (exatos até 2**53): o JSON com centenas de
+milhares de inteiros é lento para ler no IronPython.
+"""
+
+import base64
+import json
+import os
+from array import array
+from collections import namedtuple
+
+from eletrica import busca, catalogo, rastreio
+from eletrica.catalogo import id_inteiro
+
+VERSAO_FORMATO = 1
+
+NIVEL_CATEGORIA = 'categoria'
+NIVEL_FAMILIA = 'familia'
+NIVEL_TIPO = 'tipo'
+NIVEIS = (NIVEL_CATEGORIA, NIVEL_FAMILIA, NIVEL_TIPO)
+
+ORDEM_INSTANCIAS = 'instancias'
+ORDEM_NOME = 'nome'
+
+SEM_CATEGORIA = u"(sem categoria)"
+DESCONHECIDO = u"(desconhecido)"
+
+RegistroTipo = namedtuple('RegistroTipo', ['id', 'categoria', 'nome_categoria', 'familia', 'tipo'])
+
+# ``familias``/``tipos`` contam os itens agregados em cada linha
+LinhaInventario = namedtuple(
+    'LinhaInventario',
+    ['categoria', 'nome_categoria', 'familia', 'tipo', 'familias', 'tipos', 'instancias'],
+)
+
+
+def _colunas_ids(valores):
+    dados = array('d', valores)
+    bruto = dados.tobytes() if hasattr(dados, 'tobytes') else dados.tostring()
+    return base64.b64encode(bruto).decode('ascii')
+
+
+def _ids_colunas(texto):
+    dados = array('d')
+    bruto = base64.b64decode(texto)
+    if hasattr(dados, 'frombytes'):
+        dados.frombytes(bruto)
+    else:
+        dados.fromstring(bruto)
+    return [int(v) for v in dados]
+
+
+class Inventario(object):
+    """Tipos por id e o tipo de cada instância colocada."""
+
+    def __init__(self, tipos=None, instancias=None, versao=None, categorias=None):
+        self.tipos = tipos or {}  # id do símbolo -> RegistroTipo
+        self.instancias = instancias or {}  # id da instância -> id do símbolo
+        self.versao = versao
+        self.categorias = categorias  # nomes de BuiltInCategory ou None (todas)
+        self.relidos = 0
+
+    def contagens(self):
+        """``{id do símbolo: instâncias}``."""
+        contagem = {}
+        for id_simbolo in self.instancias.values():
+            contagem[id_simbolo] = contagem.get(id_simbolo, 0) + 1
+        return contagem
+
+    def _tipo(self, id_simbolo):
+        registro = self.tipos.get(id_simbolo)
+        if registro is None:
+            registro = RegistroTipo(id_simbolo, None, SEM_CATEGORIA, DESCONHECIDO, DESCONHECIDO)
+        return registro
+
+    def linhas(self, nivel=NIVEL_TIPO, filtro=u"", ordem=ORDEM_INSTANCIAS, somente_colocados=False):
+        """``LinhaInventario`` agregadas em ``nivel``.
+
+        ``filtro`` exige todos os termos (sem acentos nem caixa) no rótulo
+        "categoria família tipo"; ``ordem`` põe as maiores contagens primeiro
+        (``ORDEM_INSTANCIAS``) ou segue a ordem alfabética (``ORDEM_NOME``).
+        """
+        procurados = busca.termos(filtro or u"")
+        contagem = self.contagens()
+        ids = set(self.tipos) | set(contagem)
+        grupos = {}
+        for id_simbolo in ids:
+            registro = self._tipo(id_simbolo)
+            if procurados:
+                rotulo = busca.normalizar(u"{} {} {}".format(registro.nome_categoria, registro.familia, registro.tipo))
+                if not all(termo in rotulo for termo in procurados):
+                    continue
+            instancias = contagem.get(id_simbolo, 0)
+            if somente_colocados and not instancias:
+                continue
+            if nivel == NIVEL_CATEGORIA:
+                chave = (registro.nome_categoria,)
+            elif nivel == NIVEL_FAMILIA:
+                chave = (registro.nome_categoria, registro.familia)
+            else:
+                chave = (registro.nome_categoria, registro.familia, registro.tipo, id_simbolo)
+            grupo = grupos.get(chave)
+            if grupo is None:
+                grupo = grupos[chave] = [registro.categoria, set(), 0, 0]
+            grupo[1].add(registro.familia)
+            grupo[2] += 1
+            grupo[3] += instancias
+
+        resultado = []
+        for chave, (categoria, familias, tipos, instancias) in grupos.items():
+            familia = chave[1] if len(chave) > 1 else None
+            tipo = chave[2] if len(chave) > 2 else None
+            resultado.append(LinhaInventario(categoria, chave[0], familia, tipo, len(familias), tipos, instancias))
+        if ordem == ORDEM_NOME:
+            resultado.sort(key=lambda l: (l.nome_categoria, l.familia or u"", l.tipo or u""))
+        else:
+            resultado.sort(key=lambda l: (-l.instancias, l.nome_categoria, l.familia or u"", l.tipo or u""))
+        return resultado
+
+    def totais(self):
+        """``(categorias, famílias, tipos, instâncias)`` do inventário inteiro."""
+        categorias = set(r.nome_categoria for r in self.tipos.values())
+        familias = set((r.nome_categoria, r.familia) for r in self.tipos.values())
+        return len(categorias), len(familias), len(self.tipos), len(self.instancias)
+
+    def para_dict(self):
+        ids = list(self.instancias)
+        return {
+            'versao_formato': VERSAO_FORMATO,
+            'versao_documento': self.versao,
+            'categorias': self.categorias,
+            'tipos': dict(
+                (str(r.id), [r.categoria, r.nome_categoria, r.familia, r.tipo]) for r in self.tipos.values()
+            ),
+            'instancias': _colunas_ids(ids),
+            'simbolos': _colunas_ids([self.instancias[i] for i in ids]),
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        if dados.get('versao_formato') != VERSAO_FORMATO:
+            return cls()
+        tipos = {}
+        for chave, (categoria, nome_categoria, familia, tipo) in dados.get('tipos', {}).items():
+            tipos[int(chave)] = RegistroTipo(int(chave), categoria, nome_categoria, familia, tipo)
+        instancias = dict(zip(_ids_colunas(dados['instancias']), _ids_colunas(dados['simbolos'])))
+        return cls(tipos, instancias, dados.get('versao_documento'), dados.get('categorias'))
+
+
+def ler_tipo(simbolo):
+    from Autodesk.Revit.DB import BuiltInParameter
+
+    familia = catalogo._valor_texto(simbolo, BuiltInParameter.ALL_MODEL_FAMILY_NAME, u"Sem Família")
+    tipo = catalogo._valor_texto(simbolo, BuiltInParameter.ALL_MODEL_TYPE_NAME, u"Sem Nome")
+    categoria, nome_categoria = None, SEM_CATEGORIA
+    if simbolo.Category:
+        categoria = id_inteiro(simbolo.Category.Id)
+        nome_categoria = simbolo.Category.Name
+    return RegistroTipo(id_inteiro(simbolo.Id), categoria, nome_categoria, familia, tipo)
+
+
+def _coletor(doc, classe, nomes_categorias=None):
+    """Coletor de ``classe`` (FamilySymbol/FamilyInstance), filtrado por categoria se pedido."""
+    from Autodesk.Revit.DB import FilteredElementCollector
+
+    coletor = FilteredElementCollector(doc).OfClass(classe)
+    if nomes_categorias:
+        import clr
+        clr.AddReference('System')
+        from System.Collections.Generic import List
+        from Autodesk.Revit.DB import BuiltInCategory, ElementMulticategoryFilter
+
+        categorias = List[BuiltInCategory]([getattr(BuiltInCategory, nome) for nome in nomes_categorias])
+        coletor = coletor.WherePasses(ElementMulticategoryFilter(categorias))
+    return coletor
+
+
+def atualizar_inventario(doc, inventario, completo=False):
+    """Sincroniza ``inventario`` com o documento relendo só o que mudou.
+
+    Retorna True se algo foi alterado; ``inventario.relidos`` conta os
+    elementos lidos nesta atualização. Se a versão mudou e as modificações
+    não podem ser consultadas, tudo é relido.
+    """
+    from Autodesk.Revit.DB import ElementId, FamilyInstance, FamilySymbol
+
+    nomes = inventario.categorias
+    versao = catalogo.versao_documento(doc)
+    modificados = None
+    if not completo and versao != inventario.versao:
+        modificados = catalogo.ids_modificados(doc, inventario.versao)
+        # Versão anterior fora do histórico: não há como saber o que mudou
+        completo = modificados is None
+    relidos = 0
+
+    # Símbolos: ids sempre; registros só dos novos/modificados
+    ids_simbolos = set(id_inteiro(i) for i in _coletor(doc, FamilySymbol, nomes).ToElementIds())
+    reler = ids_simbolos if completo else ids_simbolos - set(inventario.tipos)
+    if modificados:
+        reler = reler | (modificados & ids_simbolos)
+    removidos = set(inventario.tipos) - ids_simbolos
+    for id_removido in removidos:
+        del inventario.tipos[id_removido]
+    for id_simbolo in reler:
+        simbolo = doc.GetElement(ElementId(id_simbolo))
+        if simbolo is not None:
+            inventario.tipos[id_simbolo] = ler_tipo(simbolo)
+    relidos += len(reler)
+    alterado = bool(removidos or reler)
+
+    # Instâncias: passada completa lendo o tipo de cada uma na primeira vez
+    coletor = _coletor(doc, FamilyInstance, nomes)
+    if completo or not inventario.instancias:
+        instancias = dict((id_inteiro(i.Id), id_inteiro(i.GetTypeId())) for i in coletor)
+        relidos += len(instancias)
+        alterado = alterado or instancias != inventario.instancias
+        inventario.instancias = instancias
+    else:
+        ids_instancias = set(id_inteiro(i) for i in coletor.ToElementIds())
+        atuais = inventario.instancias
+        reler = ids_instancias.difference(atuais)
+        if modificados:
+            reler |= modificados & ids_instancias
+        removidos = [i for i in atuais if i not in ids_instancias]
+        for id_removido in removidos:
+            del atuais[id_removido]
+        for id_instancia in reler:
+            instancia = doc.GetElement(ElementId(id_instancia))
+            if instancia is not None:
+                atuais[id_instancia] = id_inteiro(instancia.GetTypeId())
+        relidos += len(reler)
+        alterado = alterado or bool(removidos or reler)
+
+    alterado = alterado or versao != inventario.versao
+    inventario.versao = versao
+    inventario.relidos = relidos
+    return alterado
+
+
+def caminho_cache(doc):
+    """Arquivo de cache do inventário, um por documento (pasta de dados do pyRevit)."""
+    from pyrevit import script
+    return script.get_document_data_file('inventario_familias', 'json', add_cmd_name=False)
+
+
+def ler_cache(caminho, categorias=None):
+    if not caminho or not os.path.exists(caminho):
+        return Inventario(categorias=categorias)
+    try:
+        with open(caminho, 'r') as arquivo:
+            inventario = Inventario.de_dict(json.load(arquivo))
+    except Exception:
+        # Cache corrompido ou de outra versão: reconstruir do zero
+        return Inventario(categorias=categorias)
+    if inventario.categorias != categorias:
+        return Inventario(categorias=categorias)
+    return inventario
+
+
+def gravar_cache(inventario, caminho):
+    if not caminho:
+        return
+    try:
+        with open(caminho, 'w') as arquivo:
+            json.dump(inventario.para_dict(), arquivo)
+    except Exception:
+        # Falha ao gravar o cache não deve impedir o uso da ferramenta
+        pass
+
+
+@rastreio.medido()
+def carregar_inventario(doc, completo=False, categorias=None, caminho=None):
+    """Carrega o inventário do disco, atualiza o delta e grava de volta se mudou.
+
+    ``categorias`` (nomes de ``BuiltInCategory``) restringe os coletores;
+    ``caminho`` substitui o arquivo de cache da pasta do pyRevit.
+    """
+    if caminho is None:
+        caminho = caminho_cache(doc)
+    categorias = list(categorias) if categorias else None
+    inventario = Inventario(categorias=categorias) if completo else ler_cache(caminho, categorias)
+    if atualizar_inventario(doc, inventario, completo=completo):
+        gravar_cache(inventario, caminho)
+    return inventario
+
+
+def relatar(inventario, rel, nivel=NIVEL_TIPO, filtro=u"", ordem=ORDEM_INSTANCIAS, somente_colocados=False):
+    """Totais e a tabela do inventário em ``rel``."""
+    categorias, familias, tipos, instancias = inventario.totais()
+    rel.titulo(u"Inventário de famílias")
+    rel.texto(u"{} categoria(s), {} família(s), {} tipo(s), {} instância(s) colocada(s).".format(
+        categorias, familias, tipos, instancias))
+    if filtro:
+        rel.texto(u"Filtro: {}".format(filtro))
+    linhas = inventario.linhas(nivel, filtro, ordem, somente_colocados)
+    if nivel == NIVEL_CATEGORIA:
+        rel.tabela(
+            [(l.categoria if l.categoria is not None else u"", l.nome_categoria, l.familias, l.tipos, l.instancias)
+             for l in linhas],
+            [u"ID", u"Categoria", u"Famílias", u"Tipos", u"Instâncias"],
+        )
+    elif nivel == NIVEL_FAMILIA:
+        rel.tabela(
+            [(l.nome_categoria, l.familia, l.tipos, l.instancias) for l in linhas],
+            [u"Categoria", u"Família", u"Tipos", u"Instâncias"],
+        )
+    else:
+        rel.tabela(
+            [(l.nome_categoria, l.familia, l.tipo, l.instancias) for l in linhas],
+            [u"Categoria", u"Família", u"Tipo", u"Instâncias"],
+        )
+    return linhas
@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""Inserção de tomadas em lote em várias paredes (seleção ou pavimento inteiro).
+
+O fluxo é dividido em duas etapas:
+
+1. ``planejar_lote`` calcula, antes de abrir qualquer transação, todos os
+   pontos de inserção de todas as paredes, aplicando os parâmetros padrão
+   e as sobrescritas por parede;
+2. ``executar_lote`` cria todas as instâncias dentro do grupo de
+   transações do ``transacoes.Agendador`` (um único passo de desfazer),
+   em etapas de tamanho limitado para não acumular memória no Revit.
+
+As tomadas criadas são marcadas como gerenciadas (``marcacao``); com
+``gerenciadas`` o lote sincroniza as paredes pela diferença
+(``sincronizacao``) em vez de duplicar as tomadas já existentes.
+"""
+
+import csv
+
+from eletrica import geometria, insercao, marcacao, plano, rastreio, sincronizacao, transacoes
+
+# Quantidade de tomadas criadas por transação dentro do grupo
+TOMADAS_POR_TRANSACAO = 2000
+
+
+class ParametrosParede(object):
+    """Parâmetros de inserção de uma parede (mesmos campos do InputForm)."""
+
+    __slots__ = ('altura_metros', 'numero_tomadas', 'intervalo_metros', 'face', 'parametros_elet')
+
+    def __init__(self, altura_metros, numero_tomadas, intervalo_metros, face, parametros_elet):
+        self.altura_metros = altura_metros
+        self.numero_tomadas = numero_tomadas
+        self.intervalo_metros = intervalo_metros  # None = comprimento total da parede
+        self.face = face
+        self.parametros_elet = parametros_elet  # (S, cos φ, tensão, fases)
+
+    def com_sobrescritas(self, sobrescritas):
+        """Cópia destes parâmetros com os campos de ``sobrescritas`` substituídos."""
+        valores = dict((campo, getattr(self, campo)) for campo in self.__slots__)
+        valores.update(sobrescritas or {})
+        return ParametrosParede(**valores)
+
+
+class ItemLote(object):
+    """Parede do lote com os pontos de inserção já calculados.
+
+    ``tangentes`` traz a direção ``(tx, ty)`` da parede em cada ponto.
+    """
+
+    __slots__ = ('parede', 'parametros', 'pontos', 'tangentes')
+
+    def __init__(self, parede, parametros, pontos, tangentes):
+        self.parede = parede
+        self.parametros = parametros
+        self.pontos = pontos
+        self.tangentes = tangentes
+
+
+class ResultadoLote(object):
+    def __init__(self):
+        self.tomadas_por_parede = {}
+        self.erros = []
+        # Avisos e erros do Revit coletados pelo agendador (``transacoes.Falha``)
+        self.falhas = []
+        # Preenchido apenas no modo de sincronização
+        self.sincronizacao = None
+
+    @property
+    def total(self):
+        return sum(len(t) for t in self.tomadas_por_parede.values())
+
+
+def coletar_paredes_nivel(doc, nivel_id):
+    """Todas as paredes hospedadas no nível informado."""
+    from Autodesk.Revit.DB import ElementLevelFilter, FilteredElementCollector, Wall
+
+    return list(
+        FilteredElementCollector(doc)
+        .OfClass(Wall)
+        .WherePasses(ElementLevelFilter(nivel_id))
+    )
+
+
+def coletar_paredes_selecao(doc, uidoc):
+    """Paredes presentes na seleção atual do usuário."""
+    from Autodesk.Revit.DB import Wall
+
+    paredes = []
+    for elem_id in uidoc.Selection.GetElementIds():
+        elemento = doc.GetElement(elem_id)
+        if isinstance(elemento, Wall):
+            paredes.append(elemento)
+    return paredes
+
+
+def _converter_numero(texto, tipo):
+    texto = (texto or '').strip()
+    if not texto:
+        return None
+    return tipo(texto.replace(',', '.'))
+
+
+def ler_sobrescritas_csv(caminho):
+    """Lê sobrescritas por parede de um CSV separado por ';'.
+
+    Colunas: ``id_parede;altura;numero_tomadas;intervalo;face``. Campos vazios
+    mantêm o valor padrão do lote. Retorna ``{id_parede: {campo: valor}}``.
+    """
+    campos = (
+        ('altura', 'altura_metros', float),
+        ('numero_tomadas', 'numero_tomadas', int),
+        ('intervalo', 'intervalo_metros', float),
+    )
+    sobrescritas = {}
+    with open(caminho, 'r') as arquivo:
+        for linha in csv.DictReader(arquivo, delimiter=';'):
+            valores = {}
+            for coluna, campo, tipo in campos:
+                valor = _converter_numero(linha.get(coluna), tipo)
+                if valor is not None:
+                    valores[campo] = valor
+            face = (linha.get('face') or '').strip()
+            if face:
+                valores['face'] = face
+            sobrescritas[int(linha['id_parede'])] = valores
+    return sobrescritas
+
+
+class DescricaoParedes(object):
+    """Geometria das paredes lida do documento, ainda sem parâmetros de inserção.
+
+    ``lote`` tem uma posição por parede de ``paredes`` (mesma ordem) e só
+    contém números: pode ser lido fora da thread da API.
+    """
+
+    __slots__ = ('lote', 'paredes', 'ids', 'erros')
+
+    def __init__(self):
+        self.lote = geometria.LoteParedes()
+        self.paredes = []
+        self.ids = []
+        self.erros = []
+
+    def com_parametros(self, parametros_padrao, sobrescritas=None):
+        """Cópia do lote com os parâmetros de cada parede; retorna ``(lote, [parametros])``."""
+        sobrescritas = sobrescritas or {}
+        lote_paredes = self.lote.copiar()
+        lista = []
+        for indice, id_parede in enumerate(self.ids):
+            parametros = parametros_padrao.com_sobrescritas(sobrescritas.get(id_parede))
+            insercao.aplicar_parametros(
+                lote_paredes, indice, parametros.altura_metros, parametros.numero_tomadas,
+                parametros.intervalo_metros, parametros.face,
+            )
+            lista.append(parametros)
+        return lote_paredes, lista
+
+
+@rastreio.medido()
+def descrever_paredes(paredes):
+    """Lê curva, espessura e aberturas de todas as ``paredes`` (thread da API).
+
+    Paredes sem curva de localização válida vão para ``erros``.
+    """
+    from eletrica.catalogo import id_inteiro
+
+    descricao = DescricaoParedes()
+    for parede in paredes:
+        id_parede = id_inteiro(parede.Id)
+        try:
+            insercao.descrever_parede(descricao.lote, parede, 0.0, 1, None, None)
+        except ValueError as e:
+            descricao.erros.append("Parede {}: {}".format(id_parede, e))
+            continue
+        descricao.paredes.append(parede)
+        descricao.ids.append(id_parede)
+    return descricao
+
+
+@rastreio.medido()
+def planejar_descritas(descricao, parametros_padrao, sobrescritas=None, folga_aberturas=0.0,
+                       conflitos=None, pontos=None, gerenciadas=None):
+    """``planejar_lote`` sobre paredes já descritas (``descrever_paredes``).
+
+    ``pontos`` aceita os pontos já calculados para os mesmos parâmetros
+    (ex.: por ``antecipacao`` enquanto o formulário estava aberto). Com
+    ``gerenciadas`` (modo de sincronização), paredes com tomadas
+    gerenciadas que ficaram sem pontos recebem um item vazio, para que as
+    tomadas delas sejam removidas.
+    """
+    lote_paredes, lista = descricao.com_parametros(parametros_padrao, sobrescritas)
+    if pontos is None:
+        pontos = geometria.calcular_pontos(lote_paredes, folga_aberturas)
+    if conflitos is not None:
+        pontos = conflitos.resolver(lote_paredes, pontos, folga_aberturas=folga_aberturas)
+    itens = []
+    planejadas = set()
+    for indice, inicio, fim in pontos.fatias():
+        planejadas.add(indice)
+        itens.append(ItemLote(
+            descricao.paredes[indice], lista[indice], insercao.pontos_xyz(pontos, inicio, fim),
+            insercao.tangentes(pontos, inicio, fim)))
+    if gerenciadas:
+        for indice, parede in enumerate(descricao.paredes):
+            if indice not in planejadas and marcacao.chave_parede(parede) in gerenciadas:
+                itens.append(ItemLote(parede, lista[indice], [], []))
+    return itens, list(descricao.erros)
+
+
+def planejar_lote(paredes, parametros_padrao, sobrescritas=None, folga_aberturas=0.0,
+                  conflitos=None, gerenciadas=None):
+    """Calcula os pontos de todas as paredes antes de qualquer escrita no modelo.
+
+    Todas as paredes são descritas em um único ``LoteParedes`` e os pontos
+    saem de uma só chamada ao núcleo geométrico. Com ``conflitos``
+    (``IndiceConflitos``), pontos sobre dispositivos existentes ou sobre
+    tomadas já planejadas são deslocados ou descartados. Retorna ``(itens, erros)``;
+    paredes sem curva de localização válida são reportadas em ``erros`` e
+    não interrompem o lote.
+    """
+    return planejar_descritas(
+        descrever_paredes(paredes), parametros_padrao, sobrescritas, folga_aberturas, conflitos,
+        gerenciadas=gerenciadas)
+
+
+def _fatiar(itens, limite):
+    """Agrupa itens consecutivos até ``limite`` tomadas por grupo."""
+    grupo = []
+    quantidade = 0
+    for item in itens:
+        grupo.append(item)
+        quantidade += len(item.pontos)
+        if quantidade >= limite:
+            yield grupo
+            grupo = []
+            quantidade = 0
+    if grupo:
+        yield grupo
+
+
+def dados_do_item(item):
+    """Marcação gravada nas tomadas de um item do lote."""
+    p = item.parametros
+    return marcacao.dados_execucao(
+        item.parede, p.face, p.altura_metros, p.numero_tomadas, p.intervalo_metros, p.parametros_elet
+    )
+
+
+class _RestantesSincronizacao(object):
+    """Tomadas gerenciadas de cada parede ainda não pareadas no lote.
+
+    Cada tomada é entregue a um só item: os itens da mesma parede consomem
+    a lista em sequência e as sobras só são removidas no último item da
+    parede. Se os itens da parede usam faces diferentes (ex.: ambientes
+    dos dois lados), cada item recebe apenas as tomadas marcadas com a
+    própria face.
+    """
+
+    def __init__(self, gerenciadas, itens):
+        self.gerenciadas = gerenciadas
+        self.pendentes = {}
+        self.faces = {}
+        for item in itens:
+            chave = marcacao.chave_parede(item.parede)
+            self.pendentes[chave] = self.pendentes.get(chave, 0) + 1
+            self.faces.setdefault(chave, set()).add(item.parametros.face)
+        self.livres = {}
+
+    def retirar(self, chave, face):
+        """``(existentes, ultimo)`` para o próximo item da parede ``chave``."""
+        livres = self.livres.get(chave)
+        if livres is None:
+            livres = self.livres[chave] = list(self.gerenciadas.get(chave, []))
+        self.pendentes[chave] -= 1
+        if len(self.faces[chave]) > 1:
+            existentes = [e for e in livres if e[1].get('face') == face]
+            livres[:] = [e for e in livres if e[1].get('face') != face]
+        else:
+            existentes = list(livres)
+            del livres[:]
+        return existentes, self.pendentes[chave] == 0
+
+    def devolver(self, chave, sobras):
+        self.livres[chave].extend(sobras)
+
+    def encerrar(self, chave):
+        """Tomadas da parede que nenhum item usou."""
+        return self.livres.pop(chave)
+
+
+@rastreio.medido()
+def executar_lote(doc, tomada_selecionada, itens, nome="Inserir Tomadas em Lote",
+                  tomadas_por_transacao=TOMADAS_POR_TRANSACAO, gerenciadas=None, agendador=None):
+    """Cria todas as tomadas planejadas em um único TransactionGroup.
+
+    Com ``gerenciadas`` (``marcacao.gerenciadas_por_parede``) cada parede é
+    sincronizada: as tomadas existentes são movidas ou removidas e só as
+    que faltam são criadas. ``tomadas_por_parede`` guarda as criadas.
+    Com ``agendador`` as etapas entram no grupo já aberto pelo script;
+    sem ele o lote abre o próprio. Os avisos do Revit ficam em ``falhas``.
+    """
+    resultado = ResultadoLote()
+    if gerenciadas is not None:
+        resultado.sincronizacao = sincronizacao.ResultadoSincronizacao()
+        restantes = _RestantesSincronizacao(gerenciadas, itens)
+    cache_planos = plano.CachePlanos()
+    proprio = agendador is None
+    if proprio:
+        agendador = transacoes.Agendador(doc, nome).iniciar()
+    resultado.falhas = agendador.falhas
+    try:
+        for fatia in _fatiar(itens, tomadas_por_transacao):
+            with agendador.etapa(nome):
+                for item in fatia:
+                    # Uma parede pode vir em mais de um item (ex.: faces de dois ambientes)
+                    id_parede = marcacao.chave_parede(item.parede)
+                    if gerenciadas is not None:
+                        existentes, ultimo = restantes.retirar(id_parede, item.parametros.face)
+                        parcial = sincronizacao.sincronizar_parede(
+                            doc,
+                            item.parede,
+                            tomada_selecionada,
+                            item.pontos,
+                            item.parametros.face,
+                            item.parametros.parametros_elet,
+                            dados_do_item(item),
+                            existentes,
+                            cache_planos=cache_planos,
+                            remover=False,
+                        )
+                        restantes.devolver(id_parede, parcial.sobras)
+                        parcial.sobras = []
+                        if ultimo:
+                            sobras = restantes.encerrar(id_parede)
+                            if sobras:
+                                sincronizacao.remover_tomadas(doc, sobras, parcial)
+                        resultado.sincronizacao.somar(parcial)
+                        resultado.erros.extend(parcial.erros)
+                        resultado.tomadas_por_parede.setdefault(id_parede, []).extend(parcial.criadas)
+                        continue
+                    resultado.tomadas_por_parede.setdefault(id_parede, []).extend(insercao.criar_tomadas(
+                        doc,
+                        item.parede,
+                        tomada_selecionada,
+                        item.pontos,
+                        item.parametros.face,
+                        item.parametros.parametros_elet,
+                        erros=resultado.erros,
+                        cache_planos=cache_planos,
+                        dados_marcacao=dados_do_item(item),
+                    ))
+        if proprio:
+            agendador.concluir()
+    except Exception:
+        if proprio:
+            agendador.cancelar()
+        raise
+    return resultado
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Marcação das tomadas gerenciadas pela extensão (Extensible Storage).
+
+Cada tomada criada pelas ferramentas de inserção recebe uma entidade do
+esquema ``TomadasGerenciadas`` com os parâmetros da execução em JSON
+(parede, face, altura, quantidade, intervalo e parâmetros elétricos; em
+paredes de vínculos, também o id do vínculo). A marcação fica invisível
+ao usuário, acompanha o elemento em cópias e sincronizações e permite à
+``sincronizacao`` reconhecer quais tomadas de uma parede pertencem à
+ferramenta.
+"""
+
+import json
+
+from eletrica.catalogo import id_inteiro
+
+GUID_ESQUEMA = '6f0c2d8e-3b7a-4c61-9a4e-2f5d1b8c7e90'
+NOME_ESQUEMA = 'TomadasGerenciadas'
+CAMPO_DADOS = 'Dados'
+VERSAO_DADOS = 1
+
+_ESQUEMA = {}
+
+
+def chave_parede(parede):
+    """Id da parede ou, em paredes de vínculos, ``(id do vínculo, id da parede)``.
+
+    Os ids de um vínculo são do documento vinculado e podem coincidir com
+    ids de paredes do documento ativo.
+    """
+    vinculo = getattr(parede, 'vinculo', None)
+    if vinculo is None:
+        return id_inteiro(parede.Id)
+    return (id_inteiro(vinculo.Id), id_inteiro(parede.Id))
+
+
+def _chave_dados(dados):
+    if 'vinculo' in dados:
+        return (dados['vinculo'], dados.get('parede'))
+    return dados.get('parede')
+
+
+def dados_execucao(parede, face, altura_metros, numero_tomadas, intervalo_metros, parametros_elet):
+    """Dicionário gravado em cada tomada de uma execução."""
+    potencia_aparente, fator_potencia, tensao, numero_fases = parametros_elet
+    dados = {
+        'versao': VERSAO_DADOS,
+        'parede': id_inteiro(parede.Id),
+        'face': face,
+        'altura': altura_metros,
+        'numero': numero_tomadas,
+        'intervalo': intervalo_metros,
+        'eletrica': [potencia_aparente, fator_potencia, tensao, numero_fases],
+    }
+    vinculo = getattr(parede, 'vinculo', None)
+    if vinculo is not None:
+        dados['vinculo'] = id_inteiro(vinculo.Id)
+    return dados
+
+
+def esquema():
+    """Esquema da marcação, criado na primeira utilização da sessão."""
+    if 'esquema' not in _ESQUEMA:
+        from System import Guid, String
+        from Autodesk.Revit.DB.ExtensibleStorage import AccessLevel, Schema, SchemaBuilder
+
+        guid = Guid(GUID_ESQUEMA)
+        schema = Schema.Lookup(guid)
+        if schema is None:
+            construtor = SchemaBuilder(guid)
+            construtor.SetReadAccessLevel(AccessLevel.Public)
+            construtor.SetWriteAccessLevel(AccessLevel.Public)
+            construtor.SetSchemaName(NOME_ESQUEMA)
+            construtor.AddSimpleField(CAMPO_DADOS, String)
+            schema = construtor.Finish()
+        _ESQUEMA.update(esquema=schema, guid=guid, String=String)
+    return _ESQUEMA['esquema']
+
+
+def entidade(dados):
+    """Entidade com ``dados`` serializados.
+
+    ``SetEntity`` copia a entidade, então a mesma pode ser gravada em todas
+    as tomadas de uma parede sem serializar de novo.
+    """
+    from Autodesk.Revit.DB.ExtensibleStorage import Entity
+
+    nova = Entity(esquema())
+    nova.Set[_ESQUEMA['String']](CAMPO_DADOS, json.dumps(dados, sort_keys=True))
+    return nova
+
+
+def gravar(elemento, dados):
+    """Grava ``dados`` no elemento (exige transação aberta)."""
+    elemento.SetEntity(entidade(dados))
+
+
+def ler(elemento):
+    """Dados gravados no elemento, ou None se ele não é gerenciado."""
+    registro = elemento.GetEntity(esquema())
+    if registro is None or not registro.IsValid():
+        return None
+    texto = registro.Get[_ESQUEMA['String']](CAMPO_DADOS)
+    if not texto:
+        return None
+    try:
+        return json.loads(texto)
+    except ValueError:
+        return None
+
+
+def _coletor_marcados(doc):
+    """Instâncias com a entidade do esquema (filtro rápido, sem ler os dados)."""
+    from Autodesk.Revit.DB import FamilyInstance, FilteredElementCollector
+    from Autodesk.Revit.DB.ExtensibleStorage import ExtensibleStorageFilter
+
+    esquema()
+    return FilteredElementCollector(doc) \
+        .OfClass(FamilyInstance) \
+        .WherePasses(ExtensibleStorageFilter(_ESQUEMA['guid']))
+
+
+def gerenciadas_por_parede(doc, ids_paredes=None):
+    """``{chave_parede: [(tomada, dados), ...]}`` em uma única passada.
+
+    ``ids_paredes`` opcional limita o resultado às paredes informadas
+    (chaves de ``chave_parede``).
+    """
+    por_parede = {}
+    for tomada in _coletor_marcados(doc):
+        dados = ler(tomada)
+        if dados is None:
+            continue
+        id_parede = _chave_dados(dados)
+        if ids_paredes is not None and id_parede not in ids_paredes:
+            continue
+        por_parede.setdefault(id_parede, []).append((tomada, dados))
+    return por_parede
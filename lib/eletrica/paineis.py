@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""Índice de painéis elétricos por ElementId com consultas espaciais.
+
+``obter_paineis_eletricos`` coletava todos os ``OST_ElectricalEquipment`` a
+cada chamada e usava ``painel.Name`` como chave, de modo que painéis com o
+mesmo nome de tipo se sobrescreviam. O índice guarda, por id, o nome de
+exibição, o nível, a posição, o sistema de distribuição e as tensões, é
+construído uma vez por sessão (reconstruído apenas se o conjunto de
+painéis mudar) e responde "N painéis mais próximos" e "painéis
+compatíveis com 127/220 V" através de uma grade espacial.
+"""
+
+from collections import namedtuple
+
+from eletrica import rastreio, sessao
+from eletrica.espacial import GradeEspacial
+
+# Tamanho da célula da grade (pés, ~10 m)
+TAMANHO_CELULA = 32.8084
+
+# Tolerância relativa na comparação de tensões
+TOLERANCIA_TENSAO = 0.05
+
+RegistroPainel = namedtuple('RegistroPainel', [
+    'id', 'nome', 'nivel', 'x', 'y', 'z', 'sistema', 'tensao_fn', 'tensao_ff',
+])
+
+
+def tensao_compativel(valor, referencia, tolerancia=TOLERANCIA_TENSAO):
+    return valor is not None and abs(valor - referencia) <= tolerancia * referencia
+
+
+class IndicePaineis(object):
+    """Registros de painéis por id mais uma grade espacial das posições."""
+
+    def __init__(self, registros, tamanho_celula=TAMANHO_CELULA):
+        self.registros = dict((r.id, r) for r in registros)
+        self.grade = GradeEspacial(tamanho_celula)
+        for registro in registros:
+            self.grade.inserir(registro.x, registro.y, registro.id)
+
+    def __len__(self):
+        return len(self.registros)
+
+    def nome_exibicao(self, id_painel):
+        """Nome único para listas: nome, nível e id."""
+        r = self.registros[id_painel]
+        return u"{} - {} [{}]".format(r.nome, r.nivel or u"Sem nível", r.id)
+
+    def compativeis(self, tensao_fn=None, tensao_ff=None):
+        """Ids dos painéis cujo sistema atende às tensões informadas (ex.: 127/220)."""
+        return [
+            r.id for r in self.registros.values()
+            if (tensao_fn is None or tensao_compativel(r.tensao_fn, tensao_fn))
+            and (tensao_ff is None or tensao_compativel(r.tensao_ff, tensao_ff))
+        ]
+
+    def atende_tensao(self, id_painel, tensao):
+        """True se a tensão do circuito é a fase-neutro ou a fase-fase do painel."""
+        r = self.registros[id_painel]
+        return tensao_compativel(r.tensao_fn, tensao) or tensao_compativel(r.tensao_ff, tensao)
+
+    def mais_proximos(self, x, y, n=5, tensao=None):
+        """Os ``n`` painéis mais próximos de ``(x, y)`` como ``(distância, id)``.
+
+        Com ``tensao`` (V) apenas painéis que a fornecem são considerados.
+        """
+        filtro = None
+        if tensao:
+            filtro = lambda id_painel: self.atende_tensao(id_painel, tensao)  # noqa: E731
+        return self.grade.mais_proximos(x, y, n, filtro)
+
+    def sugerir(self, pontos, tensao=None, n=None):
+        """Painéis ordenados pela distância ao centroide de ``pontos`` ``[(x, y)]``.
+
+        Painéis incompatíveis com ``tensao`` vão para o fim da lista.
+        """
+        n = n or len(self.registros)
+        cx = sum(p[0] for p in pontos) / float(len(pontos))
+        cy = sum(p[1] for p in pontos) / float(len(pontos))
+        sugeridos = self.mais_proximos(cx, cy, n, tensao)
+        if tensao and len(sugeridos) < n:
+            vistos = set(id_painel for _, id_painel in sugeridos)
+            restantes = [
+                par for par in self.mais_proximos(cx, cy, len(self.registros))
+                if par[1] not in vistos
+            ]
+            sugeridos = sugeridos + restantes
+        return sugeridos[:n]
+
+
+def para_volts(valor_interno):
+    from Autodesk.Revit.DB import UnitUtils
+    try:
+        from Autodesk.Revit.DB import UnitTypeId
+        return UnitUtils.ConvertFromInternalUnits(valor_interno, UnitTypeId.Volts)
+    except ImportError:
+        from Autodesk.Revit.DB import DisplayUnitType
+        return UnitUtils.ConvertFromInternalUnits(valor_interno, DisplayUnitType.DUT_VOLTS)
+
+
+def _sistema_distribuicao(doc, painel, cache_sistemas):
+    """Nome e tensões (fase-neutro, fase-fase) do sistema de distribuição do painel."""
+    from Autodesk.Revit.DB import BuiltInParameter
+    from eletrica.catalogo import id_inteiro
+
+    param = painel.get_Parameter(BuiltInParameter.RBS_FAMILY_CONTENT_DISTRIBUTION_SYSTEM)
+    if not param or not param.HasValue:
+        return None, None, None
+    sistema_id = param.AsElementId()
+    chave = id_inteiro(sistema_id)
+    if chave not in cache_sistemas:
+        sistema = doc.GetElement(sistema_id)
+        if sistema is None:
+            cache_sistemas[chave] = (None, None, None)
+        else:
+            tensoes = []
+            for tipo_tensao in (sistema.VoltageLineToGround, sistema.VoltageLineToLine):
+                tensoes.append(para_volts(tipo_tensao.ActualValue) if tipo_tensao else None)
+            cache_sistemas[chave] = (sistema.Name, tensoes[0], tensoes[1])
+    return cache_sistemas[chave]
+
+
+def ler_registro(doc, painel, cache_niveis, cache_sistemas):
+    from eletrica.catalogo import id_inteiro
+
+    ponto = painel.Location.Point
+    id_nivel = id_inteiro(painel.LevelId)
+    if id_nivel not in cache_niveis:
+        nivel = doc.GetElement(painel.LevelId)
+        cache_niveis[id_nivel] = nivel.Name if nivel is not None else None
+    sistema, tensao_fn, tensao_ff = _sistema_distribuicao(doc, painel, cache_sistemas)
+    return RegistroPainel(
+        id_inteiro(painel.Id), painel.Name, cache_niveis[id_nivel],
+        ponto.X, ponto.Y, ponto.Z, sistema, tensao_fn, tensao_ff,
+    )
+
+
+def _coletor_paineis(doc):
+    from Autodesk.Revit.DB import BuiltInCategory, FamilyInstance, FilteredElementCollector
+
+    return FilteredElementCollector(doc) \
+        .OfCategory(BuiltInCategory.OST_ElectricalEquipment) \
+        .OfClass(FamilyInstance)
+
+
+def construir_registros(doc):
+    registros = []
+    cache_niveis = {}
+    cache_sistemas = {}
+    for painel in _coletor_paineis(doc):
+        try:
+            registros.append(ler_registro(doc, painel, cache_niveis, cache_sistemas))
+        except Exception:
+            # Painéis sem localização pontual não entram no índice
+            pass
+    return registros
+
+
+def _assinatura_paineis(doc):
+    """Valores brutos que definem os registros: posição, nome, nível e sistema de cada painel.
+
+    Lê só propriedades baratas de cada painel e, uma vez por sistema de
+    distribuição, os valores das tensões, sem nomes de nível nem conversões
+    de unidade.
+    """
+    from Autodesk.Revit.DB import BuiltInParameter
+    from eletrica.catalogo import id_inteiro
+
+    paineis = []
+    sistemas = {}
+    for painel in _coletor_paineis(doc):
+        try:
+            ponto = painel.Location.Point
+        except Exception:
+            continue
+        param = painel.get_Parameter(BuiltInParameter.RBS_FAMILY_CONTENT_DISTRIBUTION_SYSTEM)
+        id_sistema = id_inteiro(param.AsElementId()) if param and param.HasValue else None
+        if id_sistema is not None and id_sistema not in sistemas:
+            sistema = doc.GetElement(param.AsElementId())
+            sistemas[id_sistema] = None if sistema is None else tuple(
+                tipo.ActualValue if tipo else None
+                for tipo in (sistema.VoltageLineToGround, sistema.VoltageLineToLine))
+        paineis.append((id_inteiro(painel.Id), painel.Name, id_inteiro(painel.LevelId),
+                        ponto.X, ponto.Y, ponto.Z, id_sistema))
+    paineis.sort()
+    return tuple(paineis), tuple(sorted(sistemas.items()))
+
+
+def registros_da_sessao(doc):
+    """Registros dos painéis do documento, reaproveitados durante a sessão do Revit.
+
+    A assinatura é a versão do documento mais, por painel, id, nome, nível,
+    posição e sistema de distribuição, e as tensões de cada sistema. A
+    versão só muda ao salvar; os valores por painel fazem os registros
+    serem relidos quando um painel é criado, removido, movido ou trocado de
+    sistema, ou quando as tensões de um sistema mudam, na mesma sessão.
+    Nomes de nível e de sistema renomeados só são relidos após salvar.
+    """
+    from eletrica.catalogo import versao_documento
+
+    assinatura = (versao_documento(doc), _assinatura_paineis(doc))
+    registros = sessao.memorizar(
+        'indice_paineis', doc, assinatura,
+        lambda: [tuple(r) for r in construir_registros(doc)],
+    )
+    return [RegistroPainel(*r) for r in registros]
+
+
+@rastreio.medido()
+def indice_paineis(doc):
+    """Índice de painéis do documento (registros reaproveitados na sessão)."""
+    return IndicePaineis(registros_da_sessao(doc))
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""Regravação em massa dos parâmetros elétricos de tomadas existentes.
+
+"Definir alguns parametros de tomada" grava S, cos φ, V, fases e P em uma
+única tomada recém-inserida, com um ``LookupParameter`` por campo. Para
+reparametrizar centenas de tomadas (ex.: troca do sistema de tensão):
+
+- as definições dos parâmetros são resolvidas uma vez por símbolo
+  (``ParametrosFamilia``) e lidas/gravadas com ``get_Parameter``;
+- os valores atuais de todas as tomadas vão para colunas
+  (``CargasEletricas``), os campos informados pelo usuário são sobrepostos
+  e P, Q e a corrente são calculados de uma só vez (NumPy quando
+  disponível, módulo ``array`` caso contrário);
+- só os valores que mudaram são gravados, todos em uma única etapa do
+  ``transacoes.Agendador``.
+"""
+
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # IronPython
+    np = None
+
+from eletrica import catalogo, plano, rastreio, transacoes
+from eletrica.catalogo import id_inteiro
+
+# Campo -> nomes aceitos do parâmetro (na ordem de preferência) e se é inteiro.
+# Os primeiros nomes são os gravados pela R02, os demais os de "Definir".
+CAMPOS = (
+    ('potencia_aparente', (plano.PARAM_POTENCIA_APARENTE, 'Potencia_Aparente'), False),
+    ('fator_potencia', (plano.PARAM_FATOR_POTENCIA, 'Fator_Potencia'), False),
+    ('tensao', ('Tensão (V)', 'Tensao'), False),
+    ('numero_fases', ('Número de Fases', 'Numero_Fases'), True),
+    ('potencia_ativa', ('Potência Ativa (W)', 'Potencia_Ativa'), False),
+    ('potencia_reativa', ('Potência Reativa (VAr)', 'Potencia_Reativa'), False),
+    ('corrente', ('Corrente (A)', 'Corrente'), False),
+)
+
+# Campos informados pelo usuário e campos calculados
+ENTRADAS = ('potencia_aparente', 'fator_potencia', 'tensao', 'numero_fases')
+DERIVADOS = ('potencia_ativa', 'potencia_reativa', 'corrente')
+
+# Origens dos alvos oferecidas pela ferramenta
+ORIGEM_SELECAO = 'Seleção atual'
+ORIGEM_VISTA = 'Vista ativa'
+ORIGEM_PROJETO = 'Projeto inteiro'
+ORIGENS = (ORIGEM_SELECAO, ORIGEM_VISTA, ORIGEM_PROJETO)
+
+TOLERANCIA_VALOR = 1e-9
+
+
+class ParametrosFamilia(object):
+    """Definições dos campos elétricos de um símbolo, resolvidas na primeira instância.
+
+    Campos ausentes ou de tipo incompatível ficam de fora de ``definicoes``;
+    os somente leitura são lidos, mas nunca gravados.
+    """
+
+    def __init__(self):
+        self.definicoes = {}
+        self.somente_leitura = set()
+
+    @classmethod
+    def resolver(cls, instancia):
+        from Autodesk.Revit.DB import StorageType
+
+        mapa = cls()
+        for campo, nomes, inteiro in CAMPOS:
+            esperado = StorageType.Integer if inteiro else StorageType.Double
+            for nome in nomes:
+                param = instancia.LookupParameter(nome)
+                if param and param.StorageType == esperado:
+                    mapa.definicoes[campo] = param.Definition
+                    if param.IsReadOnly:
+                        mapa.somente_leitura.add(campo)
+                    break
+        return mapa
+
+    def graveis(self):
+        return [c for c in self.definicoes if c not in self.somente_leitura]
+
+
+class CargasEletricas(object):
+    """Valores elétricos em colunas (uma posição por tomada)."""
+
+    def __init__(self):
+        self.potencia_aparente = array('d')
+        self.fator_potencia = array('d')
+        self.tensao = array('d')
+        self.numero_fases = array('l')
+        self.potencia_ativa = array('d')
+        self.potencia_reativa = array('d')
+        self.corrente = array('d')
+
+    def __len__(self):
+        return len(self.potencia_aparente)
+
+    def adicionar(self, potencia_aparente, fator_potencia, tensao, numero_fases):
+        self.potencia_aparente.append(potencia_aparente)
+        self.fator_potencia.append(fator_potencia)
+        self.tensao.append(tensao)
+        self.numero_fases.append(numero_fases)
+
+
+def calcular_derivados(cargas):
+    """Preenche P = S·cos φ, Q = S·sen φ e I = S / (V·√3 trifásico ou V) de todas as cargas.
+
+    Tensão nula resulta em corrente nula.
+    """
+    if np is not None and len(cargas):
+        s = np.frombuffer(cargas.potencia_aparente, dtype=np.float64)
+        fp = np.clip(np.frombuffer(cargas.fator_potencia, dtype=np.float64), 0.0, 1.0)
+        tensao = np.frombuffer(cargas.tensao, dtype=np.float64)
+        fases = np.array(cargas.numero_fases, dtype=np.float64)
+        divisor = tensao * np.where(fases == 3, math.sqrt(3.0), 1.0)
+        corrente = np.zeros_like(s)
+        np.divide(s, divisor, out=corrente, where=divisor > 0)
+        cargas.potencia_ativa = array('d', (s * fp).tobytes())
+        cargas.potencia_reativa = array('d', (s * np.sqrt(1.0 - fp * fp)).tobytes())
+        cargas.corrente = array('d', corrente.tobytes())
+        return cargas
+
+    raiz3 = math.sqrt(3.0)
+    p, q, i = array('d'), array('d'), array('d')
+    for s, fp, tensao, fases in zip(
+            cargas.potencia_aparente, cargas.fator_potencia, cargas.tensao, cargas.numero_fases):
+        fp = min(max(fp, 0.0), 1.0)
+        divisor = tensao * (raiz3 if fases == 3 else 1.0)
+        p.append(s * fp)
+        q.append(s * math.sqrt(1.0 - fp * fp))
+        i.append(s / divisor if divisor > 0 else 0.0)
+    cargas.potencia_ativa, cargas.potencia_reativa, cargas.corrente = p, q, i
+    return cargas
+
+
+class ResultadoParametrizacao(object):
+    def __init__(self):
+        self.alteradas = []
+        self.mantidas = 0
+        self.escritas = 0
+        # Tomadas cujo símbolo não tem nenhum parâmetro elétrico gravável
+        self.sem_parametros = []
+        self.erros = []
+        self.cargas = None
+
+
+def coletar_tomadas(doc, origem, ids_selecao=(), termos=catalogo.TERMOS_TOMADA):
+    """Tomadas (``OST_ElectricalFixtures``) da seleção, da vista ativa ou do projeto.
+
+    Só entram instâncias cuja família contém algum dos ``termos`` no nome
+    (None aceita todas); a verificação é feita uma vez por símbolo.
+    """
+    from Autodesk.Revit.DB import BuiltInCategory, FamilyInstance, FilteredElementCollector
+
+    if origem == ORIGEM_SELECAO:
+        if not ids_selecao:
+            return []
+        coletor = FilteredElementCollector(doc, ids_selecao)
+    elif origem == ORIGEM_VISTA:
+        coletor = FilteredElementCollector(doc, doc.ActiveView.Id)
+    else:
+        coletor = FilteredElementCollector(doc)
+    coletor = coletor.OfCategory(BuiltInCategory.OST_ElectricalFixtures).OfClass(FamilyInstance)
+
+    if termos is None:
+        return list(coletor)
+    termos = [t.lower() for t in termos]
+    aceitos = {}
+    tomadas = []
+    for instancia in coletor:
+        simbolo = instancia.Symbol
+        chave = id_inteiro(simbolo.Id)
+        aceito = aceitos.get(chave)
+        if aceito is None:
+            nome = u"{} {}".format(simbolo.FamilyName, simbolo.Name).lower()
+            aceito = aceitos[chave] = any(t in nome for t in termos)
+        if aceito:
+            tomadas.append(instancia)
+    return tomadas
+
+
+def _ler(param, inteiro):
+    if param is None or not param.HasValue:
+        return None
+    return param.AsInteger() if inteiro else param.AsDouble()
+
+
+def ler_cargas(tomadas, mapas, novos):
+    """Colunas com os valores atuais de cada tomada e os campos de ``novos`` sobrepostos.
+
+    ``novos`` mapeia campos de ``ENTRADAS`` para o valor a aplicar; campos
+    ausentes ou None mantêm o valor atual (0 quando a família não o possui;
+    uma fase por padrão). ``novos['sistema_tensao']`` = ``(fase-neutro,
+    fase-fase)`` escolhe a tensão de cada tomada pelo seu número de fases.
+    """
+    inteiros = dict((campo, inteiro) for campo, _, inteiro in CAMPOS)
+    cargas = CargasEletricas()
+    for tomada in tomadas:
+        mapa = mapas[id_inteiro(tomada.Symbol.Id)]
+        valores = []
+        for campo in ENTRADAS:
+            valor = novos.get(campo)
+            if valor is None:
+                definicao = mapa.definicoes.get(campo)
+                if definicao is not None:
+                    valor = _ler(tomada.get_Parameter(definicao), inteiros[campo])
+            if valor is None:
+                valor = 1 if campo == 'numero_fases' else 0.0
+            valores.append(valor)
+        sistema = novos.get('sistema_tensao')
+        if sistema and novos.get('tensao') is None:
+            valores[2] = sistema[0] if valores[3] == 1 else sistema[1]
+        cargas.adicionar(*valores)
+    return cargas
+
+
+def resolver_mapas(tomadas, mapas=None):
+    """``ParametrosFamilia`` de cada símbolo das tomadas (``mapas`` é completado e devolvido)."""
+    mapas = {} if mapas is None else mapas
+    for tomada in tomadas:
+        chave = id_inteiro(tomada.Symbol.Id)
+        if chave not in mapas:
+            mapas[chave] = ParametrosFamilia.resolver(tomada)
+    return mapas
+
+
+def gravar_cargas(tomadas, mapas, cargas, resultado, campos=None):
+    """Grava em cada tomada os valores das colunas que mudaram (sem abrir transação).
+
+    ``campos`` limita a gravação (ex.: ``DERIVADOS``); por padrão todos os
+    campos graváveis da família.
+    """
+    inteiros = dict((campo, inteiro) for campo, _, inteiro in CAMPOS)
+    colunas = dict((campo, getattr(cargas, campo)) for campo in ENTRADAS + DERIVADOS)
+    for k, tomada in enumerate(tomadas):
+        mapa = mapas[id_inteiro(tomada.Symbol.Id)]
+        graveis = mapa.graveis()
+        if campos is not None:
+            graveis = [c for c in graveis if c in campos]
+        if not graveis:
+            resultado.sem_parametros.append(tomada)
+            continue
+        escritas = 0
+        try:
+            for campo in graveis:
+                param = tomada.get_Parameter(mapa.definicoes[campo])
+                valor = colunas[campo][k]
+                atual = _ler(param, inteiros[campo])
+                if atual is not None and abs(atual - valor) <= TOLERANCIA_VALOR:
+                    continue
+                param.Set(int(valor) if inteiros[campo] else float(valor))
+                escritas += 1
+        except Exception as e:
+            resultado.erros.append("Erro na tomada {}: {}".format(id_inteiro(tomada.Id), e))
+        resultado.escritas += escritas
+        if escritas:
+            resultado.alteradas.append(tomada)
+        else:
+            resultado.mantidas += 1
+    return resultado
+
+
+@rastreio.medido()
+def parametrizar(doc, tomadas, novos, agendador=None, nome="Parametrizar Tomadas"):
+    """Aplica ``novos`` a todas as ``tomadas`` e recalcula P, Q e a corrente.
+
+    Lê e calcula tudo antes de abrir a transação; a gravação é uma única
+    etapa do ``agendador`` (ou de um agendador próprio) e só escreve os
+    valores que mudaram.
+    """
+    resultado = ResultadoParametrizacao()
+    mapas = resolver_mapas(tomadas)
+    cargas = calcular_derivados(ler_cargas(tomadas, mapas, novos))
+    resultado.cargas = cargas
+
+    if agendador is None:
+        agendador = transacoes.Agendador(doc, nome)
+    with agendador.etapa(nome):
+        gravar_cargas(tomadas, mapas, cargas, resultado)
+    return resultado
+
+
+def recalcular_derivados(tomadas, mapas=None):
+    """Recalcula P, Q e a corrente a partir dos valores atuais e grava os que mudaram.
+
+    Não abre transação: é chamado dentro de uma já aberta (ex.: pelo
+    ``atualizador``). As entradas (S, cos φ, V, fases) não são regravadas.
+    """
+    resultado = ResultadoParametrizacao()
+    mapas = resolver_mapas(tomadas, mapas)
+    resultado.cargas = calcular_derivados(ler_cargas(tomadas, mapas, {}))
+    return gravar_cargas(tomadas, mapas, resultado.cargas, resultado, DERIVADOS)
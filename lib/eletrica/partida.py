@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Tempo de partida das ferramentas: do clique até o primeiro diálogo.
+
+Cada script guarda ``time.time()`` como primeira instrução e chama
+``primeiro_dialogo`` logo antes de abrir a primeira janela. O tempo
+decorrido é acrescentado a um CSV nos dados do pyRevit
+(``ferramenta;segundos;data``), para acompanhar a evolução entre versões
+(``benchmarks/tempos_partida.py`` resume o arquivo).
+
+``ferramenta`` reúne o início e o fim comuns a todos os scripts::
+
+    if __name__ == "__main__":
+        with partida.ferramenta(__title__, _INICIO):
+            main()
+"""
+
+import io
+import os
+import time
+from contextlib import contextmanager
+
+from eletrica import rastreio
+
+ARQUIVO_REGISTRO = 'tempos_partida'
+
+_ESTADO = {'inicio': None, 'registrado': False}
+
+
+def marcar_inicio(instante=None):
+    """Define o instante do clique (``time.time()`` do topo do script)."""
+    _ESTADO['inicio'] = time.time() if instante is None else instante
+    _ESTADO['registrado'] = False
+
+
+def _modo_depuracao():
+    """Ctrl+clique no botão do pyRevit (None fora do pyRevit: vale ``ELETRICA_RASTREIO``)."""
+    try:
+        from pyrevit import EXEC_PARAMS
+        return EXEC_PARAMS.debug_mode or None
+    except Exception:
+        return None
+
+
+@contextmanager
+def ferramenta(titulo, inicio=None, rastrear=None):
+    """Execução de uma ferramenta: marca o início e rastreia o bloco.
+
+    ``inicio`` é o ``time.time()`` do topo do script (sem ele o tempo de
+    partida não é registrado). ``rastrear`` None ativa o rastreio no
+    Ctrl+clique ou com ``ELETRICA_RASTREIO``; ao sair do bloco, mesmo com
+    erro, o rastreio é gravado.
+    """
+    if inicio is not None:
+        marcar_inicio(inicio)
+    rastreio.iniciar(titulo, _modo_depuracao() if rastrear is None else rastrear)
+    try:
+        yield
+    finally:
+        rastreio.finalizar()
+
+
+def caminho_registro():
+    try:
+        from pyrevit import script
+        return script.get_universal_data_file(ARQUIVO_REGISTRO, 'csv')
+    except Exception:
+        import tempfile
+        return os.path.join(tempfile.gettempdir(), ARQUIVO_REGISTRO + '.csv')
+
+
+def primeiro_dialogo(ferramenta, caminho=None):
+    """Registra o tempo até o primeiro diálogo (só na primeira chamada).
+
+    Retorna os segundos decorridos, ou None se já registrado ou sem início.
+    Falhas de gravação não interrompem a ferramenta.
+    """
+    if _ESTADO['inicio'] is None or _ESTADO['registrado']:
+        return None
+    _ESTADO['registrado'] = True
+    segundos = time.time() - _ESTADO['inicio']
+    try:
+        with io.open(caminho or caminho_registro(), 'a', encoding='utf-8') as arquivo:
+            arquivo.write(u"{};{:.4f};{}\n".format(
+                ferramenta, segundos, time.strftime('%Y-%m-%d %H:%M:%S')))
+    except (IOError, OSError):
+        pass
+    return segundos
+
+
+def ler_registros(caminho=None):
+    """Lista de ``(ferramenta, segundos, data)`` do arquivo de registro."""
+    caminho = caminho or caminho_registro()
+    if not os.path.exists(caminho):
+        return []
+    registros = []
+    with io.open(caminho, 'r', encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            partes = linha.rstrip(u"\n").split(u";")
+            if len(partes) != 3:
+                continue
+            try:
+                registros.append((partes[0], float(partes[1]), partes[2]))
+            except ValueError:
+                continue
+    return registros
+
+
+def _mediana(valores):
+    ordenados = sorted(valores)
+    meio = len(ordenados) // 2
+    if len(ordenados) % 2:
+        return ordenados[meio]
+    return (ordenados[meio - 1] + ordenados[meio]) / 2.0
+
+
+def resumo(registros):
+    """``{ferramenta: (execuções, mediana, máximo)}`` em segundos."""
+    por_ferramenta = {}
+    for ferramenta, segundos, _ in registros:
+        por_ferramenta.setdefault(ferramenta, []).append(segundos)
+    return dict(
+        (ferramenta, (len(valores), _mediana(valores), max(valores)))
+        for ferramenta, valores in por_ferramenta.items()
+    )
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""Plano de inserção compilado uma vez por (parede, símbolo, face).
+
+No laço original de ``inserir_tomadas`` cada tomada recalculava a curva da
+parede, a direção normalizada, o ângulo (``AngleTo``/``CrossProduct``), o
+giro de 180° da face traseira e procurava três parâmetros por nome com
+``LookupParameter``. O plano guarda tudo isso; o laço passa a apenas criar
+a instância, girá-la e gravar os valores.
+"""
+
+import math
+
+from eletrica import rastreio
+
+# Parâmetros de instância gravados em cada tomada
+PARAM_ELEVACAO = 'Elevação do Ponto'
+PARAM_POTENCIA_APARENTE = 'Potência Aparente (VA)'
+PARAM_FATOR_POTENCIA = 'Fator de Potência'
+
+
+def angulo_da_direcao(direcao, face):
+    """Ângulo (rad) entre o eixo X e a direção da parede, girado 180° na face traseira."""
+    angulo = math.atan2(direcao.Y, direcao.X)
+    if face == 'Traseira':
+        angulo += math.pi
+    return angulo
+
+
+class ParametrosCompilados(object):
+    """Definições dos parâmetros da família resolvidas na primeira instância.
+
+    Um ``Parameter`` pertence a uma instância, mas a ``Definition`` é a mesma
+    para todas as instâncias do símbolo: ``get_Parameter(definicao)`` evita a
+    busca por nome de ``LookupParameter``. Parâmetros ausentes ou de tipo
+    incompatível ficam como None e não são mais procurados.
+    """
+
+    def __init__(self):
+        self.resolvido = False
+        self.elevacao = None
+        self.potencia_aparente = None
+        self.fator_potencia = None
+
+    def resolver(self, instancia):
+        from Autodesk.Revit.DB import StorageType
+
+        param = instancia.LookupParameter(PARAM_ELEVACAO)
+        if param and not param.IsReadOnly:
+            self.elevacao = param.Definition
+
+        param = instancia.LookupParameter(PARAM_POTENCIA_APARENTE)
+        if param and param.StorageType == StorageType.Double:
+            self.potencia_aparente = param.Definition
+
+        param = instancia.LookupParameter(PARAM_FATOR_POTENCIA)
+        if param and param.StorageType == StorageType.Double:
+            self.fator_potencia = param.Definition
+
+        self.resolvido = True
+
+
+class PlanoInsercao(object):
+    """Orientação e parâmetros de uma parede, válidos para todas as suas tomadas."""
+
+    def __init__(self, parede, simbolo, face, direcao, angulo, parametros, arco=None):
+        self.parede = parede
+        self.simbolo = simbolo
+        self.face = face
+        self.direcao = direcao
+        self.angulo = angulo
+        self.parametros = parametros
+        # Paredes curvas: (cx, cy, sentido); o ângulo depende de cada ponto
+        self.arco = arco
+        # Classes da API importadas uma vez, fora do laço de instanciação
+        from Autodesk.Revit.DB import ElementTransformUtils, Line, LocationPoint, XYZ
+        from Autodesk.Revit.DB.Structure import StructuralType
+        self._api = (ElementTransformUtils, Line, LocationPoint, XYZ, StructuralType.NonStructural)
+
+    @classmethod
+    def compilar(cls, parede, simbolo, face, parametros=None):
+        """Calcula uma única vez a direção e o ângulo de rotação da parede."""
+        from Autodesk.Revit.DB import Arc
+        from eletrica.geometria import varredura_do_arco
+
+        curva = parede.Location.Curve
+        inicio, fim = curva.GetEndPoint(0), curva.GetEndPoint(1)
+        direcao = (fim - inicio).Normalize()
+        arco = None
+        if isinstance(curva, Arc):
+            centro = curva.Center
+            meio = curva.Evaluate(0.5, True)
+            _, varredura = varredura_do_arco(
+                centro.X, centro.Y, (inicio.X, inicio.Y), (fim.X, fim.Y), (meio.X, meio.Y)
+            )
+            arco = (centro.X, centro.Y, 1.0 if varredura >= 0 else -1.0)
+        return cls(
+            parede,
+            simbolo,
+            face,
+            direcao,
+            angulo_da_direcao(direcao, face),
+            parametros or ParametrosCompilados(),
+            arco,
+        )
+
+    def angulo_em(self, ponto):
+        """Ângulo de rotação no ponto (constante em paredes retas)."""
+        if self.arco is None:
+            return self.angulo
+        cx, cy, sentido = self.arco
+        angulo = math.atan2(ponto.Y - cy, ponto.X - cx) + sentido * math.pi / 2
+        if self.face == 'Traseira':
+            angulo += math.pi
+        return angulo
+
+    def _criar(self, doc, ponto_insercao):
+        """Instância hospedada na parede e girada para a face."""
+        ElementTransformUtils, Line, _, XYZ, nao_estrutural = self._api
+
+        # Inserir a tomada usando a parede como host
+        with rastreio.acumulado('NewFamilyInstance'):
+            tomada_instancia = doc.Create.NewFamilyInstance(
+                ponto_insercao,
+                self.simbolo,
+                self.parede,
+                nao_estrutural,
+            )
+
+        # Rotacionar em torno do eixo vertical que passa pelo ponto de inserção
+        eixo_rotacao = Line.CreateBound(ponto_insercao, ponto_insercao + XYZ.BasisZ)
+        with rastreio.acumulado('RotateElement'):
+            ElementTransformUtils.RotateElement(
+                doc, tomada_instancia.Id, eixo_rotacao, self.angulo_em(ponto_insercao)
+            )
+        return tomada_instancia
+
+    def instanciar(self, doc, ponto_insercao, potencia_aparente, fator_potencia):
+        """Cria, orienta e parametriza uma tomada (exige transação aberta)."""
+        _, _, LocationPoint, XYZ, _ = self._api
+        tomada_instancia = self._criar(doc, ponto_insercao)
+
+        parametros = self.parametros
+        if not parametros.resolvido:
+            parametros.resolver(tomada_instancia)
+
+        # Ajustar a altura usando o parâmetro 'Elevação do Ponto'
+        if parametros.elevacao is not None:
+            tomada_instancia.get_Parameter(parametros.elevacao).Set(ponto_insercao.Z)
+        else:
+            # Ajustar diretamente a posição Z
+            location = tomada_instancia.Location
+            if isinstance(location, LocationPoint):
+                point = location.Point
+                location.Point = XYZ(point.X, point.Y, ponto_insercao.Z)
+
+        # Definir os parâmetros elétricos na instância da família
+        if parametros.potencia_aparente is not None:
+            tomada_instancia.get_Parameter(parametros.potencia_aparente).Set(potencia_aparente)
+        if parametros.fator_potencia is not None:
+            tomada_instancia.get_Parameter(parametros.fator_potencia).Set(fator_potencia)
+
+        return tomada_instancia
+
+
+class CachePlanos(object):
+    """Planos por (parede, símbolo, face) e parâmetros compilados por símbolo.
+
+    Paredes que sabem compilar o próprio plano (``compilar_plano``, ex.:
+    ``vinculos.ParedeVinculada``) são compiladas por ele.
+    """
+
+    def __init__(self):
+        self._planos = {}
+        self._parametros = {}
+
+    def obter(self, parede, simbolo, face):
+        from eletrica.catalogo import id_inteiro
+        from eletrica.marcacao import chave_parede
+
+        id_simbolo = id_inteiro(simbolo.Id)
+        chave = (chave_parede(parede), id_simbolo, face)
+        plano = self._planos.get(chave)
+        if plano is None:
+            parametros = self._parametros.get(id_simbolo)
+            if parametros is None:
+                parametros = self._parametros[id_simbolo] = ParametrosCompilados()
+            compilar = getattr(parede, 'compilar_plano', None)
+            if compilar is None:
+                plano = PlanoInsercao.compilar(parede, simbolo, face, parametros)
+            else:
+                plano = compilar(simbolo, face, parametros)
+            self._planos[chave] = plano
+        return plano
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""Pré-visualização das posições das tomadas sem alterar o documento.
+
+A versão original criava, por ponto, um ``SketchPlane``, um ``ModelCurve``
+e um ``SetElementOverrides`` em uma transação, e depois apagava cada
+elemento com ``doc.Delete`` em outra: duas escritas no modelo e entradas
+no histórico de desfazer só para mostrar marcas vermelhas.
+
+Implementações disponíveis (todas com ``desenhar``/``limpar``):
+
+- ``PreviewTransiente``: gráficos temporários via DirectContext3D
+  (``pyrevit.revit.dc3dserver``); nada é gravado no documento;
+- ``PreviewElementos``: alternativa com linhas de modelo quando o
+  DirectContext3D não está disponível. Usa um único ``SketchPlane`` por
+  elevação, ``NewModelCurveArray``, uma passada de sobrescritas gráficas e
+  um ``TransactionGroup`` que é desfeito ao limpar (sem deixar histórico);
+- ``PreviewGravador``: apenas registra as chamadas, para testes fora do Revit.
+"""
+
+from itertools import repeat
+
+# Metade do comprimento da marca (0.2 pés ~ 0.06 metros)
+MEIO_COMPRIMENTO_MARCA = 0.2
+
+# Cor das marcas de pré-visualização (vermelho)
+COR_PREVIEW = (255, 0, 0)
+
+
+def segmentos_marcadores(pontos, direcao, meio_comprimento=MEIO_COMPRIMENTO_MARCA):
+    """Segmentos ``((x, y, z), (x, y, z))`` perpendiculares à parede em cada ponto.
+
+    ``pontos`` podem ser XYZ ou qualquer objeto com X, Y e Z. ``direcao`` é
+    uma direção única (objeto com X e Y) ou a lista das tangentes
+    ``(tx, ty)`` de cada ponto, para que as marcas em paredes curvas
+    acompanhem o arco.
+    """
+    if hasattr(direcao, 'X'):
+        direcao = repeat((direcao.X, direcao.Y))
+    segmentos = []
+    for p, (tx, ty) in zip(pontos, direcao):
+        norma = (tx * tx + ty * ty) ** 0.5 or 1.0
+        nx, ny = -ty / norma * meio_comprimento, tx / norma * meio_comprimento
+        segmentos.append(((p.X - nx, p.Y - ny, p.Z), (p.X + nx, p.Y + ny, p.Z)))
+    return segmentos
+
+
+class PreviewBase(object):
+    """Interface comum das pré-visualizações."""
+
+    def desenhar(self, segmentos):
+        raise NotImplementedError
+
+    def limpar(self):
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.limpar()
+
+
+class PreviewGravador(PreviewBase):
+    """Registra as chamadas sem desenhar nada (uso fora do Revit)."""
+
+    def __init__(self):
+        self.chamadas = []
+        self.segmentos = []
+
+    def desenhar(self, segmentos):
+        self.segmentos = list(segmentos)
+        self.chamadas.append(('desenhar', len(self.segmentos)))
+
+    def limpar(self):
+        self.segmentos = []
+        self.chamadas.append(('limpar', 0))
+
+
+class PreviewTransiente(PreviewBase):
+    """Gráficos temporários via DirectContext3D; não modifica o documento."""
+
+    def __init__(self, uidoc):
+        from pyrevit.revit import dc3dserver
+
+        self.uidoc = uidoc
+        self._dc3d = dc3dserver
+        self._servidor = None
+
+    def desenhar(self, segmentos):
+        from Autodesk.Revit.DB import ColorWithTransparency, XYZ
+
+        cor = ColorWithTransparency(COR_PREVIEW[0], COR_PREVIEW[1], COR_PREVIEW[2], 0)
+        if self._servidor is None:
+            self._servidor = self._dc3d.Server(uidoc=self.uidoc, name="Preview de Tomadas")
+        self._servidor.edges = [
+            self._dc3d.Edge(XYZ(*a), XYZ(*b), cor) for a, b in segmentos
+        ]
+        self.uidoc.RefreshActiveView()
+
+    def limpar(self):
+        if self._servidor is not None:
+            self._servidor.remove_server()
+            self._servidor = None
+            self.uidoc.RefreshActiveView()
+
+
+class PreviewElementos(PreviewBase):
+    """Linhas de modelo temporárias, desfeitas em bloco ao limpar."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._grupo = None
+
+    def desenhar(self, segmentos):
+        import clr
+        clr.AddReference('System')
+        from System.Collections.Generic import List
+        from Autodesk.Revit.DB import (
+            Color,
+            CurveArray,
+            ElementId,
+            Line,
+            OverrideGraphicSettings,
+            Plane,
+            SketchPlane,
+            Transaction,
+            TransactionGroup,
+            XYZ,
+        )
+
+        self.limpar()
+
+        # Um CurveArray por elevação: um único SketchPlane para cada uma
+        por_elevacao = {}
+        for a, b in segmentos:
+            curvas = por_elevacao.setdefault(round(a[2], 6), CurveArray())
+            curvas.Append(Line.CreateBound(XYZ(*a), XYZ(*b)))
+
+        self._grupo = TransactionGroup(self.doc, "Preview de Tomadas")
+        self._grupo.Start()
+        transacao = Transaction(self.doc, "Criar Preview")
+        transacao.Start()
+        try:
+            ids = List[ElementId]()
+            for elevacao, curvas in por_elevacao.items():
+                plano = Plane.CreateByNormalAndOrigin(XYZ.BasisZ, XYZ(0, 0, elevacao))
+                sketch_plane = SketchPlane.Create(self.doc, plano)
+                for model_curve in self.doc.Create.NewModelCurveArray(curvas, sketch_plane):
+                    ids.Add(model_curve.Id)
+
+            # Uma única passada de sobrescritas gráficas
+            ogs = OverrideGraphicSettings()
+            ogs.SetProjectionLineColor(Color(*COR_PREVIEW))
+            vista = self.doc.ActiveView
+            for elem_id in ids:
+                vista.SetElementOverrides(elem_id, ogs)
+            transacao.Commit()
+        except Exception:
+            transacao.RollBack()
+            self.limpar()
+            raise
+
+    def limpar(self):
+        # Desfazer o grupo remove todos os elementos de uma vez, sem histórico
+        if self._grupo is not None:
+            if self._grupo.HasStarted():
+                self._grupo.RollBack()
+            self._grupo = None
+
+
+def mostrar_preview(doc, uidoc, pontos, direcao, transiente=True, preview=None):
+    """Desenha as marcas dos pontos e retorna a pré-visualização usada.
+
+    ``direcao`` segue ``segmentos_marcadores``. Tenta o DirectContext3D
+    primeiro; se não estiver disponível (versão do Revit ou do pyRevit),
+    recorre às linhas de modelo temporárias. Um ``preview`` já construído
+    (ex.: ``PreviewGravador``) é usado diretamente.
+    """
+    segmentos = segmentos_marcadores(pontos, direcao)
+    if preview is not None:
+        preview.desenhar(segmentos)
+        return preview
+    if transiente:
+        preview = None
+        try:
+            preview = PreviewTransiente(uidoc)
+            preview.desenhar(segmentos)
+            return preview
+        except Exception:
+            if preview is not None:
+                try:
+                    preview.limpar()
+                except Exception:
+                    pass
+    preview = PreviewElementos(doc)
+    preview.desenhar(segmentos)
+    uidoc.RefreshActiveView()
+    return preview
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""Instrumentação das ferramentas: trechos, tempos acumulados e contadores.
+
+Uma execução lenta não dizia onde o tempo era gasto (coletores, diálogos,
+``NewFamilyInstance``/``RotateElement``, ``Regenerate``...). Com o
+rastreio ativo:
+
+- ``trecho(nome)`` (gerenciador de contexto) e ``medido(nome)``
+  (decorador) registram um evento com início e duração por chamada;
+- ``acumulado(nome)`` soma tempo e chamadas sem gerar eventos, para
+  chamadas da API dentro de laços (uma por tomada);
+- ``contar(nome)`` incrementa contadores (transações, regenerações...);
+- com ``registrar_contador_api`` (ex.: ``revit_falso.chamadas_api``) cada
+  trecho anota também as chamadas à API feitas dentro dele.
+
+``finalizar`` grava os eventos no formato Chrome Trace (abre em
+``chrome://tracing`` ou https://ui.perfetto.dev) e resume tudo em uma
+tabela no ``relatorio``. Desativado (o padrão), ``trecho``/``acumulado``
+devolvem um objeto vazio compartilhado e ``contar`` retorna de imediato.
+As ferramentas (``partida.ferramenta``) ativam o rastreio com Ctrl+clique
+ou com a variável de ambiente ``ELETRICA_RASTREIO``.
+"""
+
+import io
+import json
+import os
+import threading
+import time
+import timeit
+
+from eletrica import relatorio as _relatorio
+
+VARIAVEL_AMBIENTE = 'ELETRICA_RASTREIO'
+PREFIXO_ARQUIVO = 'rastreio'
+
+_relogio = timeit.default_timer
+
+_ESTADO = {
+    'ativo': False,
+    'ferramenta': None,
+    'origem': 0.0,
+    'contador_api': None,
+    'tid_principal': None,
+}
+_EVENTOS = []
+_ACUMULADOS = {}  # nome -> [chamadas, segundos, máximo, chamadas à API]
+_CONTADORES = {}
+_TRAVA = threading.Lock()
+
+
+class _Nulo(object):
+    """Gerenciador de contexto vazio usado com o rastreio desativado."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        return False
+
+
+_NULO = _Nulo()
+
+
+def ativo():
+    return _ESTADO['ativo']
+
+
+def iniciar(ferramenta, ativar=None):
+    """Começa o rastreio de uma execução; ``ativar`` None consulta ``ELETRICA_RASTREIO``.
+
+    Retorna True quando o rastreio ficou ativo.
+    """
+    if ativar is None:
+        ativar = bool(os.environ.get(VARIAVEL_AMBIENTE))
+    with _TRAVA:
+        del _EVENTOS[:]
+        _ACUMULADOS.clear()
+        _CONTADORES.clear()
+        _ESTADO['ferramenta'] = ferramenta
+        _ESTADO['origem'] = _relogio()
+        _ESTADO['tid_principal'] = threading.current_thread().ident
+        _ESTADO['ativo'] = bool(ativar)
+    return _ESTADO['ativo']
+
+
+def registrar_contador_api(funcao):
+    """``funcao()`` -> total de chamadas à API até o momento (None remove)."""
+    _ESTADO['contador_api'] = funcao
+
+
+def _chamadas_api():
+    funcao = _ESTADO['contador_api']
+    return funcao() if funcao is not None else None
+
+
+def _acumular(nome, segundos, api):
+    registro = _ACUMULADOS.get(nome)
+    if registro is None:
+        registro = _ACUMULADOS[nome] = [0, 0.0, 0.0, 0]
+    registro[0] += 1
+    registro[1] += segundos
+    if segundos > registro[2]:
+        registro[2] = segundos
+    if api:
+        registro[3] += api
+
+
+class _Trecho(object):
+    def __init__(self, nome, categoria, dados, evento):
+        self.nome = nome
+        self.categoria = categoria
+        self.dados = dados
+        self.evento = evento
+
+    def __enter__(self):
+        self._api = _chamadas_api()
+        self._inicio = _relogio()
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        fim = _relogio()
+        segundos = fim - self._inicio
+        api = None
+        if self._api is not None:
+            api = _chamadas_api() - self._api
+        with _TRAVA:
+            _acumular(self.nome, segundos, api)
+            if self.evento:
+                dados = dict(self.dados)
+                if api is not None:
+                    dados['api'] = api
+                if tipo is not None:
+                    dados['erro'] = tipo.__name__
+                _EVENTOS.append({
+                    'name': self.nome,
+                    'cat': self.categoria,
+                    'ph': 'X',
+                    'ts': (self._inicio - _ESTADO['origem']) * 1e6,
+                    'dur': segundos * 1e6,
+                    'pid': 1,
+                    'tid': threading.current_thread().ident,
+                    'args': dados,
+                })
+        return False
+
+
+def trecho(nome, categoria='etapa', **dados):
+    """Evento com duração (``with rastreio.trecho('Inserir'):``)."""
+    if not _ESTADO['ativo']:
+        return _NULO
+    return _Trecho(nome, categoria, dados, True)
+
+
+def acumulado(nome):
+    """Tempo e chamadas somados sob ``nome``, sem evento individual."""
+    if not _ESTADO['ativo']:
+        return _NULO
+    return _Trecho(nome, 'api', None, False)
+
+
+def medido(nome=None, categoria='funcao'):
+    """Decorador: cada chamada da função vira um ``trecho``."""
+    def decorar(funcao):
+        rotulo = nome or u"{}.{}".format(funcao.__module__.split('.')[-1], funcao.__name__)
+
+        def envolvida(*args, **kwargs):
+            if not _ESTADO['ativo']:
+                return funcao(*args, **kwargs)
+            with _Trecho(rotulo, categoria, {}, True):
+                return funcao(*args, **kwargs)
+
+        envolvida.__name__ = funcao.__name__
+        envolvida.__doc__ = funcao.__doc__
+        return envolvida
+    return decorar
+
+
+def contar(nome, quantidade=1):
+    if not _ESTADO['ativo']:
+        return
+    with _TRAVA:
+        _CONTADORES[nome] = _CONTADORES.get(nome, 0) + quantidade
+
+
+def resumo():
+    """``[(nome, chamadas, total s, máximo s, chamadas à API)]`` do maior para o menor total."""
+    with _TRAVA:
+        linhas = [(nome, r[0], r[1], r[2], r[3]) for nome, r in _ACUMULADOS.items()]
+    return sorted(linhas, key=lambda linha: -linha[2])
+
+
+def contadores():
+    with _TRAVA:
+        return dict(_CONTADORES)
+
+
+def dados_chrome():
+    """Documento Chrome Trace (``traceEvents``) da execução."""
+    with _TRAVA:
+        eventos = list(_EVENTOS)
+    metadados = [
+        {'name': 'process_name', 'ph': 'M', 'pid': 1, 'args': {'name': _ESTADO['ferramenta']}},
+    ]
+    for tid in sorted(set(e['tid'] for e in eventos)):
+        nome = 'principal' if tid == _ESTADO['tid_principal'] else 'auxiliar {}'.format(tid)
+        metadados.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': nome}})
+    return {
+        'traceEvents': metadados + eventos,
+        'displayTimeUnit': 'ms',
+        'otherData': {
+            'ferramenta': _ESTADO['ferramenta'],
+            'data': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'contadores': contadores(),
+            'acumulados': dict(
+                (nome, {'chamadas': n, 'segundos': total, 'maximo': maximo, 'api': api})
+                for nome, n, total, maximo, api in resumo()
+            ),
+        },
+    }
+
+
+def caminho_rastreio(ferramenta):
+    """Arquivo ``.json`` novo para a execução (pasta de dados do pyRevit ou temporária)."""
+    nome = u"{}_{}_{}".format(
+        PREFIXO_ARQUIVO,
+        u"".join(c if c.isalnum() else u"_" for c in ferramenta or u"ferramenta"),
+        time.strftime('%Y%m%d_%H%M%S'),
+    )
+    try:
+        from pyrevit import script
+        return script.get_universal_data_file(nome, 'json')
+    except Exception:
+        import tempfile
+        return os.path.join(tempfile.gettempdir(), nome + '.json')
+
+
+def gravar(caminho):
+    with io.open(caminho, 'w', encoding='utf-8') as arquivo:
+        texto = json.dumps(dados_chrome(), ensure_ascii=False, default=_relatorio._texto)
+        arquivo.write(_relatorio._texto(texto))
+    return caminho
+
+
+def relatar(rel, caminho=None):
+    """Tabela dos tempos por trecho e dos contadores em ``rel``."""
+    rel.titulo(u"Rastreio: {}".format(_ESTADO['ferramenta']))
+    rel.tabela(
+        [(nome, n, u"{:.1f}".format(total * 1e3), u"{:.2f}".format(total * 1e3 / n),
+          u"{:.1f}".format(maximo * 1e3), api or u"")
+         for nome, n, total, maximo, api in resumo()],
+        [u"Trecho", u"Chamadas", u"Total (ms)", u"Média (ms)", u"Máximo (ms)", u"Chamadas API"],
+    )
+    valores = contadores()
+    if valores:
+        rel.tabela(sorted(valores.items()), [u"Contador", u"Valor"])
+    if caminho:
+        rel.texto(u"Rastreio gravado em {} (abrir em chrome://tracing ou ui.perfetto.dev).".format(caminho))
+
+
+def finalizar(rel=None):
+    """Grava o arquivo de rastreio e escreve o resumo; nada acontece se desativado.
+
+    Sem ``rel`` o resumo é emitido na janela do pyRevit. Retorna o caminho
+    gravado (None se desativado ou se a gravação falhou).
+    """
+    if not _ESTADO['ativo']:
+        return None
+    _ESTADO['ativo'] = False
+    try:
+        caminho = gravar(caminho_rastreio(_ESTADO['ferramenta']))
+    except (IOError, OSError):
+        caminho = None
+    proprio = rel is None
+    if proprio:
+        rel = _relatorio.Relatorio([_relatorio.DestinoPyRevit()])
+    relatar(rel, caminho)
+    if proprio:
+        rel.emitir()
+    return caminho
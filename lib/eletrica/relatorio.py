@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""Relatório com saída em bloco para a janela do pyRevit ou arquivos.
+
+Cada ``output.print_md`` é um acréscimo de HTML separado na janela de
+saída do pyRevit, que fica muito lenta a partir de algumas centenas de
+chamadas. ``Relatorio`` acumula títulos, itens, linhas de texto e tabelas
+e os entrega de uma vez a cada destino em ``emitir()``:
+
+- ``DestinoPyRevit``: um único ``print_md`` com todo o markdown (tabelas
+  viram tabelas markdown);
+- ``DestinoTexto``: arquivo de texto simples;
+- ``DestinoJsonLines``: um objeto JSON por entrada, para processamento.
+"""
+
+import io
+import json
+
+# Tipos de entrada
+TITULO = 'titulo'
+TEXTO = 'texto'
+ITEM = 'item'
+TABELA = 'tabela'
+
+
+def _texto(valor):
+    if valor is None:
+        return u""
+    if isinstance(valor, bytes) and not isinstance(valor, type(u"")):
+        return valor.decode('utf-8', 'replace')
+    return u"{}".format(valor)
+
+
+class Relatorio(object):
+    """Acumula entradas e as envia aos destinos em ``emitir()``.
+
+    Usado como gerenciador de contexto, emite ao sair do bloco.
+    """
+
+    def __init__(self, destinos):
+        self.destinos = list(destinos)
+        self.entradas = []
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def titulo(self, texto, nivel=3):
+        self.entradas.append((TITULO, {'texto': _texto(texto), 'nivel': nivel}))
+
+    def texto(self, texto):
+        self.entradas.append((TEXTO, {'texto': _texto(texto)}))
+
+    def item(self, rotulo, valor=None, nivel=0):
+        """Item de lista ``- **rotulo:** valor`` (``nivel`` indenta)."""
+        self.entradas.append((ITEM, {'rotulo': _texto(rotulo), 'valor': valor, 'nivel': nivel}))
+
+    def tabela(self, linhas, colunas, titulo=None):
+        self.entradas.append((TABELA, {
+            'linhas': [list(linha) for linha in linhas],
+            'colunas': [_texto(c) for c in colunas],
+            'titulo': _texto(titulo) if titulo else None,
+        }))
+
+    def emitir(self):
+        """Envia todas as entradas acumuladas e esvazia o relatório."""
+        if self.entradas:
+            for destino in self.destinos:
+                destino.emitir(self.entradas)
+        self.entradas = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.emitir()
+
+
+def _celula_md(valor):
+    return _texto(valor).replace(u"|", u"\\|").replace(u"\n", u" ")
+
+
+def renderizar_markdown(entradas):
+    """Markdown de todas as entradas; itens consecutivos formam uma lista."""
+    blocos = []
+    lista = []
+    for tipo, dados in entradas:
+        if tipo != ITEM and lista:
+            blocos.append(u"\n".join(lista))
+            lista = []
+        if tipo == TITULO:
+            blocos.append(u"{} {}".format(u"#" * dados['nivel'], dados['texto']))
+        elif tipo == TEXTO:
+            blocos.append(dados['texto'])
+        elif tipo == ITEM:
+            recuo = u"  " * dados['nivel']
+            if dados['valor'] is None:
+                lista.append(u"{}- {}".format(recuo, dados['rotulo']))
+            else:
+                lista.append(u"{}- **{}:** {}".format(recuo, dados['rotulo'], _texto(dados['valor'])))
+        elif tipo == TABELA:
+            linhas = []
+            if dados['titulo']:
+                linhas.append(u"**{}**\n".format(dados['titulo']))
+            linhas.append(u"| " + u" | ".join(_celula_md(c) for c in dados['colunas']) + u" |")
+            linhas.append(u"|" + u"---|" * len(dados['colunas']))
+            for linha in dados['linhas']:
+                linhas.append(u"| " + u" | ".join(_celula_md(v) for v in linha) + u" |")
+            blocos.append(u"\n".join(linhas))
+    if lista:
+        blocos.append(u"\n".join(lista))
+    return u"\n\n".join(blocos)
+
+
+def renderizar_texto(entradas):
+    """Texto simples, uma linha por item e linhas de tabela separadas por tabulação."""
+    linhas = []
+    for tipo, dados in entradas:
+        if tipo == TITULO:
+            linhas.append(dados['texto'])
+            linhas.append(u"=" * len(dados['texto']))
+        elif tipo == TEXTO:
+            linhas.append(dados['texto'])
+        elif tipo == ITEM:
+            recuo = u"  " * dados['nivel']
+            if dados['valor'] is None:
+                linhas.append(u"{}{}".format(recuo, dados['rotulo']))
+            else:
+                linhas.append(u"{}{}: {}".format(recuo, dados['rotulo'], _texto(dados['valor'])))
+        elif tipo == TABELA:
+            if dados['titulo']:
+                linhas.append(dados['titulo'])
+            linhas.append(u"\t".join(dados['colunas']))
+            for linha in dados['linhas']:
+                linhas.append(u"\t".join(_texto(v) for v in linha))
+    return u"\n".join(linhas) + u"\n"
+
+
+class DestinoPyRevit(object):
+    """Janela de saída do pyRevit, com um único ``print_md`` por emissão."""
+
+    def __init__(self, output=None):
+        if output is None:
+            from pyrevit import script
+            output = script.get_output()
+        self.output = output
+
+    def emitir(self, entradas):
+        self.output.print_md(renderizar_markdown(entradas))
+
+
+class DestinoTexto(object):
+    """Arquivo de texto simples (acrescenta a cada emissão)."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        io.open(caminho, 'w', encoding='utf-8').close()
+
+    def emitir(self, entradas):
+        with io.open(self.caminho, 'a', encoding='utf-8') as arquivo:
+            arquivo.write(renderizar_texto(entradas))
+
+
+class DestinoJsonLines(object):
+    """Um objeto JSON por linha: ``{"tipo": ..., <dados da entrada>}``."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        io.open(caminho, 'w', encoding='utf-8').close()
+
+    def emitir(self, entradas):
+        linhas = []
+        for tipo, dados in entradas:
+            registro = dict(dados)
+            registro['tipo'] = tipo
+            linhas.append(_texto(json.dumps(registro, ensure_ascii=False, default=_texto)))
+        with io.open(self.caminho, 'a', encoding='utf-8') as arquivo:
+            arquivo.write(u"\n".join(linhas) + u"\n")
@@ -0,0 +1,627 @@
+# -*- coding: utf-8 -*-
+"""Retrato compacto do projeto para análises sem reabrir o modelo.
+
+Relatórios, auditorias e verificações de regressão relêem o modelo inteiro
+dentro do Revit a cada execução. ``exportar`` grava, em uma única passada,
+paredes, tomadas (categoria de dispositivos elétricos), painéis e circuitos
+com os seus parâmetros principais em um arquivo binário versionado
+(``.elrp``); ``Retrato`` o relê em milissegundos no CPython comum (agentes
+de build em Linux), sem Revit nem pyRevit.
+
+Formato (little-endian, seções alinhadas em 8 bytes)::
+
+    cabeçalho  b'ELRP', versão (uint16), reservado (uint16), seções (uint32),
+               título do documento (índice de texto, uint32), criação (double, epoch)
+    diretório  por seção: nome (4 bytes), tamanho do registro (uint32),
+               posição (uint64), registros (uint32), reservado (uint32)
+    seções     registros de tamanho fixo (``LAYOUTS``)
+
+Os textos são internados: ``TXTI`` guarda ``(posição, tamanho)`` de cada
+texto em ``TXTB`` (utf-8) e os campos de texto dos registros guardam o
+índice (-1 sem texto). Ids ausentes são -1 e valores numéricos ausentes
+são NaN. Medidas de comprimento estão em pés, como na Revit API, exceto o
+comprimento de rota (m) gravado por ``rotas``.
+
+Campos novos só são acrescentados ao fim dos registros e seções novas são
+ignoradas por leitores antigos: o leitor usa o tamanho de registro gravado
+no diretório, então arquivos de versões futuras continuam legíveis.
+"""
+
+import io
+import struct
+import time
+from collections import namedtuple
+
+from eletrica import rastreio
+from eletrica import relatorio as _relatorio
+from eletrica.catalogo import id_inteiro
+
+try:
+    import numpy as np
+except ImportError:  # IronPython
+    np = None
+
+ASSINATURA = b'ELRP'
+VERSAO = 1
+EXTENSAO = 'elrp'
+
+_CABECALHO = struct.Struct('<4sHHIId')
+_DIRETORIO = struct.Struct('<4sIQII')
+_ALINHAMENTO = 8
+
+SEM_ID = -1
+SEM_TEXTO = -1
+AUSENTE = float('nan')
+
+# Seção -> campos ``(nome, formato struct, é texto)`` na ordem gravada
+LAYOUTS = {
+    b'PARE': (
+        ('id', 'q', False),
+        ('x0', 'd', False), ('y0', 'd', False),
+        ('x1', 'd', False), ('y1', 'd', False),
+        ('xm', 'd', False), ('ym', 'd', False),  # meio da curva
+        ('z', 'd', False),
+        ('espessura', 'd', False),
+        ('comprimento', 'd', False),
+        ('nivel', 'i', True),
+        ('tipo', 'i', True),
+        ('arco', 'B', False),
+    ),
+    b'TOMA': (
+        ('id', 'q', False),
+        ('simbolo', 'q', False),
+        ('parede', 'q', False),
+        ('circuito', 'q', False),
+        ('x', 'd', False), ('y', 'd', False), ('z', 'd', False),
+        ('potencia_aparente', 'd', False),
+        ('fator_potencia', 'd', False),
+        ('tensao', 'd', False),
+        ('potencia_ativa', 'd', False),
+        ('corrente', 'd', False),
+        ('numero_fases', 'i', False),
+        ('familia', 'i', True),
+        ('tipo', 'i', True),
+        ('nivel', 'i', True),
+        ('gerenciada', 'B', False),
+    ),
+    b'PAIN': (
+        ('id', 'q', False),
+        ('x', 'd', False), ('y', 'd', False), ('z', 'd', False),
+        ('tensao_fn', 'd', False),
+        ('tensao_ff', 'd', False),
+        ('nome', 'i', True),
+        ('nivel', 'i', True),
+        ('sistema', 'i', True),
+    ),
+    b'CIRC': (
+        ('id', 'q', False),
+        ('painel', 'q', False),
+        ('tensao', 'd', False),
+        ('comprimento', 'd', False),  # pés, parâmetro do Revit
+        ('rota', 'd', False),  # metros, gravado por ``rotas``
+        ('potencia_aparente', 'd', False),
+        ('potencia_ativa', 'd', False),
+        ('polos', 'i', False),
+        ('pontos', 'i', False),
+        ('nome', 'i', True),
+    ),
+    b'PARM': (
+        ('elemento', 'q', False),
+        ('numero', 'd', False),
+        ('nome', 'i', True),
+        ('texto', 'i', True),
+        ('armazenamento', 'B', False),
+    ),
+}
+
+# Nome de cada seção no leitor
+SECOES = (
+    ('paredes', b'PARE'),
+    ('tomadas', b'TOMA'),
+    ('paineis', b'PAIN'),
+    ('circuitos', b'CIRC'),
+    ('parametros', b'PARM'),
+)
+
+_TEXTOS_INDICE = b'TXTI'
+_TEXTOS_DADOS = b'TXTB'
+_PAR_TEXTO = struct.Struct('<II')
+
+_FORMATOS_NUMPY = {'q': '<i8', 'd': '<f8', 'i': '<i4', 'I': '<u4', 'B': 'u1'}
+
+ResumoRetrato = namedtuple('ResumoRetrato', ['paredes', 'tomadas', 'paineis', 'circuitos', 'parametros', 'textos'])
+
+
+def _estrutura(layout):
+    return struct.Struct('<' + ''.join(formato for _, formato, _ in layout))
+
+
+def ausente(valor):
+    """True para valores numéricos ausentes (NaN)."""
+    return valor != valor
+
+
+def _numero(valor):
+    return AUSENTE if valor is None else float(valor)
+
+
+# --- Coleta (Revit) ----------------------------------------------------------
+
+class DadosRetrato(object):
+    """Registros de cada seção como tuplas na ordem de ``LAYOUTS`` (textos ainda como texto)."""
+
+    def __init__(self, titulo=u""):
+        self.titulo = titulo
+        self.secoes = dict((secao, []) for _, secao in SECOES)
+
+    def resumo(self, textos=0):
+        return ResumoRetrato(*([len(self.secoes[secao]) for _, secao in SECOES] + [textos]))
+
+
+class _Niveis(object):
+    """Nome do nível de cada id, lido uma vez por nível."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.nomes = {}
+
+    def nome(self, nivel_id):
+        chave = id_inteiro(nivel_id)
+        if chave not in self.nomes:
+            nivel = self.doc.GetElement(nivel_id) if chave >= 0 else None
+            self.nomes[chave] = nivel.Name if nivel is not None else None
+        return self.nomes[chave]
+
+
+def _registros_paredes(doc, niveis):
+    from Autodesk.Revit.DB import Arc, FilteredElementCollector, Wall
+
+    registros = []
+    for parede in FilteredElementCollector(doc).OfClass(Wall):
+        curva = getattr(parede.Location, 'Curve', None)
+        if curva is None:
+            continue
+        inicio, fim = curva.GetEndPoint(0), curva.GetEndPoint(1)
+        meio = curva.Evaluate(0.5, True)
+        registros.append((
+            id_inteiro(parede.Id),
+            inicio.X, inicio.Y, fim.X, fim.Y, meio.X, meio.Y, inicio.Z,
+            parede.WallType.Width, curva.Length,
+            niveis.nome(parede.LevelId), parede.WallType.Name,
+            1 if isinstance(curva, Arc) else 0,
+        ))
+    return registros
+
+
+def _valores_eletricos(tomada, mapa):
+    from eletrica import parametrizacao
+
+    valores = {}
+    for campo, _, inteiro in parametrizacao.CAMPOS:
+        definicao = mapa.definicoes.get(campo)
+        if definicao is not None:
+            valores[campo] = parametrizacao._ler(tomada.get_Parameter(definicao), inteiro)
+    return valores
+
+
+def _registros_tomadas(doc, niveis, circuito_de):
+    from eletrica import catalogo, exportacao, marcacao, parametrizacao
+
+    gerenciadas = set()
+    for grupo in marcacao.gerenciadas_por_parede(doc).values():
+        gerenciadas.update(id_inteiro(tomada.Id) for tomada, _ in grupo)
+
+    simbolos = {}
+    mapas = {}
+    registros = []
+    for tomada in exportacao.coletar_instancias(doc, 'OST_ElectricalFixtures'):
+        simbolo = tomada.Symbol
+        id_simbolo = id_inteiro(simbolo.Id)
+        if id_simbolo not in simbolos:
+            simbolos[id_simbolo] = catalogo.ler_registro(simbolo)
+            mapas[id_simbolo] = parametrizacao.ParametrosFamilia.resolver(tomada)
+        registro = simbolos[id_simbolo]
+        valores = _valores_eletricos(tomada, mapas[id_simbolo])
+        ponto = tomada.Location.Point
+        host = getattr(tomada, 'Host', None)
+        id_tomada = id_inteiro(tomada.Id)
+        fases = valores.get('numero_fases')
+        registros.append((
+            id_tomada, id_simbolo,
+            id_inteiro(host.Id) if host is not None else SEM_ID,
+            circuito_de.get(id_tomada, SEM_ID),
+            ponto.X, ponto.Y, ponto.Z,
+            _numero(valores.get('potencia_aparente')),
+            _numero(valores.get('fator_potencia')),
+            _numero(valores.get('tensao')),
+            _numero(valores.get('potencia_ativa')),
+            _numero(valores.get('corrente')),
+            fases if fases is not None else 0,
+            registro.familia, registro.tipo, niveis.nome(tomada.LevelId),
+            1 if id_tomada in gerenciadas else 0,
+        ))
+    return registros
+
+
+def _registros_paineis(doc):
+    from eletrica import paineis
+
+    return [
+        (r.id, r.x, r.y, r.z, _numero(r.tensao_fn), _numero(r.tensao_ff), r.nome, r.nivel, r.sistema)
+        for r in paineis.construir_registros(doc)
+    ]
+
+
+def _registros_circuitos(lista, tomadas):
+    """Circuitos com S e P somados das tomadas (já lidas) de cada um."""
+    from eletrica import demanda
+
+    cargas = dict((r[0], (r[7], r[7] * r[8])) for r in tomadas)
+    registros = []
+    for circuito in lista:
+        tensao, polos, comprimento, rota = demanda._ler_circuito(circuito)
+        ids = [id_inteiro(membro.Id) for membro in circuito.Elements]
+        total_s = total_p = 0.0
+        for id_membro in ids:
+            s, p = cargas.get(id_membro, (AUSENTE, AUSENTE))
+            if not ausente(s):
+                total_s += s
+                total_p += 0.0 if ausente(p) else p
+        painel = circuito.BaseEquipment
+        registros.append((
+            id_inteiro(circuito.Id), id_inteiro(painel.Id) if painel is not None else SEM_ID,
+            tensao, comprimento, _numero(rota), total_s, total_p, polos, len(ids),
+            getattr(circuito, 'CircuitNumber', None) or circuito.Name,
+        ))
+    return registros
+
+
+def _registros_parametros(elementos, nomes):
+    """Valores dos parâmetros ``nomes`` de cada elemento, como em ``exportacao``."""
+    from eletrica import exportacao
+
+    registros = []
+    for elemento in elementos:
+        id_elemento = id_inteiro(elemento.Id)
+        for nome in nomes:
+            parametro = elemento.LookupParameter(nome)
+            if parametro is None or not parametro.HasValue:
+                continue
+            try:
+                armazenamento, valor = exportacao.valor_parametro(parametro)
+            except Exception:
+                continue
+            if armazenamento == exportacao.ARMAZENAMENTO_STRING:
+                registros.append((id_elemento, AUSENTE, nome, valor, armazenamento))
+            else:
+                numero = _numero(valor) if isinstance(valor, (int, float)) else AUSENTE
+                registros.append((id_elemento, numero, nome, None, armazenamento))
+    return registros
+
+
+@rastreio.medido()
+def coletar(doc, extras=()):
+    """Lê o documento em uma única passada por categoria.
+
+    ``extras`` são nomes de parâmetros de instância das tomadas gravados na
+    seção ``PARM`` (além dos campos elétricos fixos).
+    """
+    from eletrica import demanda, exportacao
+
+    dados = DadosRetrato(getattr(doc, 'Title', u"") or u"")
+    niveis = _Niveis(doc)
+    circuitos = demanda.coletar_circuitos(doc)
+    circuito_de = {}
+    for circuito in circuitos:
+        id_circuito = id_inteiro(circuito.Id)
+        for membro in circuito.Elements:
+            circuito_de[id_inteiro(membro.Id)] = id_circuito
+
+    dados.secoes[b'PARE'] = _registros_paredes(doc, niveis)
+    tomadas = _registros_tomadas(doc, niveis, circuito_de)
+    dados.secoes[b'TOMA'] = tomadas
+    dados.secoes[b'PAIN'] = _registros_paineis(doc)
+    dados.secoes[b'CIRC'] = _registros_circuitos(circuitos, tomadas)
+    if extras:
+        dados.secoes[b'PARM'] = _registros_parametros(
+            exportacao.coletar_instancias(doc, 'OST_ElectricalFixtures'), extras)
+    return dados
+
+
+# --- Gravação ----------------------------------------------------------------
+
+class _Textos(object):
+    """Textos internados na ordem de aparição."""
+
+    def __init__(self):
+        self.indices = {}
+        self.dados = bytearray()
+        self.pares = bytearray()
+
+    def __len__(self):
+        return len(self.indices)
+
+    def indice(self, texto):
+        if texto is None:
+            return SEM_TEXTO
+        texto = _relatorio._texto(texto)
+        indice = self.indices.get(texto)
+        if indice is None:
+            codificado = texto.encode('utf-8')
+            indice = self.indices[texto] = len(self.indices)
+            self.pares += _PAR_TEXTO.pack(len(self.dados), len(codificado))
+            self.dados += codificado
+        return indice
+
+
+def _empacotar(layout, registros, textos):
+    estrutura = _estrutura(layout)
+    posicoes = [k for k, (_, _, texto) in enumerate(layout) if texto]
+    dados = bytearray()
+    for registro in registros:
+        if posicoes:
+            registro = list(registro)
+            for k in posicoes:
+                registro[k] = textos.indice(registro[k])
+        dados += estrutura.pack(*registro)
+    return estrutura.size, dados
+
+
+def _alinhar(posicao):
+    return (posicao + _ALINHAMENTO - 1) // _ALINHAMENTO * _ALINHAMENTO
+
+
+@rastreio.medido()
+def gravar(caminho, dados):
+    """Grava ``DadosRetrato`` em ``caminho``; retorna ``ResumoRetrato``."""
+    textos = _Textos()
+    titulo = textos.indice(dados.titulo)
+    secoes = []
+    for _, nome in SECOES:
+        tamanho, corpo = _empacotar(LAYOUTS[nome], dados.secoes[nome], textos)
+        secoes.append((nome, tamanho, len(dados.secoes[nome]), corpo))
+    secoes.append((_TEXTOS_INDICE, _PAR_TEXTO.size, len(textos), textos.pares))
+    secoes.append((_TEXTOS_DADOS, 1, len(textos.dados), textos.dados))
+
+    posicao = _alinhar(_CABECALHO.size + _DIRETORIO.size * len(secoes))
+    diretorio = []
+    for nome, tamanho, quantidade, corpo in secoes:
+        diretorio.append(_DIRETORIO.pack(nome, tamanho, posicao, quantidade, 0))
+        posicao = _alinhar(posicao + len(corpo))
+
+    with io.open(caminho, 'wb') as arquivo:
+        arquivo.write(_CABECALHO.pack(ASSINATURA, VERSAO, 0, len(secoes), titulo, time.time()))
+        for entrada in diretorio:
+            arquivo.write(entrada)
+        escrito = _CABECALHO.size + _DIRETORIO.size * len(secoes)
+        for _, _, _, corpo in secoes:
+            inicio = _alinhar(escrito)
+            arquivo.write(b'\0' * (inicio - escrito))
+            arquivo.write(bytes(corpo))
+            escrito = inicio + len(corpo)
+    return dados.resumo(len(textos))
+
+
+def exportar(doc, caminho, extras=()):
+    """Coleta o documento e grava o retrato; retorna ``ResumoRetrato``."""
+    return gravar(caminho, coletar(doc, extras))
+
+
+# --- Leitura (CPython, sem Revit) -------------------------------------------
+
+class Tabela(object):
+    """Registros de uma seção, decodificados sob demanda.
+
+    ``tabela[k]`` e a iteração devolvem namedtuples com os textos resolvidos;
+    ``coluna(nome)`` devolve uma lista com um campo de todos os registros e
+    ``estruturado()`` um array estruturado do NumPy sem cópia (None sem NumPy).
+    """
+
+    def __init__(self, retrato, nome, layout, tamanho, posicao, quantidade):
+        self.retrato = retrato
+        self.nome = nome
+        self.layout = layout
+        self.estrutura = _estrutura(layout)
+        if tamanho < self.estrutura.size:
+            raise ValueError(u"Registro da seção {} menor que o esperado".format(nome.decode('ascii')))
+        self.tamanho = tamanho
+        self.posicao = posicao
+        self.quantidade = quantidade
+        self.campos = [campo for campo, _, _ in layout]
+        self.registro = namedtuple('Registro' + nome.decode('ascii').capitalize(), self.campos)
+        self._textos = [k for k, (_, _, texto) in enumerate(layout) if texto]
+
+    def __len__(self):
+        return self.quantidade
+
+    def _resolver(self, valores):
+        if self._textos:
+            valores = list(valores)
+            texto = self.retrato.texto
+            for k in self._textos:
+                valores[k] = texto(valores[k])
+        return self.registro(*valores)
+
+    def __getitem__(self, k):
+        if k < 0:
+            k += self.quantidade
+        if not 0 <= k < self.quantidade:
+            raise IndexError(k)
+        valores = self.estrutura.unpack_from(self.retrato.dados, self.posicao + k * self.tamanho)
+        return self._resolver(valores)
+
+    def _brutos(self):
+        dados = self.retrato.dados
+        if self.tamanho == self.estrutura.size and hasattr(self.estrutura, 'iter_unpack'):
+            fim = self.posicao + self.quantidade * self.tamanho
+            return self.estrutura.iter_unpack(memoryview(dados)[self.posicao:fim])
+        return (self.estrutura.unpack_from(dados, self.posicao + k * self.tamanho)
+                for k in range(self.quantidade))
+
+    def __iter__(self):
+        for valores in self._brutos():
+            yield self._resolver(valores)
+
+    def coluna(self, campo):
+        k = self.campos.index(campo)
+        valores = [registro[k] for registro in self._brutos()]
+        if k in self._textos:
+            texto = self.retrato.texto
+            valores = [texto(v) for v in valores]
+        return valores
+
+    def estruturado(self):
+        if np is None:
+            return None
+        formatos, deslocamentos, deslocamento = [], [], 0
+        for _, formato, _ in self.layout:
+            formatos.append(_FORMATOS_NUMPY[formato])
+            deslocamentos.append(deslocamento)
+            deslocamento += struct.calcsize('<' + formato)
+        tipo = np.dtype({'names': self.campos, 'formats': formatos, 'offsets': deslocamentos,
+                         'itemsize': self.tamanho})
+        return np.frombuffer(self.retrato.dados, dtype=tipo, count=self.quantidade, offset=self.posicao)
+
+
+class Retrato(object):
+    """Leitor de um arquivo ``.elrp`` (mapeado em memória quando possível)."""
+
+    def __init__(self, dados, arquivo=None, mapa=None):
+        self.dados = dados
+        self._arquivo = arquivo
+        self._mapa = mapa
+        assinatura, self.versao, _, quantidade, titulo, self.criado = _CABECALHO.unpack_from(dados, 0)
+        if assinatura != ASSINATURA:
+            raise ValueError(u"Arquivo não é um retrato de projeto (.elrp)")
+        self.diretorio = {}
+        for k in range(quantidade):
+            nome, tamanho, posicao, registros, _ = _DIRETORIO.unpack_from(
+                dados, _CABECALHO.size + k * _DIRETORIO.size)
+            if posicao + tamanho * registros > len(dados):
+                raise ValueError(u"Retrato truncado na seção {}".format(nome.decode('ascii', 'replace')))
+            self.diretorio[nome] = (tamanho, posicao, registros)
+        _, self._posicao_pares, self._quantidade_textos = self.diretorio[_TEXTOS_INDICE]
+        self._posicao_textos = self.diretorio[_TEXTOS_DADOS][1]
+        self._cache_textos = {}
+        self.titulo = self.texto(titulo)
+        self._tabelas = {}
+
+    @classmethod
+    def abrir(cls, caminho):
+        arquivo = io.open(caminho, 'rb')
+        try:
+            import mmap
+            mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ImportError, ValueError, EnvironmentError):
+            # Arquivo vazio ou plataforma sem mmap
+            dados = arquivo.read()
+            arquivo.close()
+            return cls(dados)
+        return cls(mapa, arquivo, mapa)
+
+    def fechar(self):
+        self._tabelas.clear()
+        if self._mapa is not None:
+            try:
+                self._mapa.close()
+            except BufferError:
+                # Ainda há arrays do NumPy apontando para o mapa
+                pass
+            self._mapa = None
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        self.fechar()
+        return False
+
+    def texto(self, indice):
+        if indice < 0:
+            return None
+        texto = self._cache_textos.get(indice)
+        if texto is None:
+            if indice >= self._quantidade_textos:
+                raise ValueError(u"Índice de texto inválido: {}".format(indice))
+            posicao, tamanho = _PAR_TEXTO.unpack_from(
+                self.dados, self._posicao_pares + indice * _PAR_TEXTO.size)
+            inicio = self._posicao_textos + posicao
+            texto = self._cache_textos[indice] = bytes(self.dados[inicio:inicio + tamanho]).decode('utf-8')
+        return texto
+
+    def tabela(self, nome):
+        """``Tabela`` da seção (vazia se o arquivo não tiver a seção)."""
+        tabela = self._tabelas.get(nome)
+        if tabela is None:
+            tamanho, posicao, quantidade = self.diretorio.get(nome, (0, 0, 0))
+            layout = LAYOUTS[nome]
+            tamanho = tamanho or _estrutura(layout).size
+            tabela = self._tabelas[nome] = Tabela(self, nome, layout, tamanho, posicao, quantidade)
+        return tabela
+
+    @property
+    def paredes(self):
+        return self.tabela(b'PARE')
+
+    @property
+    def tomadas(self):
+        return self.tabela(b'TOMA')
+
+    @property
+    def paineis(self):
+        return self.tabela(b'PAIN')
+
+    @property
+    def circuitos(self):
+        return self.tabela(b'CIRC')
+
+    @property
+    def parametros(self):
+        return self.tabela(b'PARM')
+
+    def resumo(self):
+        return ResumoRetrato(*([len(self.tabela(secao)) for _, secao in SECOES] + [self._quantidade_textos]))
+
+
+def abrir(caminho):
+    return Retrato.abrir(caminho)
+
+
+# --- Relatório ---------------------------------------------------------------
+
+def cargas_por_painel(retrato):
+    """``{nome do painel: (circuitos, tomadas, S VA, P W)}``; circuitos sem painel em None."""
+    nomes = dict((p.id, p.nome) for p in retrato.paineis)
+    totais = {}
+    for circuito in retrato.circuitos:
+        nome = nomes.get(circuito.painel) if circuito.painel != SEM_ID else None
+        n, pontos, s, p = totais.get(nome, (0, 0, 0.0, 0.0))
+        totais[nome] = (n + 1, pontos + circuito.pontos, s + circuito.potencia_aparente,
+                        p + circuito.potencia_ativa)
+    return totais
+
+
+def relatar(retrato, rel):
+    """Contagens e cargas por painel do retrato em ``rel``."""
+    resumo = retrato.resumo()
+    rel.titulo(u"Retrato: {}".format(retrato.titulo or u"(sem título)"))
+    rel.texto(u"Gravado em {} (formato versão {}).".format(
+        time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(retrato.criado)), retrato.versao))
+    rel.tabela(
+        [(u"Paredes", resumo.paredes), (u"Tomadas", resumo.tomadas), (u"Painéis", resumo.paineis),
+         (u"Circuitos", resumo.circuitos), (u"Parâmetros extras", resumo.parametros),
+         (u"Textos", resumo.textos)],
+        [u"Seção", u"Registros"],
+    )
+    sem_carga = sum(1 for s in retrato.tomadas.coluna('potencia_aparente') if ausente(s) or s <= 0)
+    sem_circuito = sum(1 for c in retrato.tomadas.coluna('circuito') if c == SEM_ID)
+    rel.texto(u"Tomadas sem potência: {} | sem circuito: {}".format(sem_carga, sem_circuito))
+    totais = cargas_por_painel(retrato)
+    rel.tabela(
+        [(nome if nome is not None else u"(sem painel)", n, pontos, u"{:.0f}".format(s), u"{:.0f}".format(p))
+         for nome, (n, pontos, s, p) in sorted(totais.items(), key=lambda item: item[0] or u"")],
+        [u"Painel", u"Circuitos", u"Tomadas", u"S (VA)", u"P (W)"],
+    )
@@ -0,0 +1,1652 @@
+# -*- coding: utf-8 -*-
+"""Substituto em memória da Revit API para rodar a biblioteca fora do Revit.
+
+Os módulos de ``eletrica`` recebem o documento como argumento e importam
+``Autodesk.Revit.DB`` apenas dentro das funções. ``instalar()`` registra em
+``sys.modules`` versões mínimas de ``Autodesk.Revit.DB`` (e ``.Structure``,
+``.Electrical``, ``.ExtensibleStorage``, ``.Architecture``, ``Autodesk.Revit.Exceptions``), ``clr``,
+``System.Collections.Generic`` e ``System.Guid``; a partir daí ``Documento`` pode ser passado
+no lugar de um ``Document`` real para perfilar e testar em CPython:
+
+    from eletrica import revit_falso
+    revit_falso.instalar()
+    doc = revit_falso.Documento()
+    nivel = doc.criar_nivel('Térreo', 0.0)
+    parede = doc.criar_parede((0, 0), (10, 0), nivel)
+
+Só está implementado o que a extensão usa: coletor, paredes (retas e em
+arco) com aberturas, ``FamilySymbol``/``FamilyInstance``, parâmetros,
+transações e grupos de transação com desfazer e tratamento de falhas
+(``PostFailure`` e pré-processador), atualizadores (``IUpdater`` chamados
+no ``Commit`` com os ids alterados), ambientes com contorno
+(``GetBoundarySegments``), vínculos (``RevitLinkInstance`` com outro
+``Documento`` e transformação total, faces laterais e instâncias
+baseadas em face na referência vinculada), rotação, sistemas de
+distribuição, circuitos e Extensible Storage (campos simples). Escritas fora de transação geram
+erro, como no Revit. ``chamadas_api()`` conta as chamadas de método,
+que no IronPython atravessam a camada .NET e dominam o custo.
+"""
+
+import math
+import sys
+import types
+
+# Contador de chamadas à API falsa
+_CHAMADAS = [0]
+
+
+def _chamada():
+    _CHAMADAS[0] += 1
+
+
+def chamadas_api():
+    return _CHAMADAS[0]
+
+
+def zerar_chamadas():
+    _CHAMADAS[0] = 0
+
+
+class ErroTransacao(Exception):
+    """Modificação do documento fora de uma transação aberta."""
+
+
+# --- Enumerações -------------------------------------------------------------
+
+class _Membro(int):
+    """Membro de enumeração: inteiro com nome (``str`` devolve o nome)."""
+
+    def __new__(cls, valor, nome):
+        membro = int.__new__(cls, valor)
+        membro.nome = nome
+        return membro
+
+    def __str__(self):
+        return self.nome
+
+    __repr__ = __str__
+
+    def ToString(self):
+        return self.nome
+
+
+class _Enumeracao(object):
+    """Enumeração aberta: qualquer atributo vira um membro estável."""
+
+    def __init__(self, nome, valores=None, inicio=1):
+        self._nome = nome
+        self._membros = {}
+        self._proximo = inicio
+        for chave, valor in (valores or {}).items():
+            self._membros[chave] = _Membro(valor, chave)
+
+    def __getattr__(self, nome):
+        if nome.startswith('_'):
+            raise AttributeError(nome)
+        membro = self._membros.get(nome)
+        if membro is None:
+            membro = self._membros[nome] = _Membro(self._proximo, nome)
+            self._proximo += 1 if self._proximo > 0 else -1
+        return membro
+
+
+BuiltInCategory = _Enumeracao('BuiltInCategory', {
+    'OST_Walls': -2000011,
+    'OST_Windows': -2000014,
+    'OST_Doors': -2000023,
+    'OST_GenericModel': -2000151,
+    'OST_Rooms': -2000160,
+    'OST_Levels': -2000240,
+    'OST_ElectricalEquipment': -2001040,
+    'OST_ElectricalFixtures': -2001060,
+    'OST_LightingFixtures': -2001120,
+    'OST_ElectricalCircuit': -2001046,
+    'OST_LightingDevices': -2008087,
+}, inicio=-3000000)
+
+BuiltInParameter = _Enumeracao('BuiltInParameter', {'INVALID': -1}, inicio=-1000000)
+
+
+class StorageType(object):
+    Double = _Membro(2, 'Double')
+    Integer = _Membro(1, 'Integer')
+    String = _Membro(3, 'String')
+    ElementId = _Membro(4, 'ElementId')
+
+
+setattr(StorageType, 'None', _Membro(0, 'None'))
+
+
+class StructuralType(object):
+    NonStructural = _Membro(0, 'NonStructural')
+
+
+class ElectricalSystemType(object):
+    PowerCircuit = _Membro(6, 'PowerCircuit')
+
+
+class UnitTypeId(object):
+    Volts = 'volts'
+    Meters = 'meters'
+
+
+class UnitUtils(object):
+    """Unidades internas iguais às de exibição no substituto (pés e volts)."""
+
+    @staticmethod
+    def ConvertFromInternalUnits(valor, unidade):
+        _chamada()
+        return valor
+
+    @staticmethod
+    def ConvertToInternalUnits(valor, unidade):
+        _chamada()
+        return valor
+
+
+# --- Geometria ---------------------------------------------------------------
+
+class XYZ(object):
+    __slots__ = ('X', 'Y', 'Z')
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.X = x
+        self.Y = y
+        self.Z = z
+
+    def __add__(self, outro):
+        return XYZ(self.X + outro.X, self.Y + outro.Y, self.Z + outro.Z)
+
+    def __sub__(self, outro):
+        return XYZ(self.X - outro.X, self.Y - outro.Y, self.Z - outro.Z)
+
+    def __mul__(self, escalar):
+        return XYZ(self.X * escalar, self.Y * escalar, self.Z * escalar)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return XYZ(-self.X, -self.Y, -self.Z)
+
+    def __repr__(self):
+        return "({:.6f}, {:.6f}, {:.6f})".format(self.X, self.Y, self.Z)
+
+    def GetLength(self):
+        _chamada()
+        return math.sqrt(self.X ** 2 + self.Y ** 2 + self.Z ** 2)
+
+    def Normalize(self):
+        _chamada()
+        n = math.sqrt(self.X ** 2 + self.Y ** 2 + self.Z ** 2)
+        return XYZ(self.X / n, self.Y / n, self.Z / n)
+
+    def DotProduct(self, o):
+        _chamada()
+        return self.X * o.X + self.Y * o.Y + self.Z * o.Z
+
+    def CrossProduct(self, o):
+        _chamada()
+        return XYZ(self.Y * o.Z - self.Z * o.Y, self.Z * o.X - self.X * o.Z, self.X * o.Y - self.Y * o.X)
+
+    def AngleTo(self, o):
+        _chamada()
+        produto = (self.X * o.X + self.Y * o.Y + self.Z * o.Z) / (
+            math.sqrt(self.X ** 2 + self.Y ** 2 + self.Z ** 2) *
+            math.sqrt(o.X ** 2 + o.Y ** 2 + o.Z ** 2))
+        return math.acos(max(-1.0, min(1.0, produto)))
+
+    def DistanceTo(self, o):
+        _chamada()
+        return math.sqrt((self.X - o.X) ** 2 + (self.Y - o.Y) ** 2 + (self.Z - o.Z) ** 2)
+
+    def IsAlmostEqualTo(self, o, tolerancia=1e-9):
+        return (abs(self.X - o.X) <= tolerancia and abs(self.Y - o.Y) <= tolerancia and
+                abs(self.Z - o.Z) <= tolerancia)
+
+
+XYZ.Zero = XYZ(0.0, 0.0, 0.0)
+XYZ.BasisX = XYZ(1.0, 0.0, 0.0)
+XYZ.BasisY = XYZ(0.0, 1.0, 0.0)
+XYZ.BasisZ = XYZ(0.0, 0.0, 1.0)
+
+
+def _xyz(ponto):
+    if isinstance(ponto, XYZ):
+        return ponto
+    ponto = tuple(ponto)
+    return XYZ(float(ponto[0]), float(ponto[1]), float(ponto[2]) if len(ponto) > 2 else 0.0)
+
+
+class Curve(object):
+    def GetEndPoint(self, indice):
+        _chamada()
+        return self._extremos[indice]
+
+
+class Line(Curve):
+    def __init__(self, p0, p1):
+        self._extremos = (p0, p1)
+
+    @staticmethod
+    def CreateBound(p0, p1):
+        _chamada()
+        return Line(p0, p1)
+
+    @property
+    def Length(self):
+        p0, p1 = self._extremos
+        return math.sqrt((p1.X - p0.X) ** 2 + (p1.Y - p0.Y) ** 2 + (p1.Z - p0.Z) ** 2)
+
+    @property
+    def Direction(self):
+        p0, p1 = self._extremos
+        comprimento = self.Length
+        return XYZ((p1.X - p0.X) / comprimento, (p1.Y - p0.Y) / comprimento, (p1.Z - p0.Z) / comprimento)
+
+    def Evaluate(self, parametro, normalizado):
+        _chamada()
+        p0, p1 = self._extremos
+        t = parametro if normalizado else parametro / self.Length
+        return p0 + (p1 - p0) * t
+
+
+class Arc(Curve):
+    """Arco no plano horizontal (elevação constante)."""
+
+    def __init__(self, centro, raio, angulo_inicial, varredura):
+        self.Center = centro
+        self.Radius = raio
+        self._angulo_inicial = angulo_inicial
+        self._varredura = varredura
+        self._extremos = (self._ponto(0.0), self._ponto(1.0))
+
+    def _ponto(self, t):
+        angulo = self._angulo_inicial + self._varredura * t
+        return XYZ(self.Center.X + self.Radius * math.cos(angulo),
+                   self.Center.Y + self.Radius * math.sin(angulo), self.Center.Z)
+
+    @staticmethod
+    def Create(p0, p1, ponto_no_arco):
+        """Arco pelos dois extremos e um ponto intermediário."""
+        _chamada()
+        (ax, ay), (bx, by), (cx, cy) = (p0.X, p0.Y), (p1.X, p1.Y), (ponto_no_arco.X, ponto_no_arco.Y)
+        d = 2.0 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+        if abs(d) < 1e-12:
+            raise ValueError("Pontos colineares não definem um arco.")
+        ux = ((ax ** 2 + ay ** 2) * (by - cy) + (bx ** 2 + by ** 2) * (cy - ay) +
+              (cx ** 2 + cy ** 2) * (ay - by)) / d
+        uy = ((ax ** 2 + ay ** 2) * (cx - bx) + (bx ** 2 + by ** 2) * (ax - cx) +
+              (cx ** 2 + cy ** 2) * (bx - ax)) / d
+        inicio = math.atan2(ay - uy, ax - ux)
+        fim = math.atan2(by - uy, bx - ux)
+        meio = math.atan2(cy - uy, cx - ux)
+        varredura = (fim - inicio) % (2 * math.pi)
+        if (meio - inicio) % (2 * math.pi) > varredura:
+            varredura -= 2 * math.pi
+        return Arc(XYZ(ux, uy, p0.Z), math.hypot(ax - ux, ay - uy), inicio, varredura)
+
+    @property
+    def Length(self):
+        return abs(self._varredura) * self.Radius
+
+    def Evaluate(self, parametro, normalizado):
+        _chamada()
+        return self._ponto(parametro if normalizado else parametro / self.Length)
+
+
+class LocationPoint(object):
+    def __init__(self, ponto, rotacao=0.0):
+        self.Point = ponto
+        self.Rotation = rotacao
+
+
+class LocationCurve(object):
+    def __init__(self, curva):
+        self.Curve = curva
+
+
+class ElementTransformUtils(object):
+    @staticmethod
+    def RotateElement(doc, elem_id, eixo, angulo):
+        _chamada()
+        elemento = doc._elementos[_valor_id(elem_id)]
+        doc._exigir_transacao()
+        local = elemento.Location
+        doc._registrar_desfazer(lambda r=local.Rotation: setattr(local, 'Rotation', r))
+        local.Rotation += angulo
+
+    @staticmethod
+    def MoveElement(doc, elem_id, vetor):
+        _chamada()
+        elemento = doc._elementos[_valor_id(elem_id)]
+        doc._exigir_transacao()
+        local = elemento.Location
+        doc._registrar_desfazer(lambda p=local.Point: setattr(local, 'Point', p))
+        local.Point = local.Point + vetor
+
+
+# --- Elementos e parâmetros ----------------------------------------------------
+
+class ElementId(object):
+    __slots__ = ('Value',)
+
+    def __init__(self, valor):
+        self.Value = int(valor)
+
+    @property
+    def IntegerValue(self):
+        return self.Value
+
+    def __eq__(self, outro):
+        return isinstance(outro, ElementId) and outro.Value == self.Value
+
+    def __ne__(self, outro):
+        return not self.__eq__(outro)
+
+    def __hash__(self):
+        return hash(self.Value)
+
+    def __repr__(self):
+        return str(self.Value)
+
+    ToString = __repr__
+
+
+ElementId.InvalidElementId = ElementId(-1)
+
+
+def _valor_id(elem_id):
+    return elem_id.Value if isinstance(elem_id, ElementId) else int(elem_id)
+
+
+# Ids dos elementos de parâmetro (parâmetros de projeto/compartilhados)
+_PROXIMO_PARAMETRO = [500000]
+
+
+class Definition(object):
+    __slots__ = ('Name', 'storage', 'padrao', 'somente_leitura', 'embutido', 'Id')
+
+    def __init__(self, nome, storage=StorageType.Double, padrao=None, somente_leitura=False,
+                 embutido=None):
+        self.Name = nome
+        self.storage = storage
+        self.padrao = padrao
+        self.somente_leitura = somente_leitura
+        self.embutido = embutido  # membro de BuiltInParameter, se houver
+        if embutido is None:
+            _PROXIMO_PARAMETRO[0] += 1
+            self.Id = ElementId(_PROXIMO_PARAMETRO[0])
+        else:
+            self.Id = ElementId(int(embutido))
+
+    @property
+    def BuiltInParameter(self):
+        return BuiltInParameter.INVALID if self.embutido is None else self.embutido
+
+
+class Parameter(object):
+    """Vista sobre o valor de uma definição em um elemento."""
+
+    __slots__ = ('_elemento', 'Definition')
+
+    def __init__(self, elemento, definicao):
+        self._elemento = elemento
+        self.Definition = definicao
+
+    @property
+    def Id(self):
+        return self.Definition.Id
+
+    @property
+    def StorageType(self):
+        return self.Definition.storage
+
+    @property
+    def IsReadOnly(self):
+        return self.Definition.somente_leitura
+
+    @property
+    def HasValue(self):
+        return self._elemento._valores.get(self.Definition, self.Definition.padrao) is not None
+
+    def _valor(self):
+        return self._elemento._valores.get(self.Definition, self.Definition.padrao)
+
+    def AsDouble(self):
+        _chamada()
+        return float(self._valor() or 0.0)
+
+    def AsInteger(self):
+        _chamada()
+        return int(self._valor() or 0)
+
+    def AsString(self):
+        _chamada()
+        return self._valor()
+
+    def AsValueString(self):
+        _chamada()
+        valor = self._valor()
+        return None if valor is None else u"{}".format(valor)
+
+    def AsElementId(self):
+        _chamada()
+        valor = self._valor()
+        return valor if isinstance(valor, ElementId) else ElementId(-1 if valor is None else valor)
+
+    def Set(self, valor):
+        _chamada()
+        if self.Definition.somente_leitura:
+            raise ErroTransacao("Parâmetro somente leitura: {}".format(self.Definition.Name))
+        elemento = self._elemento
+        doc = elemento.Document
+        doc._exigir_transacao()
+        anterior = elemento._valores.get(self.Definition, self.Definition.padrao)
+        doc._registrar_desfazer(lambda: elemento._valores.__setitem__(self.Definition, anterior))
+        elemento._valores[self.Definition] = valor
+        doc._registrar_alteracao(elemento, _ALTERACAO_PARAMETRO, self.Definition.Id.Value)
+        return True
+
+
+_INDICES = {}
+
+
+def _indice_definicoes(definicoes):
+    """Índice ``id(Definition)``/``BuiltInParameter`` -> definição de uma lista."""
+    chave = id(definicoes)
+    guardado = _INDICES.get(chave)
+    if guardado is None or guardado[0] is not definicoes or guardado[2] != len(definicoes):
+        indice = {}
+        for definicao in definicoes:
+            indice[id(definicao)] = definicao
+            if definicao.embutido is not None:
+                indice.setdefault(int(definicao.embutido), definicao)
+        guardado = _INDICES[chave] = (definicoes, indice, len(definicoes))
+    return guardado[1]
+
+
+class Category(object):
+    def __init__(self, membro):
+        self.Id = ElementId(int(membro))
+        self.Name = str(membro)
+        self.BuiltInCategory = membro
+
+
+_CATEGORIAS = {}
+
+
+def _categoria(membro):
+    if membro is None:
+        return None
+    categoria = _CATEGORIAS.get(int(membro))
+    if categoria is None:
+        categoria = _CATEGORIAS[int(membro)] = Category(membro)
+    return categoria
+
+
+class Element(object):
+    """Elemento genérico; ``_definicoes`` descreve os parâmetros disponíveis."""
+
+    def __init__(self, nome=u"", categoria=None, definicoes=(), nivel_id=None, local=None):
+        self.Id = ElementId.InvalidElementId
+        self.Document = None
+        self.Name = nome
+        self.Category = _categoria(categoria)
+        self.LevelId = nivel_id or ElementId.InvalidElementId
+        self.Location = local
+        # Lista compartilhada entre as instâncias de um mesmo símbolo
+        self._definicoes = definicoes if isinstance(definicoes, list) else list(definicoes)
+        self._valores = {}
+
+    def __repr__(self):
+        return "<{} {} '{}'>".format(type(self).__name__, self.Id, self.Name)
+
+    def _todas_definicoes(self):
+        return self._definicoes
+
+    @property
+    def Parameters(self):
+        return [Parameter(self, d) for d in self._todas_definicoes()]
+
+    def LookupParameter(self, nome):
+        _chamada()
+        if isinstance(nome, bytes) and not isinstance(nome, type(u"")):
+            nome = nome.decode('utf-8')
+        for definicao in self._todas_definicoes():
+            if definicao.Name == nome:
+                return Parameter(self, definicao)
+        return None
+
+    def get_Parameter(self, chave):
+        """Acesso direto por ``Definition`` ou ``BuiltInParameter`` (sem busca por nome)."""
+        _chamada()
+        definicao = _indice_definicoes(self._todas_definicoes()).get(
+            id(chave) if isinstance(chave, Definition) else int(chave))
+        return None if definicao is None else Parameter(self, definicao)
+
+    def get_BoundingBox(self, vista):
+        return None
+
+    def GetTypeId(self):
+        _chamada()
+        return ElementId.InvalidElementId
+
+    @staticmethod
+    def GetChangeTypeParameter(parametro_id):
+        return ChangeType(_ALTERACAO_PARAMETRO, _valor_id(parametro_id))
+
+    @staticmethod
+    def GetChangeTypeAny():
+        return ChangeType(_ALTERACAO_PARAMETRO)
+
+    @staticmethod
+    def GetChangeTypeElementAddition():
+        return ChangeType(_ALTERACAO_ADICAO)
+
+    def GetEntity(self, schema):
+        _chamada()
+        entidades = self.__dict__.get('_entidades') or {}
+        return entidades.get(schema.GUID, Entity())
+
+    def SetEntity(self, entidade):
+        _chamada()
+        doc = self.Document
+        doc._exigir_transacao()
+        entidades = self.__dict__.setdefault('_entidades', {})
+        guid = entidade.Schema.GUID
+        anterior = entidades.get(guid)
+        doc._registrar_desfazer(
+            lambda: entidades.__setitem__(guid, anterior) if anterior is not None
+            else entidades.pop(guid, None))
+        entidades[guid] = entidade.copiar()
+
+    def definir(self, nome_ou_embutido, valor):
+        """Atribui um valor sem transação (montagem de cenários)."""
+        for definicao in self._todas_definicoes():
+            if definicao.Name == nome_ou_embutido or definicao.embutido == nome_ou_embutido:
+                self._valores[definicao] = valor
+                return
+        raise KeyError(nome_ou_embutido)
+
+
+class ElementType(Element):
+    pass
+
+
+class Level(Element):
+    def __init__(self, nome, elevacao):
+        super(Level, self).__init__(nome, BuiltInCategory.OST_Levels)
+        self.Elevation = elevacao
+
+
+class WallType(ElementType):
+    def __init__(self, nome, espessura):
+        super(WallType, self).__init__(nome, BuiltInCategory.OST_Walls)
+        self.Width = espessura
+
+
+class Wall(Element):
+    def __init__(self, tipo, curva, nivel_id):
+        super(Wall, self).__init__(tipo.Name, BuiltInCategory.OST_Walls, nivel_id=nivel_id,
+                                   local=LocationCurve(curva))
+        self.WallType = tipo
+        self.insercoes = []  # ids de portas/janelas hospedadas
+
+    @property
+    def Orientation(self):
+        """Normal da face externa: à esquerda do sentido da curva, no meio dela."""
+        curva = self.Location.Curve
+        antes, depois = curva.Evaluate(0.49, True), curva.Evaluate(0.51, True)
+        tangente = (depois - antes).Normalize()
+        return XYZ(-tangente.Y, tangente.X, 0.0)
+
+    def FindInserts(self, aberturas, vazios, embutidos, compartilhados):
+        _chamada()
+        return list(self.insercoes)
+
+
+FamilyPlacementType = _Enumeracao('FamilyPlacementType', inicio=0)
+
+
+class Family(Element):
+    # Famílias de tomada hospedadas em parede; baseadas em face: WorkPlaneBased
+    FamilyPlacementType = FamilyPlacementType.OneLevelBasedHosted
+
+
+class FamilySymbol(ElementType):
+    def __init__(self, familia, nome, categoria, definicoes_tipo=(), definicoes_instancia=()):
+        super(FamilySymbol, self).__init__(nome, categoria, definicoes_tipo)
+        self.Family = familia
+        self.FamilyName = familia.Name
+        self.IsActive = False
+        # Parâmetros de instância criados para cada FamilyInstance deste tipo
+        self.definicoes_instancia = list(definicoes_instancia)
+
+    def Activate(self):
+        _chamada()
+        self.Document._exigir_transacao()
+        self.IsActive = True
+
+
+class FamilyInstance(Element):
+    def __init__(self, simbolo, ponto, host=None, nivel_id=None):
+        super(FamilyInstance, self).__init__(
+            simbolo.Name, simbolo.Category.BuiltInCategory, simbolo.definicoes_instancia,
+            nivel_id if nivel_id is not None else getattr(host, 'LevelId', None),
+            LocationPoint(ponto),
+        )
+        self.Symbol = simbolo
+        self.Host = host
+        self.HostFace = None  # Reference da face (famílias baseadas em face)
+
+    def GetTypeId(self):
+        _chamada()
+        return self.Symbol.Id
+
+    def ChangeTypeId(self, tipo_id):
+        _chamada()
+        doc = self.Document
+        doc._exigir_transacao()
+        anterior = self.Symbol
+        doc._registrar_desfazer(lambda: setattr(self, 'Symbol', anterior))
+        self.Symbol = doc._elementos[_valor_id(tipo_id)]
+        return self.Id
+
+
+class VoltageType(Element):
+    def __init__(self, nome, valor):
+        super(VoltageType, self).__init__(nome)
+        self.ActualValue = valor
+
+
+class DistributionSysType(ElementType):
+    def __init__(self, nome, fase_neutro, fase_fase):
+        super(DistributionSysType, self).__init__(nome)
+        self.VoltageLineToGround = VoltageType(u"{} V".format(fase_neutro), fase_neutro) if fase_neutro else None
+        self.VoltageLineToLine = VoltageType(u"{} V".format(fase_fase), fase_fase) if fase_fase else None
+
+
+_DEFINICOES_CIRCUITO = None
+
+
+def _definicoes_circuito():
+    global _DEFINICOES_CIRCUITO
+    if _DEFINICOES_CIRCUITO is None:
+        _DEFINICOES_CIRCUITO = [
+            Definition(u"Tensão", StorageType.Double, embutido=BuiltInParameter.RBS_ELEC_VOLTAGE),
+            Definition(u"Número de polos", StorageType.Integer, 1,
+                       embutido=BuiltInParameter.RBS_ELEC_NUMBER_OF_POLES),
+            Definition(u"Carga aparente", StorageType.Double,
+                       embutido=BuiltInParameter.RBS_ELEC_APPARENT_LOAD),
+            Definition(u"Fator de potência", StorageType.Double,
+                       embutido=BuiltInParameter.RBS_ELEC_POWER_FACTOR),
+            Definition(u"Comprimento", StorageType.Double, somente_leitura=True,
+                       embutido=BuiltInParameter.RBS_ELEC_CIRCUIT_LENGTH_PARAM),
+            # Parâmetro de projeto vinculado à categoria de circuitos
+            Definition(u"Comprimento da Rota (m)", StorageType.Double),
+        ]
+    return _DEFINICOES_CIRCUITO
+
+
+class ElectricalSystem(Element):
+    def __init__(self, ids):
+        super(ElectricalSystem, self).__init__(u"Circuito", BuiltInCategory.OST_ElectricalCircuit,
+                                               _definicoes_circuito())
+        self.ids_elementos = list(ids)
+        self.BaseEquipment = None
+
+    @staticmethod
+    def Create(doc, ids, tipo):
+        _chamada()
+        ids = list(ids)
+        if not ids:
+            return None
+        circuito = ElectricalSystem(ids)
+        doc._adicionar(circuito)
+        return circuito
+
+    @property
+    def Elements(self):
+        return [self.Document.GetElement(i) for i in self.ids_elementos]
+
+    def SelectPanel(self, painel):
+        _chamada()
+        self.Document._exigir_transacao()
+        anterior = self.BaseEquipment
+        self.Document._registrar_desfazer(lambda: setattr(self, 'BaseEquipment', anterior))
+        self.BaseEquipment = painel
+
+
+# --- Ambientes ---------------------------------------------------------------
+
+SpatialElementBoundaryLocation = _Enumeracao('SpatialElementBoundaryLocation', inicio=0)
+
+
+class SpatialElementBoundaryOptions(object):
+    def __init__(self):
+        self.SpatialElementBoundaryLocation = SpatialElementBoundaryLocation.Finish
+
+
+class BoundarySegment(object):
+    """Trecho do contorno de um ambiente e o elemento que o delimita."""
+
+    def __init__(self, curva, elemento_id=None):
+        self._curva = curva
+        self.ElementId = elemento_id or ElementId.InvalidElementId
+
+    def GetCurve(self):
+        _chamada()
+        return self._curva
+
+
+class Room(Element):
+    """Ambiente com um único laço de contorno (o externo)."""
+
+    def __init__(self, nome, numero, nivel, segmentos, definicoes=()):
+        super(Room, self).__init__(
+            nome, BuiltInCategory.OST_Rooms,
+            [Definition(u"Nome", StorageType.String, nome, embutido=BuiltInParameter.ROOM_NAME),
+             Definition(u"Número", StorageType.String, numero, embutido=BuiltInParameter.ROOM_NUMBER)]
+            + list(definicoes),
+            nivel.Id,
+        )
+        self.Number = numero
+        self._segmentos = segmentos
+        self.Perimeter = sum(s._curva.Length for s in segmentos)
+        # Área pelos extremos dos trechos (suficiente para contornos poligonais)
+        pontos = [s._curva._extremos[0] for s in segmentos]
+        self.Area = abs(sum(a.X * b.Y - b.X * a.Y
+                            for a, b in zip(pontos, pontos[1:] + pontos[:1]))) / 2.0
+        if pontos:
+            self.Location = LocationPoint(XYZ(sum(p.X for p in pontos) / len(pontos),
+                                              sum(p.Y for p in pontos) / len(pontos),
+                                              nivel.Elevation))
+
+    def GetBoundarySegments(self, opcoes):
+        _chamada()
+        return [list(self._segmentos)] if self._segmentos else []
+
+
+# --- Vínculos ----------------------------------------------------------------
+
+ShellLayerType = _Enumeracao('ShellLayerType', inicio=0)
+
+
+class Transform(object):
+    """Transformação rígida (rotação em torno de Z, espelhamento e translação)."""
+
+    def __init__(self, origem, base_x, base_y):
+        self.Origin = origem
+        self.BasisX = base_x
+        self.BasisY = base_y
+        self.BasisZ = XYZ(0.0, 0.0, 1.0)
+
+    @staticmethod
+    def criar(origem=(0.0, 0.0, 0.0), rotacao=0.0, espelhado=False):
+        """Gira ``rotacao`` (rad) em torno de Z; ``espelhado`` inverte o eixo Y do vínculo antes."""
+        c, s = math.cos(rotacao), math.sin(rotacao)
+        sinal = -1.0 if espelhado else 1.0
+        return Transform(_xyz(origem), XYZ(c, s, 0.0), XYZ(-s * sinal, c * sinal, 0.0))
+
+    def OfPoint(self, ponto):
+        return self.Origin + self.OfVector(ponto)
+
+    def OfVector(self, vetor):
+        return XYZ(self.BasisX.X * vetor.X + self.BasisY.X * vetor.Y,
+                   self.BasisX.Y * vetor.X + self.BasisY.Y * vetor.Y, vetor.Z)
+
+
+class Reference(object):
+    """Referência a um elemento (ou a uma face dele); vinculada: ``ElementId`` é o vínculo."""
+
+    def __init__(self, elemento_id, elemento_vinculado_id=None, camada=None):
+        self.ElementId = elemento_id
+        self.LinkedElementId = elemento_vinculado_id or ElementId.InvalidElementId
+        self.camada = camada
+
+    def CreateLinkReference(self, instancia):
+        _chamada()
+        return Reference(instancia.Id, self.ElementId, self.camada)
+
+
+class HostObjectUtils(object):
+    @staticmethod
+    def GetSideFaces(hospedeiro, camada):
+        _chamada()
+        return [Reference(hospedeiro.Id, camada=camada)]
+
+
+class RevitLinkInstance(Element):
+    def __init__(self, nome, documento, transformacao):
+        super(RevitLinkInstance, self).__init__(nome, BuiltInCategory.OST_RvtLinks)
+        self._documento = documento
+        self._transformacao = transformacao
+
+    def GetLinkDocument(self):
+        _chamada()
+        return self._documento
+
+    def GetTotalTransform(self):
+        _chamada()
+        return self._transformacao
+
+
+# --- Filtros e coletor -------------------------------------------------------
+
+class ElementLevelFilter(object):
+    def __init__(self, nivel_id):
+        self.nivel = _valor_id(nivel_id)
+
+    def passa(self, elemento):
+        return elemento.LevelId.Value == self.nivel
+
+
+class ElementCategoryFilter(object):
+    def __init__(self, categoria):
+        self.categorias = set([int(categoria)])
+
+    def passa(self, elemento):
+        return elemento.Category is not None and elemento.Category.Id.Value in self.categorias
+
+
+class ElementMulticategoryFilter(ElementCategoryFilter):
+    def __init__(self, categorias):
+        self.categorias = set(int(c) for c in categorias)
+
+
+class ElementClassFilter(object):
+    def __init__(self, classe):
+        self.classe = classe
+
+    def passa(self, elemento):
+        return isinstance(elemento, self.classe)
+
+
+class ExtensibleStorageFilter(object):
+    def __init__(self, guid):
+        self.guid = guid
+
+    def passa(self, elemento):
+        return self.guid in (elemento.__dict__.get('_entidades') or ())
+
+
+class FilteredElementCollector(object):
+    """Coletor encadeável; a vista opcional é ignorada (todo o documento)."""
+
+    def __init__(self, doc, vista_ou_ids=None):
+        _chamada()
+        if vista_ou_ids is not None and not isinstance(vista_ou_ids, ElementId):
+            self._fonte = [doc.GetElement(i) for i in vista_ou_ids]
+        else:
+            self._fonte = None
+        self._doc = doc
+        self._filtros = []
+
+    def WherePasses(self, filtro):
+        self._filtros.append(filtro.passa)
+        return self
+
+    def OfClass(self, classe):
+        return self.WherePasses(ElementClassFilter(classe))
+
+    def OfCategory(self, categoria):
+        return self.WherePasses(ElementCategoryFilter(categoria))
+
+    def OfCategoryId(self, categoria_id):
+        self._filtros.append(
+            lambda e, v=_valor_id(categoria_id): e.Category is not None and e.Category.Id.Value == v)
+        return self
+
+    def WhereElementIsElementType(self):
+        self._filtros.append(lambda e: isinstance(e, ElementType))
+        return self
+
+    def WhereElementIsNotElementType(self):
+        self._filtros.append(lambda e: not isinstance(e, ElementType))
+        return self
+
+    def __iter__(self):
+        fonte = self._fonte if self._fonte is not None else self._doc._elementos.values()
+        filtros = self._filtros
+        for elemento in list(fonte):
+            if all(f(elemento) for f in filtros):
+                yield elemento
+
+    def ToElements(self):
+        _chamada()
+        return list(self)
+
+    def ToElementIds(self):
+        _chamada()
+        return [e.Id for e in self]
+
+    def FirstElement(self):
+        _chamada()
+        for elemento in self:
+            return elemento
+        return None
+
+    def GetElementCount(self):
+        _chamada()
+        return sum(1 for _ in self)
+
+
+# --- Transações ----------------------------------------------------------------
+
+class TransactionStatus(object):
+    Uninitialized = _Membro(0, 'Uninitialized')
+    Started = _Membro(1, 'Started')
+    RolledBack = _Membro(2, 'RolledBack')
+    Committed = _Membro(3, 'Committed')
+
+
+class FailureSeverity(object):
+    Warning = _Membro(1, 'Warning')
+    Error = _Membro(2, 'Error')
+
+
+class FailureProcessingResult(object):
+    Continue = _Membro(0, 'Continue')
+    ProceedWithCommit = _Membro(1, 'ProceedWithCommit')
+    ProceedWithRollBack = _Membro(2, 'ProceedWithRollBack')
+
+
+class IFailuresPreprocessor(object):
+    def PreprocessFailures(self, acessor):
+        raise NotImplementedError
+
+
+class FailureMessage(object):
+    """Falha postada com ``Document.PostFailure`` (a descrição vem direto no construtor)."""
+
+    def __init__(self, descricao, severidade=FailureSeverity.Warning):
+        self._descricao = descricao
+        self._severidade = severidade
+        self._ids = []
+
+    def SetFailingElements(self, ids):
+        self._ids = list(ids)
+        return self
+
+    def SetFailingElement(self, elem_id):
+        self._ids = [elem_id]
+        return self
+
+    # Interface de FailureMessageAccessor
+
+    def GetSeverity(self):
+        _chamada()
+        return self._severidade
+
+    def GetDescriptionText(self):
+        _chamada()
+        return self._descricao
+
+    def GetFailingElementIds(self):
+        _chamada()
+        return list(self._ids)
+
+
+class FailuresAccessor(object):
+    def __init__(self, transacao):
+        self._transacao = transacao
+
+    def GetFailureMessages(self):
+        _chamada()
+        return list(self._transacao._falhas)
+
+    def GetTransactionName(self):
+        return self._transacao.nome
+
+    def DeleteWarning(self, mensagem):
+        _chamada()
+        if mensagem.GetSeverity() == FailureSeverity.Warning:
+            self._transacao._falhas.remove(mensagem)
+
+    def DeleteAllWarnings(self):
+        _chamada()
+        self._transacao._falhas = [
+            f for f in self._transacao._falhas if f._severidade != FailureSeverity.Warning
+        ]
+
+
+class FailureHandlingOptions(object):
+    def __init__(self):
+        self._preprocessador = None
+        self.limpar_apos_desfazer = False
+
+    def SetFailuresPreprocessor(self, preprocessador):
+        self._preprocessador = preprocessador
+        return self
+
+    def GetFailuresPreprocessor(self):
+        return self._preprocessador
+
+    def SetClearAfterRollback(self, valor):
+        self.limpar_apos_desfazer = bool(valor)
+        return self
+
+
+class Transaction(object):
+    def __init__(self, doc, nome=u"Transação"):
+        self._doc = doc
+        self.nome = nome
+        self._desfazer = None
+        self._falhas = []
+        self._opcoes = FailureHandlingOptions()
+
+    def GetName(self):
+        return self.nome
+
+    def GetFailureHandlingOptions(self):
+        return self._opcoes
+
+    def SetFailureHandlingOptions(self, opcoes):
+        self._opcoes = opcoes
+
+    def Start(self):
+        if self._doc._transacao is not None:
+            raise ErroTransacao("Já existe uma transação aberta.")
+        self._desfazer = []
+        self._falhas = []
+        self._alteracoes = []
+        self._doc._transacao = self
+        self._doc.transacoes += 1
+        return TransactionStatus.Started
+
+    def HasStarted(self):
+        return self._desfazer is not None
+
+    def _processar_falhas(self):
+        """False quando a transação deve ser desfeita.
+
+        Sem pré-processador os avisos são descartados (o Revit mostraria
+        um diálogo) e qualquer erro desfaz a transação.
+        """
+        if not self._falhas:
+            return True
+        preprocessador = self._opcoes.GetFailuresPreprocessor()
+        if preprocessador is not None:
+            resultado = preprocessador.PreprocessFailures(FailuresAccessor(self))
+            if resultado == FailureProcessingResult.ProceedWithRollBack:
+                return False
+        return not any(f._severidade != FailureSeverity.Warning for f in self._falhas)
+
+    def Commit(self):
+        self._doc._executar_atualizadores(self)
+        if not self._processar_falhas():
+            self.RollBack()
+            return TransactionStatus.RolledBack
+        self._doc._transacao = None
+        if self._doc._grupos:
+            self._doc._grupos[-1]._desfazer.extend(self._desfazer)
+        self._desfazer = None
+        self._falhas = []
+        return TransactionStatus.Committed
+
+    def RollBack(self):
+        self._doc._transacao = None
+        _executar_desfazer(self._desfazer)
+        self._desfazer = None
+        self._falhas = []
+        return TransactionStatus.RolledBack
+
+
+class TransactionGroup(object):
+    def __init__(self, doc, nome=u"Grupo"):
+        self._doc = doc
+        self.nome = nome
+        self._desfazer = None
+
+    def Start(self):
+        self._desfazer = []
+        self._doc._grupos.append(self)
+        return True
+
+    def HasStarted(self):
+        return self._desfazer is not None
+
+    def _encerrar(self):
+        self._doc._grupos.remove(self)
+        if self._doc._grupos:
+            self._doc._grupos[-1]._desfazer.extend(self._desfazer)
+        self._desfazer = None
+
+    def Assimilate(self):
+        self._encerrar()
+        return True
+
+    Commit = Assimilate
+
+    def RollBack(self):
+        self._doc._grupos.remove(self)
+        _executar_desfazer(self._desfazer)
+        self._desfazer = None
+        return True
+
+
+def _executar_desfazer(acoes):
+    for acao in reversed(acoes or []):
+        acao()
+
+
+# --- Atualizadores (Dynamic Model Update) ------------------------------------------
+
+_ALTERACAO_PARAMETRO = 'parametro'
+_ALTERACAO_ADICAO = 'adicao'
+
+ChangePriority = _Enumeracao('ChangePriority', inicio=0)
+
+
+class ChangeType(object):
+    def __init__(self, tipo, parametro=None):
+        self.tipo = tipo
+        self.parametro = parametro  # None: qualquer parâmetro
+
+    def aceita(self, tipo, parametro):
+        return tipo == self.tipo and (self.parametro is None or parametro == self.parametro)
+
+
+class AddInId(object):
+    def __init__(self, guid):
+        self.guid = guid
+
+    def GetGUID(self):
+        return self.guid
+
+
+class UpdaterId(object):
+    def __init__(self, addin, guid):
+        self.addin = addin
+        self.guid = guid
+
+    def GetGUID(self):
+        return self.guid
+
+
+class IUpdater(object):
+    """Base dos atualizadores (``Execute``, ``GetUpdaterId``... na subclasse)."""
+
+
+class UpdaterData(object):
+    def __init__(self, doc, modificados, adicionados):
+        self._doc = doc
+        self._modificados = modificados
+        self._adicionados = adicionados
+
+    def GetDocument(self):
+        return self._doc
+
+    def GetModifiedElementIds(self):
+        _chamada()
+        return [ElementId(i) for i in sorted(self._modificados)]
+
+    def GetAddedElementIds(self):
+        _chamada()
+        return [ElementId(i) for i in sorted(self._adicionados)]
+
+    def GetDeletedElementIds(self):
+        _chamada()
+        return []
+
+
+class UpdaterRegistry(object):
+    """Registro por documento; os gatilhos ficam em ``Documento._atualizadores``."""
+
+    @staticmethod
+    def RegisterUpdater(atualizador, doc, opcional=False):
+        _chamada()
+        guid = atualizador.GetUpdaterId().GetGUID()
+        if guid in doc._atualizadores:
+            raise ErroTransacao("Atualizador já registrado neste documento.")
+        doc._atualizadores[guid] = (atualizador, [])
+
+    @staticmethod
+    def IsUpdaterRegistered(atualizador_id, doc):
+        _chamada()
+        return atualizador_id.GetGUID() in doc._atualizadores
+
+    @staticmethod
+    def UnregisterUpdater(atualizador_id, doc):
+        _chamada()
+        doc._atualizadores.pop(atualizador_id.GetGUID())
+
+    @staticmethod
+    def AddTrigger(atualizador_id, doc, filtro, tipo):
+        _chamada()
+        doc._atualizadores[atualizador_id.GetGUID()][1].append((filtro, tipo))
+
+    @staticmethod
+    def RemoveDocumentTriggers(atualizador_id, doc):
+        _chamada()
+        del doc._atualizadores[atualizador_id.GetGUID()][1][:]
+
+
+# --- Documento -------------------------------------------------------------------
+
+class Criacao(object):
+    def __init__(self, doc):
+        self._doc = doc
+
+    def NewFamilyInstance(self, *args):
+        """``(ponto, simbolo, host, tipo_estrutural)`` ou, baseada em face,
+        ``(referencia, ponto, direcao, simbolo)``."""
+        _chamada()
+        na_face = isinstance(args[0], Reference)
+        if na_face:
+            referencia, ponto, direcao, simbolo = args
+            if simbolo.Family.FamilyPlacementType != FamilyPlacementType.WorkPlaneBased:
+                raise ValueError("A família não é baseada em face.")
+        else:
+            ponto, simbolo, host, _ = args
+        if not simbolo.IsActive:
+            raise ErroTransacao("O símbolo não está ativo.")
+        if not na_face:
+            return self._doc._adicionar(FamilyInstance(simbolo, ponto, host))
+        instancia = FamilyInstance(simbolo, ponto)
+        instancia.HostFace = referencia
+        instancia.Location.Rotation = math.atan2(direcao.Y, direcao.X)
+        return self._doc._adicionar(instancia)
+
+
+class Documento(object):
+    """Documento em memória com a interface de ``Autodesk.Revit.DB.Document``."""
+
+    def __init__(self, titulo=u"Projeto Falso", caminho=u""):
+        self.Title = titulo
+        self.PathName = caminho
+        self.Create = Criacao(self)
+        self._elementos = {}
+        self._proximo_id = 1000
+        self._transacao = None
+        self._grupos = []
+        self._atualizadores = {}  # guid -> (IUpdater, [(filtro, ChangeType)])
+        self.transacoes = 0
+        self.regeneracoes = 0
+
+    @property
+    def IsModifiable(self):
+        return self._transacao is not None
+
+    def _exigir_transacao(self):
+        if self._transacao is None:
+            raise ErroTransacao("Modificação do documento fora de uma transação.")
+
+    def _registrar_desfazer(self, acao):
+        if self._transacao is not None:
+            self._transacao._desfazer.append(acao)
+
+    def _registrar(self, elemento):
+        self._proximo_id += 1
+        elemento.Id = ElementId(self._proximo_id)
+        elemento.Document = self
+        self._elementos[self._proximo_id] = elemento
+        return elemento
+
+    def _adicionar(self, elemento):
+        self._exigir_transacao()
+        self._registrar(elemento)
+        self._registrar_desfazer(lambda: self._elementos.pop(elemento.Id.Value, None))
+        self._registrar_alteracao(elemento, _ALTERACAO_ADICAO)
+        return elemento
+
+    def _registrar_alteracao(self, elemento, tipo, parametro=None):
+        if self._atualizadores and self._transacao is not None:
+            self._transacao._alteracoes.append((elemento.Id.Value, tipo, parametro))
+
+    def _executar_atualizadores(self, transacao):
+        """Chama cada atualizador uma vez com os ids que dispararam os seus gatilhos.
+
+        As alterações feitas pelos atualizadores não disparam novas chamadas.
+        """
+        alteracoes = transacao._alteracoes
+        if not self._atualizadores or not alteracoes:
+            return
+        transacao._alteracoes = []
+        for atualizador, gatilhos in list(self._atualizadores.values()):
+            modificados, adicionados = set(), set()
+            for id_elemento, tipo, parametro in alteracoes:
+                elemento = self._elementos.get(id_elemento)
+                if elemento is None:
+                    continue
+                for filtro, tipo_gatilho in gatilhos:
+                    if tipo_gatilho.aceita(tipo, parametro) and filtro.passa(elemento):
+                        (adicionados if tipo == _ALTERACAO_ADICAO else modificados).add(id_elemento)
+                        break
+            if modificados or adicionados:
+                atualizador.Execute(UpdaterData(self, modificados - adicionados, adicionados))
+
+    def GetElement(self, elem_id):
+        _chamada()
+        return self._elementos.get(_valor_id(elem_id))
+
+    def Delete(self, ids):
+        _chamada()
+        self._exigir_transacao()
+        if isinstance(ids, (ElementId, int)):
+            ids = [ids]
+        removidos = []
+        for elem_id in ids:
+            elemento = self._elementos.pop(_valor_id(elem_id), None)
+            if elemento is not None:
+                removidos.append(elemento.Id)
+                self._registrar_desfazer(lambda e=elemento: self._elementos.__setitem__(e.Id.Value, e))
+        return removidos
+
+    def Regenerate(self):
+        _chamada()
+        self._exigir_transacao()
+        self.regeneracoes += 1
+
+    def PostFailure(self, mensagem):
+        """Registra uma falha tratada no ``Commit`` da transação aberta."""
+        _chamada()
+        self._exigir_transacao()
+        self._transacao._falhas.append(mensagem)
+
+    # Montagem de cenários (fora de transação)
+
+    def criar_nivel(self, nome, elevacao=0.0):
+        return self._registrar(Level(nome, elevacao))
+
+    def criar_tipo_parede(self, nome=u"Parede 15 cm", espessura=0.5):
+        return self._registrar(WallType(nome, espessura))
+
+    def criar_parede(self, inicio, fim, nivel, tipo=None, meio=None):
+        """Parede reta entre ``inicio`` e ``fim`` ou em arco passando por ``meio``."""
+        if tipo is None:
+            tipo = self.criar_tipo_parede()
+        p0, p1 = _xyz(inicio), _xyz(fim)
+        p0 = XYZ(p0.X, p0.Y, nivel.Elevation)
+        p1 = XYZ(p1.X, p1.Y, nivel.Elevation)
+        curva = Line(p0, p1) if meio is None else Arc.Create(p0, p1, _xyz(meio))
+        return self._registrar(Wall(tipo, curva, nivel.Id))
+
+    def criar_simbolo(self, familia, tipo, categoria=BuiltInCategory.OST_ElectricalFixtures,
+                      parametros_instancia=(), parametros_tipo=(), ativo=True, baseada_em_face=False):
+        """``parametros_*``: ``(nome, StorageType, padrão)`` ou ``Definition``."""
+        def definicoes(parametros):
+            return [p if isinstance(p, Definition) else Definition(*p) for p in parametros]
+
+        familia_elem = self._registrar(Family(familia))
+        if baseada_em_face:
+            familia_elem.FamilyPlacementType = FamilyPlacementType.WorkPlaneBased
+        simbolo = FamilySymbol(
+            familia_elem, tipo, categoria,
+            [Definition(u"Nome da família", StorageType.String, familia,
+                        embutido=BuiltInParameter.ALL_MODEL_FAMILY_NAME),
+             Definition(u"Nome do tipo", StorageType.String, tipo,
+                        embutido=BuiltInParameter.ALL_MODEL_TYPE_NAME)] + definicoes(parametros_tipo),
+            definicoes(parametros_instancia),
+        )
+        simbolo.IsActive = ativo
+        return self._registrar(simbolo)
+
+    def criar_abertura(self, parede, distancia, largura=3.0, categoria=BuiltInCategory.OST_Doors):
+        """Porta/janela a ``distancia`` (pés) do início da parede."""
+        chave = (int(categoria), largura)
+        simbolos = self.__dict__.setdefault('_simbolos_aberturas', {})
+        simbolo = simbolos.get(chave)
+        if simbolo is None:
+            simbolo = simbolos[chave] = self.criar_simbolo(
+                u"Abertura", u"{:.2f}".format(largura), categoria,
+                parametros_tipo=[Definition(u"Largura", StorageType.Double, largura,
+                                            embutido=BuiltInParameter.FAMILY_WIDTH_PARAM)],
+            )
+        curva = parede.Location.Curve
+        ponto = curva.Evaluate(distancia / curva.Length, True)
+        abertura = self._registrar(FamilyInstance(simbolo, ponto, parede))
+        parede.insercoes.append(abertura.Id)
+        return abertura
+
+    def criar_ambiente(self, nome, vertices, nivel, paredes=None, numero=u"", parametros=()):
+        """Ambiente pelo polígono ``vertices`` (anti-horário, pés).
+
+        ``paredes[k]`` delimita o lado que começa em ``vertices[k]`` (None:
+        linha de separação de ambientes); ``parametros`` como em ``criar_simbolo``.
+        """
+        pontos = [_xyz(v) for v in vertices]
+        pontos = [XYZ(p.X, p.Y, nivel.Elevation) for p in pontos]
+        paredes = paredes or [None] * len(pontos)
+        segmentos = [
+            BoundarySegment(Line(a, b), None if parede is None else parede.Id)
+            for a, b, parede in zip(pontos, pontos[1:] + pontos[:1], paredes)
+        ]
+        definicoes = [p if isinstance(p, Definition) else Definition(*p) for p in parametros]
+        return self._registrar(Room(nome, numero, nivel, segmentos, definicoes))
+
+    def criar_vinculo(self, documento, origem=(0.0, 0.0, 0.0), rotacao=0.0, espelhado=False,
+                      nome=u"Arquitetura.rvt"):
+        """Instância de vínculo de ``documento`` (outro ``Documento``) neste documento."""
+        return self._registrar(RevitLinkInstance(
+            nome, documento, Transform.criar(origem, rotacao, espelhado)))
+
+    def criar_sistema_distribuicao(self, nome=u"127/220 V", fase_neutro=127.0, fase_fase=220.0):
+        return self._registrar(DistributionSysType(nome, fase_neutro, fase_fase))
+
+    def criar_painel(self, nome, ponto, nivel, sistema=None):
+        simbolos = self.__dict__.setdefault('_simbolos_paineis', {})
+        simbolo = simbolos.get(nome)
+        if simbolo is None:
+            simbolo = simbolos[nome] = self.criar_simbolo(
+                u"Quadro", nome, BuiltInCategory.OST_ElectricalEquipment,
+                parametros_instancia=[Definition(
+                    u"Sistema de distribuição", StorageType.ElementId, None,
+                    embutido=BuiltInParameter.RBS_FAMILY_CONTENT_DISTRIBUTION_SYSTEM)],
+            )
+        painel = self._registrar(FamilyInstance(simbolo, _xyz(ponto), nivel_id=nivel.Id))
+        if sistema is not None:
+            painel.definir(BuiltInParameter.RBS_FAMILY_CONTENT_DISTRIBUTION_SYSTEM, sistema.Id)
+        return painel
+
+
+# --- Extensible Storage ------------------------------------------------------------
+
+class Guid(object):
+    __slots__ = ('_texto',)
+
+    def __init__(self, texto):
+        self._texto = str(texto).lower()
+
+    def __eq__(self, outro):
+        return isinstance(outro, Guid) and outro._texto == self._texto
+
+    def __ne__(self, outro):
+        return not self.__eq__(outro)
+
+    def __hash__(self):
+        return hash(self._texto)
+
+    def ToString(self):
+        return self._texto
+
+    __str__ = ToString
+
+
+class AccessLevel(object):
+    Public = 0
+    Vendor = 1
+    Application = 2
+
+
+_ESQUEMAS = {}
+
+
+class Schema(object):
+    def __init__(self, guid, nome, campos):
+        self.GUID = guid
+        self.SchemaName = nome
+        self.campos = campos
+
+    @staticmethod
+    def Lookup(guid):
+        _chamada()
+        return _ESQUEMAS.get(guid)
+
+
+class SchemaBuilder(object):
+    def __init__(self, guid):
+        self._guid = guid
+        self._nome = u""
+        self._campos = {}
+
+    def SetReadAccessLevel(self, nivel):
+        pass
+
+    def SetWriteAccessLevel(self, nivel):
+        pass
+
+    def SetSchemaName(self, nome):
+        self._nome = nome
+
+    def AddSimpleField(self, nome, tipo):
+        self._campos[nome] = tipo
+
+    def Finish(self):
+        esquema = _ESQUEMAS[self._guid] = Schema(self._guid, self._nome, dict(self._campos))
+        return esquema
+
+
+class _MetodoGenerico(object):
+    """``entidade.Set[String](campo, valor)`` / ``entidade.Get[String](campo)``."""
+
+    def __init__(self, funcao):
+        self._funcao = funcao
+
+    def __getitem__(self, tipo):
+        return self._funcao
+
+
+class Entity(object):
+    def __init__(self, schema=None):
+        self.Schema = schema
+        self._valores = {}
+        self.Set = _MetodoGenerico(self._definir)
+        self.Get = _MetodoGenerico(self._obter)
+
+    def IsValid(self):
+        return self.Schema is not None
+
+    def _definir(self, campo, valor):
+        if campo not in self.Schema.campos:
+            raise ValueError("Campo inexistente: {}".format(campo))
+        self._valores[campo] = valor
+
+    def _obter(self, campo):
+        _chamada()
+        return self._valores.get(campo)
+
+    def copiar(self):
+        copia = Entity(self.Schema)
+        copia._valores = dict(self._valores)
+        return copia
+
+
+# --- Registro dos módulos ----------------------------------------------------------
+
+class _ListaGenerica(list):
+    def Add(self, item):
+        self.append(item)
+
+    @property
+    def Count(self):
+        return len(self)
+
+
+class _List(object):
+    def __getitem__(self, tipo):
+        return _ListaGenerica
+
+
+def _modulo(nome, **atributos):
+    modulo = types.ModuleType(nome)
+    for chave, valor in atributos.items():
+        setattr(modulo, chave, valor)
+    return modulo
+
+
+def instalar():
+    """Registra a API falsa em ``sys.modules`` (apenas fora do Revit).
+
+    Retorna o módulo ``Autodesk.Revit.DB`` falso.
+    """
+    atual = sys.modules.get('Autodesk.Revit.DB')
+    if atual is not None:
+        if getattr(atual, '_revit_falso', False):
+            return atual
+        raise RuntimeError("A Revit API real já está carregada; o substituto não deve ser instalado.")
+
+    db = _modulo(
+        'Autodesk.Revit.DB',
+        _revit_falso=True,
+        XYZ=XYZ, Line=Line, Arc=Arc, Curve=Curve,
+        LocationPoint=LocationPoint, LocationCurve=LocationCurve,
+        ElementTransformUtils=ElementTransformUtils,
+        ElementId=ElementId, Element=Element, ElementType=ElementType,
+        Parameter=Parameter, Definition=Definition, Category=Category,
+        StorageType=StorageType, BuiltInCategory=BuiltInCategory, BuiltInParameter=BuiltInParameter,
+        Level=Level, Wall=Wall, WallType=WallType, Family=Family,
+        FamilySymbol=FamilySymbol, FamilyInstance=FamilyInstance,
+        FilteredElementCollector=FilteredElementCollector,
+        ElementLevelFilter=ElementLevelFilter, ElementCategoryFilter=ElementCategoryFilter,
+        ElementMulticategoryFilter=ElementMulticategoryFilter, ElementClassFilter=ElementClassFilter,
+        ExtensibleStorageFilter=ExtensibleStorageFilter,
+        Transaction=Transaction, TransactionGroup=TransactionGroup, TransactionStatus=TransactionStatus,
+        FailureHandlingOptions=FailureHandlingOptions, FailureMessage=FailureMessage,
+        FailureSeverity=FailureSeverity, FailureProcessingResult=FailureProcessingResult,
+        FailuresAccessor=FailuresAccessor, IFailuresPreprocessor=IFailuresPreprocessor,
+        UnitUtils=UnitUtils, UnitTypeId=UnitTypeId, Document=Documento,
+        IUpdater=IUpdater, UpdaterId=UpdaterId, UpdaterData=UpdaterData, UpdaterRegistry=UpdaterRegistry,
+        ChangePriority=ChangePriority, ChangeType=ChangeType, AddInId=AddInId,
+        SpatialElementBoundaryOptions=SpatialElementBoundaryOptions,
+        SpatialElementBoundaryLocation=SpatialElementBoundaryLocation, BoundarySegment=BoundarySegment,
+        FamilyPlacementType=FamilyPlacementType, Transform=Transform, Reference=Reference,
+        RevitLinkInstance=RevitLinkInstance, HostObjectUtils=HostObjectUtils, ShellLayerType=ShellLayerType,
+    )
+    arquitetura = _modulo('Autodesk.Revit.DB.Architecture', Room=Room)
+    estrutura = _modulo('Autodesk.Revit.DB.Structure', StructuralType=StructuralType)
+    eletrica = _modulo(
+        'Autodesk.Revit.DB.Electrical',
+        ElectricalSystem=ElectricalSystem, ElectricalSystemType=ElectricalSystemType,
+        DistributionSysType=DistributionSysType,
+    )
+    excecoes = _modulo(
+        'Autodesk.Revit.Exceptions',
+        InvalidOperationException=ErroTransacao, ArgumentException=ValueError,
+    )
+    armazenamento = _modulo(
+        'Autodesk.Revit.DB.ExtensibleStorage',
+        Schema=Schema, SchemaBuilder=SchemaBuilder, Entity=Entity, AccessLevel=AccessLevel,
+        ExtensibleStorageFilter=ExtensibleStorageFilter,
+    )
+    db.Structure = estrutura
+    db.Electrical = eletrica
+    db.ExtensibleStorage = armazenamento
+    db.Architecture = arquitetura
+
+    autodesk = sys.modules.setdefault('Autodesk', _modulo('Autodesk'))
+    revit = sys.modules.setdefault('Autodesk.Revit', _modulo('Autodesk.Revit'))
+    autodesk.Revit = revit
+    revit.DB = db
+    revit.Exceptions = excecoes
+    sys.modules['Autodesk.Revit.DB'] = db
+    sys.modules['Autodesk.Revit.DB.Structure'] = estrutura
+    sys.modules['Autodesk.Revit.DB.Electrical'] = eletrica
+    sys.modules['Autodesk.Revit.DB.ExtensibleStorage'] = armazenamento
+    sys.modules['Autodesk.Revit.DB.Architecture'] = arquitetura
+    sys.modules['Autodesk.Revit.Exceptions'] = excecoes
+
+    if 'clr' not in sys.modules:
+        sys.modules['clr'] = _modulo('clr', AddReference=lambda *args: None)
+    if 'System.Collections.Generic' not in sys.modules:
+        generico = _modulo('System.Collections.Generic', List=_List())
+        colecoes = _modulo('System.Collections', Generic=generico)
+        sistema = sys.modules.setdefault('System', _modulo('System'))
+        sistema.Collections = colecoes
+        sys.modules['System.Collections'] = colecoes
+        sys.modules['System.Collections.Generic'] = generico
+    sistema = sys.modules.setdefault('System', _modulo('System'))
+    if not hasattr(sistema, 'Guid'):
+        sistema.Guid = Guid
+        sistema.String = type(u"")
+    return db
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+"""Comprimento de rota das tomadas até o painel pelo grafo das paredes.
+
+O comprimento que o Revit calcula para o circuito é praticamente uma linha
+reta do painel à tomada mais distante e não serve para dimensionar o cabo.
+Aqui os eletrodutos seguem as paredes:
+
+- as linhas de localização das paredes de um nível viram um grafo: as
+  extremidades próximas (``TOLERANCIA_JUNCAO``) são o mesmo nó e uma
+  extremidade sobre o meio de outra parede (junção em T) a divide;
+- o grafo é montado uma vez por nível e guardado na sessão enquanto as
+  paredes não mudarem;
+- painel e tomadas entram no grafo pela projeção na parede hospedeira (ou
+  na parede mais próxima) e um único Dijkstra por painel e nível, com as
+  duas extremidades do trecho do painel como fontes, dá a distância até
+  todas as tomadas ligadas a ele;
+- o comprimento do circuito é o da tomada mais distante, somado ao
+  desnível entre painel e tomada, e pode ser gravado no parâmetro
+  ``PARAM_COMPRIMENTO_ROTA`` do circuito (usado por ``demanda``).
+
+Tomadas sem caminho até o painel (paredes desconectadas) usam a distância
+ortogonal e ficam listadas em ``ResultadoRotas.sem_rota``.
+"""
+
+import bisect
+import heapq
+import math
+from collections import namedtuple
+
+from eletrica import geometria, insercao, rastreio, sessao, transacoes
+from eletrica.catalogo import id_inteiro
+from eletrica.insercao import PES_POR_METRO
+
+# Parâmetro de projeto (Número, em metros) dos circuitos elétricos
+PARAM_COMPRIMENTO_ROTA = u"Comprimento da Rota (m)"
+
+# Distância (pés) abaixo da qual extremidades de paredes são o mesmo nó
+TOLERANCIA_JUNCAO = 1.0
+
+# Distância máxima (pés) de um painel ou tomada à parede por onde entra na rota
+DISTANCIA_MAXIMA_ACESSO = 30.0
+
+# Tamanho da célula (pés) do índice de paredes
+TAMANHO_CELULA = 20.0
+
+TOLERANCIA_GRAVACAO = 0.005
+
+# Ponto de entrada no grafo: parede (índice no lote), comprimento de arco e distância até ela
+Acesso = namedtuple('Acesso', ['parede', 's', 'distancia'])
+
+
+class GrafoParedes(object):
+    """Grafo das linhas de localização das paredes de um nível.
+
+    ``quebras[i]`` guarda os comprimentos de arco (ordenados) e os nós em
+    que a parede ``i`` do lote é dividida; cada par consecutivo é uma aresta.
+    """
+
+    def __init__(self, lote, ids_paredes):
+        self.lote = lote
+        self.ids_paredes = list(ids_paredes)
+        self.indice_parede = dict((id_parede, i) for i, id_parede in enumerate(self.ids_paredes))
+        self.x = []
+        self.y = []
+        self.adjacencia = []
+        self.quebras = [([], []) for _ in self.ids_paredes]
+        self._celulas = {}
+        for i in range(len(self.ids_paredes)):
+            self._indexar(i)
+
+    def __len__(self):
+        return len(self.x)
+
+    # Montagem
+
+    @classmethod
+    def construir(cls, lote, ids_paredes, tolerancia=TOLERANCIA_JUNCAO):
+        from eletrica.espacial import GradeEspacial
+
+        grafo = cls(lote, ids_paredes)
+        nos = GradeEspacial(tolerancia)
+        extremidades = []
+        for i in range(len(lote)):
+            comprimento = lote.comprimento(i)
+            for s in (0.0, comprimento):
+                x, y = grafo.ponto(i, s)
+                proximos = nos.no_raio(x, y, tolerancia)
+                if proximos:
+                    no = min(proximos)[1]
+                else:
+                    no = grafo._novo_no(x, y)
+                    nos.inserir(x, y, no)
+                grafo._quebrar(i, s, no)
+                extremidades.append((i, no))
+
+        # Junções em T: extremidade sobre o meio de outra parede
+        for i, no in extremidades:
+            x, y = grafo.x[no], grafo.y[no]
+            for j in grafo._candidatas(x, y, tolerancia):
+                if j == i or no in grafo.quebras[j][1]:
+                    continue
+                s, distancia = grafo.projetar(j, x, y)
+                if distancia <= tolerancia and tolerancia < s < lote.comprimento(j) - tolerancia:
+                    grafo._quebrar(j, s, no)
+
+        for ss, lista in grafo.quebras:
+            for k in range(len(ss) - 1):
+                grafo._ligar(lista[k], lista[k + 1], ss[k + 1] - ss[k])
+        return grafo
+
+    def _novo_no(self, x, y):
+        self.x.append(x)
+        self.y.append(y)
+        self.adjacencia.append([])
+        return len(self.x) - 1
+
+    def _quebrar(self, i, s, no):
+        ss, lista = self.quebras[i]
+        k = bisect.bisect_left(ss, s)
+        ss.insert(k, s)
+        lista.insert(k, no)
+
+    def _ligar(self, a, b, peso):
+        if a != b:
+            self.adjacencia[a].append((b, peso))
+            self.adjacencia[b].append((a, peso))
+
+    def _limites(self, i):
+        lote = self.lote
+        if lote.tipo[i] == geometria.ARCO:
+            raio = lote.c2[i]
+            return lote.c0[i] - raio, lote.c1[i] - raio, lote.c0[i] + raio, lote.c1[i] + raio
+        return (min(lote.c0[i], lote.c2[i]), min(lote.c1[i], lote.c3[i]),
+                max(lote.c0[i], lote.c2[i]), max(lote.c1[i], lote.c3[i]))
+
+    def _indexar(self, i):
+        x0, y0, x1, y1 = self._limites(i)
+        for ci in range(int(math.floor(x0 / TAMANHO_CELULA)), int(math.floor(x1 / TAMANHO_CELULA)) + 1):
+            for cj in range(int(math.floor(y0 / TAMANHO_CELULA)), int(math.floor(y1 / TAMANHO_CELULA)) + 1):
+                self._celulas.setdefault((ci, cj), []).append(i)
+
+    def _candidatas(self, x, y, raio):
+        """Paredes cujas células cobrem o quadrado de lado ``2·raio`` em torno do ponto."""
+        candidatas = set()
+        for ci in range(int(math.floor((x - raio) / TAMANHO_CELULA)),
+                        int(math.floor((x + raio) / TAMANHO_CELULA)) + 1):
+            for cj in range(int(math.floor((y - raio) / TAMANHO_CELULA)),
+                            int(math.floor((y + raio) / TAMANHO_CELULA)) + 1):
+                candidatas.update(self._celulas.get((ci, cj), ()))
+        return candidatas
+
+    # Consultas
+
+    def ponto(self, i, s):
+        """Ponto ``(x, y)`` da linha de localização da parede ``i`` no comprimento de arco ``s``."""
+        x, y = geometria.ponto_em(self.lote, i, s)[:2]
+        return x, y
+
+    def projetar(self, i, x, y):
+        """Comprimento de arco da projeção de ``(x, y)`` na parede ``i`` e distância até ela."""
+        comprimento = self.lote.comprimento(i)
+        s = geometria.parametro_do_ponto(self.lote, i, x, y)
+        if s > comprimento:
+            if self.lote.tipo[i] == geometria.ARCO:
+                # Fora da varredura fica com a extremidade mais próxima
+                s = comprimento if s - comprimento < 2 * math.pi * self.lote.c2[i] - s else 0.0
+            else:
+                s = comprimento
+        elif s < 0.0:
+            s = 0.0
+        px, py = self.ponto(i, s)
+        return s, math.hypot(x - px, y - py)
+
+    def acesso(self, x, y, id_parede=None, raio=DISTANCIA_MAXIMA_ACESSO):
+        """Entrada no grafo pela parede ``id_parede`` ou pela mais próxima (None se longe demais)."""
+        if id_parede is not None and id_parede in self.indice_parede:
+            i = self.indice_parede[id_parede]
+            s, distancia = self.projetar(i, x, y)
+            return Acesso(i, s, distancia)
+        melhor = None
+        for i in self._candidatas(x, y, raio):
+            s, distancia = self.projetar(i, x, y)
+            if distancia <= raio and (melhor is None or distancia < melhor.distancia):
+                melhor = Acesso(i, s, distancia)
+        return melhor
+
+    def trecho(self, acesso):
+        """``(k, (no_a, distancia_a), (no_b, distancia_b))`` do trecho da parede que contém o acesso."""
+        ss, lista = self.quebras[acesso.parede]
+        k = max(0, min(bisect.bisect_right(ss, acesso.s) - 1, len(ss) - 2))
+        return k, (lista[k], acesso.s - ss[k]), (lista[k + 1], ss[k + 1] - acesso.s)
+
+    def distancias(self, origem):
+        """Dijkstra a partir das duas extremidades do trecho de ``origem``."""
+        infinito = float('inf')
+        dist = [infinito] * len(self.x)
+        fila = []
+        for no, d in self.trecho(origem)[1:]:
+            d += origem.distancia
+            if d < dist[no]:
+                dist[no] = d
+                fila.append((d, no))
+        heapq.heapify(fila)
+        adjacencia = self.adjacencia
+        while fila:
+            d, no = heapq.heappop(fila)
+            if d > dist[no]:
+                continue
+            for vizinho, peso in adjacencia[no]:
+                nova = d + peso
+                if nova < dist[vizinho]:
+                    dist[vizinho] = nova
+                    heapq.heappush(fila, (nova, vizinho))
+        return dist
+
+    def comprimento(self, dist, origem, destino):
+        """Menor caminho (pés, no plano) de ``origem`` a ``destino`` com ``dist`` de ``distancias(origem)``.
+
+        Retorna None quando o destino não está ligado à origem.
+        """
+        k, (no_a, da), (no_b, db) = self.trecho(destino)
+        melhor = min(dist[no_a] + da, dist[no_b] + db)
+        if origem.parede == destino.parede and self.trecho(origem)[0] == k:
+            melhor = min(melhor, abs(origem.s - destino.s) + origem.distancia)
+        if melhor == float('inf'):
+            return None
+        return melhor + destino.distancia
+
+    # Sessão
+
+    def para_tupla(self):
+        lote = self.lote
+        colunas = tuple(list(getattr(lote, c)) for c in ('tipo', 'c0', 'c1', 'c2', 'c3', 'c4', 'z'))
+        return (tuple(self.ids_paredes), colunas, list(self.x), list(self.y),
+                [list(v) for v in self.adjacencia],
+                [(list(ss), list(nos)) for ss, nos in self.quebras])
+
+    @classmethod
+    def de_tupla(cls, dados):
+        ids_paredes, colunas, x, y, adjacencia, quebras = dados
+        lote = geometria.LoteParedes()
+        for tipo, c0, c1, c2, c3, c4, z in zip(*colunas):
+            if tipo == geometria.ARCO:
+                lote.adicionar_arco(c0, c1, c2, c3, c4, z, 0.0, 0.0, 0)
+            else:
+                lote.adicionar_reta(c0, c1, c2, c3, z, 0.0, 0.0, 0)
+        grafo = cls(lote, ids_paredes)
+        grafo.x, grafo.y = list(x), list(y)
+        grafo.adjacencia = [list(v) for v in adjacencia]
+        grafo.quebras = [(list(ss), list(nos)) for ss, nos in quebras]
+        return grafo
+
+
+def descrever_paredes(paredes):
+    """Linhas de localização das paredes em um ``LoteParedes`` (sem espessura nem aberturas).
+
+    Retorna ``(lote, ids)``; paredes sem curva de localização ficam de fora.
+    """
+    lote = geometria.LoteParedes()
+    ids = []
+    for parede in paredes:
+        try:
+            insercao.descrever_parede(lote, parede, 0.0, 0, None, None, considerar_aberturas=False)
+        except ValueError:
+            continue
+        ids.append(id_inteiro(parede.Id))
+    return lote, ids
+
+
+def _assinatura(lote, ids):
+    return tuple(
+        (id_parede, lote.tipo[i]) + tuple(round(getattr(lote, c)[i], 4) for c in ('c0', 'c1', 'c2', 'c3', 'c4'))
+        for i, id_parede in enumerate(ids)
+    )
+
+
+@rastreio.medido()
+def grafo_do_nivel(doc, nivel_id, usar_sessao=True):
+    """Grafo das paredes do nível, reaproveitado na sessão enquanto elas não mudarem."""
+    from eletrica.lote import coletar_paredes_nivel
+
+    lote, ids = descrever_paredes(coletar_paredes_nivel(doc, nivel_id))
+    if not usar_sessao:
+        return GrafoParedes.construir(lote, ids)
+    dados = sessao.memorizar(
+        'grafo_paredes_{}'.format(id_inteiro(nivel_id)), doc, _assinatura(lote, ids),
+        lambda: GrafoParedes.construir(lote, ids).para_tupla(),
+    )
+    return GrafoParedes.de_tupla(dados)
+
+
+class ResultadoRotas(object):
+    def __init__(self):
+        # id do circuito -> comprimento (m) até a tomada mais distante
+        self.comprimentos = {}
+        # id da tomada -> comprimento (m) a partir do painel
+        self.por_tomada = {}
+        # Tomadas sem caminho pelas paredes (distância ortogonal usada)
+        self.sem_rota = []
+        self.sem_painel = []
+        self.consultas = 0
+
+
+def _ortogonal(origem, destino):
+    return abs(destino.X - origem.X) + abs(destino.Y - origem.Y)
+
+
+@rastreio.medido()
+def calcular_rotas(doc, circuitos, usar_sessao=True):
+    """Comprimento de rota de cada circuito (e de cada tomada) até o seu painel.
+
+    As tomadas são agrupadas por painel e nível: cada grupo custa um
+    Dijkstra, qualquer que seja o número de tomadas.
+    """
+    resultado = ResultadoRotas()
+    grupos = {}
+    paineis = {}
+    for circuito in circuitos:
+        id_circuito = id_inteiro(circuito.Id)
+        painel = circuito.BaseEquipment
+        if painel is None:
+            resultado.sem_painel.append(id_circuito)
+            continue
+        id_painel = id_inteiro(painel.Id)
+        paineis[id_painel] = painel.Location.Point
+        for membro in circuito.Elements:
+            chave = (id_painel, id_inteiro(membro.LevelId))
+            grupos.setdefault(chave, []).append((id_circuito, membro))
+
+    grafos = {}
+    for (id_painel, id_nivel), membros in grupos.items():
+        if id_nivel not in grafos:
+            nivel_id = membros[0][1].LevelId
+            grafos[id_nivel] = grafo_do_nivel(doc, nivel_id, usar_sessao)
+        grafo = grafos[id_nivel]
+        ponto_painel = paineis[id_painel]
+        origem = grafo.acesso(ponto_painel.X, ponto_painel.Y) if len(grafo) else None
+        dist = grafo.distancias(origem) if origem is not None else None
+        resultado.consultas += 1
+
+        for id_circuito, membro in membros:
+            ponto = membro.Location.Point
+            plano = None
+            if dist is not None:
+                host = getattr(membro, 'Host', None)
+                destino = grafo.acesso(ponto.X, ponto.Y, id_inteiro(host.Id) if host is not None else None)
+                if destino is not None:
+                    plano = grafo.comprimento(dist, origem, destino)
+            if plano is None:
+                resultado.sem_rota.append(id_inteiro(membro.Id))
+                plano = _ortogonal(ponto_painel, ponto)
+            metros = (plano + abs(ponto.Z - ponto_painel.Z)) / PES_POR_METRO
+            resultado.por_tomada[id_inteiro(membro.Id)] = metros
+            resultado.comprimentos[id_circuito] = max(metros, resultado.comprimentos.get(id_circuito, 0.0))
+    return resultado
+
+
+def gravar_comprimentos(doc, circuitos, comprimentos, agendador=None, nome="Gravar Comprimento da Rota"):
+    """Grava ``comprimentos`` (id -> m) em ``PARAM_COMPRIMENTO_ROTA``, só onde o valor mudou.
+
+    Retorna ``(gravados, sem_parametro)``; circuitos sem o parâmetro (não
+    vinculado ao projeto ou somente leitura) são contados em ``sem_parametro``.
+    """
+    from Autodesk.Revit.DB import StorageType
+
+    if agendador is None:
+        agendador = transacoes.Agendador(doc, nome)
+    gravados = sem_parametro = 0
+    with agendador.etapa(nome):
+        for circuito in circuitos:
+            metros = comprimentos.get(id_inteiro(circuito.Id))
+            if metros is None:
+                continue
+            param = circuito.LookupParameter(PARAM_COMPRIMENTO_ROTA)
+            if not param or param.IsReadOnly or param.StorageType != StorageType.Double:
+                sem_parametro += 1
+                continue
+            if param.HasValue and abs(param.AsDouble() - metros) <= TOLERANCIA_GRAVACAO:
+                continue
+            param.Set(round(metros, 2))
+            gravados += 1
+    return gravados, sem_parametro
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Memória de sessão compartilhada entre execuções dos scripts.
+
+O pyRevit executa cada botão em um motor IronPython novo, então variáveis
+de módulo não sobrevivem entre cliques. Os valores são guardados nas
+variáveis de ambiente do pyRevit (dados do AppDomain do Revit), que duram
+enquanto o Revit estiver aberto. Fora do pyRevit usa-se um dicionário local.
+"""
+
+_LOCAL = {}
+
+
+def _chave(nome, doc=None):
+    chave = 'ELETRICA_' + nome.upper()
+    if doc is not None:
+        chave += '_' + str(abs(hash(doc.PathName or doc.Title)))
+    return chave
+
+
+def obter(nome, doc=None, padrao=None):
+    chave = _chave(nome, doc)
+    try:
+        from pyrevit import script
+        valor = script.get_envvar(chave)
+    except Exception:
+        valor = _LOCAL.get(chave)
+    return padrao if valor is None else valor
+
+
+def guardar(nome, valor, doc=None):
+    chave = _chave(nome, doc)
+    try:
+        from pyrevit import script
+        script.set_envvar(chave, valor)
+    except Exception:
+        _LOCAL[chave] = valor
+
+
+def memorizar(nome, doc, assinatura, construir):
+    """Reutiliza o valor guardado enquanto ``assinatura`` não mudar.
+
+    ``construir()`` só é chamado quando não há valor para o documento ou
+    quando a assinatura (ex.: ids dos elementos envolvidos) é diferente.
+    """
+    guardado = obter(nome, doc)
+    if guardado is not None and guardado[0] == assinatura:
+        return guardado[1]
+    valor = construir()
+    guardar(nome, (assinatura, valor), doc)
+    return valor
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""Ressincronização das tomadas gerenciadas de uma parede pela diferença.
+
+Rodar a inserção de novo em uma parede criava um segundo conjunto
+completo de tomadas; corrigir um espaçamento exigia apagar tudo e
+inserir de novo, trocando os ElementIds e desfazendo os circuitos. Aqui
+as posições desejadas são comparadas com as tomadas já marcadas
+(``marcacao``) na parede:
+
+- cada posição desejada é pareada com a tomada existente mais próxima
+  (pareamento guloso pela menor distância, consultado em uma
+  ``GradeEspacial``);
+- tomadas pareadas são apenas movidas, giradas, trocadas de tipo ou têm
+  parâmetros regravados quando algo mudou, preservando o id e o circuito;
+- posições sem par viram tomadas novas e tomadas sem par são removidas
+  em uma única chamada a ``Delete``.
+
+O número de escritas no modelo é proporcional ao que mudou, não ao total
+de tomadas da parede.
+"""
+
+import heapq
+import math
+
+from eletrica import marcacao, plano
+from eletrica.espacial import GradeEspacial
+
+# Diferenças abaixo destas tolerâncias não geram escrita
+TOLERANCIA_POSICAO = 1e-4  # pés
+TOLERANCIA_ANGULO = 1e-6  # rad
+TOLERANCIA_VALOR = 1e-9
+
+
+class ResultadoSincronizacao(object):
+    def __init__(self):
+        self.criadas = []
+        self.modificadas = []
+        self.removidas = []
+        self.mantidas = 0
+        self.erros = []
+        # Tomadas existentes sem par e não removidas (``remover=False``)
+        self.sobras = []
+
+    @property
+    def alteracoes(self):
+        return len(self.criadas) + len(self.modificadas) + len(self.removidas)
+
+    def somar(self, outro):
+        self.criadas.extend(outro.criadas)
+        self.modificadas.extend(outro.modificadas)
+        self.removidas.extend(outro.removidas)
+        self.mantidas += outro.mantidas
+        self.erros.extend(outro.erros)
+        self.sobras.extend(outro.sobras)
+
+
+def parear(desejados, existentes):
+    """Pareamento guloso pela menor distância em planta.
+
+    ``desejados`` e ``existentes`` são listas de ``(x, y)``. Retorna
+    ``(pares, desejados_sem_par, existentes_sem_par)``, com ``pares`` como
+    lista de ``(indice_desejado, indice_existente)``.
+
+    Os existentes ficam em uma ``GradeEspacial`` e cada desejado guarda no
+    heap só o existente livre mais próximo; quando esse já foi pareado, a
+    consulta é refeita. O resultado é o do guloso sobre todas as N×M
+    distâncias, sem montá-las.
+    """
+    livres_d = set(range(len(desejados)))
+    livres_e = set(range(len(existentes)))
+    if not livres_d or not livres_e:
+        return [], sorted(livres_d), sorted(livres_e)
+    xs = [x for x, _ in existentes]
+    ys = [y for _, y in existentes]
+    # Células da ordem do espaçamento entre as tomadas (paredes são quase lineares)
+    extensao = max(max(xs) - min(xs), max(ys) - min(ys))
+    grade = GradeEspacial(extensao / len(existentes) if extensao > 0 else 1.0)
+    for j, (x, y) in enumerate(existentes):
+        grade.inserir(x, y, j)
+
+    def mais_proximo(i):
+        x, y = desejados[i]
+        encontrados = grade.mais_proximos(x, y, 1, filtro=livres_e.__contains__)
+        if encontrados:
+            distancia, j = encontrados[0]
+            heapq.heappush(candidatos, (distancia, i, j))
+
+    candidatos = []
+    for i in range(len(desejados)):
+        mais_proximo(i)
+    pares = []
+    while candidatos and livres_e:
+        _, i, j = heapq.heappop(candidatos)
+        if j not in livres_e:
+            mais_proximo(i)
+            continue
+        livres_d.discard(i)
+        livres_e.discard(j)
+        pares.append((i, j))
+    return pares, sorted(livres_d), sorted(livres_e)
+
+
+def _diferenca_angular(a, b):
+    return (a - b + math.pi) % (2 * math.pi) - math.pi
+
+
+def _ajustar_valor(tomada, definicao, valor):
+    if definicao is None:
+        return False
+    parametro = tomada.get_Parameter(definicao)
+    if abs(parametro.AsDouble() - valor) <= TOLERANCIA_VALOR:
+        return False
+    parametro.Set(valor)
+    return True
+
+
+def _ajustar(doc, plano_parede, tomada, ponto, potencia_aparente, fator_potencia, dados, dados_antigos,
+             entidade):
+    """Aplica à tomada existente apenas o que difere do desejado."""
+    from Autodesk.Revit.DB import ElementTransformUtils, Line, XYZ
+
+    alterada = False
+    parametros = plano_parede.parametros
+    if not parametros.resolvido:
+        parametros.resolver(tomada)
+
+    if tomada.Symbol.Id != plano_parede.simbolo.Id:
+        tomada.ChangeTypeId(plano_parede.simbolo.Id)
+        alterada = True
+
+    local = tomada.Location
+    atual = local.Point
+    dz = 0.0 if parametros.elevacao is not None else ponto.Z - atual.Z
+    dx, dy = ponto.X - atual.X, ponto.Y - atual.Y
+    if max(abs(dx), abs(dy), abs(dz)) > TOLERANCIA_POSICAO:
+        ElementTransformUtils.MoveElement(doc, tomada.Id, XYZ(dx, dy, dz))
+        alterada = True
+
+    giro = _diferenca_angular(plano_parede.angulo_em(ponto), local.Rotation)
+    if abs(giro) > TOLERANCIA_ANGULO:
+        eixo = Line.CreateBound(ponto, ponto + XYZ.BasisZ)
+        ElementTransformUtils.RotateElement(doc, tomada.Id, eixo, giro)
+        alterada = True
+
+    alterada = _ajustar_valor(tomada, parametros.elevacao, ponto.Z) or alterada
+    alterada = _ajustar_valor(tomada, parametros.potencia_aparente, potencia_aparente) or alterada
+    alterada = _ajustar_valor(tomada, parametros.fator_potencia, fator_potencia) or alterada
+
+    if dados != dados_antigos:
+        tomada.SetEntity(entidade())
+        alterada = True
+    return alterada
+
+
+def remover_tomadas(doc, existentes, resultado):
+    """Remove as tomadas ``[(tomada, dados), ...]`` em uma única chamada a ``Delete``."""
+    import clr
+    clr.AddReference('System')
+    from System.Collections.Generic import List
+    from Autodesk.Revit.DB import ElementId
+
+    ids = List[ElementId]([tomada.Id for tomada, _ in existentes])
+    doc.Delete(ids)
+    resultado.removidas.extend(ids)
+
+
+def sincronizar_parede(doc, parede, simbolo, pontos_insercao, face, parametros_elet, dados,
+                       existentes, cache_planos=None, remover=True):
+    """Leva as tomadas gerenciadas da parede às posições ``pontos_insercao``.
+
+    ``existentes`` é a lista ``[(tomada, dados), ...]`` de
+    ``marcacao.gerenciadas_por_parede``; ``dados`` é a marcação desta
+    execução. Com ``remover=False`` as tomadas sem par não são apagadas e
+    vão para ``sobras`` (ex.: a parede tem outros itens a sincronizar).
+    Exige transação aberta.
+    """
+    potencia_aparente, fator_potencia, _, _ = parametros_elet
+    if cache_planos is None:
+        cache_planos = plano.CachePlanos()
+    plano_parede = cache_planos.obter(parede, simbolo, face)
+
+    resultado = ResultadoSincronizacao()
+    # Entidade da marcação serializada uma vez, só se alguma tomada precisar
+    guardada = []
+
+    def entidade():
+        if not guardada:
+            guardada.append(marcacao.entidade(dados))
+        return guardada[0]
+
+    posicoes = [tomada.Location.Point for tomada, _ in existentes]
+    pares, novos, sobras = parear(
+        [(p.X, p.Y) for p in pontos_insercao], [(p.X, p.Y) for p in posicoes]
+    )
+
+    for i, j in pares:
+        tomada, dados_antigos = existentes[j]
+        try:
+            if _ajustar(doc, plano_parede, tomada, pontos_insercao[i],
+                        potencia_aparente, fator_potencia, dados, dados_antigos, entidade):
+                resultado.modificadas.append(tomada)
+            else:
+                resultado.mantidas += 1
+        except Exception as e:
+            resultado.erros.append("Erro ao ajustar tomada {}: {}".format(tomada.Id, e))
+
+    for i in novos:
+        try:
+            tomada = plano_parede.instanciar(doc, pontos_insercao[i], potencia_aparente, fator_potencia)
+            tomada.SetEntity(entidade())
+            resultado.criadas.append(tomada)
+        except Exception as e:
+            resultado.erros.append("Erro ao inserir tomada: {}".format(e))
+
+    sobras = [existentes[j] for j in sobras]
+    if sobras and remover:
+        remover_tomadas(doc, sobras, resultado)
+    else:
+        resultado.sobras = sobras
+    return resultado
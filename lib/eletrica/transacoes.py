@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""Agendador de transações compartilhado pelas ferramentas de tomadas.
+
+Uma execução da R02 abria pelo menos cinco transações independentes
+("Ativar Família", "Criar Preview", "Remover Preview", "Inserir Tomadas",
+"Criar Circuito Elétrico"), chamava ``doc.Regenerate()`` explicitamente e
+cada aviso do Revit aparecia em um diálogo próprio. ``Agendador``:
+
+- agrupa todas as etapas da execução em um único ``TransactionGroup``
+  (um único passo de desfazer; erro em qualquer etapa desfaz tudo);
+- abre uma ``Transaction`` por etapa lógica com ``etapa(nome)``; etapas
+  aninhadas reaproveitam a transação já aberta;
+- adia as regenerações: ``regenerar()`` apenas marca o pedido e todos os
+  pedidos de uma etapa viram um único ``Regenerate`` no fim dela (ou em
+  ``atualizar()``, quando uma leitura depende do modelo regenerado);
+- instala um pré-processador de falhas que apaga os avisos e os acumula
+  em ``falhas``. Erros desfazem a etapa e geram ``ErroEtapa``.
+"""
+
+from collections import namedtuple
+
+from eletrica import rastreio
+from eletrica import relatorio as _relatorio
+
+# Falha registrada pelo pré-processador
+Falha = namedtuple('Falha', ['etapa', 'severidade', 'descricao', 'ids'])
+
+AVISO = 'Aviso'
+ERRO = 'Erro'
+
+_CLASSES = {}
+
+
+class ErroEtapa(Exception):
+    """A etapa foi desfeita por erros do Revit (``falhas`` traz os detalhes)."""
+
+    def __init__(self, etapa, falhas):
+        self.etapa = etapa
+        self.falhas = list(falhas)
+        detalhes = u"; ".join(f.descricao for f in self.falhas[:5]) or u"transação desfeita"
+        super(ErroEtapa, self).__init__(u"Etapa '{}' desfeita: {}".format(etapa, detalhes))
+
+
+def coletar_falhas(acessor, etapa, falhas):
+    """Apaga os avisos de ``acessor`` e acumula tudo em ``falhas``.
+
+    Retorna True quando restam erros (a transação deve ser desfeita).
+    """
+    from Autodesk.Revit.DB import FailureSeverity
+    from eletrica.catalogo import id_inteiro
+
+    ha_erros = False
+    for mensagem in acessor.GetFailureMessages():
+        severidade = mensagem.GetSeverity()
+        ids = [id_inteiro(i) for i in mensagem.GetFailingElementIds()]
+        if severidade == FailureSeverity.Warning:
+            falhas.append(Falha(etapa, AVISO, mensagem.GetDescriptionText(), ids))
+            acessor.DeleteWarning(mensagem)
+        else:
+            falhas.append(Falha(etapa, ERRO, mensagem.GetDescriptionText(), ids))
+            ha_erros = True
+    return ha_erros
+
+
+def _classe_preprocessador():
+    """Declara o ``IFailuresPreprocessor`` (uma vez por motor)."""
+    if _CLASSES:
+        return _CLASSES['ColetorFalhas']
+    from Autodesk.Revit.DB import FailureProcessingResult, IFailuresPreprocessor
+
+    class ColetorFalhas(IFailuresPreprocessor):
+        def __init__(self, etapa, falhas):
+            self.etapa = etapa
+            self.falhas = falhas
+            self.erros = False
+
+        def PreprocessFailures(self, acessor):
+            if coletar_falhas(acessor, self.etapa, self.falhas):
+                self.erros = True
+                return FailureProcessingResult.ProceedWithRollBack
+            return FailureProcessingResult.Continue
+
+    _CLASSES['ColetorFalhas'] = ColetorFalhas
+    return ColetorFalhas
+
+
+class _Etapa(object):
+    """Gerenciador de contexto de uma etapa; reaproveita a transação aberta."""
+
+    def __init__(self, agendador, nome):
+        self.agendador = agendador
+        self.nome = nome
+        self._transacao = None
+        self._coletor = None
+        self._inicio = 0
+        self._trecho = None
+
+    def __enter__(self):
+        agendador = self.agendador
+        if agendador._transacao is not None:
+            return agendador
+        from Autodesk.Revit.DB import Transaction
+
+        self._transacao = Transaction(agendador.doc, self.nome)
+        self._coletor = _classe_preprocessador()(self.nome, agendador.falhas)
+        self._inicio = len(agendador.falhas)
+        opcoes = self._transacao.GetFailureHandlingOptions()
+        opcoes.SetFailuresPreprocessor(self._coletor)
+        opcoes.SetClearAfterRollback(True)
+        self._transacao.SetFailureHandlingOptions(opcoes)
+        self._trecho = rastreio.trecho(u"Transação: {}".format(self.nome), 'transacao')
+        self._trecho.__enter__()
+        self._transacao.Start()
+        agendador._transacao = self._transacao
+        agendador.etapas += 1
+        rastreio.contar('transacoes')
+        return agendador
+
+    def __exit__(self, tipo, valor, tb):
+        if self._transacao is None:
+            return False
+        try:
+            return self._fechar(tipo)
+        finally:
+            self._trecho.__exit__(tipo, valor, tb)
+
+    def _fechar(self, tipo):
+        from Autodesk.Revit.DB import TransactionStatus
+
+        agendador = self.agendador
+        agendador._transacao = None
+        if tipo is not None:
+            self._transacao.RollBack()
+            rastreio.contar('transacoes desfeitas')
+            agendador._pendente = False
+            return False
+        try:
+            agendador.atualizar()
+        except Exception:
+            self._transacao.RollBack()
+            raise
+        with rastreio.trecho('Commit', 'api'):
+            status = self._transacao.Commit()
+        if status != TransactionStatus.Committed or self._coletor.erros:
+            raise ErroEtapa(self.nome, [f for f in self._coletor.falhas[self._inicio:] if f.severidade == ERRO])
+        return False
+
+
+class Agendador(object):
+    """Um ``TransactionGroup`` por execução, uma transação por etapa.
+
+    Usado como gerenciador de contexto: assimila o grupo ao sair do bloco
+    ou o desfaz inteiro se houver exceção.
+    """
+
+    def __init__(self, doc, nome):
+        self.doc = doc
+        self.nome = nome
+        self.falhas = []
+        self.etapas = 0
+        self.regeneracoes = 0
+        self.pedidos_regeneracao = 0
+        self._grupo = None
+        self._transacao = None
+        self._pendente = False
+
+    def iniciar(self):
+        from Autodesk.Revit.DB import TransactionGroup
+
+        self._grupo = TransactionGroup(self.doc, self.nome)
+        self._grupo.Start()
+        return self
+
+    def concluir(self):
+        if self._grupo is not None:
+            self._grupo.Assimilate()
+            self._grupo = None
+
+    def cancelar(self):
+        if self._grupo is not None:
+            if self._grupo.HasStarted():
+                self._grupo.RollBack()
+            self._grupo = None
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, tipo, valor, tb):
+        if tipo is None:
+            self.concluir()
+        else:
+            self.cancelar()
+        return False
+
+    def etapa(self, nome):
+        """Transação de uma etapa lógica; ``with agendador.etapa(nome):``."""
+        return _Etapa(self, nome)
+
+    def regenerar(self):
+        """Pede uma regeneração, feita uma única vez no fim da etapa."""
+        self.pedidos_regeneracao += 1
+        self._pendente = True
+
+    def atualizar(self):
+        """Executa agora a regeneração pendente, se houver."""
+        if self._pendente:
+            self._pendente = False
+            with rastreio.trecho('Regenerate', 'api'):
+                self.doc.Regenerate()
+            self.regeneracoes += 1
+            rastreio.contar('regeneracoes')
+
+    @property
+    def avisos(self):
+        return [f for f in self.falhas if f.severidade == AVISO]
+
+    @property
+    def erros(self):
+        return [f for f in self.falhas if f.severidade == ERRO]
+
+    def resumo(self):
+        """Uma linha com a contagem de avisos e erros (vazia se não houver)."""
+        if not self.falhas:
+            return u""
+        return u"{} aviso(s) e {} erro(s) do Revit; veja o relatório.".format(
+            len(self.avisos), len(self.erros))
+
+    def relatar(self, rel=None):
+        """Escreve as falhas acumuladas em ``rel``.
+
+        Sem ``rel``, um relatório próprio é emitido na janela do pyRevit.
+        """
+        if not self.falhas:
+            return
+        proprio = rel is None
+        if proprio:
+            rel = _relatorio.Relatorio([_relatorio.DestinoPyRevit()])
+        rel.titulo(u"Avisos do Revit: {}".format(self.nome))
+        rel.tabela(
+            [(f.etapa, f.severidade, f.descricao, u", ".join(str(i) for i in f.ids)) for f in self.falhas],
+            [u"Etapa", u"Severidade", u"Descrição", u"Elementos"],
+        )
+        if proprio:
+            rel.emitir()
+
+
+def ativar_simbolo(agendador, simbolo):
+    """Ativa o símbolo dentro da etapa aberta, se necessário.
+
+    O símbolo precisa estar regenerado antes de ser instanciado, então a
+    regeneração é feita aqui, e só quando houve ativação.
+    """
+    if simbolo.IsActive:
+        return False
+    simbolo.Activate()
+    agendador.regenerar()
+    agendador.atualizar()
+    return True
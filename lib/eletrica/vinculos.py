@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""Paredes de modelos vinculados (``RevitLinkInstance``) como hospedeiras.
+
+Nos modelos elétricos a arquitetura chega por vínculo, e as ferramentas
+de inserção só aceitavam ``Wall`` do documento ativo. Aqui:
+
+- cada vínculo carregado vira um ``Vinculo``, que lê a transformação
+  total (``GetTotalTransform``) uma única vez e a guarda como números;
+- a geometria das paredes do documento vinculado (curva, espessura,
+  aberturas e orientação da face externa) é lida de uma vez, nas
+  coordenadas do vínculo, e guardada na sessão por documento vinculado
+  enquanto a versão dele não mudar. Cópias do mesmo vínculo e os demais
+  pavimentos de um modelo de 30 andares reaproveitam a mesma leitura;
+- a transformação é aplicada em Python (sem a API) e as paredes de um
+  nível do documento ativo são escolhidas pela elevação da base;
+- ``descrever_vinculos`` devolve ``lote.DescricaoParedes`` com
+  ``ParedeVinculada`` no lugar das paredes, então o planejamento, os
+  conflitos e ``lote.executar_lote`` são os mesmos das paredes do
+  projeto.
+
+Uma parede de vínculo não pode ser hospedeira direta: a tomada é criada
+na referência da face lateral convertida para o documento ativo
+(``CreateLinkReference``), o que exige uma família baseada em face
+(``aceita_vinculo``). Os vínculos giram só em torno do eixo vertical,
+então elevações somam a translação e arcos continuam arcos.
+"""
+
+import math
+
+from eletrica import catalogo, geometria, lote, plano, rastreio, sessao
+from eletrica.catalogo import id_inteiro
+from eletrica.insercao import PES_POR_METRO
+
+# Diferença aceita entre a base da parede do vínculo e o nível do documento ativo
+TOLERANCIA_ELEVACAO_METROS = 0.30
+
+
+class Vinculo(object):
+    """Instância de vínculo carregada, com a transformação lida uma vez.
+
+    ``transformacao`` é ``(ox, oy, oz, xx, xy, yx, yy)``: origem e eixos X
+    e Y do vínculo no documento ativo.
+    """
+
+    __slots__ = ('instancia', 'Id', 'nome', 'documento', 'transformacao', '_registros')
+
+    def __init__(self, instancia, documento, transformacao):
+        self.instancia = instancia
+        self.Id = instancia.Id
+        self.nome = instancia.Name
+        self.documento = documento
+        self.transformacao = transformacao
+        self._registros = None
+
+    @classmethod
+    def ler(cls, instancia):
+        """None se o vínculo estiver descarregado."""
+        documento = instancia.GetLinkDocument()
+        if documento is None:
+            return None
+        total = instancia.GetTotalTransform()
+        origem, eixo_x, eixo_y = total.Origin, total.BasisX, total.BasisY
+        return cls(instancia, documento, (
+            origem.X, origem.Y, origem.Z, eixo_x.X, eixo_x.Y, eixo_y.X, eixo_y.Y))
+
+    def ponto(self, x, y):
+        ox, oy, _, xx, xy, yx, yy = self.transformacao
+        return ox + xx * x + yx * y, oy + xy * x + yy * y
+
+    def vetor(self, x, y):
+        _, _, _, xx, xy, yx, yy = self.transformacao
+        return xx * x + yx * y, xy * x + yy * y
+
+    @property
+    def espelhado(self):
+        _, _, _, xx, xy, yx, yy = self.transformacao
+        return xx * yy - xy * yx < 0
+
+    def registros(self, usar_sessao=True):
+        """Paredes do vínculo nas coordenadas do documento ativo (calculadas uma vez)."""
+        if self._registros is None:
+            self._registros = [
+                transformar_registro(r, self) for r in paredes_do_vinculo(self.documento, usar_sessao)]
+        return self._registros
+
+
+def vinculos_do_documento(doc):
+    """``Vinculo`` de cada instância de vínculo carregada no documento."""
+    from Autodesk.Revit.DB import FilteredElementCollector, RevitLinkInstance
+
+    vinculos = []
+    for instancia in FilteredElementCollector(doc).OfClass(RevitLinkInstance):
+        vinculo = Vinculo.ler(instancia)
+        if vinculo is not None:
+            vinculos.append(vinculo)
+    return vinculos
+
+
+def aceita_vinculo(simbolo):
+    """True se a família pode ser hospedada em faces de vínculos (baseada em face)."""
+    from Autodesk.Revit.DB import FamilyPlacementType
+
+    return simbolo.Family.FamilyPlacementType == FamilyPlacementType.WorkPlaneBased
+
+
+def _registro(descricao, k, parede):
+    """``(id, tipo, c0..c4, z, espessura, aberturas, ox, oy)`` da parede ``k`` descrita."""
+    paredes = descricao.lote
+    orientacao = parede.Orientation
+    return (
+        descricao.ids[k], paredes.tipo[k], paredes.c0[k], paredes.c1[k], paredes.c2[k],
+        paredes.c3[k], paredes.c4[k], paredes.z[k], paredes.espessura[k],
+        tuple(tuple(a) for a in paredes.aberturas[k]), orientacao.X, orientacao.Y,
+    )
+
+
+@rastreio.medido()
+def paredes_do_vinculo(documento, usar_sessao=True):
+    """Registros de todas as paredes do documento vinculado, nas coordenadas dele.
+
+    Guardados na sessão por documento vinculado; a assinatura é a versão
+    do documento (Revit 2023+) ou, sem ela, os ids das paredes.
+    """
+    from Autodesk.Revit.DB import FilteredElementCollector, Wall
+
+    def construir():
+        descricao = lote.descrever_paredes(FilteredElementCollector(documento).OfClass(Wall))
+        return tuple(_registro(descricao, k, parede) for k, parede in enumerate(descricao.paredes))
+
+    if not usar_sessao:
+        return construir()
+    assinatura = catalogo.versao_documento(documento)
+    if assinatura is None:
+        assinatura = tuple(sorted(
+            id_inteiro(i) for i in FilteredElementCollector(documento).OfClass(Wall).ToElementIds()))
+    return sessao.memorizar('paredes_vinculo', documento, assinatura, construir)
+
+
+def transformar_registro(registro, vinculo):
+    """Registro de ``paredes_do_vinculo`` levado ao documento ativo.
+
+    Os comprimentos de arco das aberturas não mudam: o início da curva
+    continua sendo o início e, espelhado, o arco só troca de sentido.
+    """
+    id_parede, tipo, c0, c1, c2, c3, c4, z, espessura, aberturas, ox, oy = registro
+    if tipo == geometria.ARCO:
+        cx, cy = vinculo.ponto(c0, c1)
+        dx, dy = vinculo.vetor(math.cos(c3), math.sin(c3))
+        c0, c1, c3 = cx, cy, math.atan2(dy, dx)
+        if vinculo.espelhado:
+            c4 = -c4
+    else:
+        c0, c1 = vinculo.ponto(c0, c1)
+        c2, c3 = vinculo.ponto(c2, c3)
+    ox, oy = vinculo.vetor(ox, oy)
+    return (id_parede, tipo, c0, c1, c2, c3, c4, z + vinculo.transformacao[2], espessura, aberturas,
+            ox, oy)
+
+
+class ParedeVinculada(object):
+    """Parede de um vínculo vista do documento ativo.
+
+    Tem o ``Id`` da parede no documento vinculado e o ``vinculo``; o plano
+    de inserção (``compilar_plano``) hospeda as tomadas na face lateral.
+    """
+
+    __slots__ = ('vinculo', 'Id', 'registro')
+
+    def __init__(self, vinculo, registro):
+        from Autodesk.Revit.DB import ElementId
+
+        self.vinculo = vinculo
+        self.Id = ElementId(registro[0])
+        self.registro = registro
+
+    def __repr__(self):
+        return "<ParedeVinculada {} de {}>".format(self.registro[0], self.vinculo.nome)
+
+    def tangente_no_meio(self):
+        _, tipo, c0, c1, c2, c3, c4 = self.registro[:7]
+        if tipo == geometria.ARCO:
+            angulo = c3 + c4 / 2.0
+            sentido = 1.0 if c4 >= 0 else -1.0
+            return -sentido * math.sin(angulo), sentido * math.cos(angulo)
+        comprimento = math.hypot(c2 - c0, c3 - c1)
+        return (c2 - c0) / comprimento, (c3 - c1) / comprimento
+
+    def referencia_face(self, face):
+        """Referência da face lateral ``face`` convertida para o documento ativo.
+
+        A face frontal fica à esquerda da curva (``geometria.LADO_FACE``);
+        é a externa quando a orientação da parede aponta para esse lado.
+        """
+        from Autodesk.Revit.DB import HostObjectUtils, ShellLayerType
+
+        tx, ty = self.tangente_no_meio()
+        ox, oy = self.registro[10:12]
+        frontal_externa = -ty * ox + tx * oy >= 0
+        externa = frontal_externa if face != 'Traseira' else not frontal_externa
+        parede = self.vinculo.documento.GetElement(self.Id)
+        faces = HostObjectUtils.GetSideFaces(
+            parede, ShellLayerType.Exterior if externa else ShellLayerType.Interior)
+        if not faces:
+            raise ValueError("Parede {} do vínculo {} sem face lateral.".format(
+                self.registro[0], self.vinculo.nome))
+        return faces[0].CreateLinkReference(self.vinculo.instancia)
+
+    def compilar_plano(self, simbolo, face, parametros=None):
+        return PlanoVinculado.compilar(self, simbolo, face, parametros)
+
+
+class PlanoVinculado(plano.PlanoInsercao):
+    """Plano de uma parede de vínculo: tomada baseada em face na referência vinculada."""
+
+    def __init__(self, parede, simbolo, face, direcao, angulo, parametros, arco, referencia):
+        super(PlanoVinculado, self).__init__(parede, simbolo, face, direcao, angulo, parametros, arco)
+        self.referencia = referencia
+
+    @classmethod
+    def compilar(cls, parede, simbolo, face, parametros=None):
+        """Direção e ângulo saem do registro já transformado; a face é resolvida uma vez."""
+        from Autodesk.Revit.DB import XYZ
+
+        _, tipo, c0, c1, c2, c3, c4 = parede.registro[:7]
+        arco = None
+        if tipo == geometria.ARCO:
+            sentido = 1.0 if c4 >= 0 else -1.0
+            direcao = XYZ(-sentido * math.sin(c3), sentido * math.cos(c3), 0.0)
+            arco = (c0, c1, sentido)
+        else:
+            direcao = XYZ(c2 - c0, c3 - c1, 0.0).Normalize()
+        return cls(
+            parede, simbolo, face, direcao, plano.angulo_da_direcao(direcao, face),
+            parametros or plano.ParametrosCompilados(), arco, parede.referencia_face(face),
+        )
+
+    def _criar(self, doc, ponto_insercao):
+        """Instância na face vinculada, com o eixo X da família ao longo da parede."""
+        XYZ = self._api[3]
+        angulo = self.angulo_em(ponto_insercao)
+        with rastreio.acumulado('NewFamilyInstance'):
+            return doc.Create.NewFamilyInstance(
+                self.referencia, ponto_insercao, XYZ(math.cos(angulo), math.sin(angulo), 0.0),
+                self.simbolo,
+            )
+
+
+@rastreio.medido()
+def descrever_vinculos(vinculos, elevacao=None, ids=None, tolerancia_metros=TOLERANCIA_ELEVACAO_METROS,
+                       usar_sessao=True):
+    """Paredes dos ``vinculos`` como ``lote.DescricaoParedes`` do documento ativo.
+
+    ``elevacao`` (pés, documento ativo) limita às paredes com a base nessa
+    elevação; ``ids`` (``{id do vínculo: ids das paredes}``) às escolhidas.
+    Só a primeira chamada de cada vínculo lê o modelo vinculado.
+    """
+    tolerancia = tolerancia_metros * PES_POR_METRO
+    descricao = lote.DescricaoParedes()
+    paredes = descricao.lote
+    for vinculo in vinculos:
+        escolhidas = None if ids is None else ids.get(id_inteiro(vinculo.Id), ())
+        for registro in vinculo.registros(usar_sessao):
+            id_parede, tipo, c0, c1, c2, c3, c4, z, espessura, aberturas = registro[:10]
+            if elevacao is not None and abs(z - elevacao) > tolerancia:
+                continue
+            if escolhidas is not None and id_parede not in escolhidas:
+                continue
+            if tipo == geometria.ARCO:
+                paredes.adicionar_arco(c0, c1, c2, c3, c4, z, espessura, 0.0, 1, aberturas=aberturas)
+            else:
+                paredes.adicionar_reta(c0, c1, c2, c3, z, espessura, 0.0, 1, aberturas=aberturas)
+            descricao.paredes.append(ParedeVinculada(vinculo, registro))
+            descricao.ids.append(id_parede)
+    return descricao
+
+
+def paredes_escolhidas(doc, referencias):
+    """Vínculos e ids das paredes de ``PickObjects(ObjectType.LinkedElement)``.
+
+    Retorna ``(vinculos, {id do vínculo: set(ids das paredes)})``; elementos
+    vinculados que não são paredes ficam de fora.
+    """
+    from Autodesk.Revit.DB import Wall
+
+    lidos = {}
+    vinculos = []
+    ids = {}
+    for referencia in referencias:
+        id_vinculo = id_inteiro(referencia.ElementId)
+        if id_vinculo not in lidos:
+            lidos[id_vinculo] = Vinculo.ler(doc.GetElement(referencia.ElementId))
+        vinculo = lidos[id_vinculo]
+        if vinculo is None:
+            continue
+        if not isinstance(vinculo.documento.GetElement(referencia.LinkedElementId), Wall):
+            continue
+        if id_vinculo not in ids:
+            ids[id_vinculo] = set()
+            vinculos.append(vinculo)
+        ids[id_vinculo].add(id_inteiro(referencia.LinkedElementId))
+    return vinculos, ids
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Testes da biblioteca ``eletrica`` no CPython, sobre o documento falso (``eletrica.revit_falso``).
+
+Uso:
+    python -m pytest tests
+"""
+
+import contextlib
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+
+from eletrica import revit_falso  # noqa: E402
+
+revit_falso.instalar()
+
+import pytest  # noqa: E402
+
+from eletrica import circuitos, lote, transacoes  # noqa: E402
+
+PARAMETROS_TOMADA = [
+    (u"Elevação do Ponto", revit_falso.StorageType.Double, 0.0),
+    (u"Potência Aparente (VA)", revit_falso.StorageType.Double, 0.0),
+    (u"Fator de Potência", revit_falso.StorageType.Double, 0.0),
+    (u"Tensão (V)", revit_falso.StorageType.Double, 0.0),
+    (u"Número de Fases", revit_falso.StorageType.Integer, 1),
+    (u"Potência Ativa (W)", revit_falso.StorageType.Double, 0.0),
+    (u"Corrente (A)", revit_falso.StorageType.Double, 0.0),
+]
+
+
+class Projeto(object):
+    """Documento falso com um nível, um tipo de parede e um símbolo de tomada."""
+
+    def __init__(self, titulo):
+        self.doc = revit_falso.Documento(titulo)
+        self.nivel = self.doc.criar_nivel(u"Térreo", 0.0)
+        self.tipo = self.doc.criar_tipo_parede()
+        self.simbolo = self.doc.criar_simbolo(u"Tomada", u"TUG 10A", parametros_instancia=PARAMETROS_TOMADA)
+
+    def parede(self, inicio, fim, meio=None):
+        return self.doc.criar_parede(inicio, fim, self.nivel, self.tipo, meio=meio)
+
+    @contextlib.contextmanager
+    def etapa(self, nome=u"Teste"):
+        """Agendador com uma etapa aberta: ``with projeto.etapa(): ...``."""
+        agendador = transacoes.Agendador(self.doc, nome)
+        with agendador, agendador.etapa(nome):
+            yield agendador
+
+    def inserir(self, paredes, numero=3, potencia=100.0, fator=0.8, tensao=127.0):
+        """Insere ``numero`` tomadas por parede e devolve as tomadas em ordem."""
+        parametros = lote.ParametrosParede(0.3, numero, None, 'Frontal', (potencia, fator, tensao, 1))
+        itens, _ = lote.planejar_lote(paredes, parametros)
+        resultado = lote.executar_lote(self.doc, self.simbolo, itens)
+        return [t for p in paredes for t in resultado.tomadas_por_parede.get(p.Id.Value, [])]
+
+    def painel(self, nome, ponto, fase_neutro=127.0, fase_fase=220.0):
+        sistema = self.doc.criar_sistema_distribuicao(
+            u"{:.0f}/{:.0f} V".format(fase_neutro, fase_fase), fase_neutro, fase_fase)
+        return self.doc.criar_painel(nome, ponto, self.nivel, sistema)
+
+    def circuitos(self, grupos, painel, tensao=127.0, polos=1):
+        """Um circuito por grupo de tomadas, ligados a ``painel``."""
+        with self.etapa(u"Criar Circuitos"):
+            criados = circuitos.criar_circuitos(self.doc, [[t.Id.Value for t in g] for g in grupos])
+            circuitos.atribuir_painel(criados, painel, tensao, polos, 0.0, 0.0)
+        return criados
+
+
+@pytest.fixture
+def projeto(request):
+    # Título único: a memória de sessão é por documento
+    return Projeto(u"Teste {}".format(request.node.name))
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from eletrica import ambientes
+
+
+@pytest.mark.parametrize('classe, perimetro_m, area_m2, esperado', [
+    # Salas e quartos: uma a cada 5 m de perímetro (fração conta uma a mais)
+    (ambientes.CLASSE_SALA, 12.0, 9.0, 3),
+    (ambientes.CLASSE_SALA, 15.0, 14.0, 3),
+    (ambientes.CLASSE_SALA, 15.1, 14.0, 4),
+    (ambientes.CLASSE_SALA, 2.0, 0.25, 1),
+    # Cozinhas e áreas de serviço: uma a cada 3,5 m
+    (ambientes.CLASSE_COZINHA, 7.0, 3.0, 2),
+    (ambientes.CLASSE_COZINHA, 14.2, 12.0, 5),
+    # Banheiros e varandas: uma, qualquer que seja o perímetro
+    (ambientes.CLASSE_BANHEIRO, 12.0, 8.0, 1),
+    (ambientes.CLASSE_VARANDA, 30.0, 20.0, 1),
+    # Demais ambientes: uma até 6 m², depois uma a cada 5 m
+    (ambientes.CLASSE_OUTROS, 10.0, 6.0, 1),
+    (ambientes.CLASSE_OUTROS, 11.0, 7.0, 3),
+])
+def test_quantidade_minima_nbr_5410(classe, perimetro_m, area_m2, esperado):
+    assert ambientes.REGRAS[classe].quantidade(perimetro_m, area_m2) == esperado
+
+
+def test_potencias_de_areas_umidas():
+    cozinha = ambientes.REGRAS[ambientes.CLASSE_COZINHA]
+    umida, geral = ambientes.POTENCIA_UMIDOS_VA, ambientes.POTENCIA_GERAL_VA
+
+    assert cozinha.potencias(2) == [umida, umida]
+    assert cozinha.potencias(6) == [umida] * 3 + [geral] * 3
+    assert cozinha.potencias(7) == [umida] * 2 + [geral] * 5
+    assert ambientes.REGRAS[ambientes.CLASSE_SALA].potencias(3) == [geral] * 3
+
+
+@pytest.mark.parametrize('nome, parametro, esperado', [
+    (u"Banheiro da Suíte", None, ambientes.CLASSE_BANHEIRO),
+    (u"COZINHA GOURMET", None, ambientes.CLASSE_COZINHA),
+    (u"Dormitório 2", None, ambientes.CLASSE_SALA),
+    (u"Depósito", None, ambientes.CLASSE_OUTROS),
+    (u"Depósito", u"Área de serviço", ambientes.CLASSE_COZINHA),
+])
+def test_classificar(nome, parametro, esperado):
+    assert ambientes.classificar(nome, parametro) == esperado
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import traceback
+
+import pytest
+
+from eletrica import antecipacao, conflitos, lote
+from eletrica.insercao import PES_POR_METRO
+
+FOLGA_METROS = 0.3
+
+
+def _parametros(numero):
+    return lote.ParametrosParede(0.3, numero, None, 'Frontal', (100.0, 0.8, 127.0, 1))
+
+
+def _pontos(itens):
+    return [[(p.X, p.Y, p.Z) for p in item.pontos] for item in itens]
+
+
+def _esperado(projeto, paredes, parametros, ignorar=None):
+    indice = conflitos.indice_do_documento(projeto.doc, FOLGA_METROS * PES_POR_METRO, ignorar=ignorar)
+    itens, _ = lote.planejar_lote(paredes, parametros, conflitos=indice)
+    return _pontos(itens), indice
+
+
+@pytest.fixture
+def cruzadas(projeto):
+    """Parede com tomadas já inseridas e outra que a cruza no meio."""
+    projeto.inserir([projeto.parede((0.0, 0.0), (20.0, 0.0))], numero=3)
+    return [projeto.parede((10.0, -10.0), (10.0, 10.0))]
+
+
+def _falhar():
+    raise ValueError("falha na tarefa")
+
+
+@pytest.mark.parametrize('em_thread', [True, False])
+def test_tarefa_relanca_com_o_traceback_da_execucao(em_thread):
+    tarefa = antecipacao.Tarefa(u"Falha", _falhar, em_thread=em_thread)
+
+    with pytest.raises(ValueError) as erro:
+        tarefa.resultado()
+
+    assert traceback.extract_tb(erro.value.__traceback__)[-1][2] == '_falhar'
+
+
+def test_parametros_padrao_aproveitam_a_tarefa(projeto, cruzadas):
+    parametros = _parametros(5)
+    instantaneo = antecipacao.capturar(projeto.doc, cruzadas)
+    assert not instantaneo.gerenciadas
+    antecipada = antecipacao.Antecipacao(instantaneo, parametros, FOLGA_METROS, em_thread=False)
+
+    indice = antecipada.indice_conflitos(FOLGA_METROS, parametros=parametros)
+    itens, erros = antecipada.planejar(parametros, indice_conflitos=indice)
+
+    esperado, direto = _esperado(projeto, cruzadas, parametros)
+    assert antecipada.aproveitadas == 2 and not erros
+    assert _pontos(itens) == esperado
+    assert (indice.deslocados, indice.descartados) == (direto.deslocados, direto.descartados) != (0, 0)
+
+
+def test_parametros_alterados_usam_o_indice_limpo(projeto, cruzadas):
+    instantaneo = antecipacao.capturar(projeto.doc, cruzadas)
+    antecipada = antecipacao.Antecipacao(instantaneo, _parametros(5), FOLGA_METROS, em_thread=False)
+    parametros = _parametros(4)
+
+    indice = antecipada.indice_conflitos(FOLGA_METROS, parametros=parametros)
+    itens, _ = antecipada.planejar(parametros, indice_conflitos=indice)
+
+    assert antecipada.aproveitadas == 1
+    assert indice is not antecipada._padrao.resultado()[0]
+    assert _pontos(itens) == _esperado(projeto, cruzadas, parametros)[0]
+
+
+def test_sincronizacao_antecipa_pontos_e_indice_separados(projeto, cruzadas):
+    parametros = _parametros(5)
+    projeto.inserir(cruzadas, numero=3)
+    instantaneo = antecipacao.capturar(projeto.doc, cruzadas)
+    ignorar = set(t.Id.Value for lista in instantaneo.gerenciadas.values() for t, _ in lista)
+    assert len(ignorar) == 3
+    antecipada = antecipacao.Antecipacao(instantaneo, parametros, FOLGA_METROS, em_thread=False)
+
+    indice = antecipada.indice_conflitos(FOLGA_METROS, ignorar=ignorar, parametros=parametros)
+    itens, _ = antecipada.planejar(parametros, indice_conflitos=indice, gerenciadas=antecipada.gerenciadas())
+
+    assert antecipada.aproveitadas == 2
+    assert indice.ignorar == ignorar
+    assert _pontos(itens) == _esperado(projeto, cruzadas, parametros, ignorar)[0]
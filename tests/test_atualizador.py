@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from eletrica import atualizador, revit_falso
+
+PARAM_S = u"Potência Aparente (VA)"
+PARAM_P = u"Potência Ativa (W)"
+PARAM_I = u"Corrente (A)"
+
+
+@pytest.fixture
+def id_addin(projeto):
+    id_addin = revit_falso.AddInId(revit_falso.Guid('a1b2c3d4-0000-4000-8000-000000000001'))
+    yield id_addin
+    if atualizador.ativo(projeto.doc, id_addin):
+        atualizador.desativar(projeto.doc, id_addin)
+
+
+@pytest.fixture
+def tomadas(projeto):
+    return projeto.inserir([projeto.parede((0.0, 0.0), (20.0, 0.0))], numero=2, potencia=100.0, fator=0.8)
+
+
+def _valor(tomada, nome):
+    return tomada.LookupParameter(nome).AsDouble()
+
+
+def _editar(projeto, tomada, valor, tensao=None):
+    with projeto.etapa(u"Editar"):
+        tomada.LookupParameter(PARAM_S).Set(valor)
+        if tensao is not None:
+            tomada.LookupParameter(u"Tensão (V)").Set(tensao)
+
+
+def test_edicao_de_s_recalcula_os_derivados_na_mesma_transacao(projeto, id_addin, tomadas):
+    ids, completos = atualizador.ativar(projeto.doc, id_addin)
+    instancia = atualizador.instancia(id_addin)
+    chamadas = instancia.chamadas
+    transacoes = projeto.doc.transacoes
+
+    _editar(projeto, tomadas[0], 500.0, tensao=127.0)
+
+    assert completos and len(ids) == 4
+    assert instancia.chamadas == chamadas + 1 and projeto.doc.transacoes == transacoes + 1
+    assert _valor(tomadas[0], PARAM_P) == pytest.approx(400.0)
+    assert _valor(tomadas[0], PARAM_I) == pytest.approx(500.0 / 127.0)
+    # A inserção grava só S e cos φ: a outra tomada continua sem derivados
+    assert _valor(tomadas[1], PARAM_P) == 0.0
+    assert instancia.erros == []
+
+
+def test_tomada_inserida_recebe_os_derivados(projeto, id_addin):
+    atualizador.ativar(projeto.doc, id_addin)
+
+    tomada, = projeto.inserir([projeto.parede((0.0, 0.0), (20.0, 0.0))], numero=1, potencia=200.0, fator=0.5)
+
+    assert _valor(tomada, PARAM_P) == pytest.approx(100.0)
+
+
+def test_desativado_nao_recalcula(projeto, id_addin, tomadas):
+    assert atualizador.alternar(projeto.doc, id_addin)
+    _editar(projeto, tomadas[0], 500.0)
+    assert not atualizador.alternar(projeto.doc, id_addin)
+    chamadas = atualizador.instancia(id_addin).chamadas
+
+    _editar(projeto, tomadas[0], 1000.0)
+
+    assert not atualizador.ativo(projeto.doc, id_addin)
+    assert atualizador.instancia(id_addin).chamadas == chamadas
+    assert _valor(tomadas[0], PARAM_P) == pytest.approx(400.0)
+
+
+def test_outros_elementos_sao_ignorados(projeto, tomadas):
+    parede = projeto.parede((0.0, 10.0), (20.0, 10.0))
+
+    assert atualizador.atualizar(projeto.doc, [parede.Id]) is None
+    assert atualizador.tomadas_dos_ids(projeto.doc, [parede.Id, tomadas[0].Id]) == [tomadas[0]]
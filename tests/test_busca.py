@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from eletrica import busca, catalogo
+from eletrica.catalogo import RegistroSimbolo
+
+CATEGORIA = 1
+
+
+def _registro(id_simbolo, familia, tipo, parametros=()):
+    return RegistroSimbolo(id_simbolo, familia, tipo, CATEGORIA, True, u"Dispositivos elétricos", parametros)
+
+
+@pytest.fixture
+def indice():
+    return busca.IndiceBusca.construir([
+        _registro(1, u"Tomada Baixa", u"10A"),
+        _registro(2, u"TUG", u"2P+T 10A"),
+        _registro(3, u"Receptacle", u"Duplex"),
+        _registro(4, u"Ponto de Força", u"20A"),
+        _registro(5, u"Interruptor", u"Simples", parametros=(u"Tomada conjugada",)),
+        _registro(6, u"Luminária", u"Plafon"),
+    ])
+
+
+def _ids(resultado):
+    return [i for _, i in resultado]
+
+
+def test_sinonimos_compilados_em_termos_unicode():
+    indice = busca.IndiceBusca()
+
+    assert indice.sinonimos[(u'ponto', u'forca')][0] == (u'tomada',)
+    assert all(isinstance(t, type(u'')) for chave in indice.sinonimos for t in chave)
+
+
+def test_campo_exato_vem_antes_do_sinonimo_e_do_parametro(indice):
+    resultado = _ids(indice.buscar(u"tomada"))
+
+    assert resultado[0] == 1
+    assert set(resultado[1:4]) == {2, 3, 4}
+    assert resultado[-1] == 5
+
+
+@pytest.mark.parametrize('consulta, primeiro', [
+    (u"TUG", 2),
+    (u"Receptacle", 3),
+    (u"ponto de força", 4),
+])
+def test_sinonimos_encontram_as_demais_tomadas(indice, consulta, primeiro):
+    resultado = _ids(indice.buscar(consulta))
+
+    assert resultado[0] == primeiro
+    assert {1, 2, 3, 4} <= set(resultado)
+    assert 6 not in resultado
+
+
+def test_prefixo_e_termo_aproximado(indice):
+    assert _ids(indice.buscar(u"lumin")) == [6]
+    assert _ids(indice.buscar(u"luminaris")) == [6]
+    assert _ids(indice.buscar(u"tomadas"))[0] == 1
+
+
+def test_todos_os_termos_sao_exigidos(indice):
+    assert _ids(indice.buscar(u"tomada 20A")) == [4]
+    assert _ids(indice.buscar(u"tomada plafon")) == []
+
+
+def test_consulta_vazia_em_ordem_alfabetica_e_filtro_de_categoria(indice):
+    assert [r for r, _ in indice.buscar(u"")][:2] == [u"Interruptor : Simples", u"Luminária : Plafon"]
+    assert indice.buscar(u"tomada", categorias=set()) == []
+
+
+def test_indice_do_catalogo_do_documento(projeto):
+    projeto.doc.criar_simbolo(u"Ponto de Força", u"TUE 20A")
+    projeto.doc.criar_simbolo(u"Luminária", u"Plafon")
+    cat = catalogo.CatalogoSimbolos()
+    catalogo.atualizar_catalogo(projeto.doc, cat)
+
+    indice = busca.indice_do_catalogo(projeto.doc, cat, usar_sessao=False)
+
+    assert sorted(r for r, _ in indice.buscar(u"TUG")) == [u"Ponto de Força : TUE 20A", u"Tomada : TUG 10A"]
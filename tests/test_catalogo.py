@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from eletrica import catalogo
+from eletrica.revit_falso import BuiltInParameter
+
+
+@pytest.fixture
+def sem_salvar(monkeypatch):
+    # Versão fixa: nada é salvo entre as execuções
+    monkeypatch.setattr(catalogo, 'versao_documento', lambda doc: 'v1')
+    lidos = []
+    ler = catalogo.ler_registro
+    monkeypatch.setattr(catalogo, 'ler_registro', lambda simbolo: lidos.append(simbolo.Id.Value) or ler(simbolo))
+    return lidos
+
+
+def test_segunda_execucao_reaproveita_os_registros(projeto, sem_salvar):
+    cat = catalogo.CatalogoSimbolos()
+    assert catalogo.atualizar_catalogo(projeto.doc, cat)
+    assert sem_salvar == [projeto.simbolo.Id.Value]
+
+    assert not catalogo.atualizar_catalogo(projeto.doc, cat)
+    assert sem_salvar == [projeto.simbolo.Id.Value]
+    assert cat.opcoes() == {u"Tomada : TUG 10A": projeto.simbolo.Id.Value}
+
+
+def test_tipo_renomeado_na_sessao_e_relido(projeto, sem_salvar):
+    cat = catalogo.CatalogoSimbolos()
+    catalogo.atualizar_catalogo(projeto.doc, cat)
+
+    with projeto.etapa():
+        projeto.simbolo.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME).Set(u"TUG 20A")
+
+    assert catalogo.atualizar_catalogo(projeto.doc, cat)
+    assert cat.registros[projeto.simbolo.Id.Value].tipo == u"TUG 20A"
+    assert list(cat.opcoes()) == [u"Tomada : TUG 20A"]
+
+
+def test_simbolo_ativado_na_sessao_e_relido(projeto, sem_salvar):
+    inativo = projeto.doc.criar_simbolo(u"Tomada", u"TUE 20A", ativo=False)
+    cat = catalogo.CatalogoSimbolos()
+    catalogo.atualizar_catalogo(projeto.doc, cat)
+    assert not cat.registros[inativo.Id.Value].ativo
+
+    with projeto.etapa():
+        inativo.Activate()
+
+    assert catalogo.atualizar_catalogo(projeto.doc, cat)
+    assert cat.registros[inativo.Id.Value].ativo
+    assert sem_salvar[-1] == inativo.Id.Value
+
+
+def test_cache_em_disco_ida_e_volta(projeto, sem_salvar, tmp_path):
+    caminho = str(tmp_path / 'catalogo.json')
+    cat = catalogo.CatalogoSimbolos()
+    catalogo.atualizar_catalogo(projeto.doc, cat)
+
+    catalogo.gravar_cache(cat, caminho)
+    lido = catalogo.ler_cache(caminho)
+
+    assert lido.versao == 'v1'
+    assert lido.registros == cat.registros
+    assert not catalogo.atualizar_catalogo(projeto.doc, lido)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from eletrica import circuitos, demanda
+from eletrica.circuitos import Carga
+
+
+def test_curva_de_hilbert_visita_a_grade_em_passos_unitarios():
+    ordem = sorted(((x, y) for x in range(4) for y in range(4)), key=lambda p: circuitos.indice_hilbert(*p, ordem=2))
+
+    assert ordem[0] == (0, 0) and ordem[-1] == (3, 0)
+    assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(ordem, ordem[1:]))
+
+
+def test_limites_de_carga_e_de_pontos():
+    cargas = [Carga(i, float(i), 0.0, 500.0, None) for i in range(7)]
+
+    assert circuitos.particionar(cargas, max_va=1000.0, max_pontos=10) == [[0, 1], [2, 3], [4, 5], [6]]
+    assert circuitos.particionar(cargas, max_va=10000.0, max_pontos=3) == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_carga_acima_do_limite_forma_circuito_proprio():
+    cargas = [Carga(1, 0.0, 0.0, 300.0, None), Carga(2, 1.0, 0.0, 5000.0, None), Carga(3, 2.0, 0.0, 300.0, None)]
+
+    assert circuitos.particionar(cargas, max_va=2200.0) == [[1], [2], [3]]
+
+
+def test_grupos_nao_dividem_circuito_e_vizinhos_ficam_juntos():
+    # Dois aglomerados distantes no mesmo nível e um ponto em outro nível
+    cargas = [Carga(i, x, y, 100.0, 1) for i, (x, y) in enumerate(
+        [(0.0, 0.0), (100.0, 100.0), (1.0, 0.0), (101.0, 100.0), (0.0, 1.0), (100.0, 101.0)])]
+    cargas.append(Carga(9, 0.5, 0.5, 100.0, 2))
+
+    grupos = circuitos.particionar(cargas, max_pontos=3)
+
+    assert sorted(sorted(g) for g in grupos) == [[0, 2, 4], [1, 3, 5], [9]]
+    assert grupos[-1] == [9]
+
+
+def test_circuitos_criados_no_documento(projeto):
+    tomadas = projeto.inserir([projeto.parede((0.0, 0.0), (20.0, 0.0)), projeto.parede((0.0, 30.0), (20.0, 30.0))],
+                              numero=3, potencia=800.0)
+    cargas = circuitos.cargas_das_tomadas(tomadas, 100.0)
+    assert [c.va for c in cargas] == pytest.approx([800.0] * 6)
+    painel = projeto.painel(u"QD-1", (0.0, -2.0, 0.0))
+
+    criados = projeto.circuitos(
+        [[t for t in tomadas if t.Id.Value in grupo] for grupo in circuitos.particionar(cargas)], painel)
+
+    assert len(criados) == 3
+    assert sorted(len(list(c.Elements)) for c in criados) == [2, 2, 2]
+    assert all(c.BaseEquipment.Id == painel.Id for c in criados)
+    assert len(demanda.coletar_circuitos(projeto.doc)) == 3
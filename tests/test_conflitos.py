@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from eletrica import conflitos, geometria
+
+ID_DISPOSITIVO = 101
+
+
+def _lote(aberturas=None):
+    lote = geometria.LoteParedes()
+    lote.adicionar_reta(0.0, 0.0, 10.0, 0.0, 0.0, 0.0, 1.0, 3, aberturas=aberturas)
+    return lote
+
+
+def _resolver(lote, **opcoes):
+    indice = conflitos.indice_dos_pontos([(5.0, 0.0, 1.0, ID_DISPOSITIVO)], 0.5,
+                                         ignorar=opcoes.pop('ignorar', None))
+    pontos = indice.resolver(lote, geometria.calcular_pontos(lote, usar_numpy=False), **opcoes)
+    return indice, pontos
+
+
+def test_desloca_ao_longo_da_parede_ate_sair_da_folga():
+    indice, pontos = _resolver(_lote())
+
+    assert list(pontos.s) == pytest.approx([0.0, 5.75, 10.0])
+    assert (pontos.x[1], pontos.y[1], pontos.z[1]) == pytest.approx((5.75, 0.0, 1.0))
+    assert (indice.deslocados, indice.descartados) == (1, 0)
+
+
+def test_nao_desloca_para_dentro_de_abertura():
+    _, pontos = _resolver(_lote(aberturas=[(5.5, 6.5)]))
+
+    assert list(pontos.s) == pytest.approx([0.0, 4.25, 10.0])
+
+
+def test_descarta_sem_deslocamento_permitido():
+    indice, pontos = _resolver(_lote(), deslocamento_maximo=0.0)
+
+    assert list(pontos.s) == pytest.approx([0.0, 10.0])
+    assert (indice.deslocados, indice.descartados) == (0, 1)
+
+
+def test_ids_ignorados_nao_contam_como_conflito():
+    indice, pontos = _resolver(_lote(), ignorar={ID_DISPOSITIVO})
+
+    assert list(pontos.s) == pytest.approx([0.0, 5.0, 10.0])
+    assert (indice.deslocados, indice.descartados) == (0, 0)
+
+
+def test_pontos_aceitos_ocupam_o_indice_nos_cantos():
+    lote = _lote()
+    lote.adicionar_reta(10.0, 0.0, 10.0, 10.0, 0.0, 0.0, 1.0, 1)
+    indice = conflitos.IndiceConflitos(0.5)
+
+    pontos = indice.resolver(lote, geometria.calcular_pontos(lote, usar_numpy=False))
+
+    assert list(pontos.parede) == [0, 0, 0, 1]
+    assert (pontos.x[3], pontos.y[3]) == pytest.approx((10.0, 0.75))
+    assert len(indice) == 4
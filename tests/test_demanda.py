@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import math
+
+import pytest
+
+from eletrica import catalogo, demanda
+
+
+@pytest.fixture
+def circuito(projeto, monkeypatch):
+    # Versão fixa: o documento não é salvo entre as execuções
+    monkeypatch.setattr(catalogo, 'versao_documento', lambda doc: 'v1')
+    tomadas = projeto.inserir([projeto.parede((0.0, 0.0), (20.0, 0.0))], numero=3, potencia=100.0, fator=0.8)
+    painel = projeto.painel(u"QD-1", (0.0, -2.0, 0.0))
+    return tomadas, painel
+
+
+def test_edicao_sem_salvar_recalcula_o_circuito(projeto, circuito):
+    tomadas, painel = circuito
+    projeto.circuitos([tomadas], painel)
+    cache = demanda.analisar(projeto.doc, usar_sessao=False).cache
+
+    demanda.analisar(projeto.doc, cache=cache, usar_sessao=False)
+    assert (cache.recalculados, cache.reaproveitados) == (1, 1)
+
+    with projeto.etapa():
+        tomadas[0].LookupParameter(u"Potência Aparente (VA)").Set(300.0)
+    analise = demanda.analisar(projeto.doc, cache=cache, usar_sessao=False)
+
+    assert (cache.recalculados, cache.reaproveitados) == (2, 1)
+    assert [c.potencia_aparente for c in analise.circuitos.values()] == pytest.approx([500.0])
+
+
+def test_tensao_do_circuito_entra_na_assinatura(projeto, circuito):
+    tomadas, painel = circuito
+    criado, = projeto.circuitos([tomadas], painel)
+    cache = demanda.analisar(projeto.doc, usar_sessao=False).cache
+
+    with projeto.etapa():
+        criado.LookupParameter(u"Tensão").Set(220.0)
+    analise = demanda.analisar(projeto.doc, cache=cache, usar_sessao=False)
+
+    assert cache.recalculados == 2
+    assert analise.circuitos[criado.Id.Value].tensao == pytest.approx(220.0)
+
+
+def test_demanda_do_painel_aplica_a_faixa_a_potencia_ativa(projeto, circuito):
+    tomadas, painel = circuito
+    projeto.circuitos([tomadas], painel)
+
+    resultado, = demanda.analisar(projeto.doc, usar_sessao=False).paineis.values()
+
+    assert (resultado.potencia_aparente, resultado.potencia_ativa) == pytest.approx((300.0, 240.0))
+    assert resultado.fator_demanda == pytest.approx(0.86)
+    assert resultado.demanda_ativa == pytest.approx(240.0 * 0.86)
+    assert resultado.demanda == pytest.approx(240.0 * 0.86 / 0.8)
+
+
+@pytest.mark.parametrize('tensao, polos, divisor', [
+    (127.0, 1, 127.0),
+    (0.0, 1, 127.0),
+    (0.0, 2, 220.0),
+    (0.0, 3, math.sqrt(3.0) * 220.0),
+])
+def test_corrente_do_painel_pelos_polos_dos_circuitos(projeto, circuito, tensao, polos, divisor):
+    tomadas, painel = circuito
+    projeto.circuitos([tomadas], painel, tensao=tensao, polos=polos)
+
+    resultado, = demanda.analisar(projeto.doc, usar_sessao=False).paineis.values()
+
+    assert resultado.polos == polos
+    assert resultado.corrente == pytest.approx(resultado.demanda / divisor)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import io
+
+import pytest
+
+from eletrica import exportacao
+
+
+class EscritorLista(exportacao.EscritorBlocos):
+    def __init__(self, tamanho_bloco=exportacao.TAMANHO_BLOCO):
+        super(EscritorLista, self).__init__(tamanho_bloco)
+        self.blocos = []
+
+    def _gravar_bloco(self, linhas):
+        self.blocos.append(list(linhas))
+
+
+@pytest.fixture
+def tomadas(projeto):
+    return projeto.inserir([projeto.parede((0.0, 0.0), (20.0, 0.0))], numero=3, potencia=100.0)
+
+
+def test_parametros_de_tipo_uma_vez_e_de_instancia_por_tomada(projeto, tomadas):
+    escritor = EscritorLista(tamanho_bloco=4)
+
+    with escritor:
+        resumo = exportacao.exportar_parametros(exportacao.coletar_instancias(projeto.doc), [escritor])
+
+    linhas = [l for bloco in escritor.blocos for l in bloco]
+    assert all(len(b) == 4 for b in escritor.blocos[:-1])
+    assert (resumo.elementos, resumo.tipos, resumo.linhas) == (3, 1, len(linhas)) == (3, 1, escritor.linhas)
+    id_tipo = projeto.simbolo.Id.Value
+    assert set(l.elemento for l in linhas if l.origem == exportacao.ORIGEM_TIPO) == {id_tipo}
+    assert set(l.elemento for l in linhas if l.origem == exportacao.ORIGEM_INSTANCIA) == set(
+        t.Id.Value for t in tomadas)
+    elevacoes = [l.valor for l in linhas if l.nome == u"Elevação do Ponto"]
+    assert elevacoes == pytest.approx([0.3] * 3)
+    assert [l.valor for l in linhas if l.nome == u"Nome do tipo"] == [u"TUG 10A"]
+
+
+def test_colunar_e_csv_guardam_as_mesmas_linhas(projeto, tomadas, tmp_path):
+    colunar, texto = str(tmp_path / 'parametros.elpc'), str(tmp_path / 'parametros.csv')
+    memoria = EscritorLista()
+
+    with exportacao.EscritorColunar(colunar, tamanho_bloco=5) as a, exportacao.EscritorCSV(texto, 5) as b:
+        with memoria:
+            exportacao.exportar_parametros(exportacao.coletar_instancias(projeto.doc), [a, b, memoria])
+
+    esperado = memoria.blocos[0]
+    assert list(exportacao.ler_colunar(colunar)) == esperado
+    with io.open(texto, encoding='utf-8-sig') as arquivo:
+        linhas_csv = arquivo.read().splitlines()
+    assert linhas_csv[0] == u";".join(exportacao.CABECALHO_CSV)
+    assert len(linhas_csv) == len(esperado) + 1
+    assert linhas_csv[1].split(u";")[0] == u"Tipo"
+
+
+def test_arquivo_que_nao_e_colunar(tmp_path):
+    caminho = tmp_path / 'outro.elpc'
+    caminho.write_bytes(b'XXXX\x01\x00')
+
+    with pytest.raises(ValueError):
+        list(exportacao.ler_colunar(str(caminho)))
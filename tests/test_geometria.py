@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import math
+
+import pytest
+
+from eletrica import geometria
+
+MODOS = [False, pytest.param(True, marks=pytest.mark.skipif(geometria.np is None, reason="NumPy ausente"))]
+
+
+def _coordenadas(pontos):
+    return [(pontos.x[k], pontos.y[k], pontos.z[k]) for k in range(len(pontos))]
+
+
+@pytest.mark.parametrize('usar_numpy', MODOS)
+def test_reta_distribui_pelo_comprimento_e_desloca_a_face(usar_numpy):
+    lote = geometria.LoteParedes()
+    lote.adicionar_reta(0.0, 0.0, 10.0, 0.0, 1.0, 0.5, 1.0, 3, face='Frontal')
+    lote.adicionar_reta(0.0, 0.0, 0.0, 10.0, 1.0, 0.5, 1.0, 2, intervalo=4.0, face='Traseira')
+
+    pontos = geometria.calcular_pontos(lote, usar_numpy=usar_numpy)
+
+    assert list(pontos.parede) == [0, 0, 0, 1, 1]
+    assert _coordenadas(pontos) == pytest.approx([
+        (0.0, 0.25, 2.0), (5.0, 0.25, 2.0), (10.0, 0.25, 2.0),
+        (0.25, 3.0, 2.0), (0.25, 7.0, 2.0),
+    ])
+    assert [(i, inicio, fim) for i, inicio, fim in pontos.fatias()] == [(0, 0, 3), (1, 3, 5)]
+
+
+@pytest.mark.parametrize('usar_numpy', MODOS)
+def test_reta_descarta_pontos_sobre_aberturas(usar_numpy):
+    lote = geometria.LoteParedes()
+    lote.adicionar_reta(0.0, 0.0, 10.0, 0.0, 0.0, 0.0, 1.0, 3, aberturas=[(4.0, 6.0), (8.0, 9.0)])
+
+    assert list(geometria.calcular_pontos(lote, usar_numpy=usar_numpy).s) == pytest.approx([0.0, 10.0])
+    # A folga amplia a abertura nos dois lados
+    pontos = geometria.calcular_pontos(lote, folga_aberturas=1.5, usar_numpy=usar_numpy)
+    assert list(pontos.s) == pytest.approx([0.0])
+
+
+@pytest.mark.parametrize('usar_numpy', MODOS)
+def test_arco_segue_a_curva_com_tangente_local(usar_numpy):
+    raio = 10.0
+    lote = geometria.LoteParedes()
+    lote.adicionar_arco(0.0, 0.0, raio, 0.0, math.pi / 2, 0.0, 0.5, 1.0, 3, face='Frontal',
+                        aberturas=[(raio * math.pi / 4 - 0.5, raio * math.pi / 4 + 0.5)])
+    lote.adicionar_arco(0.0, 0.0, raio, 0.0, math.pi / 2, 0.0, 0.0, 1.0, 3)
+
+    pontos = geometria.calcular_pontos(lote, usar_numpy=usar_numpy)
+
+    # O ponto do meio da primeira parede cai na abertura
+    assert list(pontos.parede) == [0, 0, 1, 1, 1]
+    for k in range(len(pontos)):
+        x, y, tx, ty = pontos.x[k], pontos.y[k], pontos.tx[k], pontos.ty[k]
+        distancia = 9.75 if pontos.parede[k] == 0 else raio
+        assert math.hypot(x, y) == pytest.approx(distancia)
+        # Tangente unitária e perpendicular ao raio em cada ponto (não à corda)
+        assert math.hypot(tx, ty) == pytest.approx(1.0)
+        assert x * tx + y * ty == pytest.approx(0.0, abs=1e-9)
+    assert (pontos.tx[3], pontos.ty[3]) == pytest.approx((-math.sqrt(0.5), math.sqrt(0.5)))
+
+
+def test_ponto_em_coincide_com_calcular_pontos():
+    lote = geometria.LoteParedes()
+    lote.adicionar_arco(2.0, 3.0, 8.0, 0.5, -2.0, 1.0, 0.4, 1.0, 4, face='Traseira')
+    pontos = geometria.calcular_pontos(lote, usar_numpy=False)
+
+    for k in range(len(pontos)):
+        esperado = (pontos.x[k], pontos.y[k], pontos.z[k], pontos.tx[k], pontos.ty[k])
+        assert geometria.ponto_em(lote, 0, pontos.s[k]) == pytest.approx(esperado)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from eletrica import catalogo, inventario
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    return str(tmp_path / 'inventario.json')
+
+
+@pytest.fixture
+def tomadas(projeto):
+    return projeto.inserir([projeto.parede((0.0, 0.0), (20.0, 0.0))], numero=3)
+
+
+def _contagem(inv, simbolo):
+    return inv.contagens().get(simbolo.Id.Value, 0)
+
+
+def test_segunda_carga_vem_do_cache_sem_reler(projeto, tomadas, caminho, monkeypatch):
+    primeira = inventario.carregar_inventario(projeto.doc, completo=True, caminho=caminho)
+    gravacoes = []
+    monkeypatch.setattr(inventario, 'gravar_cache', lambda inv, c: gravacoes.append(c))
+
+    segunda = inventario.carregar_inventario(projeto.doc, caminho=caminho)
+
+    assert primeira.relidos > 0 and segunda.relidos == 0 and gravacoes == []
+    assert segunda.instancias == primeira.instancias
+    assert _contagem(segunda, projeto.simbolo) == 3
+    assert segunda.tipos[projeto.simbolo.Id.Value].tipo == u"TUG 10A"
+
+
+def test_carga_incremental_le_so_os_novos_e_tira_os_removidos(projeto, tomadas, caminho):
+    inventario.carregar_inventario(projeto.doc, completo=True, caminho=caminho)
+    novo = projeto.doc.criar_simbolo(u"Tomada", u"TUE 20A")
+    with projeto.etapa():
+        projeto.doc.Delete(tomadas[0].Id)
+
+    inv = inventario.carregar_inventario(projeto.doc, caminho=caminho)
+
+    assert inv.relidos == 1
+    assert novo.Id.Value in inv.tipos and tomadas[0].Id.Value not in inv.instancias
+    assert _contagem(inv, projeto.simbolo) == 2
+    assert inventario.carregar_inventario(projeto.doc, caminho=caminho).relidos == 0
+
+
+def test_troca_de_tipo_relida_pelos_modificados(projeto, tomadas, caminho, monkeypatch):
+    versoes = iter(['v1', 'v2'])
+    monkeypatch.setattr(catalogo, 'versao_documento', lambda doc: next(versoes))
+    inventario.carregar_inventario(projeto.doc, completo=True, caminho=caminho)
+    outro = projeto.doc.criar_simbolo(u"Tomada", u"TUE 20A")
+    with projeto.etapa():
+        tomadas[0].ChangeTypeId(outro.Id)
+    monkeypatch.setattr(catalogo, 'ids_modificados', lambda doc, versao: set([tomadas[0].Id.Value]))
+
+    inv = inventario.carregar_inventario(projeto.doc, caminho=caminho)
+
+    assert inv.relidos == 2 and inv.versao == 'v2'
+    assert (_contagem(inv, projeto.simbolo), _contagem(inv, outro)) == (2, 1)
+
+
+def test_cache_corrompido_ou_de_outras_categorias_reconstroi(projeto, tomadas, caminho):
+    with open(caminho, 'w') as arquivo:
+        arquivo.write('{')
+    assert len(inventario.carregar_inventario(projeto.doc, caminho=caminho).instancias) == 3
+
+    filtrado = inventario.carregar_inventario(
+        projeto.doc, categorias=['OST_ElectricalFixtures'], caminho=caminho)
+    assert filtrado.categorias == ['OST_ElectricalFixtures'] and filtrado.relidos > 0
+
+
+def test_linhas_por_familia_com_filtro(projeto, tomadas, caminho):
+    projeto.doc.criar_simbolo(u"Tomada", u"TUE 20A")
+    projeto.doc.criar_simbolo(u"Luminária", u"Plafon")
+    inv = inventario.carregar_inventario(projeto.doc, completo=True, caminho=caminho)
+
+    linha, = inv.linhas(inventario.NIVEL_FAMILIA, filtro=u"tomada")
+    assert (linha.familia, linha.tipos, linha.instancias) == (u"Tomada", 2, 3)
+    assert [l.tipo for l in inv.linhas(filtro=u"tomada", somente_colocados=True)] == [u"TUG 10A"]
+    assert [l.familia for l in inv.linhas(inventario.NIVEL_FAMILIA, filtro=u"luminaria")] == [u"Luminária"]
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from eletrica import lote, marcacao, transacoes
+from eletrica.insercao import PES_POR_METRO
+
+PARAMETROS = lote.ParametrosParede(0.3, 3, None, 'Frontal', (100.0, 0.8, 127.0, 1))
+
+
+def test_planejamento_aplica_padroes_e_sobrescritas(projeto):
+    a = projeto.parede((0.0, 0.0), (20.0, 0.0))
+    b = projeto.parede((0.0, 10.0), (20.0, 10.0))
+
+    itens, erros = lote.planejar_lote([a, b], PARAMETROS, {b.Id.Value: {'numero_tomadas': 5, 'altura_metros': 1.1}})
+
+    assert not erros
+    assert [(i.parede, len(i.pontos)) for i in itens] == [(a, 3), (b, 5)]
+    assert itens[1].parametros.face == 'Frontal' and itens[1].parametros.numero_tomadas == 5
+    assert [p.Z for p in itens[0].pontos] == pytest.approx([0.3 * PES_POR_METRO] * 3)
+    assert [p.Z for p in itens[1].pontos] == pytest.approx([1.1 * PES_POR_METRO] * 5)
+    assert [p.X for p in itens[1].pontos] == sorted(p.X for p in itens[1].pontos)
+    assert all(0.0 <= p.X <= 20.0 for i in itens for p in i.pontos)
+
+
+def test_parede_sem_curva_vai_para_os_erros_sem_interromper(projeto):
+    a = projeto.parede((0.0, 0.0), (20.0, 0.0))
+    b = projeto.parede((0.0, 10.0), (20.0, 10.0))
+    b.Location = None
+
+    itens, erros = lote.planejar_lote([a, b], PARAMETROS)
+
+    assert [i.parede for i in itens] == [a]
+    assert erros == ["Parede {}: Não foi possível obter a localização da parede.".format(b.Id.Value)]
+
+
+def test_sobrescritas_lidas_do_csv(tmp_path):
+    caminho = tmp_path / 'sobrescritas.csv'
+    caminho.write_text(u"id_parede;altura;numero_tomadas;intervalo;face\n"
+                       u"10;1,10;;;Traseira\n"
+                       u"11;;4;2,5;\n")
+
+    assert lote.ler_sobrescritas_csv(str(caminho)) == {
+        10: {'altura_metros': 1.1, 'face': 'Traseira'},
+        11: {'numero_tomadas': 4, 'intervalo_metros': 2.5},
+    }
+
+
+def test_paredes_do_nivel(projeto):
+    a = projeto.parede((0.0, 0.0), (20.0, 0.0))
+    outro = projeto.doc.criar_nivel(u"Superior", 10.0)
+    projeto.doc.criar_parede((0.0, 0.0), (20.0, 0.0), outro, projeto.tipo)
+
+    assert lote.coletar_paredes_nivel(projeto.doc, projeto.nivel.Id) == [a]
+
+
+def test_execucao_em_etapas_limitadas_marca_as_tomadas(projeto):
+    paredes = [projeto.parede((0.0, 10.0 * k), (20.0, 10.0 * k)) for k in range(3)]
+    itens, _ = lote.planejar_lote(paredes, PARAMETROS)
+
+    agendador = transacoes.Agendador(projeto.doc, u"Lote")
+
+    with agendador:
+        resultado = lote.executar_lote(projeto.doc, projeto.simbolo, itens, tomadas_por_transacao=4,
+                                       agendador=agendador)
+
+    # Fatias de até 4 tomadas: as duas primeiras paredes, depois a terceira
+    assert agendador.etapas == 2
+    assert resultado.total == 9 and not resultado.erros and not resultado.falhas
+    gerenciadas = marcacao.gerenciadas_por_parede(projeto.doc)
+    assert sorted(gerenciadas) == sorted(p.Id.Value for p in paredes)
+    assert all(len(gerenciadas[p.Id.Value]) == 3 for p in paredes)
+    dados = gerenciadas[paredes[0].Id.Value][0][1]
+    assert (dados['face'], dados['numero']) == ('Frontal', 3)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from eletrica import catalogo, paineis, revit_falso
+from eletrica.revit_falso import BuiltInParameter
+
+
+@pytest.fixture
+def quadros(projeto, monkeypatch):
+    # Versão fixa: as edições abaixo acontecem na mesma sessão, sem salvar
+    monkeypatch.setattr(catalogo, 'versao_documento', lambda doc: 'v1')
+    return projeto.painel(u"QD-A", (0.0, 0.0, 0.0)), projeto.painel(u"QD-B", (100.0, 0.0, 0.0))
+
+
+def _contar_construcoes(monkeypatch):
+    chamadas = []
+    construir = paineis.construir_registros
+    monkeypatch.setattr(paineis, 'construir_registros', lambda doc: chamadas.append(1) or construir(doc))
+    return chamadas
+
+
+def test_mais_proximos_por_id_e_tensao(projeto, quadros):
+    a, b = quadros
+    c = projeto.painel(u"QD-C", (90.0, 10.0, 0.0), 220.0, 380.0)
+    indice = paineis.indice_paineis(projeto.doc)
+
+    assert [i for _, i in indice.mais_proximos(95.0, 0.0, 2)] == [b.Id.Value, c.Id.Value]
+    assert [i for _, i in indice.mais_proximos(95.0, 0.0, 2, tensao=127.0)] == [b.Id.Value, a.Id.Value]
+    assert [i for _, i in indice.sugerir([(90.0, 0.0), (100.0, 20.0)], tensao=380.0)] == [
+        c.Id.Value, b.Id.Value, a.Id.Value]
+    assert indice.nome_exibicao(a.Id.Value) == u"QD-A - Térreo [{}]".format(a.Id.Value)
+
+
+def test_registros_reaproveitados_sem_alteracao(projeto, quadros, monkeypatch):
+    chamadas = _contar_construcoes(monkeypatch)
+
+    paineis.registros_da_sessao(projeto.doc)
+    paineis.registros_da_sessao(projeto.doc)
+
+    assert len(chamadas) == 1
+
+
+def test_painel_movido_na_sessao_e_relido(projeto, quadros):
+    a, b = quadros
+    assert paineis.indice_paineis(projeto.doc).mais_proximos(90.0, 0.0, 1)[0][1] == b.Id.Value
+
+    with projeto.etapa():
+        revit_falso.ElementTransformUtils.MoveElement(projeto.doc, b.Id, revit_falso.XYZ(200.0, 0.0, 0.0))
+
+    assert paineis.indice_paineis(projeto.doc).mais_proximos(90.0, 0.0, 1)[0][1] == a.Id.Value
+
+
+def test_sistema_trocado_na_sessao_e_relido(projeto, quadros):
+    _, b = quadros
+    sistema = projeto.doc.criar_sistema_distribuicao(u"220/380 V", 220.0, 380.0)
+    assert paineis.indice_paineis(projeto.doc).compativeis(220.0) == []
+
+    with projeto.etapa():
+        b.get_Parameter(BuiltInParameter.RBS_FAMILY_CONTENT_DISTRIBUTION_SYSTEM).Set(sistema.Id)
+
+    assert paineis.indice_paineis(projeto.doc).compativeis(220.0) == [b.Id.Value]
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from eletrica import lote, parametrizacao
+
+from conftest import PARAMETROS_TOMADA
+
+
+def _valores(tomada, nome):
+    return tomada.LookupParameter(nome).AsDouble()
+
+
+def test_troca_do_sistema_de_tensao_recalcula_os_derivados(projeto):
+    tomadas = projeto.inserir([projeto.parede((0.0, 0.0), (20.0, 0.0))], numero=3, potencia=100.0, fator=0.8)
+
+    coletadas = parametrizacao.coletar_tomadas(projeto.doc, parametrizacao.ORIGEM_PROJETO)
+    resultado = parametrizacao.parametrizar(projeto.doc, coletadas, {'sistema_tensao': (220.0, 380.0)})
+
+    assert sorted(t.Id.Value for t in coletadas) == sorted(t.Id.Value for t in tomadas)
+    assert len(resultado.alteradas) == 3 and resultado.erros == []
+    for tomada in tomadas:
+        assert _valores(tomada, u"Tensão (V)") == pytest.approx(220.0)
+        assert _valores(tomada, u"Potência Ativa (W)") == pytest.approx(80.0)
+        assert _valores(tomada, u"Corrente (A)") == pytest.approx(100.0 / 220.0)
+
+
+def test_segunda_execucao_nao_grava_nada(projeto):
+    projeto.inserir([projeto.parede((0.0, 0.0), (20.0, 0.0))], numero=2)
+    coletadas = parametrizacao.coletar_tomadas(projeto.doc, parametrizacao.ORIGEM_PROJETO)
+    parametrizacao.parametrizar(projeto.doc, coletadas, {'tensao': 220.0})
+
+    resultado = parametrizacao.parametrizar(projeto.doc, coletadas, {'tensao': 220.0})
+
+    assert (resultado.alteradas, resultado.mantidas, resultado.escritas) == ([], 2, 0)
+
+
+def test_somente_leitura_e_familias_sem_parametros(projeto):
+    parede = projeto.parede((0.0, 0.0), (20.0, 0.0))
+    itens, _ = lote.planejar_lote([parede], lote.ParametrosParede(0.3, 1, None, 'Frontal', (100.0, 0.8, 127.0, 1)))
+    bloqueada = projeto.doc.criar_simbolo(u"Tomada", u"TUG 20A", parametros_instancia=[
+        p if p[0] != u"Tensão (V)" else (p[0], p[1], p[2], True) for p in PARAMETROS_TOMADA])
+    vazia = projeto.doc.criar_simbolo(u"Tomada", u"Sem parâmetros")
+    tomada_bloqueada, = lote.executar_lote(projeto.doc, bloqueada, itens).tomadas_por_parede[parede.Id.Value]
+    tomada_vazia, = lote.executar_lote(projeto.doc, vazia, itens).tomadas_por_parede[parede.Id.Value]
+
+    resultado = parametrizacao.parametrizar(projeto.doc, [tomada_bloqueada, tomada_vazia], {'tensao': 220.0})
+
+    assert resultado.sem_parametros == [tomada_vazia] and resultado.erros == []
+    assert _valores(tomada_bloqueada, u"Tensão (V)") == 0.0
+    assert _valores(tomada_bloqueada, u"Corrente (A)") == pytest.approx(100.0 / 220.0)
+
+
+def test_familias_fora_dos_termos_ficam_de_fora(projeto):
+    parede = projeto.parede((0.0, 0.0), (20.0, 0.0))
+    tomada, = projeto.inserir([parede], numero=1)
+    itens, _ = lote.planejar_lote([parede], lote.ParametrosParede(0.3, 1, None, 'Frontal', (0.0, 1.0, 127.0, 1)))
+    interruptor = projeto.doc.criar_simbolo(u"Interruptor", u"Simples")
+    lote.executar_lote(projeto.doc, interruptor, itens)
+
+    coletadas = parametrizacao.coletar_tomadas(projeto.doc, parametrizacao.ORIGEM_PROJETO)
+
+    assert [t.Id.Value for t in coletadas] == [tomada.Id.Value]
+    assert parametrizacao.coletar_tomadas(projeto.doc, parametrizacao.ORIGEM_SELECAO) == []
+
+
+def test_calculo_sem_numpy_igual_ao_vetorizado(monkeypatch):
+    def cargas():
+        c = parametrizacao.CargasEletricas()
+        c.adicionar(100.0, 0.8, 127.0, 1)
+        c.adicionar(900.0, 0.92, 380.0, 3)
+        c.adicionar(50.0, 1.2, 0.0, 1)
+        return c
+
+    vetorizado = parametrizacao.calcular_derivados(cargas())
+    monkeypatch.setattr(parametrizacao, 'np', None)
+    laco = parametrizacao.calcular_derivados(cargas())
+
+    for campo in parametrizacao.DERIVADOS:
+        assert list(getattr(laco, campo)) == pytest.approx(list(getattr(vetorizado, campo)))
+    assert list(laco.corrente) == pytest.approx([100.0 / 127.0, 900.0 / (380.0 * 3 ** 0.5), 0.0])
+    assert list(laco.potencia_reativa)[2] == 0.0
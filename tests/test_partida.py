@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from eletrica import partida, rastreio
+
+
+def test_ferramenta_marca_o_inicio_e_encerra_o_rastreio_mesmo_com_erro(monkeypatch):
+    finalizados = []
+    monkeypatch.setattr(rastreio, 'finalizar', lambda: finalizados.append(True))
+
+    with pytest.raises(RuntimeError):
+        with partida.ferramenta(u"Ferramenta", 123.0, rastrear=False):
+            assert partida._ESTADO['inicio'] == 123.0
+            assert rastreio._ESTADO['ferramenta'] == u"Ferramenta"
+            raise RuntimeError()
+
+    assert finalizados == [True]
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import math
+
+import pytest
+
+from eletrica import insercao, plano, revit_falso
+from eletrica.revit_falso import XYZ
+
+
+def _criar(projeto, parede, pontos, face='Frontal', cache_planos=None):
+    with projeto.etapa():
+        return insercao.criar_tomadas(projeto.doc, parede, projeto.simbolo, pontos, face,
+                                      (1000.0, 0.8, 127.0, 1), cache_planos=cache_planos)
+
+
+def _valor(tomada, nome):
+    return tomada.LookupParameter(nome).AsDouble()
+
+
+def test_cache_compila_uma_vez_por_parede_simbolo_e_face(projeto):
+    a = projeto.parede((0.0, 0.0), (30.0, 40.0))
+    b = projeto.parede((0.0, 0.0), (0.0, 10.0))
+    cache = plano.CachePlanos()
+
+    frontal = cache.obter(a, projeto.simbolo, 'Frontal')
+
+    assert cache.obter(a, projeto.simbolo, 'Frontal') is frontal
+    assert cache.obter(a, projeto.simbolo, 'Traseira') is not frontal
+    assert cache.obter(b, projeto.simbolo, 'Frontal').parametros is frontal.parametros
+
+
+@pytest.mark.parametrize('face, giro', [('Frontal', 0.0), ('Traseira', math.pi)])
+def test_tomadas_orientadas_e_parametrizadas_na_parede_reta(projeto, face, giro):
+    parede = projeto.parede((0.0, 0.0), (30.0, 40.0))
+    pontos = [XYZ(0.6 * s, 0.8 * s, 1.0) for s in (5.0, 25.0, 45.0)]
+
+    tomadas = _criar(projeto, parede, pontos, face)
+
+    assert len(tomadas) == 3
+    for tomada in tomadas:
+        assert tomada.Location.Rotation == pytest.approx(math.atan2(0.8, 0.6) + giro)
+        assert _valor(tomada, plano.PARAM_ELEVACAO) == pytest.approx(1.0)
+        assert _valor(tomada, plano.PARAM_POTENCIA_APARENTE) == pytest.approx(1000.0)
+        assert _valor(tomada, plano.PARAM_FATOR_POTENCIA) == pytest.approx(0.8)
+
+
+def test_tomadas_tangentes_a_parede_em_arco(projeto):
+    # Arco por (0, 0), (10, 5) e (20, 0): centro em (10, -7.5), raio 12.5
+    parede = projeto.parede((0.0, 0.0), (20.0, 0.0), meio=(10.0, 5.0))
+    curva = parede.Location.Curve
+    pontos = [curva.Evaluate(t, True) for t in (0.25, 0.5, 0.75)]
+
+    tomadas = _criar(projeto, parede, pontos)
+
+    for ponto, tomada in zip(pontos, tomadas):
+        rotacao = tomada.Location.Rotation
+        raio = (ponto.X - 10.0, ponto.Y + 7.5)
+        assert math.cos(rotacao) * raio[0] + math.sin(rotacao) * raio[1] == pytest.approx(0.0, abs=1e-9)
+    assert tomadas[1].Location.Rotation % (2 * math.pi) == pytest.approx(0.0, abs=1e-9)
+
+
+def test_parametros_procurados_por_nome_so_na_primeira_tomada(projeto):
+    parede = projeto.parede((0.0, 0.0), (30.0, 40.0))
+    cache = plano.CachePlanos()
+    _criar(projeto, parede, [XYZ(0.6, 0.8, 1.0)], cache_planos=cache)
+    pontos = [XYZ(0.6 * s, 0.8 * s, 1.0) for s in range(2, 12)]
+
+    antes = revit_falso.chamadas_api()
+    _criar(projeto, parede, pontos, cache_planos=cache)
+
+    # NewFamilyInstance, eixo, RotateElement e get_Parameter + Set de três parâmetros
+    assert revit_falso.chamadas_api() - antes == 9 * len(pontos)
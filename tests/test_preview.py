@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from eletrica import lote, preview
+
+
+def _marcas(projeto, parede):
+    parametros = lote.ParametrosParede(0.3, 5, None, 'Frontal', (100.0, 0.8, 127.0, 1))
+    (item,), _ = lote.planejar_lote([parede], parametros)
+    with preview.PreviewGravador() as gravador:
+        assert preview.mostrar_preview(projeto.doc, None, item.pontos, item.tangentes, preview=gravador) is gravador
+        segmentos = gravador.segmentos
+    assert gravador.chamadas == [('desenhar', 5), ('limpar', 0)]
+    return item, segmentos
+
+
+def test_marcas_perpendiculares_a_parede_reta(projeto):
+    item, segmentos = _marcas(projeto, projeto.parede((0.0, 0.0), (20.0, 0.0)))
+
+    for ponto, (a, b) in zip(item.pontos, segmentos):
+        assert (a[0], b[0]) == pytest.approx((ponto.X, ponto.X))
+        assert (a[1], b[1]) == pytest.approx((ponto.Y - 0.2, ponto.Y + 0.2))
+        assert a[2] == b[2] == pytest.approx(ponto.Z)
+
+
+def test_marcas_seguem_o_raio_da_parede_em_arco(projeto):
+    # Arco por (0, 0), (10, 5) e (20, 0): centro em (10, -7.5), raio 12.5
+    item, segmentos = _marcas(projeto, projeto.parede((0.0, 0.0), (20.0, 0.0), meio=(10.0, 5.0)))
+
+    direcoes = set()
+    for ponto, (a, b) in zip(item.pontos, segmentos):
+        mx, my = (a[0] + b[0]) / 2.0, (a[1] + b[1]) / 2.0
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        rx, ry = ponto.X - 10.0, ponto.Y + 7.5
+        assert (mx, my) == pytest.approx((ponto.X, ponto.Y))
+        assert (dx * dx + dy * dy) ** 0.5 == pytest.approx(0.4)
+        assert dx * ry - dy * rx == pytest.approx(0.0, abs=1e-9)
+        direcoes.add((round(dx, 6), round(dy, 6)))
+    assert len(direcoes) == len(segmentos)
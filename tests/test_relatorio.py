@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+
+from eletrica import demanda, relatorio
+
+
+class SaidaFalsa(object):
+    def __init__(self):
+        self.chamadas = []
+
+    def print_md(self, texto):
+        self.chamadas.append(texto)
+
+
+def _preencher(rel):
+    rel.titulo(u"Resumo")
+    rel.item(u"Tomadas", 3)
+    rel.item(u"Sem valor", nivel=1)
+    rel.tabela([(u"QD|1", 1.5), (u"QD-2", None)], [u"Painel", u"Corrente (A)"], titulo=u"Painéis")
+    rel.texto(u"Fim")
+
+
+def test_uma_unica_chamada_a_janela_do_pyrevit():
+    saida = SaidaFalsa()
+
+    with relatorio.Relatorio([relatorio.DestinoPyRevit(saida)]) as rel:
+        _preencher(rel)
+        assert saida.chamadas == []
+
+    assert saida.chamadas == [
+        u"### Resumo\n\n"
+        u"- **Tomadas:** 3\n  - Sem valor\n\n"
+        u"**Painéis**\n\n| Painel | Corrente (A) |\n|---|---|\n| QD\\|1 | 1.5 |\n| QD-2 |  |\n\n"
+        u"Fim"
+    ]
+
+
+def test_destinos_de_texto_e_json_lines(tmp_path):
+    texto, linhas = str(tmp_path / 'relatorio.txt'), str(tmp_path / 'relatorio.jsonl')
+
+    with relatorio.Relatorio([relatorio.DestinoTexto(texto), relatorio.DestinoJsonLines(linhas)]) as rel:
+        _preencher(rel)
+
+    with io.open(texto, encoding='utf-8') as arquivo:
+        assert arquivo.read().splitlines() == [
+            u"Resumo", u"======", u"Tomadas: 3", u"  Sem valor", u"Painéis", u"Painel\tCorrente (A)",
+            u"QD|1\t1.5", u"QD-2\t", u"Fim"]
+    with io.open(linhas, encoding='utf-8') as arquivo:
+        registros = [json.loads(l) for l in arquivo]
+    assert [r['tipo'] for r in registros] == [
+        relatorio.TITULO, relatorio.ITEM, relatorio.ITEM, relatorio.TABELA, relatorio.TEXTO]
+    assert registros[3]['linhas'] == [[u"QD|1", 1.5], [u"QD-2", None]]
+
+
+def test_emitir_esvazia_e_acrescenta_ao_arquivo(tmp_path):
+    caminho = str(tmp_path / 'relatorio.txt')
+    rel = relatorio.Relatorio([relatorio.DestinoTexto(caminho)])
+
+    rel.texto(u"primeira")
+    rel.emitir()
+    rel.emitir()
+    rel.texto(u"segunda")
+    rel.emitir()
+
+    assert len(rel) == 0
+    with io.open(caminho, encoding='utf-8') as arquivo:
+        assert arquivo.read() == u"primeira\nsegunda\n"
+
+
+def test_analise_de_demanda_no_relatorio(projeto, tmp_path):
+    tomadas = projeto.inserir([projeto.parede((0.0, 0.0), (20.0, 0.0))], numero=3)
+    projeto.circuitos([tomadas], projeto.painel(u"QD-1", (0.0, -2.0, 0.0)))
+    caminho = str(tmp_path / 'demanda.jsonl')
+
+    with relatorio.Relatorio([relatorio.DestinoJsonLines(caminho)]) as rel:
+        demanda.relatar(demanda.analisar(projeto.doc, usar_sessao=False), rel)
+
+    with io.open(caminho, encoding='utf-8') as arquivo:
+        tabelas = [r for r in map(json.loads, arquivo) if r['tipo'] == relatorio.TABELA]
+    assert [len(t['linhas']) for t in tabelas] == [1, 1]
+    assert tabelas[0]['linhas'][0][0] == u"QD-1"
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from eletrica import retrato, revit_falso
+
+NAN = float('nan')
+
+
+def _dados():
+    dados = retrato.DadosRetrato(u"Residência Térrea")
+    dados.secoes[b'PARE'] = [
+        (11, 0.0, 0.0, 10.0, 0.0, 5.0, 0.0, 0.0, 0.5, 10.0, u"Térreo", u"Alvenaria 15", 0),
+        (12, 0.0, 0.0, 0.0, 8.0, 1.0, 4.0, 0.0, 0.5, 8.6, u"Térreo", None, 1),
+    ]
+    dados.secoes[b'TOMA'] = [
+        (21, 3, 11, 31, 5.0, 0.25, 1.0, 100.0, 0.8, 127.0, 80.0, 0.79, 1,
+         u"Tomada", u"TUG 10A", u"Térreo", 1),
+        (22, 3, retrato.SEM_ID, retrato.SEM_ID, 1.0, 2.0, 1.0, NAN, NAN, NAN, NAN, NAN, 1,
+         u"Tomada", u"TUG 10A", None, 0),
+    ]
+    dados.secoes[b'PAIN'] = [(41, 50.0, 20.0, 0.0, 127.0, 220.0, u"QD-1", u"Térreo", u"127/220 V")]
+    dados.secoes[b'CIRC'] = [(31, 41, 127.0, 30.0, 9.1, 100.0, 80.0, 1, 1, u"1")]
+    return dados
+
+
+def test_gravar_e_abrir_preservam_os_registros(tmp_path):
+    dados = _dados()
+    caminho = str(tmp_path / ('projeto.' + retrato.EXTENSAO))
+
+    resumo = retrato.gravar(caminho, dados)
+
+    with retrato.abrir(caminho) as lido:
+        assert lido.titulo == u"Residência Térrea"
+        assert lido.resumo() == resumo == (2, 2, 1, 1, 0, 8)
+        assert [tuple(p) for p in lido.paredes] == dados.secoes[b'PARE']
+        assert tuple(lido.paineis[0]) == dados.secoes[b'PAIN'][0]
+        assert tuple(lido.circuitos[-1]) == dados.secoes[b'CIRC'][0]
+        assert tuple(lido.tomadas[0]) == dados.secoes[b'TOMA'][0]
+        sem_circuito = lido.tomadas[1]
+        assert sem_circuito.circuito == retrato.SEM_ID and sem_circuito.nivel is None
+        assert retrato.ausente(sem_circuito.potencia_aparente)
+        assert lido.tomadas.coluna('familia') == [u"Tomada", u"Tomada"]
+        assert len(lido.parametros) == 0
+        with pytest.raises(IndexError):
+            lido.tomadas[2]
+        assert retrato.cargas_por_painel(lido) == {u"QD-1": (1, 1, 100.0, 80.0)}
+
+
+def test_rejeita_arquivo_que_nao_e_retrato(tmp_path):
+    caminho = tmp_path / 'outro.elrp'
+    caminho.write_bytes(b'XXXX' + b'\0' * 64)
+
+    with pytest.raises(ValueError):
+        retrato.abrir(str(caminho))
+
+
+def test_exportar_documento_falso(tmp_path):
+    doc = revit_falso.Documento(u"Projeto")
+    nivel = doc.criar_nivel(u"Térreo", 0.0)
+    tipo = doc.criar_tipo_parede()
+    reta = doc.criar_parede((0.0, 0.0), (10.0, 0.0), nivel, tipo)
+    doc.criar_parede((0.0, 0.0), (10.0, 0.0), nivel, tipo, meio=(5.0, 2.5))
+    doc.criar_painel(u"QD-1", (20.0, 5.0, 0.0), nivel, doc.criar_sistema_distribuicao())
+    caminho = str(tmp_path / 'projeto.elrp')
+
+    resumo = retrato.exportar(doc, caminho)
+
+    with retrato.abrir(caminho) as lido:
+        assert lido.resumo() == resumo
+        assert lido.titulo == u"Projeto"
+        assert lido.paredes.coluna('arco') == [0, 1]
+        assert lido.paredes[0].id == revit_falso._valor_id(reta.Id)
+        assert lido.paredes[0].comprimento == pytest.approx(10.0)
+        assert lido.paredes.coluna('nivel') == [u"Térreo", u"Térreo"]
+        assert [p.nome for p in lido.paineis] == [u"QD-1"]
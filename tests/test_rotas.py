@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from eletrica import demanda, rotas
+from eletrica.insercao import PES_POR_METRO
+
+
+@pytest.fixture
+def instalacao(projeto):
+    # Parede em L: o painel fica no início do primeiro trecho e as tomadas no segundo
+    primeira = projeto.parede((0.0, 0.0), (30.0, 0.0))
+    segunda = projeto.parede((30.0, 0.0), (30.0, 30.0))
+    isolada = projeto.parede((100.0, 100.0), (120.0, 100.0))
+    tomadas = projeto.inserir([segunda], numero=3)
+    solta, = projeto.inserir([isolada], numero=1)
+    painel = projeto.painel(u"QD-1", (0.0, -1.0, 0.0))
+    criados = projeto.circuitos([tomadas, [solta]], painel)
+    return tomadas, solta, criados
+
+
+def _pelas_paredes(tomada):
+    # 1 pé até a parede, 30 pela primeira, y pela segunda, meia espessura e o desnível
+    ponto = tomada.Location.Point
+    return (1.0 + 30.0 + ponto.Y + 0.25 + ponto.Z) / PES_POR_METRO
+
+
+def test_rota_segue_as_paredes_ate_a_tomada_mais_distante(projeto, instalacao):
+    tomadas, solta, (circuito, _) = instalacao
+
+    resultado = rotas.calcular_rotas(projeto.doc, demanda.coletar_circuitos(projeto.doc), usar_sessao=False)
+
+    for tomada in tomadas:
+        ponto = tomada.Location.Point
+        assert resultado.por_tomada[tomada.Id.Value] == pytest.approx(_pelas_paredes(tomada))
+        assert resultado.por_tomada[tomada.Id.Value] > (ponto.X ** 2 + (ponto.Y + 1.0) ** 2) ** 0.5 / PES_POR_METRO
+    assert resultado.comprimentos[circuito.Id.Value] == pytest.approx(_pelas_paredes(tomadas[-1]))
+    assert resultado.consultas == 1
+
+
+def test_parede_desconectada_usa_a_distancia_ortogonal(projeto, instalacao):
+    tomadas, solta, (_, isolado) = instalacao
+
+    resultado = rotas.calcular_rotas(projeto.doc, demanda.coletar_circuitos(projeto.doc), usar_sessao=False)
+
+    ponto = solta.Location.Point
+    assert resultado.sem_rota == [solta.Id.Value]
+    assert resultado.comprimentos[isolado.Id.Value] == pytest.approx(
+        (ponto.X + ponto.Y + 1.0 + ponto.Z) / PES_POR_METRO)
+
+
+def test_grafo_do_nivel_reaproveitado_na_sessao(projeto, instalacao, monkeypatch):
+    construcoes = []
+    construir = rotas.GrafoParedes.construir.__func__
+    monkeypatch.setattr(rotas.GrafoParedes, 'construir', classmethod(
+        lambda cls, *args, **kwargs: construcoes.append(1) or construir(cls, *args, **kwargs)))
+    circuitos = demanda.coletar_circuitos(projeto.doc)
+
+    primeira = rotas.calcular_rotas(projeto.doc, circuitos).comprimentos
+    segunda = rotas.calcular_rotas(projeto.doc, circuitos).comprimentos
+    assert len(construcoes) == 1 and segunda == pytest.approx(primeira)
+
+    projeto.parede((30.0, 30.0), (0.0, 30.0))
+    rotas.calcular_rotas(projeto.doc, circuitos)
+    assert len(construcoes) == 2
+
+
+def test_gravacao_so_do_que_mudou(projeto, instalacao):
+    tomadas, solta, criados = instalacao
+    circuitos = demanda.coletar_circuitos(projeto.doc)
+    comprimentos = rotas.calcular_rotas(projeto.doc, circuitos, usar_sessao=False).comprimentos
+
+    assert rotas.gravar_comprimentos(projeto.doc, circuitos, comprimentos) == (2, 0)
+    assert rotas.gravar_comprimentos(projeto.doc, circuitos, comprimentos) == (0, 0)
+    for circuito in criados:
+        assert circuito.LookupParameter(rotas.PARAM_COMPRIMENTO_ROTA).AsDouble() == pytest.approx(
+            round(comprimentos[circuito.Id.Value], 2))
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from eletrica import lote, marcacao, sincronizacao
+
+PARAMETROS = lote.ParametrosParede(0.3, 3, None, 'Frontal', (100.0, 0.8, 127.0, 1))
+
+
+def test_pareia_pela_menor_distancia():
+    desejados = [(0.0, 0.0), (5.0, 0.0), (10.0, 0.0)]
+    existentes = [(10.2, 0.0), (0.1, 0.0), (5.0, 0.3)]
+
+    pares, sem_par_d, sem_par_e = sincronizacao.parear(desejados, existentes)
+
+    assert sorted(pares) == [(0, 1), (1, 2), (2, 0)]
+    assert (sem_par_d, sem_par_e) == ([], [])
+
+
+def test_guloso_da_prioridade_ao_par_mais_proximo():
+    # O existente em 4.9 é o mais próximo dos dois desejados: fica com o de 5.0
+    pares, sem_par_d, sem_par_e = sincronizacao.parear([(0.0, 0.0), (5.0, 0.0)], [(4.9, 0.0)])
+
+    assert pares == [(1, 0)]
+    assert (sem_par_d, sem_par_e) == ([0], [])
+
+
+def test_sobras_dos_dois_lados():
+    pares, sem_par_d, sem_par_e = sincronizacao.parear([(0.0, 0.0)], [(3.0, 0.0), (0.5, 0.0), (9.0, 9.0)])
+
+    assert pares == [(0, 1)]
+    assert (sem_par_d, sem_par_e) == ([], [0, 2])
+    assert sincronizacao.parear([], [(1.0, 1.0)]) == ([], [], [0])
+    assert sincronizacao.parear([(1.0, 1.0)], []) == ([], [0], [])
+
+
+def test_pareamento_pela_grade_igual_ao_guloso_completo():
+    import random
+
+    aleatorio = random.Random(7)
+    desejados = [(aleatorio.uniform(0, 200), aleatorio.uniform(0, 3)) for _ in range(150)]
+    existentes = [(aleatorio.uniform(0, 200), aleatorio.uniform(0, 3)) for _ in range(120)]
+    distancias = sorted(
+        ((dx - ex) ** 2 + (dy - ey) ** 2, i, j)
+        for i, (dx, dy) in enumerate(desejados) for j, (ex, ey) in enumerate(existentes))
+    livres_d, livres_e, esperados = set(range(150)), set(range(120)), set()
+    for _, i, j in distancias:
+        if i in livres_d and j in livres_e:
+            livres_d.discard(i)
+            livres_e.discard(j)
+            esperados.add((i, j))
+
+    pares, sem_par_d, sem_par_e = sincronizacao.parear(desejados, existentes)
+
+    assert set(pares) == esperados
+    assert sem_par_d == sorted(livres_d) and sem_par_e == []
+
+
+def _itens_nas_duas_faces(parede):
+    frontal, _ = lote.planejar_lote([parede], PARAMETROS)
+    traseira, _ = lote.planejar_lote([parede], PARAMETROS, {parede.Id.Value: {'face': 'Traseira',
+                                                                              'numero_tomadas': 2}})
+    return frontal + traseira
+
+
+def test_lote_sincroniza_parede_que_aparece_em_dois_itens(projeto):
+    parede = projeto.parede((0.0, 0.0), (20.0, 0.0))
+    itens = _itens_nas_duas_faces(parede)
+    criadas = lote.executar_lote(projeto.doc, projeto.simbolo, itens).tomadas_por_parede[parede.Id.Value]
+    assert len(criadas) == 5
+
+    gerenciadas = marcacao.gerenciadas_por_parede(projeto.doc)
+    resultado = lote.executar_lote(projeto.doc, projeto.simbolo, itens, gerenciadas=gerenciadas)
+
+    # Cada item recebe só as tomadas da própria face: nada a mover, criar ou remover
+    assert resultado.erros == []
+    assert resultado.sincronizacao.alteracoes == 0
+    assert resultado.sincronizacao.mantidas == 5
+    assert all(projeto.doc.GetElement(t.Id) is not None for t in criadas)
+
+
+def test_lote_remove_sobras_so_depois_do_ultimo_item_da_parede(projeto):
+    parede = projeto.parede((0.0, 0.0), (20.0, 0.0))
+    lote.executar_lote(projeto.doc, projeto.simbolo, _itens_nas_duas_faces(parede))
+    # Agora só a face frontal, dividida em dois itens (ex.: potências diferentes)
+    itens, _ = lote.planejar_lote([parede], PARAMETROS)
+    item = itens[0]
+    divididos = [lote.ItemLote(parede, item.parametros, item.pontos[:1], item.tangentes[:1]),
+                 lote.ItemLote(parede, item.parametros, item.pontos[1:], item.tangentes[1:])]
+
+    gerenciadas = marcacao.gerenciadas_por_parede(projeto.doc)
+    resultado = lote.executar_lote(projeto.doc, projeto.simbolo, divididos, gerenciadas=gerenciadas)
+
+    assert resultado.erros == []
+    assert resultado.sincronizacao.mantidas == 3
+    assert (len(resultado.sincronizacao.criadas), len(resultado.sincronizacao.removidas)) == (0, 2)
+    assert len(marcacao.gerenciadas_por_parede(projeto.doc)[parede.Id.Value]) == 3
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from eletrica import relatorio, revit_falso, transacoes
+from eletrica.revit_falso import FailureMessage, FailureSeverity
+
+PARAM_S = u"Potência Aparente (VA)"
+
+
+@pytest.fixture
+def tomada(projeto):
+    return projeto.inserir([projeto.parede((0.0, 0.0), (20.0, 0.0))], numero=1, potencia=100.0)[0]
+
+
+def _s(tomada):
+    return tomada.LookupParameter(PARAM_S).AsDouble()
+
+
+def test_etapas_em_um_grupo_com_uma_regeneracao_por_etapa(projeto, tomada):
+    doc = projeto.doc
+    transacoes_antes, regeneracoes_antes = doc.transacoes, doc.regeneracoes
+    agendador = transacoes.Agendador(doc, u"Execução")
+
+    with agendador:
+        with agendador.etapa(u"Primeira"):
+            tomada.LookupParameter(PARAM_S).Set(200.0)
+            agendador.regenerar()
+            agendador.regenerar()
+            with agendador.etapa(u"Aninhada"):
+                agendador.regenerar()
+        with agendador.etapa(u"Segunda"):
+            tomada.LookupParameter(PARAM_S).Set(300.0)
+
+    assert (agendador.etapas, doc.transacoes - transacoes_antes) == (2, 2)
+    assert (agendador.pedidos_regeneracao, agendador.regeneracoes) == (3, 1)
+    assert doc.regeneracoes - regeneracoes_antes == 1
+    assert _s(tomada) == 300.0
+
+
+def test_avisos_sao_coletados_sem_desfazer(projeto, tomada):
+    agendador = transacoes.Agendador(projeto.doc, u"Execução")
+
+    with agendador, agendador.etapa(u"Editar"):
+        tomada.LookupParameter(PARAM_S).Set(200.0)
+        projeto.doc.PostFailure(FailureMessage(u"Instâncias sobrepostas").SetFailingElement(tomada.Id))
+
+    assert agendador.falhas == [transacoes.Falha(u"Editar", transacoes.AVISO, u"Instâncias sobrepostas",
+                                                 [tomada.Id.Value])]
+    assert agendador.erros == [] and agendador.resumo() == u"1 aviso(s) e 0 erro(s) do Revit; veja o relatório."
+    assert _s(tomada) == 200.0
+
+
+def test_erro_desfaz_o_grupo_inteiro(projeto, tomada):
+    agendador = transacoes.Agendador(projeto.doc, u"Execução")
+
+    with pytest.raises(transacoes.ErroEtapa) as erro:
+        with agendador:
+            with agendador.etapa(u"Primeira"):
+                tomada.LookupParameter(PARAM_S).Set(200.0)
+            with agendador.etapa(u"Segunda"):
+                tomada.LookupParameter(PARAM_S).Set(300.0)
+                projeto.doc.PostFailure(FailureMessage(u"Falha grave", FailureSeverity.Error))
+
+    assert erro.value.etapa == u"Segunda"
+    assert [f.descricao for f in erro.value.falhas] == [u"Falha grave"]
+    assert _s(tomada) == 100.0
+
+
+def test_excecao_na_etapa_desfaz_e_propaga(projeto, tomada):
+    agendador = transacoes.Agendador(projeto.doc, u"Execução")
+
+    with pytest.raises(ZeroDivisionError):
+        with agendador, agendador.etapa(u"Editar"):
+            tomada.LookupParameter(PARAM_S).Set(200.0)
+            agendador.regenerar()
+            1 / 0
+
+    assert _s(tomada) == 100.0
+    assert agendador.regeneracoes == 0
+    assert projeto.doc._transacao is None
+
+
+def test_relatorio_das_falhas():
+    agendador = transacoes.Agendador(None, u"Execução")
+    agendador.falhas.append(transacoes.Falha(u"Editar", transacoes.AVISO, u"Aviso", [1, 2]))
+    rel = relatorio.Relatorio([])
+
+    agendador.relatar(rel)
+
+    assert [tipo for tipo, _ in rel.entradas] == [relatorio.TITULO, relatorio.TABELA]
+    assert rel.entradas[1][1]['linhas'] == [[u"Editar", transacoes.AVISO, u"Aviso", u"1, 2"]]
+
+
+def test_ativar_simbolo_regenera_so_quando_ativa(projeto):
+    inativo = projeto.doc.criar_simbolo(u"Tomada", u"TUE 20A", ativo=False)
+    agendador = transacoes.Agendador(projeto.doc, u"Execução")
+
+    with agendador, agendador.etapa(u"Ativar"):
+        assert transacoes.ativar_simbolo(agendador, inativo)
+        assert not transacoes.ativar_simbolo(agendador, inativo)
+
+    assert inativo.IsActive and agendador.regeneracoes == 1
+    assert revit_falso.chamadas_api() > 0
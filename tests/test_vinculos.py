@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import math
+
+import pytest
+
+from eletrica import geometria, lote, marcacao, revit_falso, vinculos
+
+ORIGEM = (100.0, 50.0, 2.0)
+
+
+@pytest.fixture
+def arquitetura(request):
+    # Título único: a geometria do vínculo fica na sessão por documento
+    doc = revit_falso.Documento(u"Arquitetura {}".format(request.node.name))
+    tipo = doc.criar_tipo_parede()
+    terreo = doc.criar_nivel(u"Térreo", 0.0)
+    superior = doc.criar_nivel(u"Superior", 10.0)
+    doc.criar_parede((0.0, 0.0), (30.0, 0.0), terreo, tipo)
+    doc.criar_parede((0.0, 0.0), (20.0, 0.0), terreo, tipo, meio=(10.0, 10.0))
+    doc.criar_parede((0.0, 0.0), (30.0, 0.0), superior, tipo)
+    return doc
+
+
+@pytest.fixture
+def eletrico(projeto, arquitetura):
+    projeto.doc.criar_vinculo(arquitetura, origem=ORIGEM, rotacao=math.radians(90.0))
+    return projeto.doc
+
+
+def test_paredes_do_vinculo_no_documento_ativo(eletrico):
+    descricao = vinculos.descrever_vinculos(vinculos.vinculos_do_documento(eletrico), elevacao=2.0)
+    paredes = descricao.lote
+
+    assert len(descricao.ids) == 2
+    assert all(isinstance(p, vinculos.ParedeVinculada) for p in descricao.paredes)
+    assert (paredes.c0[0], paredes.c1[0], paredes.c2[0], paredes.c3[0]) == pytest.approx((100.0, 50.0, 100.0, 80.0))
+    assert paredes.z[0] == pytest.approx(2.0)
+    # Arco: centro (10, 0) vai para (100, 60) e o ângulo inicial gira 90°
+    assert paredes.tipo[1] == geometria.ARCO
+    assert (paredes.c0[1], paredes.c1[1]) == pytest.approx((100.0, 60.0))
+    assert (math.cos(paredes.c3[1]), math.sin(paredes.c3[1])) == pytest.approx((0.0, -1.0), abs=1e-9)
+
+
+def test_vinculo_espelhado_inverte_o_arco(projeto, arquitetura):
+    projeto.doc.criar_vinculo(arquitetura, origem=ORIGEM, espelhado=True)
+    vinculo, = vinculos.vinculos_do_documento(projeto.doc)
+    original = vinculos.paredes_do_vinculo(arquitetura, usar_sessao=False)[1]
+
+    descricao = vinculos.descrever_vinculos([vinculo], elevacao=2.0)
+
+    assert vinculo.espelhado
+    assert descricao.lote.c4[1] == pytest.approx(-original[6])
+
+
+def test_segunda_leitura_vem_da_sessao(eletrico, monkeypatch):
+    leituras = []
+    descrever = lote.descrever_paredes
+    monkeypatch.setattr(lote, 'descrever_paredes', lambda paredes: leituras.append(1) or descrever(paredes))
+
+    primeira = vinculos.descrever_vinculos(vinculos.vinculos_do_documento(eletrico), elevacao=2.0)
+    segunda = vinculos.descrever_vinculos(vinculos.vinculos_do_documento(eletrico), elevacao=12.0)
+
+    assert len(leituras) == 1
+    assert (len(primeira.ids), len(segunda.ids)) == (2, 1)
+
+
+def test_tomadas_criadas_no_documento_ativo(projeto, eletrico):
+    simbolo = projeto.doc.criar_simbolo(u"Tomada de face", u"TUG 10A", baseada_em_face=True)
+    descricao = vinculos.descrever_vinculos(vinculos.vinculos_do_documento(eletrico), elevacao=2.0)
+    parametros = lote.ParametrosParede(0.3, 3, None, 'Frontal', (100.0, 0.8, 127.0, 1))
+    itens, erros = lote.planejar_descritas(descricao, parametros)
+
+    resultado = lote.executar_lote(projeto.doc, simbolo, itens, nome=u"Tomadas no Vínculo")
+
+    assert vinculos.aceita_vinculo(simbolo) and not vinculos.aceita_vinculo(projeto.simbolo)
+    assert erros == [] and resultado.erros == [] and resultado.total == 6
+    # Parede girada 90°: vai de (100, 50) a (100, 80) e a face frontal fica a oeste
+    retas = resultado.tomadas_por_parede[marcacao.chave_parede(descricao.paredes[0])]
+    assert all(t.Document is projeto.doc for t in retas)
+    assert [(t.Location.Point.X, t.Location.Point.Y) for t in retas] == pytest.approx(
+        [(99.75, 50.0), (99.75, 65.0), (99.75, 80.0)])